@@ -12,6 +12,7 @@ import colorsys
 import itertools
 import threading
 from typing import TypeVar
+from datetime import timedelta
 
 # pyqt6 module import
 import numpy as np
@@ -595,30 +596,81 @@ def lcm(a, b):
     return (a * b) // math.gcd(a, b)
 
 
-def get_path_matches(f_path, f_str, is_file=False):
+def get_path_matches(f_path, f_str, is_file=False, descend_match=True):
 
     # initialisations
-    f_list = []
+    f_list, d_stack = [], [str(f_path)]
 
-    for root, dirs, files in os.walk(f_path):
-        if is_file:
-            # case is a file search
-            for f in files:
-                if f == f_str:
-                    f_list.append(os.path.join(root, f))
+    # searches the directory tree (iterative top-down search, in the same order as os.walk)
+    while len(d_stack):
+        d_path = d_stack.pop()
+        try:
+            f_scan = os.scandir(d_path)
 
-        else:
-            # case is a directory search
-            for d in dirs:
-                if d == f_str:
-                    f_list.append(os.path.join(root, d))
+        except OSError:
+            # case is an unreadable directory (skipped, as with os.walk)
+            continue
+
+        # searches the directory entries
+        sub_dir = []
+        with f_scan:
+            for f in f_scan:
+                is_dir = f.is_dir()
+                if (f.name == f_str) and (is_dir != is_file):
+                    # case is a matching file/directory
+                    f_list.append(os.path.join(d_path, f.name))
+                    if is_dir and (not descend_match):
+                        continue
+
+                # adds the sub-directory to the search (symbolic links are not followed)
+                if is_dir and (not f.is_symlink()):
+                    sub_dir.append(f.path)
+
+        d_stack.extend(reversed(sub_dir))
 
     return f_list
 
 
+def get_file_stamps(f_path):
+
+    # initialisations
+    f_stamp = []
+    if not os.path.isdir(f_path):
+        return f_stamp
+
+    # retrieves the relative path, size and modification time of each file within the directory tree
+    for root, dirs, files in os.walk(f_path):
+        for f in sorted(files):
+            f_stat = os.stat(os.path.join(root, f))
+            f_rel = os.path.relpath(os.path.join(root, f), f_path).replace('\\', '/')
+            f_stamp.append([f_rel, f_stat.st_size, f_stat.st_mtime_ns])
+
+    return sorted(f_stamp)
+
+
+def get_duration_string(t_dur):
+
+    # splits the duration into the hour/minute/second components
+    t_sp = str(timedelta(seconds=t_dur)).split(':')
+    t_sp_s = t_sp[2].split('.')
+    t_sp_ms = str(np.round(float(t_sp[2]) % 1, 3))[2:]
+
+    return '{0}:{1}:{2}.{3}'.format(t_sp[0], t_sp[1], t_sp_s[0], t_sp_ms)
+
+
+def get_cpu_budget(n_task, n_cpu=None):
+
+    # splits the CPU cores between the concurrent tasks (returns the worker count and the per-task job count)
+    n_cpu = (os.cpu_count() or 1) if (n_cpu is None) else n_cpu
+    n_worker = max(1, min(n_task, n_cpu))
+
+    return n_worker, max(1, n_cpu // n_worker)
+
+
 def get_folder_dir(f_path):
 
-    return [x for x in os.listdir(f_path) if os.path.isdir(os.path.join(f_path, x))]
+    with os.scandir(f_path) as f_scan:
+        return [x.name for x in f_scan if x.is_dir()]
 
 
 def normalise_trace(y):
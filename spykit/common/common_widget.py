@@ -15,9 +15,10 @@ from skimage.measure import label, regionprops
 # spykit module import
 import spykit.common.common_func as cf
 from spykit.threads.utils import ThreadWorker
+from spykit.common.session_trace import session_tracer
 
 # pyqtgraph module imports
-from pyqtgraph import (ViewBox, RectROI, InfiniteLine, ColorMap, colormap, TextItem)
+from pyqtgraph import (ViewBox, RectROI, InfiniteLine, ColorMap, colormap, TextItem, PlotWidget, BarGraphItem)
 
 # pyqt6 module import
 from PyQt6.QtWidgets import (QWidget, QHBoxLayout, QGridLayout, QVBoxLayout, QPushButton, QGroupBox, QTabWidget,
@@ -149,6 +150,7 @@ f_mode = {
     'filter': "Unit Filter Options (*.filt)",
     'saveview': "Portable Network Graphics File (*.png)",
     'text': "ASCII Text File (*.txt)",
+    'trace': "Chrome Trace File (*.json)",
 }
 
 f_name = {
@@ -387,9 +389,12 @@ class SessionProgress(QDialog):
     hght_button_frame = 40
 
     # array class fields
-    but_str = ['Save Session Details', 'Close Dialog']
+    but_str = ['Save Session Details', 'Export Load Timeline', 'Close Dialog']
     info_tab = ['Session', 'Preprocessing', 'Spike Sorting', 'Postprocessing']
 
+    # load timeline colours (based on span category)
+    span_col = {'session': 'b', 'worker': 'g', 'gui': 'r'}
+
     # widget styles
     list_style = "border: 1px solid black;"
     frame_style = QFrame.Shape.Box | QFrame.Shadow.Plain
@@ -443,6 +448,9 @@ class SessionProgress(QDialog):
             tab_widget = self.create_info_tab(it)
             self.prog_tab_grp.addTab(tab_widget, it)
 
+        # adds the session load timeline tab
+        self.prog_tab_grp.addTab(self.create_timeline_tab(), 'Load Timeline')
+
     def create_info_tab(self, tab_lbl):
 
         # tab widget/layouts
@@ -461,6 +469,43 @@ class SessionProgress(QDialog):
 
         return tab_widget
 
+    def create_timeline_tab(self):
+
+        # tab widget/layouts
+        tab_widget = QWidget()
+        tab_layout = QVBoxLayout()
+        plot_widget = PlotWidget()
+        info_list = QPlainTextEdit()
+
+        # sets the tab widget properties
+        tab_widget.setLayout(tab_layout)
+        tab_layout.addWidget(plot_widget, 3)
+        tab_layout.addWidget(info_list, 2)
+
+        # sets the listbox properties
+        info_list.setStyleSheet(self.list_style)
+        info_list.setReadOnly(True)
+        info_list.setPlainText(session_tracer.get_summary_string())
+
+        # sets the plot widget properties
+        plot_widget.setBackground('w')
+        plot_widget.setMouseEnabled(x=True, y=False)
+        plot_widget.setLabel('bottom', 'Time (s)')
+        plot_widget.getPlotItem().invertY(True)
+
+        # creates the waterfall bars (one row per span, ordered by start time)
+        t_span = sorted(session_tracer.get_spans(), key=lambda x: x.t_start)
+        for i_span, ts in enumerate(t_span):
+            bar_item = BarGraphItem(x0=[ts.t_start], y=[i_span], width=[max(ts.duration(), 1e-3)],
+                                    height=0.8, brush=self.span_col.get(ts.cat, 'k'))
+            plot_widget.addItem(bar_item)
+
+        # sets the span name tick labels
+        y_tick = [(i, ts.name) for i, ts in enumerate(t_span)]
+        plot_widget.getAxis('left').setTicks([y_tick])
+
+        return tab_widget
+
     def get_list_text(self, tab_lbl):
 
         match tab_lbl:
@@ -479,7 +524,7 @@ class SessionProgress(QDialog):
     def init_button_frame(self):
 
         # initialisations
-        cb_fcn = [self.save_props, self.close_window]
+        cb_fcn = [self.save_props, self.export_timeline, self.close_window]
 
         # sets the button frame properties
         self.button_frame.setLayout(self.button_layout)
@@ -512,6 +557,17 @@ class SessionProgress(QDialog):
             with open(file_path, "w", encoding="utf-8") as file:
                 file.writelines(self.ses_info.get_full_session_info())
 
+    def export_timeline(self):
+
+        # prompts the user for the chrome trace file name
+        file_dlg = FileDialogModal(
+            None, "Set File Name", f_mode["trace"], str(log_dir), is_save=True,
+        )
+        if file_dlg.exec() == QDialog.DialogCode.Accepted:
+            # outputs the session load timeline to file
+            file_path = cf.get_selected_file_path(file_dlg, f_mode["trace"])
+            session_tracer.export_chrome_trace(file_path)
+
     def close_window(self):
 
         self.close()
@@ -3138,6 +3194,7 @@ class QProgressWidget(QWidget):
     p_max = 1000
     t_int = 50
     t_period = 1000
+    t_reset = 250
     lbl_width = 170
     wait_lbl = "No Session Data Loaded"
 
@@ -3274,10 +3331,9 @@ class QProgressWidget(QWidget):
             # stops the timeline widget
             self.stop_timer()
 
-            # resets the progressbar
+            # resets the progressbar (after a short delay, without blocking the event loop)
             self.prog_bar.setValue(self.p_max)
-            time.sleep(0.25)
-            self.prog_bar.setValue(0)
+            QTimer.singleShot(self.t_reset, lambda: self.prog_bar.setValue(0))
 
             # resets the text label
             self.lbl_obj.setText(self.get_status_text())
@@ -3383,6 +3439,7 @@ class QDialogProgress(QWidget):
     t_int = 50
     p_max = 1000
     t_period = 1000
+    t_reset = 250
     lbl_width = 200
 
     wait_lbl = 'Waiting For User Input...'
@@ -3518,9 +3575,6 @@ class QDialogProgress(QWidget):
             self.m_str = m_str_nw
             self.lbl_obj.setText(self.m_str)
 
-        # pauses for a little bit
-        time.sleep(0.005)
-
     def update_time_string(self, t_lbl):
 
         t_str = time.strftime('%H:%M:%S', time.gmtime(t_lbl))
@@ -3538,9 +3592,8 @@ class QDialogProgress(QWidget):
             # stops the timeline widget
             self.stop_timer()
 
-            # resets the progressbar
-            time.sleep(0.25)
-            self.prog_bar.setValue(0)
+            # resets the progressbar (after a short delay, without blocking the event loop)
+            QTimer.singleShot(self.t_reset, lambda: self.prog_bar.setValue(0))
 
             # resets the text label
             self.lbl_obj.setText(self.wait_lbl)
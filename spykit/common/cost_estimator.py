@@ -0,0 +1,370 @@
+# module import
+import os
+import json
+import shutil
+import numpy as np
+
+# spykit module import
+import spykit.common.common_func as cf
+import spykit.common.common_widget as cw
+from spykit.common.job_tuner import job_tuner, n_chunk_buf, t_chunk_def
+from spykit.common.preprocess_cache import prep_cache
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+# calibration table file (a preprocessing benchmark output file, with an optional sorter section)
+cost_table_file = os.path.join(cw.para_dir, 'cost_table.json').replace('\\', '/')
+
+# default step throughput (single job channel samples per second), and the job count scaling exponent
+step_rate_def = {
+    'phase_shift': 1.5e7,
+    'bandpass_filter': 2.5e7,
+    'common_reference': 3.0e7,
+    'interpolate_channels': 2.0e7,
+    'remove_channels': 5.0e8,
+    'whitening': 1.5e7,
+    'drift_correct': 4.0e6,
+}
+step_rate_min = 1.0e7
+p_job_scale = 0.8
+
+# calibration recording sampling rate (the benchmark synthetic recording rate)
+s_freq_calib = 30000.
+
+# default step memory overhead (in MB, for a 384 channel recording - chunk buffers are added separately)
+step_ram_def = {
+    'drift_correct': 2000.,
+}
+
+# default sorter parameters (wall time per recording second, the fixed/per-channel memory in MB, and the size of the
+# sorter output relative to the int16 recording - all for a 384 channel recording)
+sorter_para_def = {
+    'kilosort4': {'t_factor': 1.0, 'ram_mb': 6000., 'ram_ch_mb': 8., 'disk_factor': 1.5},
+    'kilosort3': {'t_factor': 1.2, 'ram_mb': 6000., 'ram_ch_mb': 8., 'disk_factor': 1.5},
+    'kilosort2_5': {'t_factor': 1.2, 'ram_mb': 6000., 'ram_ch_mb': 8., 'disk_factor': 1.5},
+    'spykingcircus2': {'t_factor': 1.5, 'ram_mb': 4000., 'ram_ch_mb': 12., 'disk_factor': 1.2},
+    'tridesclous2': {'t_factor': 1.5, 'ram_mb': 4000., 'ram_ch_mb': 12., 'disk_factor': 1.2},
+    'mountainsort5': {'t_factor': 2.0, 'ram_mb': 4000., 'ram_ch_mb': 16., 'disk_factor': 1.2},
+    'herdingspikes': {'t_factor': 0.5, 'ram_mb': 2000., 'ram_ch_mb': 4., 'disk_factor': 0.2},
+    'simple': {'t_factor': 0.5, 'ram_mb': 2000., 'ram_ch_mb': 4., 'disk_factor': 0.2},
+}
+sorter_para_other = {'t_factor': 2.0, 'ram_mb': 6000., 'ram_ch_mb': 16., 'disk_factor': 1.5}
+n_ch_ref = 384
+
+# resource warning thresholds (fraction of the available RAM/free disk space)
+p_ram_warn = 0.8
+p_disk_warn = 0.9
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+"""
+    CostEstimate: predicted wall time, peak RAM and output disk usage of a processing plan
+"""
+
+
+class CostEstimate(object):
+    def __init__(self, t_run=0., t_pass=0., n_bytes_ram=0., n_bytes_disk=0., out_dir=None):
+        super(CostEstimate, self).__init__()
+
+        # class field initialisations
+        self.t_run = t_run
+        self.t_pass = t_pass
+        self.n_bytes_ram = n_bytes_ram
+        self.n_bytes_disk = n_bytes_disk
+        self.out_dir = out_dir
+
+        # other class fields
+        self.warnings = []
+
+    # ---------------------------------------------------------------------------
+    # Class Functions
+    # ---------------------------------------------------------------------------
+
+    def check_resources(self):
+
+        # resets the warnings
+        self.warnings = []
+
+        # checks the peak memory usage against the available RAM
+        n_bytes_avail = job_tuner.get_available_ram()
+        if (n_bytes_avail is not None) and (self.n_bytes_ram > p_ram_warn * n_bytes_avail):
+            self.warnings.append('Peak memory ({0}) exceeds the available RAM ({1})'.format(
+                get_size_string(self.n_bytes_ram), get_size_string(n_bytes_avail)))
+
+        # checks the output disk usage against the free disk space
+        n_bytes_free = get_free_disk_space(self.out_dir)
+        if (n_bytes_free is not None) and (self.n_bytes_disk > p_disk_warn * n_bytes_free):
+            self.warnings.append('Output size ({0}) exceeds the free disk space ({1})'.format(
+                get_size_string(self.n_bytes_disk), get_size_string(n_bytes_free)))
+
+        return self.warnings
+
+    def combine(self, est_other, is_concurrent=False):
+
+        # combines the estimate with another estimate (concurrent plans share the peak memory and wall time)
+        if is_concurrent:
+            self.t_run = max(self.t_run, est_other.t_run)
+            self.t_pass = max(self.t_pass, est_other.t_pass)
+            self.n_bytes_ram += est_other.n_bytes_ram
+
+        else:
+            self.t_run += est_other.t_run
+            self.t_pass += est_other.t_pass
+            self.n_bytes_ram = max(self.n_bytes_ram, est_other.n_bytes_ram)
+
+        self.n_bytes_disk += est_other.n_bytes_disk
+        self.out_dir = est_other.out_dir if (self.out_dir is None) else self.out_dir
+
+    # ---------------------------------------------------------------------------
+    # Class Getter Functions
+    # ---------------------------------------------------------------------------
+
+    def get_summary_string(self):
+
+        # sets the estimate summary
+        s_str = [
+            'Estimated Wall Time: {0}'.format(get_time_string(self.t_run)),
+            'Estimated Peak RAM: {0}'.format(get_size_string(self.n_bytes_ram)),
+            'Estimated Output Disk: {0}'.format(get_size_string(self.n_bytes_disk)),
+        ]
+
+        # adds the lazy pass time (the cost paid by each later read of the preprocessed data)
+        if self.t_pass > 0:
+            s_str.append('Preprocessed Data Pass: {0}'.format(get_time_string(self.t_pass)))
+
+        return '\n'.join(s_str + ['* {0}'.format(x) for x in self.warnings])
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+"""
+    CostEstimator: processing plan cost estimator. the step throughput/memory overheads are read from the calibration
+                   table (produced by the preprocessing benchmark), with default values used for uncalibrated steps,
+                   and the costs are scaled by the recording size and the per-shank/concatenation options
+"""
+
+
+class CostEstimator(object):
+    def __init__(self, table_file=cost_table_file):
+        super(CostEstimator, self).__init__()
+
+        # class field initialisations
+        self.table_file = table_file
+        self.step_calib = []
+        self.sorter_para = dict(sorter_para_def)
+
+        # loads the calibration table
+        self.load_table()
+
+    # ---------------------------------------------------------------------------
+    # Calibration Table Functions
+    # ---------------------------------------------------------------------------
+
+    def load_table(self, table_file=None):
+
+        # resets the calibration fields
+        self.table_file = self.table_file if (table_file is None) else table_file
+        self.step_calib = []
+        self.sorter_para = dict(sorter_para_def)
+
+        # exits if there is no calibration table
+        if (self.table_file is None) or (not os.path.isfile(self.table_file)):
+            return
+
+        try:
+            with open(self.table_file, 'r', encoding='utf-8') as f:
+                c_data = json.load(f)
+
+        except (OSError, ValueError):
+            # case is the table couldn't be read
+            return
+
+        # stores the successful single step results
+        self.step_calib = [x for x in c_data.get('results', []) if
+                           (x.get('step') in step_rate_def) and ('error' not in x) and x.get('channel_samples_per_s')]
+
+        # updates the sorter parameters
+        for s_name, s_para in c_data.get('sorters', {}).items():
+            self.sorter_para[s_name] = dict(self.sorter_para.get(s_name, sorter_para_other), **s_para)
+
+    def get_step_rate(self, pp_name, n_jobs, dtype):
+
+        # retrieves the calibrated results for the step (results with the same data type are preferred)
+        s_calib = [x for x in self.step_calib if x['step'] == pp_name]
+        s_calib = [x for x in s_calib if x['dtype'] == dtype.name] or s_calib
+        if len(s_calib) == 0:
+            # case is the step is uncalibrated (the default throughput is used)
+            return step_rate_def.get(pp_name, step_rate_min) * n_jobs ** p_job_scale
+
+        # uses the result with the closest job count (the throughput is not extrapolated to larger job counts)
+        c_best = min(s_calib, key=lambda x: abs(x['n_jobs'] - n_jobs))
+        return c_best['channel_samples_per_s'] * min(1., (n_jobs / c_best['n_jobs']) ** p_job_scale)
+
+    def get_step_ram(self, pp_name, n_ch):
+
+        # retrieves the calibrated results for the step
+        s_calib = [x for x in self.step_calib if (x['step'] == pp_name) and (x.get('rss_peak_mb') is not None)]
+        if len(s_calib) == 0:
+            # case is the step is uncalibrated (the default overhead is used)
+            return step_ram_def.get(pp_name, 0.) * (n_ch / n_ch_ref) * 2 ** 20
+
+        # removes the synthetic recording size from the peak memory (the overhead is scaled by the channel count)
+        n_bytes_step = []
+        for sc in s_calib:
+            n_bytes_rec = sc['n_channels'] * sc['t_dur'] * np.dtype(sc['dtype']).itemsize * s_freq_calib
+            n_bytes_step.append(max(0., sc['rss_peak_mb'] * 2 ** 20 - n_bytes_rec) * n_ch / sc['n_channels'])
+
+        return max(n_bytes_step)
+
+    # ---------------------------------------------------------------------------
+    # Estimate Functions
+    # ---------------------------------------------------------------------------
+
+    def estimate_preprocess(self, probe_recs, n_shank, pp_steps, per_shank, concat_runs, use_cache):
+
+        # memory allocation
+        est = CostEstimate(out_dir=prep_cache.cache_dir if use_cache else None)
+
+        # estimates the plan cost for each probe (probe tasks are run concurrently)
+        for recs in probe_recs:
+            p_unit = get_plan_units(recs, n_shank, per_shank, concat_runs)
+            n_worker, n_jobs = cf.get_cpu_budget(len(p_unit))
+            est.combine(self.estimate_preprocess_units(p_unit, pp_steps, use_cache, n_worker, n_jobs), True)
+
+        est.check_resources()
+        return est
+
+    def estimate_preprocess_units(self, p_unit, pp_steps, use_cache, n_worker, n_jobs):
+
+        # memory allocation
+        est = CostEstimate()
+        dtype_filt = np.dtype('float32')
+
+        for n_ch, n_frm, s_freq, dtype in p_unit:
+            # initialisations
+            n_samp = n_ch * n_frm
+            t_step = [n_samp / self.get_step_rate(x, n_jobs, dtype) for x in pp_steps]
+
+            # the lazy pass reads through all steps (materialised steps only run the last step on each pass)
+            est_u = CostEstimate()
+            est_u.t_pass = sum(t_step[-1:]) if use_cache else sum(t_step)
+
+            if use_cache:
+                # case is the steps are materialised (each step is computed once and written to disk)
+                est_u.t_run = sum(t_step)
+                est_u.n_bytes_disk = len(pp_steps) * n_samp * dtype_filt.itemsize
+
+            elif 'drift_correct' in pp_steps:
+                # case is lazy preprocessing (only the motion estimation is run, reading through the upstream steps)
+                est_u.t_run = sum(t_step[:(pp_steps.index('drift_correct') + 1)])
+
+            # sets the peak memory (the job chunk buffers and the largest step overhead)
+            n_bytes_job = n_ch * int(s_freq * t_chunk_def) * dtype_filt.itemsize * n_chunk_buf
+            n_bytes_step = max([self.get_step_ram(x, n_ch) for x in pp_steps], default=0.)
+            est_u.n_bytes_ram = n_jobs * n_bytes_job + n_bytes_step
+
+            # adds the unit estimate
+            est.combine(est_u)
+
+        # scales the wall time/memory by the concurrent unit count
+        est.t_run /= n_worker
+        est.n_bytes_ram *= n_worker
+
+        return est
+
+    def estimate_sorting(self, probe_recs, n_shank, sorter, per_shank, concat_runs, out_dir, pp_steps=None):
+
+        # memory allocation
+        est = CostEstimate(out_dir=out_dir)
+        s_para = self.sorter_para.get(sorter, sorter_para_other)
+        pp_steps = [] if (pp_steps is None) else pp_steps
+
+        # estimates the plan cost for each probe (probe tasks are run concurrently)
+        for recs in probe_recs:
+            p_unit = get_plan_units(recs, n_shank, per_shank, concat_runs)
+            est.combine(self.estimate_sorting_units(p_unit, s_para, pp_steps), True)
+
+        est.check_resources()
+        return est
+
+    def estimate_sorting_units(self, p_unit, s_para, pp_steps):
+
+        # memory allocation
+        est = CostEstimate()
+        n_jobs = cf.get_cpu_budget(1)[1]
+
+        for n_ch, n_frm, s_freq, dtype in p_unit:
+            # initialisations
+            est_u = CostEstimate()
+            t_dur, p_ch = n_frm / s_freq, n_ch / n_ch_ref
+
+            # the sorter reads the preprocessed data through the lazy preprocessing steps
+            t_pass = sum([n_ch * n_frm / self.get_step_rate(x, n_jobs, dtype) for x in pp_steps])
+
+            # sets the sorter time/memory/disk usage (scaled by the channel count)
+            est_u.t_run = t_pass + s_para['t_factor'] * t_dur * p_ch
+            est_u.n_bytes_ram = (s_para['ram_mb'] + s_para['ram_ch_mb'] * n_ch) * 2 ** 20
+            est_u.n_bytes_disk = s_para['disk_factor'] * n_ch * n_frm * np.dtype('int16').itemsize
+
+            # adds the unit estimate (sorting units are run in sequence)
+            est.combine(est_u)
+
+        return est
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def get_plan_units(recs, n_shank, per_shank, concat_runs):
+    """Returns the channel count, frame count, sampling rate and data type of each plan unit (the runs of a
+       concatenated plan are combined, and the channels are split between the shanks of a per-shank plan)"""
+
+    # retrieves the run recording dimensions
+    r_dim = [(r.get_num_channels(), r.get_num_frames(), r.get_sampling_frequency(), r.get_dtype()) for r in recs]
+    if concat_runs and len(r_dim):
+        r_dim = [(r_dim[0][0], sum([x[1] for x in r_dim]), r_dim[0][2], r_dim[0][3])]
+
+    # splits the runs by shank (if required)
+    if per_shank and (n_shank > 1):
+        return [(int(np.ceil(x[0] / n_shank)), x[1], x[2], x[3]) for x in r_dim for _ in range(n_shank)]
+
+    return r_dim
+
+
+def get_free_disk_space(out_dir):
+    """Returns the free disk space (in bytes) of the output folder, out_dir (None if unknown)"""
+
+    if out_dir is None:
+        return None
+
+    try:
+        # finds the nearest existing folder
+        d_path = os.path.abspath(out_dir)
+        while not os.path.exists(d_path):
+            d_path = os.path.dirname(d_path)
+
+        return shutil.disk_usage(d_path).free
+
+    except OSError:
+        return None
+
+
+def get_time_string(t_dur):
+    """Returns the hour/minute/second string for the duration, t_dur (hours are not wrapped at a day)"""
+
+    t_min, t_sec = divmod(int(np.ceil(t_dur)), 60)
+    return '{0:02d}:{1:02d}:{2:02d}'.format(*divmod(t_min, 60), t_sec)
+
+
+def get_size_string(n_bytes):
+    """Returns the size string for the byte count, n_bytes"""
+
+    for i_scl, s_unit in enumerate(['B', 'KB', 'MB', 'GB']):
+        if n_bytes < 2 ** (10 * (i_scl + 1)):
+            return '{0:.1f} {1}'.format(n_bytes / 2 ** (10 * i_scl), s_unit)
+
+    return '{0:.1f} TB'.format(n_bytes / 2 ** 40)
+
+
+# global processing plan cost estimator object
+cost_estimator = CostEstimator()
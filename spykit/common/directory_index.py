@@ -0,0 +1,210 @@
+# module import
+import os
+import json
+import time
+
+# spykit module import
+import spykit.common.common_widget as cw
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+# directory index file path
+index_file = os.path.join(cw.resource_dir, 'dir_index.json').replace('\\', '/')
+
+# index format version
+index_version = 1
+
+# directory modification time tolerance (directories modified within this period are always rescanned, as
+# changes within the file system timestamp resolution would otherwise be missed)
+t_mod_tol = 2 * 10 ** 9
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+"""
+    DirectoryIndex: persistent index of the directory listings visited by DirectoryCheck. each entry holds the
+                    directory modification time and sub-directory names, and a listing is only re-read if the
+                    directory modification time has changed since it was indexed
+"""
+
+
+class DirectoryIndex(object):
+    def __init__(self, i_file=None):
+        super(DirectoryIndex, self).__init__()
+
+        # class field initialisations
+        self.i_file = i_file
+        self.d_index = {}
+        self.d_visit = set()
+
+        # scan counters
+        self.n_scan = 0
+        self.n_reuse = 0
+
+        # boolean class fields
+        self.is_loaded = False
+        self.is_changed = False
+
+    # ---------------------------------------------------------------------------
+    # Directory Listing Functions
+    # ---------------------------------------------------------------------------
+
+    def get_folder_dir(self, f_path):
+
+        return self.get_dir_entry(f_path)[1]
+
+    def get_dir_entry(self, f_path):
+
+        # retrieves the directory modification time
+        f_path = str(f_path)
+        f_mtime = os.stat(f_path).st_mtime_ns
+        self.d_visit.add(f_path)
+
+        # returns the indexed listing (if the directory is unchanged)
+        d_entry = self.d_index.get(f_path)
+        if (d_entry is not None) and (d_entry[0] == f_mtime):
+            self.n_reuse += 1
+            return d_entry
+
+        # otherwise, re-reads the directory sub-directories (symbolic links are flagged)
+        f_dir, f_link = [], []
+        with os.scandir(f_path) as f_scan:
+            for f in f_scan:
+                if f.is_dir():
+                    f_dir.append(f.name)
+                    if f.is_symlink():
+                        f_link.append(f.name)
+
+        # updates the index entry (recently modified directories are flagged for rescanning)
+        if (time.time_ns() - f_mtime) < t_mod_tol:
+            f_mtime = -1
+
+        self.d_index[f_path] = [f_mtime, f_dir, f_link]
+        self.n_scan += 1
+        self.is_changed = True
+
+        return self.d_index[f_path]
+
+    def get_path_matches(self, f_path, f_str):
+
+        # initialisations
+        f_list, d_stack = [], [str(f_path)]
+
+        # searches the directory tree for matching directories (matches are not searched)
+        while len(d_stack):
+            d_path = d_stack.pop()
+            try:
+                _, f_dir, f_link = self.get_dir_entry(d_path)
+
+            except OSError:
+                # case is an unreadable directory
+                continue
+
+            # searches the sub-directories
+            sub_dir = []
+            for fd in f_dir:
+                if fd == f_str:
+                    # case is a matching directory
+                    f_list.append(os.path.join(d_path, fd))
+
+                elif fd not in f_link:
+                    # case is a sub-directory to search
+                    sub_dir.append(os.path.join(d_path, fd))
+
+            d_stack.extend(reversed(sub_dir))
+
+        return f_list
+
+    # ---------------------------------------------------------------------------
+    # Index Scan Functions
+    # ---------------------------------------------------------------------------
+
+    def start_scan(self):
+
+        # loads the index file (first scan only)
+        if not self.is_loaded:
+            self.load_index()
+
+        # resets the scan fields
+        self.d_visit = set()
+        self.n_scan, self.n_reuse = 0, 0
+
+    def end_scan(self, f_root):
+
+        # determines the entries within the search folder that were not visited (parent folders first)
+        f_root = str(f_root)
+        d_chk = sorted([x for x in self.d_index if self.is_sub_path(x, f_root) and (x not in self.d_visit)], key=len)
+
+        # removes the entries for directories that no longer exist within their (indexed) parent directory
+        d_rmv = []
+        for d in d_chk:
+            d_parent, d_name = os.path.split(d)
+            p_entry = self.d_index.get(d_parent)
+            if (p_entry is None) or (d_name not in p_entry[1]):
+                self.d_index.pop(d)
+                d_rmv.append(d)
+
+        # saves the index (if there was a change)
+        if self.is_changed or len(d_rmv):
+            self.save_index()
+
+    # ---------------------------------------------------------------------------
+    # Index File Functions
+    # ---------------------------------------------------------------------------
+
+    def load_index(self):
+
+        # flag that the index has been loaded
+        self.is_loaded = True
+        if (self.i_file is None) or (not os.path.exists(self.i_file)):
+            return
+
+        try:
+            # loads the index file
+            with open(self.i_file, 'r', encoding='utf-8') as f:
+                i_data = json.load(f)
+
+        except (OSError, ValueError):
+            # case is an invalid index file (the index is rebuilt)
+            return
+
+        # sets the index entries (if the index version is valid)
+        if i_data.get('version') == index_version:
+            self.d_index = i_data.get('dirs', {})
+
+    def save_index(self):
+
+        # exits if there is no index file
+        if self.i_file is None:
+            return
+
+        try:
+            # writes the index to a temporary file (the index is replaced once the write has completed)
+            os.makedirs(os.path.dirname(self.i_file), exist_ok=True)
+            with open(self.i_file + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump({'version': index_version, 'dirs': self.d_index}, f)
+
+            os.replace(self.i_file + '.tmp', self.i_file)
+            self.is_changed = False
+
+        except OSError:
+            # case is the index file can't be written (the index is kept in memory)
+            pass
+
+    def clear(self):
+
+        self.d_index = {}
+        self.is_changed = True
+
+    # ---------------------------------------------------------------------------
+    # Static Methods
+    # ---------------------------------------------------------------------------
+
+    @staticmethod
+    def is_sub_path(f_path, f_root):
+
+        f_root = f_root.rstrip('/\\')
+        return (f_path == f_root) or f_path.startswith((f_root + '/', f_root + '\\'))
+
+
+# global directory index object
+dir_index = DirectoryIndex(index_file)
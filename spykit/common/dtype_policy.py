@@ -0,0 +1,123 @@
+# module import
+import numpy as np
+
+# spikeinterface module import
+from spikeinterface.core import get_random_data_chunks
+from spikeinterface.preprocessing import scale, clip
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+# filtered/export data type options
+filt_dtypes = ['float32', 'float64']
+export_dtypes = ['int16', 'float32']
+
+# requantisation parameters (the signal range headroom and the range estimate chunk count/size)
+p_headroom = 0.5
+n_chunk_q = 20
+n_frm_chunk_q = 10000
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+"""
+    DtypePolicy: session data type policy for the preprocessing chain. channel selection steps keep the input data
+                 type (so raw int16 data stays int16), filtering steps produce float32 data, and exported data is
+                 requantised to int16 (the requantisation gain is stored in the channel gains)
+"""
+
+
+class DtypePolicy(object):
+    # steps that keep the input data type
+    pass_steps = ['remove_channels']
+
+    # steps that set the output data type directly (all other steps are cast)
+    dtype_steps = ['phase_shift', 'bandpass_filter', 'common_reference']
+
+    # steps that require floating point input data
+    float_steps = ['drift_correct']
+
+    def __init__(self, filt_dtype='float32', export_dtype='int16'):
+        super(DtypePolicy, self).__init__()
+
+        # class field initialisations
+        self.filt_dtype = filt_dtype
+        self.export_dtype = export_dtype
+
+    # ---------------------------------------------------------------------------
+    # Preprocessing Step Functions
+    # ---------------------------------------------------------------------------
+
+    def get_step_opt(self, pp_name, pp_opt):
+
+        # sets the output data type for the steps that support it
+        if (pp_name in self.dtype_steps) and ('dtype' not in pp_opt):
+            pp_opt = dict(pp_opt, dtype=self.filt_dtype)
+
+        return pp_opt
+
+    def get_step_input(self, rec, pp_name):
+
+        # casts integer data for the steps that require floating point data (the cast is lazy)
+        if (pp_name in self.float_steps) and (rec.get_dtype().kind != 'f'):
+            return rec.astype(self.filt_dtype)
+
+        return rec
+
+    def get_step_output(self, rec, rec_in, pp_name):
+
+        dtype = self.get_step_dtype(rec_in.get_dtype(), pp_name)
+        return rec if (rec.get_dtype() == dtype) else rec.astype(dtype)
+
+    def get_step_dtype(self, dtype_in, pp_name):
+
+        # channel selection steps keep the input data type, and all other steps use the filtered data type
+        return np.dtype(dtype_in) if (pp_name in self.pass_steps) else np.dtype(self.filt_dtype)
+
+    # ---------------------------------------------------------------------------
+    # Export Functions
+    # ---------------------------------------------------------------------------
+
+    def requantise(self, rec, export_dtype=None):
+
+        # field retrieval
+        export_dtype = np.dtype(self.export_dtype if (export_dtype is None) else export_dtype)
+
+        if rec.get_dtype() == export_dtype:
+            # case is the recording has the export data type
+            return rec, 1.
+
+        elif (export_dtype.kind not in 'iu') or (rec.get_dtype().kind in 'iu'):
+            # case is floating point export (or integer to integer conversion)
+            return rec.astype(export_dtype), 1.
+
+        # estimates the signal range (from random data chunks)
+        y_chunk = get_random_data_chunks(rec, num_chunks_per_segment=n_chunk_q, chunk_size=n_frm_chunk_q, seed=0)
+        y_max = max(float(np.max(np.abs(y_chunk))), 1.)
+
+        # sets the requantisation gain (the range headroom allows for peaks outside the sampled chunks)
+        y_lim = np.iinfo(export_dtype).max
+        gain = y_max / (p_headroom * y_lim)
+
+        # requantises the recording (values outside the integer range are clipped)
+        rec_q = scale(clip(rec, a_min=-y_lim * gain, a_max=y_lim * gain), gain=1. / gain, dtype=export_dtype.str)
+
+        # resets the channel gains (so the scaled traces are unchanged)
+        n_ch = rec.get_num_channels()
+        if rec.has_scaleable_traces():
+            rec_q.set_channel_gains(rec.get_channel_gains() * gain)
+            rec_q.set_channel_offsets(rec.get_channel_offsets())
+
+        else:
+            rec_q.set_channel_gains(np.full(n_ch, gain))
+            rec_q.set_channel_offsets(np.zeros(n_ch))
+
+        # stores the requantisation gain
+        rec_q.annotate(requant_gain=gain)
+        return rec_q, gain
+
+    # ---------------------------------------------------------------------------
+    # Class Getter Functions
+    # ---------------------------------------------------------------------------
+
+    def get_policy_info(self):
+
+        return {'filt_dtype': self.filt_dtype, 'export_dtype': self.export_dtype}
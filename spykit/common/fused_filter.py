@@ -0,0 +1,254 @@
+# module import
+import numpy as np
+import scipy.fft
+import scipy.signal
+
+# spikeinterface module import
+from spikeinterface.core import get_chunk_with_margin
+from spikeinterface.preprocessing.basepreprocessor import BasePreprocessor, BasePreprocessorSegment
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+# fused preprocessing step chain
+fused_chain = ['phase_shift', 'bandpass_filter', 'common_reference']
+
+# supported step parameters (chains with other parameters are run as separate layers)
+fused_para = {
+    'phase_shift': ['margin_ms', 'dtype'],
+    'bandpass_filter': ['freq_min', 'freq_max', 'margin_ms', 'dtype'],
+    'common_reference': ['operator', 'reference', 'dtype'],
+}
+
+# validation parameters (validation chunk duration and relative tolerance)
+t_valid = 0.05
+tol_valid = 1e-3
+
+# validation results (keyed by the recording type and chain step parameters)
+valid_status = {}
+
+# phase shift factor cache (keyed by the transform size and inter-sample shifts, so the factors are reused between
+# recordings with the same probe)
+shift_cache = {}
+n_shift_cache = 8
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+"""
+    FusedFilterRecording: single-pass phase shift -> bandpass filter -> global common reference recording. the parent
+                          traces are read once (with the combined step margins), and the steps are run on a float32
+                          chunk buffer (the phase shift factors are reused between chunks of the same size)
+"""
+
+
+class FusedFilterRecording(BasePreprocessor):
+    # extractor name
+    name = 'fused_filter'
+
+    def __init__(self, recording, ps_opt, bp_opt, cr_opt, dtype=None):
+
+        # field retrieval
+        dtype = recording.get_dtype() if (dtype is None) else np.dtype(dtype)
+        s_freq = recording.get_sampling_frequency()
+        BasePreprocessor.__init__(self, recording, dtype=dtype)
+
+        # phase shift parameters
+        sample_shift = np.asarray(recording.get_property('inter_sample_shift'), dtype=float)
+        m_ps = int(float(ps_opt.get('margin_ms', 40.)) * s_freq / 1000.)
+
+        # bandpass filter parameters (the filter sections are float32, so the filter runs on the chunk buffer type)
+        band = [float(bp_opt.get('freq_min', 300.)), float(bp_opt.get('freq_max', 6000.))]
+        coeff = scipy.signal.iirfilter(5, band, fs=s_freq, analog=False, btype='bandpass', ftype='butter', output='sos')
+        coeff = coeff.astype('float32')
+        m_bp = int(float(bp_opt.get('margin_ms', 5.)) * s_freq / 1000.)
+
+        # common reference operator
+        op_fcn = calc_median_ref if (cr_opt.get('operator', 'median') == 'median') else calc_mean_ref
+
+        # sets up the recording segments
+        for rec_seg in recording._recording_segments:
+            self.add_recording_segment(
+                FusedFilterRecordingSegment(rec_seg, sample_shift, m_ps, coeff, m_bp, op_fcn, dtype)
+            )
+
+        # sets the recording keyword arguments
+        self._kwargs = dict(recording=recording, ps_opt=ps_opt, bp_opt=bp_opt, cr_opt=cr_opt, dtype=dtype.str)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+"""
+    FusedFilterRecordingSegment: fused filter recording segment
+"""
+
+
+class FusedFilterRecordingSegment(BasePreprocessorSegment):
+    def __init__(self, parent_segment, sample_shift, m_ps, coeff, m_bp, op_fcn, dtype):
+        BasePreprocessorSegment.__init__(self, parent_segment)
+
+        # step parameters
+        self.sample_shift = sample_shift
+        self.m_ps = m_ps
+        self.coeff = coeff
+        self.m_bp = m_bp
+        self.op_fcn = op_fcn
+        self.dtype = dtype
+
+        # other class fields
+        self.is_int = np.issubdtype(dtype, np.integer)
+
+    def get_traces(self, start_frame, end_frame, channel_indices):
+
+        # field retrieval
+        n_frm = self.parent_recording_segment.get_num_samples()
+        start_frame = 0 if (start_frame is None) else start_frame
+        end_frame = n_frm if (end_frame is None) else end_frame
+
+        # sets the bandpass filter margins (these are truncated at the recording limits, as for the layered filter)
+        bp_l, bp_r = min(self.m_bp, start_frame), min(self.m_bp, n_frm - end_frame)
+
+        # reads the parent traces once (the phase shift margins are zero-padded and tapered)
+        y, ps_l, ps_r = get_chunk_with_margin(self.parent_recording_segment, start_frame - bp_l, end_frame + bp_r,
+                                              None, self.m_ps, add_zeros=True, window_on_margin=True, dtype='float32')
+
+        # applies the phase shift (removing the phase shift margins)
+        y = self.apply_phase_shift(y)[ps_l:(y.shape[0] - ps_r)]
+        if self.is_int:
+            np.round(y, out=y)
+
+        # applies the bandpass filter (removing the filter margins)
+        y = scipy.signal.sosfiltfilt(self.coeff, y, axis=0).astype('float32', copy=False)
+        y = y[bp_l:(y.shape[0] - bp_r)]
+        if self.is_int:
+            np.round(y, out=y)
+
+        # subtracts the common reference (calculated over all channels)
+        y_ref = self.op_fcn(y)
+        if channel_indices is None:
+            # case is all channels (the reference is subtracted in place)
+            y -= y_ref
+
+        else:
+            # case is a channel subset
+            y = y[:, channel_indices] - y_ref
+
+        return y.astype(self.dtype, copy=False)
+
+    def apply_phase_shift(self, y):
+
+        # applies the shift in the frequency domain. the chunk is zero-padded to a fast transform size (the chunk
+        # margins are tapered to zero, so the padding doesn't alter the shifted signal)
+        n_frm = y.shape[0]
+        n_fft = scipy.fft.next_fast_len(n_frm, real=True)
+        y_f = scipy.fft.rfft(y, n=n_fft, axis=0)
+        y_f *= get_shift_factors(n_fft, self.sample_shift)
+
+        return scipy.fft.irfft(y_f, n=n_fft, axis=0)[:n_frm].astype('float32', copy=False)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def get_shift_factors(n_frm, sample_shift):
+    """Returns the phase shift factors for a chunk of n_frm samples with the inter-sample shifts, sample_shift"""
+
+    # returns the stored factors (if available)
+    s_key = (n_frm, sample_shift.tobytes())
+    f_shift = shift_cache.get(s_key)
+    if f_shift is not None:
+        return f_shift
+
+    # frequency scale (the last frequency is the nyquist frequency for even sample counts)
+    n_freq = n_frm // 2 + 1
+    omega = np.linspace(0, np.pi * (1 if (n_frm % 2 == 0) else (n_frm - 1) / n_frm), n_freq)
+    f_shift = np.exp(-1j * omega[:, None] * sample_shift[None, :]).astype('complex64')
+
+    # stores the factors (the oldest factors are removed if the cache is full)
+    if len(shift_cache) >= n_shift_cache:
+        shift_cache.pop(next(iter(shift_cache)), None)
+
+    shift_cache[s_key] = f_shift
+    return f_shift
+
+
+def calc_median_ref(y):
+    """Returns the median over the channels of the chunk, y (the median is taken from the sorted channel values, as
+       the vectorised sort is much faster than the median partition for the probe channel counts)"""
+
+    n_ch = y.shape[1]
+    y_sort = np.sort(y, axis=1)
+    return 0.5 * (y_sort[:, [(n_ch - 1) // 2]] + y_sort[:, [n_ch // 2]])
+
+
+def calc_mean_ref(y):
+    """Returns the mean over the channels of the chunk, y"""
+
+    return np.mean(y, axis=1, keepdims=True)
+
+
+def find_fused_chain(pp_names):
+    """Returns the start index of the fused step chain within the step names, pp_names (None if not found)"""
+
+    for i in range(len(pp_names) - len(fused_chain) + 1):
+        if pp_names[i:(i + len(fused_chain))] == fused_chain:
+            return i
+
+    return None
+
+
+def can_fuse_steps(rec, pp_opt):
+    """Determines if the chain step parameters, pp_opt, and recording, rec, can be run as a fused kernel"""
+
+    # the phase shift requires the inter-sample shifts, and only the global reference is fused
+    if ('inter_sample_shift' not in rec.get_property_keys()) or (pp_opt[2].get('reference') != 'global'):
+        return False
+
+    # the reference operator must be supported
+    if pp_opt[2].get('operator', 'median') not in ['median', 'average']:
+        return False
+
+    return all([set(p_opt).issubset(fused_para[pp_name]) for pp_name, p_opt in zip(fused_chain, pp_opt)])
+
+
+def fuse_filter_chain(rec, rec_layer, pp_opt):
+    """Returns the fused recording for the chain step parameters, pp_opt (the layered recording, rec_layer, is
+       returned if the chain can't be fused, or the fused output doesn't match the layered output)"""
+
+    # exits if the chain can't be fused
+    if not can_fuse_steps(rec, pp_opt):
+        return rec_layer
+
+    try:
+        # creates the fused recording
+        rec_fuse = FusedFilterRecording(rec, *pp_opt, dtype=rec_layer.get_dtype())
+
+    except Exception:
+        # case is the fused recording couldn't be created
+        return rec_layer
+
+    # validates the fused recording against the layered recording (once for each recording type/parameter set)
+    v_key = repr([rec.get_dtype().str, rec.get_num_channels(), rec.get_sampling_frequency(), pp_opt])
+    if v_key not in valid_status:
+        valid_status[v_key] = validate_fused_recording(rec_fuse, rec_layer)
+
+    return rec_fuse if valid_status[v_key] else rec_layer
+
+
+def validate_fused_recording(rec_fuse, rec_layer):
+    """Determines if the fused recording, rec_fuse, matches the layered recording, rec_layer, over chunks at the
+       start/middle of the recording"""
+
+    # field retrieval
+    n_frm = rec_layer.get_num_frames()
+    n_chk = min(n_frm, int(t_valid * rec_layer.get_sampling_frequency()))
+
+    for i_frm0 in [0, (n_frm - n_chk) // 2]:
+        # retrieves the fused/layered traces
+        y_layer = rec_layer.get_traces(start_frame=i_frm0, end_frame=i_frm0 + n_chk).astype(float)
+        y_fuse = rec_fuse.get_traces(start_frame=i_frm0, end_frame=i_frm0 + n_chk).astype(float)
+
+        # determines if the traces match (integer types are allowed to differ by the rounding)
+        y_tol = max(tol_valid * np.max(np.abs(y_layer)), 2. if rec_fuse.get_dtype().kind in 'iu' else 0.)
+        if (y_fuse.shape != y_layer.shape) or (np.max(np.abs(y_fuse - y_layer), initial=0) > y_tol):
+            return False
+
+    return True
@@ -0,0 +1,292 @@
+# module import
+import os
+import time
+import shutil
+import tempfile
+import threading
+import numpy as np
+
+# spikeinterface module import
+import spikeinterface as si
+
+# spykit module import
+import spykit.common.common_func as cf
+from spykit.common.memory_manager import mem_manager
+from spykit.common.recording_export import RecordingExport
+
+# psutil module import (optional - used for the available memory)
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+# candidate chunk durations (in seconds)
+t_chunk_opt = [0.25, 0.5, 1., 2.]
+t_chunk_def = 1.
+
+# calibration export parameters (minimum/maximum slice duration, and the minimum relative throughput gain)
+t_calib_min = 3.
+t_calib_max = 30.
+p_gain_min = 0.05
+
+# memory model parameters (fraction of the available RAM used by the jobs, and the chunk buffers held by each job)
+p_ram_avail = 0.5
+n_chunk_buf = 4
+
+# disk probe parameters (probe file size/block size, and the disk throughput saturation fraction)
+n_bytes_disk = 64 * 2 ** 20
+n_bytes_disk_blk = 8 * 2 ** 20
+p_disk_sat = 0.9
+
+# maximum envelope read duration (in seconds)
+t_read_max = 60.
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+"""
+    JobTuner: hardware-aware job parameter tuner. the core count, available memory and output disk throughput are
+              probed, and the export job count/chunk duration is selected by timing short calibration exports (the
+              candidates are limited by the memory budget). the tuned parameters are reused for recordings with the
+              same channel count/data type/sampling rate
+"""
+
+
+class JobTuner(object):
+    def __init__(self):
+        super(JobTuner, self).__init__()
+
+        # class field initialisations
+        self.job_kw = {}
+        self.disk_rate = {}
+
+        # thread-safety objects
+        self._lock = threading.Lock()
+
+    # ---------------------------------------------------------------------------
+    # Job Parameter Functions
+    # ---------------------------------------------------------------------------
+
+    def get_job_kwargs(self, rec, pass_type='export', out_dir=None, n_cpu=None):
+
+        # retrieves the previously tuned parameters (if available)
+        t_key = self.get_tune_key(rec, pass_type, n_cpu)
+        with self._lock:
+            if t_key in self.job_kw:
+                return dict(self.job_kw[t_key])
+
+        # sets the candidate job parameters (within the memory limit)
+        p_cand = self.get_candidates(rec, n_cpu)
+        if (pass_type == 'export') and (out_dir is not None):
+            # case is an export pass (the candidates are calibrated against the output disk)
+            n_jobs, t_chunk = self.calibrate(rec, p_cand, out_dir)
+
+        else:
+            # case is another pass (the largest job count at the default chunk duration is used)
+            n_jobs, t_chunk = self.get_model_para(p_cand)
+
+        # stores the tuned parameters
+        job_kw = {'n_jobs': n_jobs, 'chunk_duration': '{0}s'.format(t_chunk)}
+        with self._lock:
+            self.job_kw[t_key] = job_kw
+
+        return dict(job_kw)
+
+    def get_read_duration(self, rec, t_blk):
+
+        # determines the largest multiple of the block duration (up to the maximum read duration) within the limit
+        n_bytes_s = rec.get_num_channels() * rec.get_dtype().itemsize * rec.get_sampling_frequency()
+        t_read = min(t_read_max, self.get_memory_limit() / (n_chunk_buf * n_bytes_s))
+
+        return max(1, int(t_read // t_blk)) * t_blk
+
+    def get_candidates(self, rec, n_cpu=None):
+
+        # sets the candidate job counts (the global job count is used as the core share if set)
+        n_cpu = self.get_cpu_count() if (n_cpu is None) else n_cpu
+        n_jobs_opt = np.unique([max(1, n_cpu // x) for x in [8, 4, 2, 1]])
+
+        # removes the candidates that exceed the memory limit
+        n_bytes_max = self.get_memory_limit()
+        p_cand = [(int(n_jobs), t_chunk) for n_jobs in n_jobs_opt for t_chunk in t_chunk_opt
+                  if n_jobs * self.get_job_bytes(rec, t_chunk) <= n_bytes_max]
+
+        # case is no candidates fit within the limit (a single job with the smallest chunk is used)
+        return p_cand if len(p_cand) else [(1, t_chunk_opt[0])]
+
+    def get_memory_limit(self):
+
+        # the limit is the memory budget (reduced to a share of the available RAM if known)
+        n_bytes_avail = self.get_available_ram()
+        if n_bytes_avail is None:
+            return mem_manager.n_bytes_max
+
+        else:
+            return min(mem_manager.n_bytes_max, p_ram_avail * n_bytes_avail)
+
+    @staticmethod
+    def get_model_para(p_cand):
+
+        # uses the largest job count at the default chunk duration (or the largest chunk duration otherwise)
+        n_jobs = max([x[0] for x in p_cand])
+        t_chunk = [x[1] for x in p_cand if x[0] == n_jobs]
+
+        return n_jobs, t_chunk_def if (t_chunk_def in t_chunk) else max(t_chunk)
+
+    @staticmethod
+    def get_job_bytes(rec, t_chunk):
+
+        # estimates the memory used by each job (float32 chunk buffers of the recording)
+        n_frm_chunk = int(rec.get_sampling_frequency() * t_chunk)
+        return rec.get_num_channels() * n_frm_chunk * np.dtype('float32').itemsize * n_chunk_buf
+
+    @staticmethod
+    def get_tune_key(rec, pass_type, n_cpu):
+
+        return pass_type, rec.get_num_channels(), rec.get_dtype().str, rec.get_sampling_frequency(), n_cpu
+
+    # ---------------------------------------------------------------------------
+    # Calibration Functions
+    # ---------------------------------------------------------------------------
+
+    def calibrate(self, rec, p_cand, out_dir):
+
+        # field retrieval
+        n_jobs_opt = sorted(set([x[0] for x in p_cand]))
+        n_jobs, t_chunk = self.get_model_para(p_cand)
+        n_bytes_frm = rec.get_num_channels() * rec.get_dtype().itemsize
+
+        # sets the disk throughput limit (in frames per second)
+        disk_rate = self.get_disk_throughput(out_dir)
+        r_disk = np.inf if (disk_rate is None) else (p_disk_sat * disk_rate / n_bytes_frm)
+
+        # creates the calibration folder (on the same disk as the output folder)
+        os.makedirs(out_dir, exist_ok=True)
+        calib_dir = tempfile.mkdtemp(prefix='.calib-', dir=out_dir)
+
+        try:
+            # increases the job count (for the default chunk duration) until the throughput gain falls off, or
+            # the throughput reaches the disk throughput
+            r_best, n_jobs_best = 0., n_jobs_opt[0]
+            for n_j in [x for x in n_jobs_opt if (x, t_chunk) in p_cand]:
+                r_cand = self.run_calibration(rec, n_j, t_chunk, calib_dir)
+                if r_cand < (1. + p_gain_min) * r_best:
+                    break
+
+                r_best, n_jobs_best = r_cand, n_j
+                if r_best >= r_disk:
+                    break
+
+            # determines the chunk duration with the highest throughput (for the selected job count)
+            t_chunk_best = t_chunk
+            for t_c in [x[1] for x in p_cand if (x[0] == n_jobs_best) and (x[1] != t_chunk)]:
+                r_cand = self.run_calibration(rec, n_jobs_best, t_c, calib_dir)
+                if r_cand > (1. + p_gain_min) * r_best:
+                    r_best, t_chunk_best = r_cand, t_c
+
+        except Exception:
+            # case is the calibration failed (the memory model parameters are used)
+            return n_jobs, t_chunk
+
+        finally:
+            # removes the calibration folder
+            shutil.rmtree(calib_dir, ignore_errors=True)
+
+        return n_jobs_best, t_chunk_best
+
+    @staticmethod
+    def run_calibration(rec, n_jobs, t_chunk, calib_dir):
+
+        # sets up the calibration slice (each job processes at least two chunks)
+        s_freq = rec.get_sampling_frequency()
+        t_calib = min(t_calib_max, max(t_calib_min, 2 * n_jobs * t_chunk))
+        n_frm = min(rec.get_num_frames(), int(t_calib * s_freq))
+        rec_c = rec.frame_slice(start_frame=0, end_frame=n_frm)
+
+        # runs the calibration export (using the same chunked exporter as the full export)
+        c_folder = os.path.join(calib_dir, '{0}-{1}'.format(n_jobs, t_chunk))
+        t_start = time.perf_counter()
+        RecordingExport(rec_c, c_folder, 'calibration', t_chunk).run(n_jobs, threading.BoundedSemaphore(n_jobs))
+        t_run = time.perf_counter() - t_start
+
+        # removes the calibration output, and returns the throughput (in frames per second)
+        shutil.rmtree(c_folder, ignore_errors=True)
+        return n_frm / max(t_run, 1e-6)
+
+    # ---------------------------------------------------------------------------
+    # Hardware Probe Functions
+    # ---------------------------------------------------------------------------
+
+    def get_disk_throughput(self, out_dir):
+
+        # retrieves the previously probed throughput for the output disk
+        d_key = self.get_disk_key(out_dir)
+        if d_key in self.disk_rate:
+            return self.disk_rate[d_key]
+
+        try:
+            # writes the probe file (the write is synced, so the throughput isn't set by the page cache)
+            os.makedirs(out_dir, exist_ok=True)
+            f_fd, f_probe = tempfile.mkstemp(prefix='.probe-', dir=out_dir)
+            y_blk = os.urandom(n_bytes_disk_blk)
+
+            t_start = time.perf_counter()
+            with os.fdopen(f_fd, 'wb') as f:
+                for _ in range(n_bytes_disk // n_bytes_disk_blk):
+                    f.write(y_blk)
+
+                f.flush()
+                os.fsync(f.fileno())
+
+            # calculates the throughput (in bytes per second)
+            disk_rate = n_bytes_disk / max(time.perf_counter() - t_start, 1e-6)
+            os.remove(f_probe)
+
+        except OSError:
+            # case is the disk couldn't be probed
+            disk_rate = None
+
+        self.disk_rate[d_key] = disk_rate
+        return disk_rate
+
+    @staticmethod
+    def get_disk_key(out_dir):
+
+        # finds the nearest existing folder (the device id is used to key the disk throughput)
+        d_path = os.path.abspath(out_dir)
+        while not os.path.exists(d_path):
+            d_path = os.path.dirname(d_path)
+
+        return os.stat(d_path).st_dev
+
+    @staticmethod
+    def get_cpu_count():
+
+        # uses the global job count if set (e.g., the core share of the concurrent probe tasks)
+        n_jobs = si.get_global_job_kwargs().get('n_jobs', 1)
+        if isinstance(n_jobs, int) and (n_jobs > 1):
+            return n_jobs
+
+        # otherwise, uses the cores available to the process
+        if hasattr(os, 'sched_getaffinity'):
+            return len(os.sched_getaffinity(0))
+
+        return cf.get_cpu_budget(1)[1]
+
+    @staticmethod
+    def get_available_ram():
+
+        if psutil is not None:
+            return psutil.virtual_memory().available
+
+        try:
+            # case is psutil isn't installed (the available pages are used, where supported)
+            return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+
+        except (AttributeError, ValueError, OSError):
+            return None
+
+
+# global job parameter tuner object
+job_tuner = JobTuner()
@@ -0,0 +1,342 @@
+# module import
+import os
+import json
+import time
+import weakref
+import threading
+import numpy as np
+import pandas as pd
+
+# pyqt6 module import
+from PyQt6.QtCore import QObject, pyqtSignal
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+# default memory budget (in bytes)
+n_bytes_def = 8 * 2 ** 30
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+"""
+    MemoryItem: memory accounting information for a single registered cache. file-backed (memory mapped) items are
+                reported separately, and are not counted against the memory budget
+"""
+
+
+class MemoryItem:
+    def __init__(self, item_id, owner, desc, evict_fcn=None, is_mapped=False):
+
+        # cache descriptors
+        self.item_id = item_id
+        self.owner_ref = weakref.ref(owner)
+        self.desc = desc
+        self.is_mapped = is_mapped
+        self.evict_ref = None
+        self.set_evict_fcn(evict_fcn)
+
+        # accounting fields
+        self.n_bytes = 0
+        self.n_evict = 0
+        self.t_access = time.monotonic()
+
+    def set_evict_fcn(self, evict_fcn):
+
+        if evict_fcn is None:
+            # case is a fixed (non-evictable) item
+            self.evict_ref = None
+
+        elif hasattr(evict_fcn, '__self__'):
+            # case is a bound method (weak reference so the registry doesn't keep the owner alive)
+            self.evict_ref = weakref.WeakMethod(evict_fcn)
+
+        else:
+            # case is a function
+            self.evict_ref = lambda: evict_fcn
+
+    def evict(self):
+
+        evict_fcn = self.evict_ref()
+        if evict_fcn is not None:
+            evict_fcn()
+
+    def can_evict(self):
+
+        return self.evict_ref is not None
+
+    def is_alive(self):
+
+        return (self.owner_ref() is not None) and ((self.evict_ref is None) or (self.evict_ref() is not None))
+
+    def is_owner(self, owner):
+
+        return self.owner_ref() is owner
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+"""
+    MemoryManager: central registry that accounts for the byte footprint of spykit's caches, and evicts the
+                   least recently used caches (across all registered caches) when the memory budget is exceeded
+"""
+
+
+class MemoryManager(QObject):
+    # pyqtsignal functions
+    budget_exceeded = pyqtSignal(object)
+    usage_changed = pyqtSignal()
+
+    def __init__(self, n_bytes_max=n_bytes_def):
+        super(MemoryManager, self).__init__()
+
+        # class field initialisations
+        self.item = {}
+        self.n_bytes_max = n_bytes_max
+        self.n_evict_tot = 0
+        self.n_bytes_evict = 0
+
+        # thread-safety objects
+        self._lock = threading.RLock()
+
+        # connects the signal functions (eviction is always run from the main thread)
+        self.budget_exceeded.connect(self.enforce_budget)
+
+    # ---------------------------------------------------------------------------
+    # Cache Registration Functions
+    # ---------------------------------------------------------------------------
+
+    def register(self, owner, desc, evict_fcn=None, item_key=None, is_mapped=False):
+
+        # sets up the item id
+        item_id = self.get_item_id(owner, item_key)
+
+        # adds the registry item (if not already registered)
+        with self._lock:
+            m_item = self.get_item(owner, item_key)
+            if m_item is None:
+                self.item[item_id] = MemoryItem(item_id, owner, desc, evict_fcn, is_mapped)
+
+            else:
+                m_item.desc = desc
+                m_item.is_mapped = is_mapped
+                m_item.set_evict_fcn(evict_fcn)
+
+        return item_id
+
+    def unregister(self, owner, item_key=None):
+
+        with self._lock:
+            if self.get_item(owner, item_key) is not None:
+                self.item.pop(self.get_item_id(owner, item_key))
+
+        self.usage_changed.emit()
+
+    # ---------------------------------------------------------------------------
+    # Memory Accounting Functions
+    # ---------------------------------------------------------------------------
+
+    def update(self, owner, n_bytes, item_key=None):
+
+        with self._lock:
+            # retrieves the registry item (exit if not registered)
+            item_id = self.get_item_id(owner, item_key)
+            m_item = self.get_item(owner, item_key)
+            if m_item is None:
+                return
+
+            # updates the byte footprint/access time
+            m_item.n_bytes = int(n_bytes)
+            m_item.t_access = time.monotonic()
+            is_over = self.get_total_bytes() > self.n_bytes_max
+
+        # runs the eviction (if over budget)
+        self.usage_changed.emit()
+        if is_over:
+            self.budget_exceeded.emit(item_id)
+
+    def touch(self, owner, item_key=None):
+
+        with self._lock:
+            m_item = self.get_item(owner, item_key)
+            if m_item is not None:
+                m_item.t_access = time.monotonic()
+
+    def enforce_budget(self, item_keep=None):
+
+        # removes any items whose owners have been deleted
+        self.remove_dead_items()
+
+        # retrieves the evictable items (ordered from least to most recently used)
+        with self._lock:
+            m_item = sorted([x for x in self.item.values() if x.can_evict() and x.n_bytes],
+                            key=lambda x: x.t_access)
+            n_bytes_tot = self.get_total_bytes()
+
+        for mi in m_item:
+            # exits if within the memory budget
+            if n_bytes_tot <= self.n_bytes_max:
+                break
+
+            elif mi.item_id == item_keep:
+                # case is the item that was just updated (this is in use so is never evicted)
+                continue
+
+            # runs the eviction function
+            mi.evict()
+
+            # resets the item accounting fields
+            with self._lock:
+                n_bytes_tot -= mi.n_bytes
+                self.n_bytes_evict += mi.n_bytes
+                self.n_evict_tot += 1
+                mi.n_evict += 1
+                mi.n_bytes = 0
+
+        # flag that the memory usage has changed
+        self.usage_changed.emit()
+
+    def remove_dead_items(self):
+
+        with self._lock:
+            for item_id in [k for k, x in self.item.items() if not x.is_alive()]:
+                self.item.pop(item_id)
+
+    def evict_all(self):
+
+        # runs all eviction functions
+        with self._lock:
+            m_item = [x for x in self.item.values() if x.can_evict() and x.n_bytes]
+
+        for mi in m_item:
+            mi.evict()
+            mi.n_bytes = 0
+
+        # flag that the memory usage has changed
+        self.usage_changed.emit()
+
+    # ---------------------------------------------------------------------------
+    # Class Getter Functions
+    # ---------------------------------------------------------------------------
+
+    def get_item(self, owner, item_key=None):
+
+        # retrieves the registry item (an item left by a deleted owner whose id has been reused is removed)
+        with self._lock:
+            item_id = self.get_item_id(owner, item_key)
+            m_item = self.item.get(item_id)
+            if (m_item is not None) and (not m_item.is_owner(owner)):
+                self.item.pop(item_id)
+                return None
+
+            return m_item
+
+    def get_total_bytes(self, evict_only=False):
+
+        # the memory mapped items are file-backed, so are not counted against the budget
+        with self._lock:
+            return sum([x.n_bytes for x in self.item.values() if (not x.is_mapped) and
+                        (x.can_evict() or (not evict_only))])
+
+    def get_mapped_bytes(self):
+
+        with self._lock:
+            return sum([x.n_bytes for x in self.item.values() if x.is_mapped])
+
+    def get_top_consumers(self, n_top=None):
+
+        # removes any items whose owners have been deleted
+        self.remove_dead_items()
+
+        # sorts the items by the byte footprint (descending)
+        with self._lock:
+            m_item = sorted(self.item.values(), key=lambda x: -x.n_bytes)
+
+        return m_item if (n_top is None) else m_item[:n_top]
+
+    def get_summary_string(self, n_top=20):
+
+        # removes any items whose owners have been deleted
+        self.remove_dead_items()
+
+        # initialisations
+        n_mb = 2 ** 20
+        s_str = [
+            'Memory Budget = {:.1f} MB'.format(self.n_bytes_max / n_mb),
+            'Total Accounted = {:.1f} MB (Evictable = {:.1f} MB)'.format(
+                self.get_total_bytes() / n_mb, self.get_total_bytes(True) / n_mb),
+            'Memory Mapped = {:.1f} MB (not counted)'.format(self.get_mapped_bytes() / n_mb),
+            'Evictions = {0} ({1:.1f} MB freed)\n'.format(self.n_evict_tot, self.n_bytes_evict / n_mb),
+        ]
+
+        # appends the top consumer information
+        for mi in self.get_top_consumers(n_top):
+            e_str = 'mapped' if mi.is_mapped else ('evictable' if mi.can_evict() else 'fixed')
+            s_str.append('{0:>10.2f} MB | {1:<9} | {2}'.format(mi.n_bytes / n_mb, e_str, mi.desc))
+
+        return '\n'.join(s_str)
+
+    @staticmethod
+    def get_item_id(owner, item_key=None):
+
+        # note - the owner ids can be reused once the owner is deleted, so the items also hold an owner weak reference
+        return (id(owner), item_key)
+
+    # ---------------------------------------------------------------------------
+    # Budget Parameter Functions
+    # ---------------------------------------------------------------------------
+
+    def set_budget(self, n_bytes_max):
+
+        # resets the memory budget and evicts items (if over budget)
+        self.n_bytes_max = int(n_bytes_max)
+        self.enforce_budget()
+
+    def load_budget(self, b_file):
+
+        if os.path.exists(b_file):
+            with open(b_file, 'r', encoding='utf-8') as f:
+                self.n_bytes_max = int(json.load(f).get('n_bytes_max', n_bytes_def))
+
+    def save_budget(self, b_file):
+
+        with open(b_file, 'w', encoding='utf-8') as f:
+            json.dump({'n_bytes_max': self.n_bytes_max}, f)
+
+
+# global memory manager object
+mem_manager = MemoryManager()
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def get_array_bytes(x):
+    """Returns the (in-memory) byte size of the array/container, x"""
+
+    if isinstance(x, np.memmap):
+        # memory maps are file-backed
+        return 0
+
+    elif isinstance(x, np.ndarray):
+        if x.dtype == object:
+            return x.nbytes + sum([get_array_bytes(y) for y in x.flat])
+        else:
+            return x.nbytes
+
+    elif isinstance(x, (pd.DataFrame, pd.Series)):
+        # case is a data frame/series (the object column contents are included)
+        return int(np.sum(x.memory_usage(deep=True)))
+
+    elif isinstance(x, (list, tuple)):
+        return sum([get_array_bytes(y) for y in x])
+
+    elif isinstance(x, dict):
+        return sum([get_array_bytes(y) for y in x.values()])
+
+    else:
+        return 0
+
+
+def get_object_bytes(obj):
+    """Returns the (in-memory) byte size of the array/container fields of the object, obj"""
+
+    return 0 if (obj is None) else sum([get_array_bytes(x) for x in vars(obj).values()])
@@ -4,7 +4,7 @@ import struct
 import numpy as np
 from pathlib import Path
 
-from PyQt6.QtCore import pyqtSignal, QObject
+from PyQt6.QtCore import QObject
 
 # ----------------------------------------------------------------------------------------------------------------------
 
@@ -13,9 +13,6 @@ from PyQt6.QtCore import pyqtSignal, QObject
 """
 
 class PostMemMap(QObject):
-    # pyqtsignal functions
-    progress_fcn = pyqtSignal(int, int)
-
     # dimension fields
     n_hdr_mua = 4
     n_hdr_noise = 6
@@ -34,7 +31,7 @@ class PostMemMap(QObject):
         # sets the input arguments
         self.mmap_file = mmap_file_new.replace('\\', '/')
 
-    def write_mem_map(self, bc_data):
+    def write_mem_map(self, bc_data, p_task=None):
 
         # field retrieval
         p_fcn = bc_data.get_para_value
@@ -62,11 +59,16 @@ class PostMemMap(QObject):
                              n_hdr_max, n_peak_max, n_trough_max, n_hist_max, n_decay_loc))
         m_map = np.memmap(self.mmap_file, dtype=dt, mode='w+', shape=(1,))
 
-        # sets the memory map fields
+        # sets up the field progress sub-task
         n_fld = len(dt.names)
+        if p_task is not None:
+            p_task = p_task.add_sub_task('field', n_step=n_fld)
+
+        # sets the memory map fields
         for i_fld, dt_n in enumerate(dt.names):
             # progress update
-            self.progress_fcn.emit(i_fld, n_fld)
+            if p_task is not None:
+                p_task.set_step(i_fld, dt_n)
 
             # parameter field value
             p_val_new = p_fcn(dt_n)
@@ -0,0 +1,466 @@
+# module import
+import os
+import json
+import time
+import shutil
+import hashlib
+import importlib.util
+import numpy as np
+from pathlib import PurePath
+
+# spikeinterface module import
+import spikeinterface as si
+from spikeinterface.sortingcomponents.motion import interpolate_motion
+from spikeinterface.preprocessing.motion import correct_motion, load_motion_info, get_motion_parameters_preset
+
+# spykit module import
+import spykit.common.common_func as cf
+import spykit.common.common_widget as cw
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+# cache format version (changing this invalidates all existing materialisations)
+cache_version = 1
+
+# cache information file name
+cache_info_file = 'cache_info.json'
+
+# recording annotation field used to hold the preprocessing chain key
+key_field = 'pp_cache_key'
+
+# motion estimate cache format/interpolation parameter field
+motion_format = 'motion'
+motion_interp_key = 'interpolate_motion_kwargs'
+
+# source file content hash block size/count (the blocks are evenly spaced over the file)
+n_bytes_hash = 2 ** 20
+n_blk_hash = 3
+
+# materialisation formats (zarr is only available if installed)
+cache_formats = ['binary', 'zarr'] if (importlib.util.find_spec('zarr') is not None) else ['binary']
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+"""
+    PreprocessCache: content-addressed store of materialised preprocessing step outputs. each output is keyed by
+                     a hash of the raw (upstream) recording and the ordered preprocessing steps/parameters, so an
+                     identical chain (from any session or configuration file) reuses the existing materialisation
+"""
+
+
+class PreprocessCache:
+    # cache size limit
+    n_bytes_max = 200 * 2 ** 30
+
+    def __init__(self, cache_dir=None):
+
+        # class field initialisations
+        self.cache_dir = cache_dir
+
+        # cache counters
+        self.n_hit = 0
+        self.n_miss = 0
+
+    # ---------------------------------------------------------------------------
+    # Cache Key Functions
+    # ---------------------------------------------------------------------------
+
+    def get_raw_key(self, rec):
+
+        try:
+            # retrieves the recording provenance (the full extractor chain)
+            r_dict = rec.to_dict(recursive=True)
+
+        except Exception:
+            # case is the recording can't be described (the chain is not cached)
+            return None
+
+        # sets up the raw recording key (the source paths are replaced by the source file identities, so the key
+        # is unchanged if the session is moved or copied)
+        k_data = {
+            'version': cache_version,
+            'si_version': si.__version__,
+            'recording': get_source_key_data(r_dict),
+        }
+
+        return get_hash_string(k_data)
+
+    @staticmethod
+    def get_motion_key(key_prev, pp_opt):
+
+        # the motion key excludes the interpolation parameters (so changing these reuses the motion estimate)
+        m_para = {k: v for k, v in pp_opt.items() if k != motion_interp_key}
+        return get_hash_string({'upstream': key_prev, 'step': 'motion', 'para': m_para})
+
+    @staticmethod
+    def get_step_key(key_prev, pp_name, pp_opt):
+
+        # the step key chains the upstream key with the step name/parameters
+        return get_hash_string({'upstream': key_prev, 'step': pp_name, 'para': pp_opt})
+
+    def get_recording_key(self, rec):
+
+        # returns the stored chain key (the raw recording key is calculated if not set)
+        key = rec.get_annotation(key_field) if (key_field in rec.get_annotation_keys()) else None
+        if key is None:
+            key = self.get_raw_key(rec)
+            self.set_recording_key(rec, key)
+
+        return key
+
+    @staticmethod
+    def set_recording_key(rec, key):
+
+        if key is not None:
+            rec.annotate(**{key_field: key})
+
+    # ---------------------------------------------------------------------------
+    # Materialisation Functions
+    # ---------------------------------------------------------------------------
+
+    def materialise(self, rec, key, pp_name=None, f_format='binary', job_kw=None):
+
+        # exits if the cache is not set or there is no key
+        if (self.cache_dir is None) or (key is None):
+            return rec
+
+        # retrieves the existing materialisation (if available)
+        rec_cache = self.load(key)
+        if rec_cache is not None:
+            self.n_hit += 1
+            return rec_cache
+
+        # otherwise, writes the recording to a temporary folder (the folder is renamed once complete)
+        self.n_miss += 1
+        f_format = f_format if (f_format in cache_formats) else cache_formats[0]
+        c_path = self.get_cache_path(key)
+        tmp_path = '{0}.tmp-{1}'.format(c_path, cf.gen_random_string(6))
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            job_kw = self.get_job_kwargs() if (job_kw is None) else job_kw
+            rec.save(format=f_format, folder=self.get_data_path(tmp_path, f_format), **job_kw)
+
+            # writes the cache information and moves the materialisation into place
+            self.write_entry(tmp_path, key, pp_name, f_format)
+
+        except Exception:
+            # case is the materialisation couldn't be written (the lazy recording is used)
+            return rec
+
+        finally:
+            # removes the temporary folder (if the materialisation wasn't moved into place)
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+        # reduces the cache size (if over the limit)
+        self.reduce_cache(keep_key=key)
+
+        # returns the materialised recording
+        rec_cache = self.load(key)
+        return rec if (rec_cache is None) else rec_cache
+
+    def load(self, key):
+
+        # retrieves the cache information (exit if the materialisation doesn't exist)
+        c_info = self.get_cache_info(key)
+        if (c_info is None) or (c_info['format'] == motion_format):
+            return None
+
+        try:
+            # loads the materialised recording
+            d_path = self.get_data_path(self.get_cache_path(key), c_info['format'])
+            if c_info['format'] == 'zarr':
+                rec = si.read_zarr(d_path)
+            else:
+                rec = si.read_binary_folder(d_path)
+
+        except Exception:
+            # case is an invalid materialisation (this is removed)
+            self.remove(key)
+            return None
+
+        # flags the materialisation as recently used and resets the chain key
+        os.utime(os.path.join(self.get_cache_path(key), cache_info_file))
+        self.set_recording_key(rec, key)
+        return rec
+
+    def write_entry(self, tmp_path, key, pp_name, f_format):
+
+        # writes the cache information file
+        c_info = {
+            'version': cache_version,
+            'key': key,
+            'step': pp_name,
+            'format': f_format,
+            'n_bytes': get_folder_size(tmp_path),
+            't_create': time.time(),
+        }
+        with open(os.path.join(tmp_path, cache_info_file), 'w', encoding='utf-8') as f:
+            json.dump(c_info, f)
+
+        # moves the entry into place
+        os.replace(tmp_path, self.get_cache_path(key))
+
+    def has_entry(self, key):
+
+        c_info = self.get_cache_info(key)
+        return (c_info is not None) and (c_info['format'] != motion_format)
+
+    def remove(self, key):
+
+        shutil.rmtree(self.get_cache_path(key), ignore_errors=True)
+
+    def reduce_cache(self, keep_key=None):
+
+        # retrieves the cache entries (least recently used first)
+        c_entry = []
+        for key in self.get_cache_keys():
+            c_info = self.get_cache_info(key)
+            if c_info is not None:
+                t_access = os.path.getmtime(os.path.join(self.get_cache_path(key), cache_info_file))
+                c_entry.append((t_access, key, c_info['n_bytes']))
+
+        # removes the least recently used entries until the cache is within the size limit
+        n_bytes = sum([x[2] for x in c_entry])
+        for _, key, n_bytes_c in sorted(c_entry):
+            if n_bytes <= self.n_bytes_max:
+                break
+
+            elif key != keep_key:
+                self.remove(key)
+                n_bytes -= n_bytes_c
+
+    def clear(self):
+
+        for key in self.get_cache_keys():
+            self.remove(key)
+
+    # ---------------------------------------------------------------------------
+    # Motion Estimate Functions
+    # ---------------------------------------------------------------------------
+
+    def estimate_motion(self, rec, key, pp_opt, job_kw=None):
+
+        # runs the motion correction directly (if the cache is not set or there is no key)
+        job_kw = {} if (job_kw is None) else job_kw
+        if (self.cache_dir is None) or (key is None):
+            return correct_motion(rec, **pp_opt, **job_kw)
+
+        # otherwise, runs the motion correction (the motion information is written to a temporary folder)
+        self.n_miss += 1
+        tmp_path = '{0}.tmp-{1}'.format(self.get_cache_path(key), cf.gen_random_string(6))
+
+        try:
+            rec_mc = correct_motion(rec, folder=tmp_path, **pp_opt, **job_kw)
+
+        except Exception:
+            # case is the motion correction failed (the temporary folder is removed)
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+
+        try:
+            # writes the cache information and moves the motion information into place
+            self.write_entry(tmp_path, key, 'drift_correct', motion_format)
+
+        except OSError:
+            # case is the motion information couldn't be stored (the corrected recording is still valid)
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            return rec_mc
+
+        # reduces the cache size (if over the limit)
+        self.reduce_cache(keep_key=key)
+        return rec_mc
+
+    def load_motion(self, key):
+
+        # retrieves the cache information (exit if the motion information doesn't exist)
+        c_info = None if (key is None) else self.get_cache_info(key)
+        if (c_info is None) or (c_info['format'] != motion_format):
+            return None
+
+        try:
+            # loads the motion information (peaks, peak locations and motion displacement)
+            m_info = load_motion_info(self.get_cache_path(key))
+
+        except Exception:
+            # case is invalid motion information (this is removed)
+            self.remove(key)
+            return None
+
+        # flags the motion information as recently used
+        os.utime(os.path.join(self.get_cache_path(key), cache_info_file))
+        self.n_hit += 1
+
+        return m_info
+
+    def interpolate_motion(self, rec, m_info, pp_opt):
+
+        return interpolate_motion(rec, m_info['motion'], **self.get_interp_kwargs(pp_opt))
+
+    @staticmethod
+    def get_interp_kwargs(pp_opt):
+
+        # sets the interpolation parameters (the preset values are updated with any set parameters)
+        m_para = get_motion_parameters_preset(pp_opt.get('preset', 'dredge_fast'))
+        return dict(m_para[motion_interp_key], **pp_opt.get(motion_interp_key, {}))
+
+    # ---------------------------------------------------------------------------
+    # Class Getter Functions
+    # ---------------------------------------------------------------------------
+
+    def get_cache_path(self, key):
+
+        return os.path.join(self.cache_dir, key).replace('\\', '/')
+
+    def get_cache_info(self, key):
+
+        # exits if the cache is not set
+        if self.cache_dir is None:
+            return None
+
+        try:
+            # reads the cache information file
+            with open(os.path.join(self.get_cache_path(key), cache_info_file), 'r', encoding='utf-8') as f:
+                c_info = json.load(f)
+
+        except (OSError, ValueError):
+            # case is a missing (or partially written) materialisation
+            return None
+
+        return c_info if (c_info.get('version') == cache_version) else None
+
+    def get_cache_keys(self):
+
+        # exits if the cache directory doesn't exist
+        if (self.cache_dir is None) or (not os.path.isdir(self.cache_dir)):
+            return []
+
+        with os.scandir(self.cache_dir) as f_scan:
+            return [f.name for f in f_scan if f.is_dir() and ('.tmp-' not in f.name)]
+
+    def get_cache_size(self):
+
+        return sum([c_info['n_bytes'] for c_info in map(self.get_cache_info, self.get_cache_keys()) if c_info])
+
+    # ---------------------------------------------------------------------------
+    # Static Methods
+    # ---------------------------------------------------------------------------
+
+    @staticmethod
+    def get_data_path(c_path, f_format):
+
+        return os.path.join(c_path, 'recording.zarr' if (f_format == 'zarr') else 'recording').replace('\\', '/')
+
+    @staticmethod
+    def get_job_kwargs():
+
+        # uses the global job parameters (these are set to a share of the cores for concurrent probe tasks)
+        job_kw = si.get_global_job_kwargs()
+        n_jobs = job_kw.get('n_jobs', 1)
+
+        return {'n_jobs': n_jobs if (n_jobs != 1) else cf.get_cpu_budget(1)[1], 'progress_bar': False}
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def get_cache_dir():
+    """Returns the preprocessing cache directory (the default directory is used if not set)"""
+
+    c_dir = cw.get_def_dir('cache')
+    if str(c_dir) == cw.resource_dir:
+        c_dir = os.path.join(cw.resource_dir, 'cache')
+
+    return str(c_dir).replace('\\', '/')
+
+
+def get_source_key_data(d):
+    """Returns a copy of the recording dictionary, d, with the source file/folder paths replaced by their identities"""
+
+    if isinstance(d, dict):
+        return {k: get_source_key_data(v) for k, v in d.items()}
+
+    elif isinstance(d, (list, tuple)):
+        return [get_source_key_data(x) for x in d]
+
+    elif isinstance(d, (str, PurePath)) and os.path.isabs(d) and os.path.exists(d):
+        return get_source_identity(d)
+
+    return d
+
+
+def get_source_identity(s_path):
+    """Returns the relative file paths, sizes and sampled content hashes of the source file/folder, s_path"""
+
+    # retrieves the source files (the folder files are found over the whole folder tree, as the data files of some
+    # formats - e.g., openephys - are held within sub-folders of the recording folder)
+    if os.path.isdir(s_path):
+        f_path = []
+        for dir_path, _, f_names in os.walk(s_path):
+            f_path += [os.path.join(dir_path, f) for f in f_names]
+
+        f_rel = [os.path.relpath(x, s_path).replace('\\', '/') for x in f_path]
+
+    else:
+        f_path, f_rel = [str(s_path)], [os.path.basename(s_path)]
+
+    # memory allocation
+    f_info = []
+
+    for fr, fp in sorted(zip(f_rel, f_path)):
+        # hashes evenly spaced blocks of the file (the whole file is hashed if small)
+        f_size, f_hash = os.path.getsize(fp), hashlib.md5()
+        with open(fp, 'rb') as f:
+            if f_size <= n_blk_hash * n_bytes_hash:
+                f_hash.update(f.read())
+
+            else:
+                for i_ofs in np.linspace(0, f_size - n_bytes_hash, n_blk_hash).astype(np.int64):
+                    f.seek(int(i_ofs))
+                    f_hash.update(f.read(n_bytes_hash))
+
+        f_info.append([fr, f_size, f_hash.hexdigest()])
+
+    return {'files': f_info}
+
+
+def encode_key_value(x):
+    """Converts the non-JSON key value, x, into a deterministic JSON serialisable value"""
+
+    if isinstance(x, np.ndarray):
+        # case is an array (the array contents are hashed)
+        x = np.ascontiguousarray(x)
+        return {'dtype': str(x.dtype), 'shape': list(x.shape), 'md5': hashlib.md5(x.tobytes()).hexdigest()}
+
+    elif isinstance(x, np.generic):
+        return x.item()
+
+    elif isinstance(x, PurePath):
+        return cf.convert_path(str(x))
+
+    elif isinstance(x, (set, frozenset)):
+        return sorted([str(y) for y in x])
+
+    else:
+        return '{0}.{1}'.format(type(x).__module__, type(x).__name__)
+
+
+def get_hash_string(k_data):
+    """Returns the hash string of the key data dictionary, k_data"""
+
+    k_str = json.dumps(k_data, default=encode_key_value, sort_keys=True)
+    return hashlib.sha256(k_str.encode('utf-8')).hexdigest()[:32]
+
+
+def get_folder_size(f_path):
+    """Returns the total byte size of the files within the folder, f_path"""
+
+    n_bytes = 0
+    for dir_path, _, f_names in os.walk(f_path):
+        n_bytes += sum([os.path.getsize(os.path.join(dir_path, f)) for f in f_names])
+
+    return n_bytes
+
+
+# global preprocessing cache object
+prep_cache = PreprocessCache(get_cache_dir())
@@ -0,0 +1,279 @@
+# module import
+import time
+import weakref
+import threading
+
+# pyqt6 module import
+from PyQt6.QtCore import QObject, QTimer
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+"""
+    ProgressInfo: coalesced progress snapshot of a task hierarchy (ordered from the root to the deepest level)
+"""
+
+
+class ProgressInfo:
+    def __init__(self, name, desc, i_step, n_step, pr_val, t_elapsed, is_finished):
+
+        # task descriptors
+        self.name = name
+        self.desc = desc
+
+        # progress fields (one value per task level)
+        self.i_step = i_step
+        self.n_step = n_step
+        self.pr_val = pr_val
+
+        # other class fields
+        self.t_elapsed = t_elapsed
+        self.is_finished = is_finished
+
+    def get_eta(self):
+
+        # overall progress proportion (exit if no progress has been made)
+        pr_tot = self.pr_val[0]
+        if (pr_tot <= 0) or self.is_finished:
+            return None
+
+        return self.t_elapsed * (1. - pr_tot) / pr_tot
+
+    def get_eta_string(self):
+
+        # calculates the estimated time remaining (exit if not known)
+        t_eta = self.get_eta()
+        if t_eta is None:
+            return ''
+
+        return 'ETA {0}'.format(time.strftime('%H:%M:%S', time.gmtime(t_eta)))
+
+    def get_level_count(self):
+
+        return len(self.pr_val)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+"""
+    ProgressTask: hierarchical progress task (e.g., run -> shank -> step). each level holds the number of steps
+                  and the current step, and the proportional progress of a level includes that of its sub-task
+"""
+
+
+class ProgressTask:
+    def __init__(self, bus, name, desc='', n_step=1, parent=None):
+
+        # task descriptors
+        self.bus = bus
+        self.name = name
+        self.desc = desc
+        self.parent = parent
+        self.child = None
+
+        # progress fields
+        self.i_step = 0
+        self.n_step = max(1, n_step)
+        self.t_start = time.perf_counter()
+        self.pr_overall = None
+        self.is_finished = False
+
+    # ---------------------------------------------------------------------------
+    # Progress Update Functions
+    # ---------------------------------------------------------------------------
+
+    def add_sub_task(self, name, desc='', n_step=1):
+
+        # creates the sub-task (replaces any previous sub-task)
+        with self.bus.lock:
+            self.child = ProgressTask(self.bus, name, desc, n_step, self)
+
+        self.bus.publish(self)
+        return self.child
+
+    def set_step(self, i_step, desc=None):
+
+        # resets the current step (the previous sub-task is complete)
+        with self.bus.lock:
+            self.i_step = min(i_step, self.n_step)
+            self.child = None
+            if desc is not None:
+                self.desc = desc
+
+        self.bus.publish(self)
+
+    def set_fraction(self, pr_val, desc=None):
+
+        # resets the current step from the proportional progress
+        self.set_step(pr_val * self.n_step, desc)
+
+    def set_overall(self, pr_val):
+
+        # overrides the task progress (used when the sub-tasks are run concurrently)
+        with self.bus.lock:
+            self.pr_overall = min(1., pr_val)
+
+        self.bus.publish(self)
+
+    def set_count(self, n_step):
+
+        with self.bus.lock:
+            self.n_step = max(1, n_step)
+
+        self.bus.publish(self)
+
+    def advance(self, n_step=1):
+
+        self.set_step(self.i_step + n_step)
+
+    def finish(self):
+
+        # flags the task as being complete
+        with self.bus.lock:
+            self.i_step = self.n_step
+            self.child = None
+            self.is_finished = True
+
+        self.bus.publish(self)
+
+    # ---------------------------------------------------------------------------
+    # Class Getter Functions
+    # ---------------------------------------------------------------------------
+
+    def get_root(self):
+
+        return self if (self.parent is None) else self.parent.get_root()
+
+    def get_levels(self):
+
+        return [self] if (self.child is None) else [self] + self.child.get_levels()
+
+    def get_fraction(self):
+
+        # returns the overridden progress (if set)
+        if self.pr_overall is not None:
+            return self.pr_overall
+
+        # includes the sub-task progress (if running)
+        pr_child = 0. if (self.child is None) else self.child.get_fraction()
+        return min(1., (self.i_step + pr_child) / self.n_step)
+
+    def get_info(self):
+
+        # retrieves the task levels
+        t_level = self.get_levels()
+
+        return ProgressInfo(self.name,
+                            [x.desc for x in t_level],
+                            [int(x.i_step) for x in t_level],
+                            [x.n_step for x in t_level],
+                            [x.get_fraction() for x in t_level],
+                            time.perf_counter() - self.t_start,
+                            self.is_finished)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+"""
+    ProgressBus: progress event bus. workers publish task updates (which only flags the task as changed), and the
+                 changes are coalesced and sent to the subscribers (on the main thread) at a fixed refresh rate
+"""
+
+
+class ProgressBus(QObject):
+    # refresh period (in ms)
+    t_refresh = 100
+
+    def __init__(self):
+        super(ProgressBus, self).__init__()
+
+        # class field initialisations
+        self.task = {}
+        self.sub_fcn = {}
+        self.is_changed = set()
+        self.timer = None
+
+        # thread-safety objects
+        self.lock = threading.RLock()
+
+    # ---------------------------------------------------------------------------
+    # Task Publishing Functions
+    # ---------------------------------------------------------------------------
+
+    def start_task(self, name, desc='', n_step=1):
+
+        # creates the new root task (replaces any existing task)
+        with self.lock:
+            self.task[name] = ProgressTask(self, name, desc, n_step)
+
+        self.publish(self.task[name])
+        return self.task[name]
+
+    def get_task(self, name):
+
+        with self.lock:
+            return self.task.get(name)
+
+    def publish(self, p_task):
+
+        # flags the root task has changed (the subscribers are updated on the next refresh)
+        with self.lock:
+            self.is_changed.add(p_task.get_root().name)
+
+    def publish_value(self, name, desc, pr_val):
+
+        # retrieves the task (creates a new task if it doesn't exist)
+        p_task = self.get_task(name)
+        if (p_task is None) or p_task.is_finished:
+            p_task = self.start_task(name, desc)
+
+        # updates the progress value
+        p_task.set_fraction(pr_val, desc)
+
+    # ---------------------------------------------------------------------------
+    # Subscriber Functions
+    # ---------------------------------------------------------------------------
+
+    def subscribe(self, name, sub_fcn):
+
+        # adds the subscriber function (weak reference so the bus doesn't keep the owner alive)
+        with self.lock:
+            if name not in self.sub_fcn:
+                self.sub_fcn[name] = []
+
+            if not any([x() == sub_fcn for x in self.sub_fcn[name]]):
+                self.sub_fcn[name].append(weakref.WeakMethod(sub_fcn))
+
+        # starts the refresh timer (subscriptions are made from the main thread)
+        if self.timer is None:
+            self.timer = QTimer(self)
+            self.timer.timeout.connect(self.flush)
+            self.timer.start(self.t_refresh)
+
+    def unsubscribe(self, name, sub_fcn):
+
+        with self.lock:
+            if name in self.sub_fcn:
+                self.sub_fcn[name] = [x for x in self.sub_fcn[name] if x() not in (None, sub_fcn)]
+
+    def flush(self):
+
+        # retrieves the changed task snapshots
+        with self.lock:
+            t_name, self.is_changed = self.is_changed, set()
+            p_info = [self.task[x].get_info() for x in t_name if x in self.task]
+
+            # removes the finished tasks
+            for pi in p_info:
+                if pi.is_finished:
+                    self.task.pop(pi.name, None)
+
+        # runs the subscriber functions
+        for pi in p_info:
+            for s_ref in list(self.sub_fcn.get(pi.name, [])):
+                sub_fcn = s_ref()
+                if sub_fcn is not None:
+                    sub_fcn(pi)
+
+
+# global progress bus object
+progress_bus = ProgressBus()
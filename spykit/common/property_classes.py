@@ -2,12 +2,12 @@
 import os
 import gc
 import copy
-import time
 import glob
 import numpy as np
 import pandas as pd
 from pathlib import Path
 from functools import partial as pfcn
+from concurrent.futures import ThreadPoolExecutor
 
 # pyqt6 module imports
 from PyQt6.QtWidgets import (QMainWindow, QHBoxLayout, QFormLayout, QWidget,
@@ -22,8 +22,15 @@ from spikeinterface.core import order_channels_by_depth
 
 # spykit module imports
 import spykit.common.common_func as cf
-from spykit.threads.utils import ThreadWorker
+import spykit.common.spikeinterface_func as sf
+from spykit.threads.utils import ThreadWorker, WorkerBarrier
 from spykit.common.postprocess import PostMemMap
+from spykit.common.session_trace import session_tracer
+from spykit.common.session_cache import ResidentSession, ResidentSessionCache
+from spykit.common.memory_manager import mem_manager
+from spykit.common.job_tuner import job_tuner
+from spykit.common.progress_bus import progress_bus
+from spykit.common.session_journal import session_journal
 from spykit.info.preprocess import pp_flds, RunPreProcessing
 from spykit.info.preprocess import prep_task_map as pp_map
 from spykit.widgets.spike_sorting import RunSpikeSorting, SpikeSortInfo
@@ -43,7 +50,6 @@ class SessionWorkBook(QObject):
     keep_channel_reset = pyqtSignal()
     worker_job_started = pyqtSignal(str)
     worker_job_finished = pyqtSignal(str)
-    prep_progress_update = pyqtSignal(str, float)
     added_post_process = pyqtSignal(str)
 
     # array class fields
@@ -73,6 +79,12 @@ class SessionWorkBook(QObject):
         self.prep_type = None
         self.n_channels = None
 
+        # resident session cache (for warm session switching)
+        self.session_cache = ResidentSessionCache()
+
+        # multi-probe session objects (one session object per recording probe)
+        self.probe_sessions = {}
+
         # resets the initialisation flag
         self.has_init = True
         self.open_session = False
@@ -665,15 +677,27 @@ class SessionWorkBook(QObject):
         if is_keep:
             self.channel_data.toggle_keep_flag(i_channel, state)
 
+            # records the keep flag edits in the autosave journal
+            for i_ch in (i_channel if isinstance(i_channel, list) else [i_channel]):
+                session_journal.record('keep', int(i_ch), bool(self.channel_data.is_keep[i_ch]))
+
         else:
             self.channel_data.toggle_select_flag(i_channel, state)
 
     def reset_session(self, ses_data, ssf_file):
 
-        # resets the session object
-        self.session = SessionObject(self.sp_main, ses_data['session_props'], ssf_file, self.worker_job_started)
-        self.session.channel_calc.connect(self.channel_calc)
-        self.session.prep_prop_update.connect(self.prep_prop_update)
+        # retrieves the session from the resident session cache (if available)
+        ses_entry = self.session_cache.get_entry(ses_data['session_props'])
+        if ses_entry is not None:
+            # case is a resident session (the channel data is reset from file)
+            ses_entry.session.ssf_file = ssf_file
+            ses_entry.session.ssf_load = True
+            self.session = ses_entry.session
+
+        else:
+            # resets the session object
+            self.session = SessionObject(self.sp_main, ses_data['session_props'], ssf_file, self.worker_job_started)
+            self.session.channel_calc.connect(self.channel_calc)
 
         # resets the other class fields
         self.state = ses_data['state']
@@ -683,6 +707,10 @@ class SessionWorkBook(QObject):
         # flags that the job worker has finished
         self.worker_job_finished.emit(ch_type)
 
+        # exits if the channel workers were cancelled (the channel data is incomplete)
+        if (session is not None) and (not session.data_init.get(ch_type, True)):
+            return
+
         # runs the signal function (based on data type)
         match ch_type:
             case 'sync':
@@ -691,9 +719,75 @@ class SessionWorkBook(QObject):
             case 'bad':
                 self.bad_channel_change.emit(session)
 
-    def prep_prop_update(self, m_str, pr_val):
+    def stash_session(self):
+
+        # exits if there is no session loaded
+        if self.session is None:
+            return
+
+        # removes the temporary (unsaved) post-processing data files
+        if self.post_data is not None:
+            self.post_data.clear_temp_postprocessing()
+
+        # adds the current session to the resident session cache (the other probes of a multi-probe session are
+        # pinned within the cache)
+        ses_entry = ResidentSession(self.session, self.channel_data, self.session_props,
+                                    self.post_data, self.current_run, self.current_shank)
+        self.session_cache.add_entry(ses_entry)
+
+    # ---------------------------------------------------------------------------
+    # Multi-Probe Session Methods
+    # ---------------------------------------------------------------------------
+
+    def set_current_probe(self, probe_name):
+
+        # exits if the probe is already selected
+        probe_ses = self.probe_sessions.get(probe_name)
+        if (probe_ses is None) or (probe_ses is self.session):
+            return
+
+        # moves the current probe session into the resident session cache and switches probes
+        self.stash_session()
+        self.session = probe_ses
+
+    def get_probe_names(self):
+
+        return list(self.probe_sessions.keys())
+
+    def get_probe_sessions(self):
+
+        # returns the current probe session, followed by the other probe sessions
+        return [self.session] + [x for x in self.probe_sessions.values() if x is not self.session]
+
+    def get_current_probe(self):
+
+        return None if (self.session is None) else self.session.probe_name
+
+    def is_multi_probe(self):
+
+        return len(self.probe_sessions) > 1
+
+    def run_probe_tasks(self, task_fcn, all_probe=True):
+
+        # runs the task for the current session only (single probe sessions use the full CPU budget)
+        ses_probe = [x for x in self.probe_sessions.values() if x is not self.session]
+        if (not all_probe) or (len(ses_probe) == 0):
+            return task_fcn(self.session, None)
+
+        # splits the CPU budget between the probes (each probe task is passed its core share, as the global job
+        # parameters are shared by the concurrent tasks)
+        n_worker, n_cpu = cf.get_cpu_budget(len(ses_probe) + 1)
 
-        self.prep_progress_update.emit(m_str, pr_val)
+        # runs the other probe tasks concurrently (the current probe task is run on the calling thread)
+        with ThreadPoolExecutor(max_workers=max(1, n_worker - 1)) as executor:
+            t_probe = [executor.submit(task_fcn, x, n_cpu) for x in ses_probe]
+            t_result = task_fcn(self.session, n_cpu)
+
+            # waits for the other probe tasks to complete (re-raising any task errors)
+            for tp in t_probe:
+                tp.result()
+
+        return t_result
 
     def silence_sync(self, i_run, ind_s, ind_f):
 
@@ -735,21 +829,40 @@ class SessionWorkBook(QObject):
         _self.prep_type = None
         has_session = _self.session is not None
 
+        # clears the probe sessions (if the new session is not a probe of the current multi-probe session)
+        if _self.session not in _self.probe_sessions.values():
+            _self.probe_sessions = {}
+
         # resets the current run/session names
         if has_session:
             # case is there is a new session set (clearing session)
             _self.current_run = _self.session.get_run_names()[0]
             _self.current_ses = _self.session.get_session_names(0)[0]
 
-            # sets up the channel data object
-            _probe_current = _self.get_current_recording_probe()
-            _self.channel_data = ChannelData(_probe_current)
-            _self.session_props = SessionProps(_probe_current)
-            _self.post_data = PostProcessData(_self.sp_main)
-            _self.session.load_sorting_para(_self)
+            # retrieves the session from the resident session cache (if previously loaded)
+            ses_entry = _self.session_cache.pop_entry(_self.session)
+            if ses_entry is not None:
+                # case is a resident session (restores the derived data objects)
+                _self.current_run = ses_entry.current_run
+                _self.current_shank = ses_entry.current_shank
+                _self.channel_data = ses_entry.channel_data
+                _self.session_props = ses_entry.session_props
+                _self.post_data = ses_entry.post_data
+
+                # clears the preprocessing (probe sessions keep their preprocessing when switching probes)
+                if not _self.is_multi_probe():
+                    _self.session.reset_preprocessing()
 
-            # connects the signal functions
-            _self.post_data.added_pp.connect(_self.added_post_proc)
+            else:
+                # sets up the channel data object
+                _probe_current = _self.get_current_recording_probe()
+                _self.channel_data = ChannelData(_probe_current)
+                _self.session_props = SessionProps(_probe_current)
+                _self.post_data = PostProcessData(_self.sp_main)
+                _self.session.load_sorting_para(_self)
+
+                # connects the signal functions
+                _self.post_data.added_pp.connect(_self.added_post_proc)
 
         else:
             # case is there is no session set (clearing session)
@@ -764,8 +877,16 @@ class SessionWorkBook(QObject):
         if _self.has_init:
             _self.session_change.emit()
 
+    @staticmethod
+    def update_probe_sessions(_self):
+
+        # pins the probe sessions within the resident session cache (these are still in use, so must not be released
+        # by the cache limits or the memory manager)
+        _self.session_cache.set_pinned(_self.probe_sessions.values())
+
     # trace property observer properties
     session = cf.ObservableProperty(update_session)
+    probe_sessions = cf.ObservableProperty(update_probe_sessions)
 
 
 # ----------------------------------------------------------------------------------------------------------------------
@@ -779,12 +900,11 @@ class SessionObject(QObject):
     # pyqtsignal functions
     channel_data_setup = pyqtSignal(object)
     channel_calc = pyqtSignal(str, object)
-    prep_prop_update = pyqtSignal(str, float)
 
     # parameters
     dy_min = 1.5
 
-    def __init__(self, sp_main, s_props, ssf_file=None, sig_fcn=None):
+    def __init__(self, sp_main, s_props, ssf_file=None, sig_fcn=None, defer_load=False):
         super(SessionObject, self).__init__(sp_main)
 
         # class field initialisations
@@ -804,16 +924,25 @@ class SessionObject(QObject):
         self.t_worker = None
         self.shank_runs = None
         self.data_init = {'bad': False, 'sync': False}
+        self.bad_para = {}
+
+        # channel worker completion barriers (the channel updates are run once all run workers have finished)
+        self.bad_barrier = WorkerBarrier(self)
+        self.bad_barrier.all_finished.connect(self.bad_channel_ready)
+        self.sync_barrier = WorkerBarrier(self)
+        self.sync_barrier.all_finished.connect(self.sync_channel_ready)
 
         self.ssf_file = ssf_file
         self.ssf_load = ssf_file is not None
 
         # creates the session property fields from the input dictionary
+        self.probe_name = None
         for sp in s_props:
             setattr(self, sp, s_props[sp])
 
-        # loads the session
-        self.load_session()
+        # loads the session (deferred sessions are loaded by the caller)
+        if not defer_load:
+            self.load_session()
 
     # ---------------------------------------------------------------------------
     # Session I/O Functions
@@ -821,16 +950,29 @@ class SessionObject(QObject):
 
     def load_session(self):
 
+        # resets the session load timeline
+        session_tracer.reset()
+
+        # loads the raw session data and sets up the session objects
+        self.load_raw_session()
+        self.setup_session()
+
+    def load_raw_session(self):
+
+        # sets up the trace span name suffix (multi-probe sessions only)
+        t_sfx = '' if (self.probe_name is None) else ' ({0})'.format(self.probe_name)
+
         match self.format_type:
             case 'folder':
                 # case is loading from folder format
-                self._s = sw.Session(
-                    subject_path=self.subject_path,
-                    session_name=self.session_name,
-                    file_format=self.file_format,
-                    run_names=self.run_names,
-                    output_path=self.output_path,
-                )
+                with session_tracer.span('Session Setup' + t_sfx, session_name=self.session_name):
+                    self._s = sw.Session(
+                        subject_path=self.subject_path,
+                        session_name=self.session_name,
+                        file_format=self.file_format,
+                        run_names=self.run_names,
+                        output_path=self.output_path,
+                    )
 
             case 'file':
                 # case is loading from raw data file
@@ -838,8 +980,18 @@ class SessionObject(QObject):
                 # FINISH ME!
                 pass
 
-        # loads the raw data and channel data
-        self._s.load_raw_data()
+        # loads the raw data (spikewrap only loads the imec0 probe, so multi-probe session runs are loaded directly
+        # from the probe stream)
+        with session_tracer.span('Load Raw Data' + t_sfx):
+            if self.probe_name is None:
+                self._s.load_raw_data()
+
+            else:
+                sf.load_probe_raw_data(self._s, self.probe_name)
+
+    def setup_session(self):
+
+        # sets up the preprocessing/sorting objects
         self.prep_obj = RunPreProcessing(self._s)
         self.sort_obj = RunSpikeSorting(self._s)
         # self.prep_obj.update_prog.connect(self.update_prog)
@@ -849,58 +1001,61 @@ class SessionObject(QObject):
         if not self.ssf_load:
             self.load_channel_data()
 
-    def load_channel_data(self):
-
-        # pauses for things to catch up...
-        time.sleep(0.1)
+    def load_channel_data(self, i_run_calc=None):
 
         # memory allocation
         self.t_worker = []
+        self.bad_barrier.reset()
+        self.sync_barrier.reset()
         n_run = self.get_run_count()
-        self.bad_ch = np.empty(n_run, dtype=object)
-        self.sync_ch = np.empty(n_run, dtype=object)
+
+        if i_run_calc is None:
+            # case is calculating the channel data for all runs
+            i_run_calc = range(n_run)
+            self.bad_ch = np.empty(n_run, dtype=object)
+            self.sync_ch = np.empty(n_run, dtype=object)
+
+        else:
+            # case is only recalculating the channel data for specific runs
+            for i_run in i_run_calc:
+                self.bad_ch[i_run], self.sync_ch[i_run] = None, None
 
         # field initialisation
         self.data_init['bad'] = False
         self.data_init['sync'] = False
 
-        for i_run in range(n_run):
+        for i_run in i_run_calc:
             # retrieves the raw session run object
             ses_run = self.get_session_runs(i_run)
 
             # sets up the bad channel detection worker
-            t_worker_bad = ThreadWorker(self.sp_main, self.get_bad_channel, (ses_run, i_run))
+            t_worker_bad = ThreadWorker(self.sp_main, self.get_bad_channel, (ses_run, i_run, self.bad_para))
             t_worker_bad.work_finished.connect(self.post_get_bad_channel)
             t_worker_bad.desc = 'bad'
-            t_worker_bad.start()
 
             # sets up the sync channel detection worker
             t_worker_sync = ThreadWorker(self.sp_main, self.get_sync_channel, (self._s, i_run))
             t_worker_sync.work_finished.connect(self.post_get_sync_channel)
             t_worker_sync.desc = 'sync'
-            t_worker_sync.start()
 
             # appends the worker objects
             self.t_worker.append(t_worker_bad)
             self.t_worker.append(t_worker_sync)
+            self.bad_barrier.add_worker(t_worker_bad)
+            self.sync_barrier.add_worker(t_worker_sync)
 
-            # updates the signal function
-            if self.sig_fcn is not None:
-                if isinstance(self.sig_fcn, pyqtSignal):
-                    self.sig_fcn.emit('bad')
-                    self.sig_fcn.emit('sync')
-
-                else:
-                    self.sig_fcn('bad')
-                    self.sig_fcn('sync')
+        # starts the workers (after all workers have been added to the barriers, so a barrier can't complete early)
+        for tw in self.t_worker:
+            tw.start()
 
-        # pauses for things to catch up...
-        time.sleep(0.1)
+        # updates the signal function (one job for each channel detection type)
+        self.emit_job_started('bad')
+        self.emit_job_started('sync')
 
-    def load_sorting_para(self, ses_obj):
+    def load_sorting_para(self, ses_obj, force_calc=False):
 
         # updates the signal function
-        if (ses_obj.session.sig_fcn is not None) and (not ses_obj.session.ssf_load):
+        if (ses_obj.session.sig_fcn is not None) and (force_calc or (not ses_obj.session.ssf_load)):
             # sets up the bad channel detection worker
             t_worker_sort = ThreadWorker(self.sp_main, self.get_sorter_info, (ses_obj))
             t_worker_sort.work_finished.connect(self.post_get_sorter_info)
@@ -912,15 +1067,14 @@ class SessionObject(QObject):
 
     def recalc_bad_channel_detect(self, p_props):
 
-        # pauses for things to catch up...
-        time.sleep(0.1)
-
         # memory allocation
         t_worker = []
+        self.bad_barrier.reset()
         n_run = self.get_run_count()
         self.bad_ch = np.empty(n_run, dtype=object)
 
         # field initialisation
+        self.bad_para = p_props
         self.data_init['bad'] = False
 
         for i_run in range(n_run):
@@ -930,24 +1084,79 @@ class SessionObject(QObject):
             # sets up the bad channel detection worker
             t_worker_new = ThreadWorker(self.sp_main, self.get_bad_channel, (ses_run, i_run, p_props))
             t_worker_new.work_finished.connect(self.post_get_bad_channel)
-            t_worker_new.start()
+            t_worker_new.desc = 'bad'
 
             # appends the worker objects
             t_worker.append(t_worker_new)
+            self.bad_barrier.add_worker(t_worker_new)
 
-            # updates the signal function
-            if self.sig_fcn is not None:
-                if isinstance(self.sig_fcn, pyqtBoundSignal):
-                    self.sig_fcn.emit('bad')
+        # starts the workers (after all workers have been added to the barrier)
+        for tw in t_worker:
+            tw.start()
 
-                else:
-                    self.sig_fcn('bad')
+        # updates the signal function
+        self.emit_job_started('bad')
 
         return t_worker
 
+    def emit_job_started(self, job_name):
+
+        if self.sig_fcn is not None:
+            if isinstance(self.sig_fcn, pyqtBoundSignal):
+                self.sig_fcn.emit(job_name)
+
+            else:
+                self.sig_fcn(job_name)
+
+    def bad_channel_ready(self):
+
+        # runs the bad channel updates (once the workers for all runs have finished)
+        self.channel_calc.emit('bad', self)
+
+    def sync_channel_ready(self):
+
+        # runs the sync channel updates (once the workers for all runs have finished)
+        self.channel_calc.emit('sync', self)
+
     def update_prog(self, m_str, pr_val):
 
-        self.prep_prop_update.emit(m_str, pr_val)
+        progress_bus.publish_value('session', m_str, pr_val)
+
+    # ---------------------------------------------------------------------------
+    # Channel Snapshot Functions
+    # ---------------------------------------------------------------------------
+
+    def get_channel_snapshot(self):
+
+        # returns the validity stamps/parameters for the calculated channel data
+        return {
+            'version': 1,
+            'bad_para': self.bad_para,
+            'stamps': [self.get_raw_file_stamps(i_run) for i_run in range(self.get_run_count())],
+        }
+
+    def get_stale_runs(self, ch_snap):
+
+        # field retrieval
+        n_run = self.get_run_count()
+        is_calc = [(self.bad_ch is not None) and (self.sync_ch is not None) and
+                   (self.bad_ch[i_run] is not None) and (self.sync_ch[i_run] is not None) for i_run in range(n_run)]
+
+        if ch_snap is None:
+            # case is a legacy session file (the stored channel data is used as is)
+            return [i_run for i_run in range(n_run) if not is_calc[i_run]]
+
+        # resets the bad channel detection parameters
+        self.bad_para = ch_snap.get('bad_para', {})
+        ch_stamp = ch_snap.get('stamps', [])
+
+        # determines the runs where the channel data is missing or the raw data files have changed
+        return [i_run for i_run in range(n_run) if (not is_calc[i_run]) or (i_run >= len(ch_stamp)) or
+                (list(ch_stamp[i_run]) != self.get_raw_file_stamps(i_run))]
+
+    def get_raw_file_stamps(self, i_run):
+
+        return cf.get_file_stamps(self._s._raw_runs[i_run]._parent_input_path)
 
     # ---------------------------------------------------------------------------
     # Thread worker functions
@@ -966,8 +1175,9 @@ class SessionObject(QObject):
 
         # retrieves the sync channels for each session/run
         b_channel = []
-        for probe in ses_run._raw.values():
-            b_channel.append(si.preprocessing.detect_bad_channels(probe, **p_props))
+        with session_tracer.span(f'Bad Channel Detection (Run #{i_run + 1})', cat='worker'):
+            for probe in ses_run._raw.values():
+                b_channel.append(si.preprocessing.detect_bad_channels(probe, **p_props))
 
         # returns the bad channels
         return b_channel, i_run
@@ -979,7 +1189,8 @@ class SessionObject(QObject):
         ses_obj, i_run = run_data
 
         # returns the sync channels
-        return ses_obj.get_sync_channel(i_run).flatten(), i_run
+        with session_tracer.span(f'Sync Channel Detection (Run #{i_run + 1})', cat='worker'):
+            return ses_obj.get_sync_channel(i_run).flatten(), i_run
 
     @staticmethod
     def calc_trace_minmax(run_data):
@@ -989,34 +1200,42 @@ class SessionObject(QObject):
 
         # memory allocation
         y_min, y_max = [], []
-        sz_blk, n_bins, t_blk, n_ds = 150000, 100, 10, 10
-
-        for probe in ses_run._raw.values():
-            # retrieves the traces for the current probe
-            y_sig = probe.get_traces()
-
-            # determines the histogram block size
-            n_frm, n_ch = y_sig.shape
-            n_frm_blk = np.min([n_frm, int(probe.sampling_frequency * t_blk)])
-            n_blk = int(np.ceil(n_frm / n_frm_blk))
-
-            # allocates memory for the current probe
-            t_blk = np.zeros((n_blk, 2))
-            y_min_tmp, y_max_tmp = np.zeros((n_blk, n_ch)), np.zeros((n_blk, n_ch))
-            for i_blk in range(n_blk):
-                # retrieves the sub-signal block
-                t_blk[i_blk, 0] = i_blk * n_frm_blk
-                t_blk[i_blk, 1] = np.min([(i_blk + 1) * n_frm_blk, n_frm])
-                i_row_blk = np.arange(int(t_blk[i_blk, 0]), int(t_blk[i_blk, 1]))
-                y_sig_blk = y_sig[i_row_blk, :][::n_ds, :]
-
-                # calculates the min/max over the block
-                y_min_tmp[i_blk, :] = np.min(y_sig_blk, axis=0)
-                y_max_tmp[i_blk, :] = np.max(y_sig_blk, axis=0)
-
-            # appends the min/max values
-            y_min.append(y_min_tmp)
-            y_max.append(y_max_tmp)
+        sz_blk, n_bins, t_dur_blk, n_ds = 150000, 100, 10, 10
+
+        with session_tracer.span(f'Min/Max Envelope (Run #{i_run + 1})', cat='worker'):
+            for probe in ses_run._raw.values():
+                # determines the histogram block size
+                n_frm, n_ch = probe.get_num_frames(), probe.get_num_channels()
+                n_frm_blk = np.min([n_frm, int(probe.sampling_frequency * t_dur_blk)])
+                n_blk = int(np.ceil(n_frm / n_frm_blk))
+
+                # determines the read block count (the traces are read in memory-limited windows of whole blocks)
+                t_read = job_tuner.get_read_duration(probe, n_frm_blk / probe.sampling_frequency)
+                n_blk_read = max(1, int(np.round(t_read * probe.sampling_frequency / n_frm_blk)))
+
+                # allocates memory for the current probe
+                t_blk = np.zeros((n_blk, 2))
+                y_min_tmp, y_max_tmp = np.zeros((n_blk, n_ch)), np.zeros((n_blk, n_ch))
+                for i_blk in range(n_blk):
+                    # reads the next trace window (at the start of each read window)
+                    if (i_blk % n_blk_read) == 0:
+                        i_frm_read = i_blk * n_frm_blk
+                        y_sig = probe.get_traces(start_frame=i_frm_read,
+                                                 end_frame=min((i_blk + n_blk_read) * n_frm_blk, n_frm))
+
+                    # retrieves the sub-signal block
+                    t_blk[i_blk, 0] = i_blk * n_frm_blk
+                    t_blk[i_blk, 1] = np.min([(i_blk + 1) * n_frm_blk, n_frm])
+                    i_row_blk = np.arange(int(t_blk[i_blk, 0]), int(t_blk[i_blk, 1])) - i_frm_read
+                    y_sig_blk = y_sig[i_row_blk, :][::n_ds, :]
+
+                    # calculates the min/max over the block
+                    y_min_tmp[i_blk, :] = np.min(y_sig_blk, axis=0)
+                    y_max_tmp[i_blk, :] = np.max(y_sig_blk, axis=0)
+
+                # appends the min/max values
+                y_min.append(y_min_tmp)
+                y_max.append(y_max_tmp)
 
         # returns the min/max values
         return t_blk, y_min, y_max, i_run
@@ -1025,8 +1244,9 @@ class SessionObject(QObject):
     def get_sorter_info(run_data):
 
         # initialisations
-        ss_info = SpikeSortInfo(run_data)
-        return ss_info.setup_all_sort_para()
+        with session_tracer.span('Sorter Information', cat='worker'):
+            ss_info = SpikeSortInfo(run_data)
+            return ss_info.setup_all_sort_para()
 
     # ---------------------------------------------------------------------------
     # Post thread worker functions
@@ -1039,12 +1259,10 @@ class SessionObject(QObject):
         ch_id = self._s._raw_runs[0]._raw['grouped'].get_channel_ids()
         self.bad_ch[i_run] = dict(zip(ch_id, ch_data[0][1]))
 
-        # if all runs have been detected, then run the signal function
+        # flags if all runs have been detected (the channel updates are run by the completion barrier)
         if np.all([x is not None for x in self.bad_ch]):
             self.data_init['bad'] = True
 
-        self.channel_calc.emit('bad', self)
-
     def post_get_sync_channel(self, data):
 
         # sets the signal data
@@ -1059,13 +1277,11 @@ class SessionObject(QObject):
             # resets the signal values as being on/off
             ch_data = 100 * (ch_data > (y_min + y_max) / 2).astype(int)
 
-        # if all runs have been detected, then run the signal function
+        # flags if all runs have been detected (the channel updates are run by the completion barrier)
         self.sync_ch[i_run] = ch_data
         if np.all([x is not None for x in self.sync_ch]):
             self.data_init['sync'] = True
 
-        self.channel_calc.emit('sync', self)
-
     def post_calc_trace_minmax(self, data):
 
         t_blk, y_min, y_max, i_run = data
@@ -1093,6 +1309,12 @@ class SessionObject(QObject):
 
         self.prep_obj.preprocess(configs, per_shank, concat_runs)
 
+    def reset_preprocessing(self):
+
+        # clears the preprocessed runs and resets the preprocessing object
+        self._s._pp_runs = []
+        self.prep_obj = RunPreProcessing(self._s)
+
     # ---------------------------------------------------------------------------
     # Session wrapper functions
     # ---------------------------------------------------------------------------
@@ -1170,11 +1392,42 @@ class SessionObject(QObject):
 
     def force_close_workers(self):
 
+        # force quits the running workers (the cancelled workers complete the barriers, which clear the jobs)
         if self.t_worker is not None:
             for tw in self.t_worker:
                 if tw.is_running:
                     tw.force_quit()
-                    self.channel_calc.emit(tw.desc, self)
+
+    # ---------------------------------------------------------------------------
+    # Static Methods
+    # ---------------------------------------------------------------------------
+
+    @staticmethod
+    def load_probe_sessions(sp_main, probe_props, ssf_file=None, sig_fcn=None):
+
+        # exits if there are no probe sessions to load
+        if not len(probe_props):
+            return {}
+
+        # resets the session load timeline
+        session_tracer.reset()
+
+        # creates the probe session objects (the raw data is loaded below)
+        probe_ses = {}
+        for p_name, p_props in probe_props.items():
+            probe_ses[p_name] = SessionObject(sp_main, p_props, ssf_file, sig_fcn, defer_load=True)
+
+        # loads the raw data for each probe concurrently (each probe is an independent recording stream)
+        n_worker = cf.get_cpu_budget(len(probe_ses))[0]
+        with ThreadPoolExecutor(max_workers=n_worker) as executor:
+            for t_load in [executor.submit(x.load_raw_session) for x in probe_ses.values()]:
+                t_load.result()
+
+        # sets up the probe session objects (the channel data workers for each probe run concurrently)
+        for ps in probe_ses.values():
+            ps.setup_session()
+
+        return probe_ses
 
     # ---------------------------------------------------------------------------
     # Protected Properties
@@ -1388,6 +1641,12 @@ class PostProcessData(QObject):
         # sets saved flag
         self.is_saved.append(is_save)
 
+        # accounts for the memory map footprint (the memory maps are file-backed, so aren't counted in the budget)
+        n_bytes_mmap = sum([x.nbytes for x in mmap_new.flat if x is not None])
+        mem_manager.register(self, f'Post-Processing Memory Map ({self.mmap_name[-1]})', item_key=self.mmap_name[-1],
+                             is_mapped=True)
+        mem_manager.update(self, n_bytes_mmap, item_key=self.mmap_name[-1])
+
         # determines the unit count (if the first mmap)
         self.n_mmap += 1
         if (self.n_mmap == 1):
@@ -1426,10 +1685,10 @@ class PostProcessData(QObject):
 
             for i_run in range(self.n_run_pp):
                 for i_shank in range(self.n_shank_pp):
-                    # clears the memory maps
+                    # clears the memory maps (the file handle is closed before the file is deleted)
                     self.mmap[i_map][i_run, i_shank].flush()
+                    self.mmap[i_map][i_run, i_shank]._mmap.close()
                     self.mmap[i_map][i_run, i_shank] = None
-                    time.sleep(0.1)
 
                     # deletes the temporary file
                     if not self.is_saved[i_map]:
@@ -1438,6 +1697,10 @@ class PostProcessData(QObject):
                         except:
                             pass
 
+        # removes the memory maps from the memory manager
+        for mm_name in self.mmap_name:
+            mem_manager.unregister(self, item_key=mm_name)
+
         # resets the class fields
         self.mmap = []
         self.mmap_file = []
@@ -1451,6 +1714,32 @@ class PostProcessData(QObject):
         self.n_run_pp = 0
         self.n_shank_pp = 0
 
+    def clear_temp_postprocessing(self):
+
+        # clears and deletes the temporary (unsaved) memory mapped files
+        for i_map in reversed(range(self.n_mmap)):
+            if self.is_saved[i_map]:
+                continue
+
+            for i_run in range(self.n_run_pp):
+                for i_shank in range(self.n_shank_pp):
+                    # closes the memory map
+                    self.mmap[i_map][i_run, i_shank].flush()
+                    self.mmap[i_map][i_run, i_shank]._mmap.close()
+                    self.mmap[i_map][i_run, i_shank] = None
+
+                    # deletes the temporary file
+                    try:
+                        os.remove(self.mmap_file[i_map][i_run, i_shank])
+                    except:
+                        pass
+
+            # removes the memory map fields
+            self.remove_post_process(i_map)
+
+        # resets the current memory map index
+        self.i_mmap = 0
+
     def remove_post_process(self, i_mmap_rmv=None):
 
         # default memory map array index
@@ -1460,8 +1749,8 @@ class PostProcessData(QObject):
         # appends the new mmap file
         self.mmap.pop(i_mmap_rmv)
         self.mmap_file.pop(i_mmap_rmv)
-        self.mmap_name.pop(i_mmap_rmv)
         self.is_saved.pop(i_mmap_rmv)
+        mem_manager.unregister(self, item_key=self.mmap_name.pop(i_mmap_rmv))
 
         # decrements the map count
         self.n_mmap -= 1
@@ -1487,7 +1776,6 @@ class PostProcessData(QObject):
                 self.mmap[self.i_mmap][i_run, i_shank].flush()
                 self.mmap[self.i_mmap][i_run, i_shank]._mmap.close()
                 self.mmap[self.i_mmap][i_run, i_shank] = None
-                time.sleep(0.25)
 
                 # recreates the memory mapped file
                 os.rename(self.mmap_file[self.i_mmap][i_run, i_shank], mmap_file_new[i_run, i_shank])
@@ -1497,8 +1785,17 @@ class PostProcessData(QObject):
         # resets the other fields
         self.is_saved[self.i_mmap] = True
         self.mmap_file[self.i_mmap] = mmap_file_new
+        mm_name_prev = self.mmap_name[self.i_mmap]
         self.mmap_name[self.i_mmap] = os.path.split(mmap_file_new[0, 0])[1]
 
+        # resets the memory manager item name
+        n_bytes_mmap = sum([x.nbytes for x in self.mmap[self.i_mmap].flat if x is not None])
+        mem_manager.unregister(self, item_key=mm_name_prev)
+        mem_manager.register(
+            self, f'Post-Processing Memory Map ({self.mmap_name[self.i_mmap]})', item_key=self.mmap_name[self.i_mmap],
+            is_mapped=True)
+        mem_manager.update(self, n_bytes_mmap, item_key=self.mmap_name[self.i_mmap])
+
     # ---------------------------------------------------------------------------
     # Class Setter Functions
     # ---------------------------------------------------------------------------
@@ -0,0 +1,401 @@
+# module import
+import os
+import json
+import sqlite3
+import threading
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+
+# spykit module import
+import spykit.common.common_widget as cw
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+# recording catalog file path
+catalog_file = os.path.join(cw.resource_dir, 'rec_catalog.sqlite').replace('\\', '/')
+
+# catalog format version
+catalog_version = 1
+
+# recording header file names
+oebin_file = 'structure.oebin'
+meta_suffix = '.meta'
+
+# catalog table columns
+cat_col = ['header_path', 'stream', 'run_path', 'file_format', 'sample_rate', 'n_channel', 'duration',
+           'probe_type', 'file_size', 'header_mtime']
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+"""
+    RecordingCatalog: local SQLite catalog of the recording metadata (sampling rate, channel count, duration, probe
+                      type and file size). the metadata is parsed from the SpikeGLX (.meta) and OpenEphys
+                      (structure.oebin/settings.xml) header files only, so no recording objects are created. header
+                      files are only re-parsed if their modification time has changed
+"""
+
+
+class RecordingCatalog(object):
+    # maximum parser thread count
+    n_worker_max = 16
+
+    def __init__(self, db_file=None):
+        super(RecordingCatalog, self).__init__()
+
+        # class field initialisations
+        self.db_file = db_file
+        self.db_conn = None
+
+        # database lock (the catalog is updated from a worker thread)
+        self.db_lock = threading.RLock()
+
+    # ---------------------------------------------------------------------------
+    # Catalog Update Functions
+    # ---------------------------------------------------------------------------
+
+    def build(self, f_root):
+
+        # searches the directory tree for the recording header files
+        f_root = str(f_root).replace('\\', '/')
+        h_file = []
+        d_stack = [f_root]
+        while len(d_stack):
+            d_path = d_stack.pop()
+            try:
+                f_scan = os.scandir(d_path)
+
+            except OSError:
+                # case is an unreadable directory
+                continue
+
+            with f_scan:
+                for f in f_scan:
+                    if f.is_dir(follow_symlinks=False):
+                        d_stack.append('{0}/{1}'.format(d_path, f.name))
+
+                    elif is_header_file(f.name):
+                        h_file.append('{0}/{1}'.format(d_path, f.name))
+
+        # updates the catalog entries, and removes any entries for header files that no longer exist
+        self.update_headers(h_file)
+        self.remove_missing(f_root, h_file)
+
+    def update_runs(self, run_path):
+
+        # retrieves the header files from each run directory
+        h_file = []
+        for rp in run_path:
+            rp = str(rp).replace('\\', '/')
+            if os.path.isdir(rp):
+                h_file += ['{0}/{1}'.format(rp, x) for x in sorted(os.listdir(rp)) if is_header_file(x)]
+
+        # updates the catalog entries
+        self.update_headers(h_file)
+
+    def update_headers(self, h_file):
+
+        # determines the header files that are new or have been modified since being catalogued
+        h_mtime = self.get_header_mtimes()
+        h_update = []
+        for hf in h_file:
+            try:
+                if h_mtime.get(hf) != os.stat(hf).st_mtime_ns:
+                    h_update.append(hf)
+
+            except OSError:
+                continue
+
+        # exits if there are no changes
+        if not len(h_update):
+            return 0
+
+        # parses the header files (in parallel, as this is file i/o bound)
+        n_worker = max(1, min(self.n_worker_max, len(h_update)))
+        with ThreadPoolExecutor(max_workers=n_worker) as executor:
+            h_rows = list(executor.map(parse_header_file, h_update))
+
+        # updates the catalog table
+        with self.db_lock, self.get_connection() as db_conn:
+            for hf, hr in zip(h_update, h_rows):
+                db_conn.execute('DELETE FROM recording WHERE header_path = ?', (hf,))
+                db_conn.executemany('INSERT INTO recording VALUES ({0})'.format(','.join(['?'] * len(cat_col))),
+                                    [tuple(r[k] for k in cat_col) for r in hr])
+
+        return len(h_update)
+
+    def remove_missing(self, f_root, h_file):
+
+        # removes the entries within the root folder for header files that were not found
+        h_file = set(h_file)
+        h_rmv = [x for x in self.get_header_mtimes(f_root) if x not in h_file]
+
+        with self.db_lock, self.get_connection() as db_conn:
+            db_conn.executemany('DELETE FROM recording WHERE header_path = ?', [(x,) for x in h_rmv])
+
+    # ---------------------------------------------------------------------------
+    # Catalog Query Functions
+    # ---------------------------------------------------------------------------
+
+    def query(self, run_path=None, path_prefix=None, file_format=None, probe_type=None, min_duration=None,
+              stream=None):
+
+        # sets up the query conditions
+        q_cond, q_val = [], []
+        if run_path is not None:
+            q_cond.append('run_path = ?')
+            q_val.append(str(run_path).replace('\\', '/').rstrip('/'))
+
+        if path_prefix is not None:
+            p_pref = str(path_prefix).replace('\\', '/')
+            q_cond.append('substr(run_path, 1, length(?)) = ?')
+            q_val += [p_pref, p_pref]
+
+        if file_format is not None:
+            q_cond.append('file_format = ?')
+            q_val.append(file_format)
+
+        if probe_type is not None:
+            q_cond.append('probe_type = ?')
+            q_val.append(probe_type)
+
+        if min_duration is not None:
+            q_cond.append('duration >= ?')
+            q_val.append(min_duration)
+
+        if stream is not None:
+            q_cond.append('stream = ?')
+            q_val.append(stream)
+
+        # runs the query
+        q_str = 'SELECT {0} FROM recording'.format(', '.join(cat_col))
+        if len(q_cond):
+            q_str += ' WHERE ' + ' AND '.join(q_cond)
+
+        with self.db_lock:
+            q_cur = self.get_connection().execute(q_str + ' ORDER BY run_path, stream', q_val)
+            return [dict(zip(cat_col, x)) for x in q_cur.fetchall()]
+
+    def get_run_info(self, run_path):
+
+        try:
+            # retrieves the run streams (the action potential stream is returned if there are multiple streams)
+            r_info = self.query(run_path=run_path)
+
+        except sqlite3.Error:
+            # case is the catalog can't be read
+            return None
+
+        if not len(r_info):
+            return None
+
+        r_ap = [x for x in r_info if is_ap_stream(x['stream'])]
+        return r_ap[0] if len(r_ap) else r_info[0]
+
+    # ---------------------------------------------------------------------------
+    # Class Getter Functions
+    # ---------------------------------------------------------------------------
+
+    def get_connection(self):
+
+        with self.db_lock:
+            # returns the connection (if already open)
+            if self.db_conn is not None:
+                return self.db_conn
+
+            # opens the catalog database
+            db_file = ':memory:' if (self.db_file is None) else self.db_file
+            if self.db_file is not None:
+                os.makedirs(os.path.dirname(self.db_file), exist_ok=True)
+
+            self.db_conn = sqlite3.connect(db_file, check_same_thread=False)
+
+            # recreates the catalog table (if the format version has changed)
+            if self.db_conn.execute('PRAGMA user_version').fetchone()[0] != catalog_version:
+                with self.db_conn:
+                    self.db_conn.execute('DROP TABLE IF EXISTS recording')
+                    self.db_conn.execute('PRAGMA user_version = {0}'.format(catalog_version))
+
+            # creates the catalog table/indices
+            with self.db_conn:
+                self.db_conn.execute(
+                    'CREATE TABLE IF NOT EXISTS recording (header_path TEXT, stream TEXT, run_path TEXT, '
+                    'file_format TEXT, sample_rate REAL, n_channel INTEGER, duration REAL, probe_type TEXT, '
+                    'file_size INTEGER, header_mtime INTEGER, PRIMARY KEY (header_path, stream))')
+                self.db_conn.execute('CREATE INDEX IF NOT EXISTS recording_run ON recording (run_path)')
+
+            return self.db_conn
+
+    def get_header_mtimes(self, f_root=None):
+
+        # retrieves the header file modification times
+        q_str, q_val = 'SELECT header_path, MAX(header_mtime) FROM recording', []
+        if f_root is not None:
+            p_pref = str(f_root).replace('\\', '/').rstrip('/') + '/'
+            q_str += ' WHERE substr(header_path, 1, length(?)) = ?'
+            q_val += [p_pref, p_pref]
+
+        with self.db_lock:
+            q_cur = self.get_connection().execute(q_str + ' GROUP BY header_path', q_val)
+            return dict(q_cur.fetchall())
+
+    def close(self):
+
+        with self.db_lock:
+            if self.db_conn is not None:
+                self.db_conn.close()
+                self.db_conn = None
+
+
+# global recording catalog object
+rec_catalog = RecordingCatalog(catalog_file)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def is_header_file(f_name):
+    """Determines if the file name, f_name, is a SpikeGLX/OpenEphys recording header file"""
+
+    return (f_name == oebin_file) or f_name.endswith(meta_suffix)
+
+
+def is_ap_stream(stream):
+    """Determines if the recording stream name, stream, is an action potential stream (e.g., "imec0.ap")"""
+
+    return stream.lower().replace('-', '.').split('.')[-1] == 'ap'
+
+
+def parse_header_file(h_file):
+    """Parses the recording header file, h_file, and returns the catalog rows (one per recording stream)"""
+
+    try:
+        if os.path.basename(h_file) == oebin_file:
+            # case is an OpenEphys structure file
+            return parse_oebin_file(h_file)
+
+        else:
+            # case is a SpikeGLX meta file
+            return parse_meta_file(h_file)
+
+    except (OSError, ValueError, KeyError, TypeError, ET.ParseError):
+        # case is an invalid/unreadable header file (exit if the file has been removed)
+        if not os.path.exists(h_file):
+            return []
+
+        # otherwise, the header is catalogued without metadata
+        f_format = 'openephys' if (os.path.basename(h_file) == oebin_file) else 'spikeglx'
+        return [get_catalog_row(h_file, '', os.path.dirname(h_file), f_format)]
+
+
+def parse_meta_file(h_file):
+    """Parses the SpikeGLX meta file, h_file"""
+
+    # reads the meta file key/value pairs
+    h_meta = {}
+    with open(h_file, 'r', encoding='utf-8', errors='replace') as f:
+        for h_line in f:
+            if '=' in h_line:
+                k, v = h_line.split('=', 1)
+                h_meta[k.strip().lstrip('~')] = v.strip()
+
+    # retrieves the sampling rate/channel count
+    s_rate = float(h_meta.get('imSampRate', h_meta.get('niSampRate', 0))) or None
+    n_ch = int(h_meta['nSavedChans']) if ('nSavedChans' in h_meta) else None
+
+    # determines the recording file size
+    bin_file = h_file[:-len(meta_suffix)] + '.bin'
+    if 'fileSizeBytes' in h_meta:
+        f_size = int(h_meta['fileSizeBytes'])
+
+    else:
+        f_size = os.path.getsize(bin_file) if os.path.exists(bin_file) else None
+
+    # determines the recording duration
+    if 'fileTimeSecs' in h_meta:
+        t_dur = float(h_meta['fileTimeSecs'])
+
+    elif (f_size is not None) and s_rate and n_ch:
+        t_dur = f_size / (2 * n_ch * s_rate)
+
+    else:
+        t_dur = None
+
+    # sets the probe type (part number for newer versions, probe option for older versions)
+    if 'imDatPrb_pn' in h_meta:
+        p_type = h_meta['imDatPrb_pn']
+
+    elif 'imDatPrb_type' in h_meta:
+        p_type = 'type {0}'.format(h_meta['imDatPrb_type'])
+
+    elif 'imProbeOpt' in h_meta:
+        p_type = 'option {0}'.format(h_meta['imProbeOpt'])
+
+    else:
+        p_type = None
+
+    # sets the stream name (e.g., "imec0.ap")
+    stream = '.'.join(os.path.basename(h_file).split('.')[1:-1])
+
+    return [get_catalog_row(h_file, stream, os.path.dirname(h_file), 'spikeglx', s_rate, n_ch, t_dur, p_type,
+                            f_size)]
+
+
+def parse_oebin_file(h_file):
+    """Parses the OpenEphys structure file, h_file (the probe type is read from the record node settings)"""
+
+    # reads the structure file
+    with open(h_file, 'r', encoding='utf-8') as f:
+        h_oebin = json.load(f)
+
+    # retrieves the probe type from the record node settings file (recording -> experiment -> record node)
+    h_dir = os.path.dirname(h_file)
+    p_type = parse_oe_settings_file(os.path.join(os.path.dirname(os.path.dirname(h_dir)), 'settings.xml'))
+
+    # sets up the rows for each continuous stream
+    h_rows = []
+    for h_cont in h_oebin.get('continuous', []):
+        # retrieves the stream sampling rate/channel count
+        s_rate = float(h_cont.get('sample_rate', 0)) or None
+        n_ch = h_cont.get('num_channels')
+        stream = h_cont.get('stream_name', h_cont.get('folder_name', '').strip('/'))
+
+        # determines the recording file size/duration
+        dat_file = os.path.join(h_dir, 'continuous', h_cont.get('folder_name', ''), 'continuous.dat')
+        f_size = os.path.getsize(dat_file) if os.path.exists(dat_file) else None
+        t_dur = f_size / (2 * n_ch * s_rate) if ((f_size is not None) and s_rate and n_ch) else None
+
+        h_rows.append(get_catalog_row(h_file, stream, h_dir, 'openephys', s_rate, n_ch, t_dur, p_type, f_size))
+
+    return h_rows if len(h_rows) else [get_catalog_row(h_file, '', h_dir, 'openephys')]
+
+
+def parse_oe_settings_file(s_file):
+    """Returns the probe type from the OpenEphys record node settings file, s_file (None if not available)"""
+
+    # exits if there is no settings file
+    if not os.path.exists(s_file):
+        return None
+
+    # retrieves the first neuropixels probe element
+    for h_elem in ET.parse(s_file).getroot().iter('NP_PROBE'):
+        return h_elem.get('probe_part_number', h_elem.get('probe_name'))
+
+    return None
+
+
+def get_catalog_row(h_file, stream, run_path, file_format, s_rate=None, n_ch=None, t_dur=None, p_type=None,
+                    f_size=None):
+    """Sets up the catalog table row for the recording header file, h_file"""
+
+    return {
+        'header_path': h_file,
+        'stream': stream,
+        'run_path': run_path.replace('\\', '/'),
+        'file_format': file_format,
+        'sample_rate': s_rate,
+        'n_channel': n_ch,
+        'duration': t_dur,
+        'probe_type': p_type,
+        'file_size': f_size,
+        'header_mtime': os.stat(h_file).st_mtime_ns,
+    }
@@ -0,0 +1,656 @@
+# module import
+import os
+import json
+import time
+import zlib
+import threading
+import numpy as np
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+# spikeinterface module import
+import spikeinterface as si
+from spikeinterface.core import BinaryRecordingExtractor, BinaryFolderRecording
+from spikeinterface.core.core_tools import check_json
+from spikeinterface.core.zarrextractors import add_properties_and_annotations
+
+# spykit module import
+import spykit.common.common_func as cf
+from spykit.common.progress_bus import progress_bus
+from spykit.common.preprocess_cache import prep_cache, get_hash_string, get_folder_size
+
+# zarr/numcodecs module import (optional - used for the compressed zarr export)
+try:
+    import zarr
+    from numcodecs import Blosc, Delta
+except ImportError:
+    zarr, Blosc, Delta = None, None, None
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+# maximum number of concurrent chunk writes (over all outputs)
+n_io_max = 4
+
+# chunk manifest/log file names (and the manifest format version)
+manifest_file = 'export_manifest.json'
+chunk_log_file = 'export_chunks.log'
+manifest_version = 1
+
+# export formats (the compressed zarr format is only available if zarr/numcodecs are installed)
+has_zarr = (zarr is not None) and (Blosc is not None)
+export_formats = ['binary', 'zarr'] if has_zarr else ['binary']
+
+# zarr compression options (blosc compressor name and shuffle/delta filter)
+blosc_cnames = ['zstd', 'lz4', 'blosclz']
+zarr_filters = ['Byte Shuffle', 'Bit Shuffle', 'Delta + Bit Shuffle']
+blosc_clevel = 5
+
+# read-back benchmark parameters (random chunk count/duration)
+n_chunk_read = 20
+t_chunk_read = 1.
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+"""
+    RecordingExport: chunked binary folder export of a single recording. the chunks are read/written by a pool of
+                     threads, and the output folder matches the spikeinterface binary folder format. a chunk manifest
+                     (the completed chunks and their checksums) is written alongside the output, so an interrupted
+                     export resumes from the missing chunks (the completed chunks are verified first)
+"""
+
+
+class RecordingExport(object):
+    def __init__(self, rec, folder, out_name, t_chunk=1.):
+        super(RecordingExport, self).__init__()
+
+        # input arguments
+        self.rec = rec
+        self.folder = Path(folder)
+        self.out_name = out_name
+
+        # chunk fields
+        self.n_frm_chunk = max(1, int(t_chunk * rec.get_sampling_frequency()))
+        self.chunk = self.get_chunk_ranges()
+        self.i_done = set()
+        self.n_done = 0
+
+        # other class fields
+        self.t_start = None
+        self.t_finish = None
+        self.error = None
+        self.read_rate = None
+        self.is_verify = False
+        self.f_data = []
+
+        # thread-safety objects
+        self._lock = threading.Lock()
+
+    # ---------------------------------------------------------------------------
+    # Export Functions
+    # ---------------------------------------------------------------------------
+
+    def run(self, n_jobs, io_sem, prog_fcn=None, is_cancel=None):
+
+        # initialisations
+        self.t_start = time.perf_counter()
+        self.folder.mkdir(parents=True, exist_ok=True)
+
+        # resumes from the chunk manifest (the previously written chunks are verified)
+        self.is_verify = True
+        self.i_done = self.load_manifest()
+        self.n_done = len(self.i_done)
+        self.is_verify = False
+
+        # opens the output data (this is created if there are no previously written chunks)
+        self.open_output()
+
+        # opens the chunk log (completed chunks are appended)
+        f_log = open(self.folder / chunk_log_file, 'a', encoding='utf-8')
+
+        def write_chunk(i_chk):
+
+            # exits if the export has been cancelled
+            if (is_cancel is not None) and is_cancel():
+                return
+
+            # reads the chunk traces
+            i_seg, i_frm0, i_frm1 = self.chunk[i_chk]
+            y_chk = self.rec.get_traces(segment_index=i_seg, start_frame=i_frm0, end_frame=i_frm1)
+            y_chk = np.ascontiguousarray(y_chk, dtype=self.rec.get_dtype())
+
+            # writes the chunk (the concurrent writes over all outputs are limited by the i/o budget)
+            with io_sem:
+                self.write_chunk_data(i_chk, y_chk)
+
+            # records the completed chunk (the data is written before the log entry)
+            with self._lock:
+                f_log.write('{0} {1}\n'.format(i_chk, zlib.crc32(y_chk.data)))
+                f_log.flush()
+
+                self.i_done.add(i_chk)
+                self.n_done = len(self.i_done)
+
+            if prog_fcn is not None:
+                prog_fcn()
+
+        try:
+            # writes the missing chunks
+            i_chunk = [i for i in range(len(self.chunk)) if i not in self.i_done]
+            with ThreadPoolExecutor(max_workers=max(1, n_jobs)) as executor:
+                for t_chk in [executor.submit(write_chunk, i) for i in i_chunk]:
+                    t_chk.result()
+
+        finally:
+            # closes the output data/log files
+            self.close_output()
+            f_log.close()
+
+        # writes the binary folder information (if the export is complete)
+        if self.is_complete():
+            self.finalise()
+
+        self.t_finish = time.perf_counter()
+
+    def open_output(self):
+
+        # opens the segment data files (the files are only resized if they don't match the output size)
+        self.f_data = []
+        for i_seg in range(self.rec.get_num_segments()):
+            d_file, n_bytes = self.get_data_file(i_seg), self.get_segment_bytes(i_seg)
+            if (not d_file.exists()) or (d_file.stat().st_size != n_bytes):
+                with open(d_file, 'ab') as f:
+                    f.truncate(n_bytes)
+
+            self.f_data.append((open(d_file, 'r+b'), threading.Lock()))
+
+    def write_chunk_data(self, i_chk, y_chk):
+
+        # writes the chunk to the segment data file
+        f, f_lock = self.f_data[self.chunk[i_chk][0]]
+        with f_lock:
+            f.seek(self.get_chunk_offset(i_chk))
+            f.write(y_chk.data)
+
+    def close_output(self):
+
+        for f, _ in self.f_data:
+            f.close()
+
+        self.f_data = []
+
+    def finalise(self):
+
+        # field retrieval
+        rec, n_seg = self.rec, self.rec.get_num_segments()
+
+        # writes the recording provenance
+        if rec.check_serializability('json'):
+            rec.dump(self.folder / 'provenance.json')
+        else:
+            with open(self.folder / 'provenance.json', 'w', encoding='utf-8') as f:
+                json.dump({'warning': 'the provenance is not json serializable'}, f)
+
+        # writes the recording metadata
+        rec.save_metadata_to_folder(self.folder)
+
+        # writes the binary recording information
+        rec_bin = BinaryRecordingExtractor(
+            file_paths=[self.get_data_file(i) for i in range(n_seg)],
+            sampling_frequency=rec.get_sampling_frequency(),
+            num_channels=rec.get_num_channels(),
+            dtype=rec.get_dtype(),
+            t_starts=rec._get_t_starts(),
+            channel_ids=rec.get_channel_ids(),
+            time_axis=0,
+            file_offset=0,
+            is_filtered=rec.is_filtered(),
+            gain_to_uV=rec.get_channel_gains(),
+            offset_to_uV=rec.get_channel_offsets(),
+        )
+        rec_bin.dump(self.folder / 'binary.json', relative_to=self.folder)
+
+        # writes the folder recording information (this is used to load the export with si.load)
+        BinaryFolderRecording(self.folder).dump(self.folder / 'si_folder.json', relative_to=self.folder)
+
+        # flags the manifest as being complete
+        self.write_manifest(is_complete=True)
+
+    # ---------------------------------------------------------------------------
+    # Chunk Manifest Functions
+    # ---------------------------------------------------------------------------
+
+    def load_manifest(self):
+
+        try:
+            # reads the manifest file
+            with open(self.folder / manifest_file, 'r', encoding='utf-8') as f:
+                m_info = json.load(f)
+
+        except (OSError, ValueError):
+            # case is there is no (readable) manifest
+            m_info = None
+
+        if (m_info is None) or (m_info.get('version') != manifest_version) or (m_info.get('key') != self.get_key()):
+            # case is a new export (or a different recording), so any previous chunk log is removed
+            self.write_manifest()
+            with open(self.folder / chunk_log_file, 'w', encoding='utf-8'):
+                pass
+
+            return set()
+
+        # resumes with the manifest chunk size
+        self.n_frm_chunk = m_info['n_frm_chunk']
+        self.chunk = self.get_chunk_ranges()
+
+        # reads the chunk log (incomplete lines from an interrupted write are ignored)
+        crc = {}
+        try:
+            with open(self.folder / chunk_log_file, 'r', encoding='utf-8') as f:
+                for l_str in f:
+                    l_sp = l_str.split()
+                    if (len(l_sp) == 2) and all([x.isdigit() for x in l_sp]) and (int(l_sp[0]) < len(self.chunk)):
+                        crc[int(l_sp[0])] = int(l_sp[1])
+
+        except OSError:
+            pass
+
+        # verifies the logged chunks against the written data
+        i_done = set([i_chk for i_chk, c_val in crc.items() if self.verify_chunk(i_chk, c_val)])
+
+        # rewrites the chunk log (with the verified chunks only)
+        with open(self.folder / chunk_log_file, 'w', encoding='utf-8') as f:
+            f.writelines(['{0} {1}\n'.format(i, crc[i]) for i in sorted(i_done)])
+
+        self.write_manifest()
+        return i_done
+
+    def write_manifest(self, is_complete=False):
+
+        # sets up the manifest information
+        m_info = {
+            'version': manifest_version,
+            'key': self.get_key(),
+            'n_frm_chunk': self.n_frm_chunk,
+            'n_chunk': len(self.chunk),
+            'dtype': self.rec.get_dtype().str,
+            'is_complete': is_complete,
+        }
+
+        # writes the manifest (via a temporary file, so the manifest is never partially written)
+        m_file = self.folder / manifest_file
+        with open(m_file.with_suffix('.tmp'), 'w', encoding='utf-8') as f:
+            json.dump(m_info, f, indent=2)
+
+        os.replace(m_file.with_suffix('.tmp'), m_file)
+
+    def verify_chunk(self, i_chk, c_val):
+
+        # field retrieval
+        i_seg, i_frm0, i_frm1 = self.chunk[i_chk]
+        n_bytes = (i_frm1 - i_frm0) * self.get_frame_bytes()
+
+        try:
+            # reads the chunk data and compares the checksum
+            with open(self.get_data_file(i_seg), 'rb') as f:
+                f.seek(self.get_chunk_offset(i_chk))
+                y_chk = f.read(n_bytes)
+
+            return (len(y_chk) == n_bytes) and (zlib.crc32(y_chk) == c_val)
+
+        except OSError:
+            return False
+
+    # ---------------------------------------------------------------------------
+    # Class Getter Functions
+    # ---------------------------------------------------------------------------
+
+    def get_key(self):
+
+        # the export key is the recording chain key and the output dimensions/data type
+        return get_hash_string({
+            'recording': prep_cache.get_recording_key(self.rec),
+            'dtype': self.rec.get_dtype().str,
+            'channel_ids': [str(x) for x in self.rec.get_channel_ids()],
+            's_freq': self.rec.get_sampling_frequency(),
+            'n_frm': [self.rec.get_num_samples(i) for i in range(self.rec.get_num_segments())],
+        })
+
+    def get_chunk_ranges(self):
+
+        # sets the chunk frame ranges for each segment
+        chunk = []
+        for i_seg in range(self.rec.get_num_segments()):
+            n_frm = self.rec.get_num_samples(i_seg)
+            chunk += [(i_seg, i, min(i + self.n_frm_chunk, n_frm)) for i in range(0, n_frm, self.n_frm_chunk)]
+
+        return chunk
+
+    def get_chunk_offset(self, i_chk):
+
+        return self.chunk[i_chk][1] * self.get_frame_bytes()
+
+    def get_frame_bytes(self):
+
+        return self.rec.get_num_channels() * self.rec.get_dtype().itemsize
+
+    def get_segment_bytes(self, i_seg):
+
+        return self.rec.get_num_samples(i_seg) * self.get_frame_bytes()
+
+    def get_data_file(self, i_seg):
+
+        return self.folder / 'traces_cached_seg{0}.raw'.format(i_seg)
+
+    def get_fraction(self):
+
+        return self.n_done / max(1, len(self.chunk))
+
+    def get_eta(self):
+
+        # exits if the export hasn't started (or is complete)
+        pr_val = self.get_fraction()
+        if (self.t_start is None) or (pr_val <= 0) or (self.t_finish is not None):
+            return None
+
+        t_elapsed = time.perf_counter() - self.t_start
+        return t_elapsed * (1. - pr_val) / pr_val
+
+    def get_write_stats(self):
+
+        # exits if the export isn't complete
+        if (self.t_finish is None) or (not self.is_complete()):
+            return None
+
+        # calculates the compression ratio and write throughput (of the uncompressed data)
+        n_bytes_raw = sum([self.get_segment_bytes(i) for i in range(self.rec.get_num_segments())])
+        n_bytes_disk = get_folder_size(self.folder)
+        return {
+            'ratio': n_bytes_raw / max(1, n_bytes_disk),
+            'rate_mb': n_bytes_raw / (2 ** 20 * max(self.t_finish - self.t_start, 1e-6)),
+        }
+
+    def get_status_string(self):
+
+        if self.error is not None:
+            # case is the export failed
+            return '{0}: Error'.format(self.out_name)
+
+        elif self.is_complete():
+            # case is the export is complete (the compression ratio/write throughput are included)
+            w_stats = self.get_write_stats()
+            if w_stats is None:
+                return '{0}: Complete'.format(self.out_name)
+
+            s_str = '{0}: Complete (x{1:.2f}, {2:.0f} MB/s'.format(self.out_name, w_stats['ratio'], w_stats['rate_mb'])
+            if self.read_rate is not None:
+                # case is the read-back throughput has been measured
+                s_str = '{0}, Read {1:.0f} MB/s'.format(s_str, self.read_rate)
+
+            return s_str + ')'
+
+        elif self.t_start is None:
+            # case is the export is waiting to start
+            return '{0}: Waiting...'.format(self.out_name)
+
+        elif self.is_verify:
+            # case is the previously written chunks are being verified
+            return '{0}: Verifying...'.format(self.out_name)
+
+        elif self.t_finish is not None:
+            # case is the export was cancelled (the export can be resumed)
+            return '{0}: Cancelled ({1:.0f}%)'.format(self.out_name, 100. * self.get_fraction())
+
+        # case is the export is running
+        t_eta = self.get_eta()
+        eta_str = '' if (t_eta is None) else ' (ETA {0})'.format(time.strftime('%H:%M:%S', time.gmtime(t_eta)))
+        return '{0}: {1:.0f}%{2}'.format(self.out_name, 100. * self.get_fraction(), eta_str)
+
+    def is_complete(self):
+
+        return self.n_done == len(self.chunk)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+"""
+    ZarrRecordingExport: compressed zarr export of a single recording (blosc compression, with an optional delta
+                         filter). the chunks are written by the same thread pool/chunk manifest as the binary export
+                         (each chunk is a separate zarr chunk), and the output matches the spikeinterface zarr format
+"""
+
+
+class ZarrRecordingExport(RecordingExport):
+    def __init__(self, rec, folder, out_name, t_chunk=1., cname='zstd', f_type=zarr_filters[1]):
+
+        # the zarr folder requires the zarr suffix
+        folder = Path(folder)
+        folder = folder if (folder.suffix == '.zarr') else folder.with_name(folder.name + '.zarr')
+        super(ZarrRecordingExport, self).__init__(rec, folder, out_name, t_chunk)
+
+        # compression fields
+        self.cname = cname
+        self.f_type = f_type
+
+    # ---------------------------------------------------------------------------
+    # Export Functions
+    # ---------------------------------------------------------------------------
+
+    def open_output(self):
+
+        # opens the zarr group (the existing traces are used if resuming from previously written chunks)
+        z_root = zarr.open_group(str(self.folder), mode='a')
+        if len(self.i_done) == 0:
+            # case is a new export (any previous zarr data is removed, and the recording information is written)
+            for z_key in list(z_root.keys()):
+                del z_root[z_key]
+
+            z_root.attrs.clear()
+            self.setup_zarr_group(z_root)
+
+        # retrieves the segment trace datasets
+        self.f_data = [z_root[self.get_trace_name(i)] for i in range(self.rec.get_num_segments())]
+
+    def write_chunk_data(self, i_chk, y_chk):
+
+        # writes the chunk to the segment traces (the chunks match the zarr chunks, so the writes are independent)
+        i_seg, i_frm0, i_frm1 = self.chunk[i_chk]
+        self.f_data[i_seg][i_frm0:i_frm1, :] = y_chk
+
+    def close_output(self):
+
+        self.f_data = []
+
+    def finalise(self):
+
+        # flags the manifest as being complete (the recording information is written with the traces datasets)
+        self.write_manifest(is_complete=True)
+
+    def setup_zarr_group(self, z_root):
+
+        # field retrieval
+        rec, n_seg = self.rec, self.rec.get_num_segments()
+        compressor, filters = get_zarr_codecs(self.cname, self.f_type, rec.get_dtype())
+
+        # writes the recording information (as for the spikeinterface zarr writer)
+        z_root.attrs['provenance'] = check_json(rec.to_dict(recursive=True)) if rec.check_if_json_serializable() \
+            else None
+        z_root.attrs['sampling_frequency'] = float(rec.get_sampling_frequency())
+        z_root.attrs['num_segments'] = int(n_seg)
+        z_root.create_dataset(name='channel_ids', data=rec.get_channel_ids(), compressor=None)
+
+        # creates the segment traces datasets (chunked by the export chunks)
+        for i_seg in range(n_seg):
+            z_root.create_dataset(name=self.get_trace_name(i_seg), shape=(rec.get_num_samples(i_seg),
+                                  rec.get_num_channels()), chunks=(self.n_frm_chunk, None), dtype=rec.get_dtype(),
+                                  filters=filters, compressor=compressor)
+
+        # writes the probe information
+        if rec.get_property('contact_vector') is not None:
+            z_root.attrs['probe'] = check_json(rec.get_probegroup().to_dict(array_as_list=True))
+
+        # writes the segment time vectors/start times
+        t_starts = np.full(n_seg, np.nan)
+        for i_seg, rec_seg in enumerate(rec._recording_segments):
+            t_kw = rec_seg.get_times_kwargs()
+            if t_kw['time_vector'] is not None:
+                z_root.create_dataset(name='times_seg{0}'.format(i_seg), data=t_kw['time_vector'],
+                                      filters=filters, compressor=compressor)
+
+            elif t_kw['t_start'] is not None:
+                t_starts[i_seg] = t_kw['t_start']
+
+        if np.any(~np.isnan(t_starts)):
+            z_root.create_dataset(name='t_starts', data=t_starts, compressor=None)
+
+        # writes the channel properties/annotations
+        add_properties_and_annotations(z_root, rec)
+
+    # ---------------------------------------------------------------------------
+    # Chunk Manifest Functions
+    # ---------------------------------------------------------------------------
+
+    def verify_chunk(self, i_chk, c_val):
+
+        # field retrieval
+        i_seg, i_frm0, i_frm1 = self.chunk[i_chk]
+
+        try:
+            # reads the (decompressed) chunk data and compares the checksum
+            z_data = zarr.open_group(str(self.folder), mode='r')[self.get_trace_name(i_seg)]
+            y_chk = np.ascontiguousarray(z_data[i_frm0:i_frm1], dtype=self.rec.get_dtype())
+            return zlib.crc32(y_chk.data) == c_val
+
+        except Exception:
+            return False
+
+    # ---------------------------------------------------------------------------
+    # Class Getter Functions
+    # ---------------------------------------------------------------------------
+
+    @staticmethod
+    def get_trace_name(i_seg):
+
+        return 'traces_seg{0}'.format(i_seg)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+"""
+    ExportScheduler: runs a set of recording exports concurrently under a global worker budget. the budget is split
+                     between the concurrent exports, and the concurrent chunk writes (over all exports) are limited by
+                     the i/o budget. the overall progress is published on the progress bus
+"""
+
+
+class ExportScheduler(object):
+    # progress bus task name
+    pr_name = 'save_prep'
+
+    def __init__(self, exports, n_worker):
+        super(ExportScheduler, self).__init__()
+
+        # input arguments
+        self.exports = exports
+        self.n_worker = max(1, n_worker)
+
+        # other class fields
+        self.pr_task = None
+        self.is_cancel = False
+        self.io_sem = threading.BoundedSemaphore(max(1, min(self.n_worker, n_io_max)))
+
+    def run(self):
+
+        # splits the worker budget between the concurrent exports
+        n_export, n_jobs = cf.get_cpu_budget(len(self.exports), self.n_worker)
+        self.pr_task = progress_bus.start_task(self.pr_name, 'Exporting Preprocessed Data', len(self.exports))
+
+        try:
+            # runs the exports (the export errors are stored, so the other exports continue)
+            with ThreadPoolExecutor(max_workers=n_export) as executor:
+                for t_exp in [executor.submit(self.run_export, x, n_jobs) for x in self.exports]:
+                    t_exp.result()
+
+        finally:
+            # flags the export as being complete
+            self.pr_task.finish()
+
+        return [x for x in self.exports if (x.error is not None)]
+
+    def run_export(self, exp, n_jobs):
+
+        try:
+            # runs the export
+            exp.run(n_jobs, self.io_sem, self.update_progress, lambda: self.is_cancel)
+
+        except Exception as e:
+            # case is the export failed
+            exp.error = e
+
+        # updates the completed export count
+        self.pr_task.set_step(sum([x.is_complete() or (x.error is not None) for x in self.exports]))
+        self.update_progress()
+
+    def update_progress(self):
+
+        # resets the overall progress (from the chunk counts over all exports)
+        n_done = sum([x.n_done for x in self.exports])
+        n_chunk = sum([len(x.chunk) for x in self.exports])
+        self.pr_task.set_overall(n_done / max(1, n_chunk))
+
+    def cancel(self):
+
+        self.is_cancel = True
+
+    # ---------------------------------------------------------------------------
+    # Class Getter Functions
+    # ---------------------------------------------------------------------------
+
+    def get_status_strings(self):
+
+        return [x.get_status_string() for x in self.exports]
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def get_zarr_codecs(cname, f_type, dtype):
+    """Returns the blosc compressor and filters for the compressor name, cname, and filter type, f_type"""
+
+    # sets the blosc shuffle type (bit shuffling is typically better for int16 data)
+    shuffle = Blosc.SHUFFLE if (f_type == zarr_filters[0]) else Blosc.BITSHUFFLE
+    compressor = Blosc(cname=cname, clevel=blosc_clevel, shuffle=shuffle)
+
+    # sets the delta filter (integer data only, as the float differences don't compress any better)
+    is_delta = (f_type == zarr_filters[2]) and (np.dtype(dtype).kind in 'iu')
+    filters = [Delta(dtype=np.dtype(dtype).str)] if is_delta else None
+
+    return compressor, filters
+
+
+def create_export(rec, folder, out_name, t_chunk=1., f_format='binary', cname='zstd', f_type=zarr_filters[1]):
+    """Returns the recording export object for the export format, f_format"""
+
+    if f_format == 'zarr':
+        return ZarrRecordingExport(rec, folder, out_name, t_chunk, cname, f_type)
+
+    else:
+        return RecordingExport(rec, folder, out_name, t_chunk)
+
+
+def benchmark_read(folder, n_chunk=n_chunk_read, t_chunk=t_chunk_read, seed=0):
+    """Returns the read-back throughput (in MB/s of uncompressed data) of random chunks of an exported recording"""
+
+    # loads the exported recording
+    rec = si.load(folder)
+    n_frm_chunk = min(rec.get_num_frames(), max(1, int(t_chunk * rec.get_sampling_frequency())))
+
+    # sets the random chunk start frames
+    rng = np.random.default_rng(seed)
+    i_frm0 = rng.integers(0, rec.get_num_frames() - n_frm_chunk + 1, n_chunk)
+
+    # reads the random chunks
+    n_bytes, t_start = 0, time.perf_counter()
+    for i0 in i_frm0:
+        n_bytes += rec.get_traces(start_frame=int(i0), end_frame=int(i0) + n_frm_chunk).nbytes
+
+    return n_bytes / (2 ** 20 * max(time.perf_counter() - t_start, 1e-6))
@@ -0,0 +1,205 @@
+# module import
+import gc
+import numpy as np
+from collections import OrderedDict
+from functools import partial as pfcn
+
+# spykit module import
+from spykit.common.memory_manager import mem_manager, get_array_bytes, get_object_bytes
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+"""
+    ResidentSession: derived data for a session held in the resident session cache
+"""
+
+
+class ResidentSession:
+    def __init__(self, session, channel_data, session_props, post_data, current_run=None, current_shank=None):
+
+        # main session objects
+        self.session = session
+        self.channel_data = channel_data
+        self.session_props = session_props
+        self.post_data = post_data
+
+        # other class fields
+        self.current_run = current_run
+        self.current_shank = current_shank
+        self.key = ResidentSessionCache.get_session_key(session.get_session_props())
+        self.n_bytes = self.calc_byte_size()
+        self.is_pinned = False
+
+    def calc_byte_size(self):
+
+        # adds the bad/sync channel fields (the bad channel tables are data frames, and the sync traces are the
+        # largest derived fields)
+        n_bytes = sum([get_array_bytes(getattr(self.session, p_fld, None)) for p_fld in ['bad_ch', 'sync_ch']])
+
+        # adds the channel data/session property arrays, and the post-processing unit tables (the post-processing
+        # memory maps are file-backed, so are accounted separately by the memory manager)
+        for p_obj in [self.channel_data, self.session_props, self.post_data]:
+            n_bytes += get_object_bytes(p_obj)
+
+        return n_bytes
+
+    def release(self):
+
+        # force closes any running workers
+        self.session.force_close_workers()
+
+        # closes the open memory maps (the saved files are kept on disk)
+        if self.post_data is not None:
+            for mmap, mm_name in zip(self.post_data.mmap, self.post_data.mmap_name):
+                mem_manager.unregister(self.post_data, item_key=mm_name)
+                for mm in np.ravel(mmap):
+                    if isinstance(mm, np.memmap):
+                        mm.flush()
+                        mm._mmap.close()
+
+        # clears the object references
+        self.session = None
+        self.channel_data = None
+        self.session_props = None
+        self.post_data = None
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+"""
+    ResidentSessionCache: LRU cache of the most recently used (non-current) sessions. pinned sessions (the other
+                          probes of the current multi-probe session) are held outside of the cache limits, and are
+                          never evicted while pinned
+"""
+
+
+class ResidentSessionCache:
+    # cache size limits
+    n_max = 3
+    n_bytes_max = 4 * 2 ** 30
+
+    def __init__(self, n_max=None, n_bytes_max=None):
+
+        # field initialisations
+        self.entry = OrderedDict()
+        self.pin_key = set()
+
+        # resets the cache size limits (if provided)
+        if n_max is not None:
+            self.n_max = n_max
+
+        if n_bytes_max is not None:
+            self.n_bytes_max = n_bytes_max
+
+    # ---------------------------------------------------------------------------
+    # Cache Update Functions
+    # ---------------------------------------------------------------------------
+
+    def add_entry(self, ses_entry):
+
+        # removes any existing entry for the session
+        if ses_entry.key in self.entry:
+            self.remove_entry(ses_entry.key)
+
+        # adds the new entry (as the most recently used) and reduces the cache to within limits
+        ses_entry.is_pinned = ses_entry.key in self.pin_key
+        self.entry[ses_entry.key] = ses_entry
+        self.reduce_cache()
+
+        # registers the entry with the memory manager
+        if ses_entry.key in self.entry:
+            self.register_entry(ses_entry)
+            mem_manager.update(self, ses_entry.n_bytes, item_key=ses_entry.key)
+
+    def register_entry(self, ses_entry):
+
+        # registers the entry with the memory manager (pinned entries can't be evicted)
+        m_desc = 'Resident Session ({0}/{1})'.format(ses_entry.key[1].split('/')[-1], ses_entry.key[2])
+        evict_fcn = None if ses_entry.is_pinned else pfcn(self.remove_entry, ses_entry.key)
+        mem_manager.register(self, m_desc, evict_fcn, item_key=ses_entry.key)
+
+    def set_pinned(self, sessions):
+
+        # resets the pinned session keys
+        self.pin_key = set([self.get_session_key(x.get_session_props()) for x in sessions])
+
+        # updates the pinned state of the cached entries
+        for ses_entry in self.entry.values():
+            is_pinned = ses_entry.key in self.pin_key
+            if is_pinned != ses_entry.is_pinned:
+                ses_entry.is_pinned = is_pinned
+                self.register_entry(ses_entry)
+
+        # reduces the cache to within limits (the unpinned sessions are now included)
+        self.reduce_cache()
+
+    def get_entry(self, s_props):
+
+        # retrieves the session key (exit if there is no match)
+        s_key = self.get_session_key(s_props)
+        if s_key not in self.entry:
+            return None
+
+        # flags the entry as being the most recently used
+        self.entry.move_to_end(s_key)
+        mem_manager.touch(self, item_key=s_key)
+        return self.entry[s_key]
+
+    def pop_entry(self, session):
+
+        # retrieves the matching session entry (exit if there is no match)
+        s_key = self.get_session_key(session.get_session_props())
+        if (s_key not in self.entry) or (self.entry[s_key].session is not session):
+            return None
+
+        # removes the entry from the cache (without releasing the session objects)
+        mem_manager.unregister(self, item_key=s_key)
+        return self.entry.pop(s_key)
+
+    def remove_entry(self, s_key, force=False):
+
+        # exits if the entry has already been removed (or is pinned)
+        if (s_key not in self.entry) or (self.entry[s_key].is_pinned and not force):
+            return
+
+        # removes and releases the session entry
+        mem_manager.unregister(self, item_key=s_key)
+        self.entry.pop(s_key).release()
+        gc.collect()
+
+    def reduce_cache(self):
+
+        # removes the least recently used (unpinned) sessions until the cache is within the count/size limits
+        s_key = [k for k, x in self.entry.items() if not x.is_pinned]
+        while len(s_key) and ((len(s_key) > self.n_max) or (self.get_total_bytes() > self.n_bytes_max)):
+            self.remove_entry(s_key.pop(0))
+
+    def clear(self):
+
+        for s_key in list(self.entry.keys()):
+            self.remove_entry(s_key, True)
+
+    # ---------------------------------------------------------------------------
+    # Class Getter Functions
+    # ---------------------------------------------------------------------------
+
+    def get_total_bytes(self):
+
+        # returns the unpinned session byte count (the pinned sessions are outside the cache limits)
+        return sum([x.n_bytes for x in self.entry.values() if not x.is_pinned])
+
+    def get_session_count(self):
+
+        return len(self.entry)
+
+    @staticmethod
+    def get_session_key(s_props):
+
+        # sets the run names as a hashable field
+        run_names = s_props.get('run_names')
+        if isinstance(run_names, (list, tuple, np.ndarray)):
+            run_names = tuple(run_names)
+
+        return (s_props.get('format_type'), str(s_props.get('subject_path')), s_props.get('session_name'),
+                s_props.get('file_format'), run_names)
+
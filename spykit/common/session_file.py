@@ -0,0 +1,421 @@
+# module import
+import io
+import os
+import json
+import pickle
+import struct
+import numpy as np
+import pandas as pd
+from pathlib import Path, PurePath
+from collections.abc import Mapping
+
+# spykit module import
+from spykit.info.preprocess import PreprocessConfig
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+# session file format fields
+ssf_magic = b'SPYKITSF'
+ssf_version = 2
+ssf_min_version = 2
+ssf_align = 64
+
+# session file header prefix (magic string + header byte count)
+ssf_prefix = struct.Struct('<8sQ')
+
+# classes that can be stored within a session file (decoded without running any class code)
+ssf_class = {
+    'PreprocessConfig': PreprocessConfig,
+}
+
+# built-in types that can be loaded from a legacy (pickled) session file
+legacy_builtin = ('dict', 'list', 'tuple', 'set', 'frozenset', 'slice', 'range', 'complex', 'bytearray')
+
+# module/name pairs that can be loaded from a legacy (pickled) session file (only exact matches are loaded, as a
+# module tree match also allows any function within the module to be called)
+legacy_class = {
+    # built-in types (protocol 2 pickles store the bytes objects as encoded strings)
+    *[(x, y) for x in ('builtins', '__builtin__') for y in legacy_builtin],
+    ('_codecs', 'encode'),
+    ('collections', 'OrderedDict'),
+
+    # numpy array/dtype/scalar reconstructors
+    ('numpy', 'ndarray'),
+    ('numpy', 'dtype'),
+    *[(x, y) for x in ('numpy.core.multiarray', 'numpy._core.multiarray') for y in ('_reconstruct', 'scalar')],
+    *[(x, '_frombuffer') for x in ('numpy.core.numeric', 'numpy._core.numeric')],
+
+    # pandas frame/series/index reconstructors
+    *[(x, y) for x in ('pandas', 'pandas.core.frame') for y in ('DataFrame',)],
+    *[(x, y) for x in ('pandas', 'pandas.core.series') for y in ('Series',)],
+    *[(x, y) for x in ('pandas', 'pandas.core.indexes.base') for y in ('Index',)],
+    *[(x, y) for x in ('pandas', 'pandas.core.indexes.range') for y in ('RangeIndex',)],
+    ('pandas.core.indexes.base', '_new_Index'),
+    ('pandas.core.internals.managers', 'BlockManager'),
+    ('pandas.core.internals.managers', 'SingleBlockManager'),
+    ('pandas._libs.internals', '_unpickle_block'),
+    ('pandas._libs.arrays', '__pyx_unpickle_NDArrayBacked'),
+    *[(x, y) for x in ('pandas', 'pandas.arrays', 'pandas.core.arrays.string_')
+      for y in ('StringArray', 'StringDtype')],
+
+    # path classes
+    *[(x, y) for x in ('pathlib', 'pathlib._local')
+      for y in ('Path', 'PosixPath', 'WindowsPath', 'PurePath', 'PurePosixPath', 'PureWindowsPath')],
+
+    # spykit configuration classes
+    ('spykit.info.preprocess', 'PreprocessConfig'),
+}
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+"""
+    SessionFileError: error raised if a session file is invalid or incompatible
+"""
+
+
+class SessionFileError(Exception):
+    pass
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+"""
+    SessionFileEncoder: encodes a session data dictionary into a JSON header tree and binary array sections
+"""
+
+
+class SessionFileEncoder:
+    def __init__(self):
+
+        # memory allocation
+        self.arr = []
+        self.arr_info = []
+        self.n_bytes = 0
+
+    def encode(self, x):
+
+        if x is None or isinstance(x, (bool, str)):
+            # case is a JSON native value
+            return x
+
+        elif isinstance(x, (int, float)) and not isinstance(x, np.generic):
+            # case is a numerical value
+            return x
+
+        elif isinstance(x, np.ndarray):
+            if x.dtype.hasobject:
+                # case is an object array (each element is encoded separately)
+                return {'__type__': 'object_array', 'shape': list(x.shape), 'items': [self.encode(y) for y in x.flat]}
+
+            else:
+                # case is a numerical array (stored as a binary section)
+                return {'__type__': 'array', 'index': self.add_array(x)}
+
+        elif isinstance(x, np.generic):
+            # case is a numpy scalar
+            return {'__type__': 'scalar', 'dtype': np.lib.format.dtype_to_descr(x.dtype), 'value': x.item()}
+
+        elif isinstance(x, dict):
+            if all([isinstance(k, str) for k in x.keys()]) and ('__type__' not in x):
+                # case is a string keyed dictionary
+                return {k: self.encode(v) for k, v in x.items()}
+
+            else:
+                # case is a dictionary with non-string keys
+                return {'__type__': 'dict', 'items': [[self.encode(k), self.encode(v)] for k, v in x.items()]}
+
+        elif isinstance(x, list):
+            return [self.encode(y) for y in x]
+
+        elif isinstance(x, tuple):
+            return {'__type__': 'tuple', 'items': [self.encode(y) for y in x]}
+
+        elif isinstance(x, (set, frozenset)):
+            return {'__type__': 'set', 'items': [self.encode(y) for y in x]}
+
+        elif isinstance(x, PurePath):
+            return {'__type__': 'path', 'value': str(x)}
+
+        elif isinstance(x, pd.DataFrame):
+            return {'__type__': 'dataframe', 'index': self.encode(x.index.to_numpy()),
+                    'columns': self.encode(list(x.columns)),
+                    'data': [self.encode(x[c].to_numpy()) for c in x.columns]}
+
+        elif type(x).__name__ in ssf_class:
+            # case is a stored class object
+            return {'__type__': 'object', 'class': type(x).__name__, 'fields': self.encode(x.__dict__)}
+
+        else:
+            # case is an unsupported type
+            raise TypeError('Session file fields of type "{0}" can not be saved.'.format(type(x).__name__))
+
+    def add_array(self, x):
+
+        # sets up the array section information (memory mapped arrays are copied into memory)
+        x = np.array(x) if isinstance(x, np.memmap) else np.ascontiguousarray(x)
+        self.arr.append(x)
+        self.arr_info.append({
+            'dtype': np.lib.format.dtype_to_descr(x.dtype),
+            'shape': list(x.shape),
+            'offset': self.n_bytes,
+            'n_bytes': x.nbytes,
+        })
+
+        # increments the section byte offset
+        self.n_bytes += get_aligned_size(x.nbytes)
+        return len(self.arr) - 1
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+"""
+    SessionFile: reader for the versioned session file. only the header is read when the file is opened, and the
+                 header fields/array sections are decoded on demand (the array sections are read into memory, so
+                 the file is never held open and can be overwritten by a later save)
+"""
+
+
+class SessionFile:
+    def __init__(self, file_path):
+
+        # class field initialisations
+        self.file_path = str(file_path)
+        self.arr = {}
+
+        # reads the file header
+        with open(self.file_path, 'rb') as f:
+            f_magic, n_hdr = ssf_prefix.unpack(f.read(ssf_prefix.size))
+            if f_magic != ssf_magic:
+                raise SessionFileError('"{0}" is not a Spykit session file.'.format(self.file_path))
+
+            self.hdr = json.loads(f.read(n_hdr).decode('utf-8'))
+
+        # determines if the file can be read by this version
+        self.version = self.hdr.get('version', 0)
+        if self.hdr.get('min_version', self.version) > ssf_version:
+            e_str = ('This session file was saved by a newer version of Spykit (file version {0}, supported '
+                     'version {1}). Update Spykit to open this file.').format(self.version, ssf_version)
+            raise SessionFileError(e_str)
+
+        # sets the array section byte offset
+        self.data_ofs = get_aligned_size(ssf_prefix.size + n_hdr)
+
+    # ---------------------------------------------------------------------------
+    # Field Retrieval Functions
+    # ---------------------------------------------------------------------------
+
+    def keys(self):
+
+        return list(self.hdr['data'].keys())
+
+    def get_field(self, key, def_val=None):
+
+        if key in self.hdr['data']:
+            return self.decode(self.hdr['data'][key])
+
+        else:
+            return def_val
+
+    def get_array(self, i_arr):
+
+        # returns the array (if already loaded)
+        if i_arr in self.arr:
+            return self.arr[i_arr]
+
+        # retrieves the array section information
+        a_info = self.hdr['arrays'][i_arr]
+        a_dtype = np.lib.format.descr_to_dtype(a_info['dtype'])
+        a_shape = tuple(a_info['shape'])
+
+        if a_info['n_bytes'] == 0:
+            # case is an empty array
+            self.arr[i_arr] = np.empty(a_shape, dtype=a_dtype)
+
+        else:
+            # case is a non-empty array (read directly into memory. memory mapping the section would keep the file
+            # open, and the file can't then be replaced on Windows)
+            n_count = int(np.prod(a_shape))
+            with open(self.file_path, 'rb') as f:
+                f.seek(self.data_ofs + a_info['offset'])
+                self.arr[i_arr] = np.fromfile(f, dtype=a_dtype, count=n_count).reshape(a_shape)
+
+        return self.arr[i_arr]
+
+    def load_all(self):
+
+        return {k: self.get_field(k) for k in self.keys()}
+
+    def decode(self, x):
+
+        if isinstance(x, list):
+            return [self.decode(y) for y in x]
+
+        elif not isinstance(x, dict):
+            return x
+
+        elif '__type__' not in x:
+            return {k: self.decode(v) for k, v in x.items()}
+
+        match x['__type__']:
+            case 'array':
+                # case is a binary array section
+                return self.get_array(x['index'])
+
+            case 'object_array':
+                # case is an object array
+                y = np.empty(len(x['items']), dtype=object)
+                for i, y_item in enumerate(x['items']):
+                    y[i] = self.decode(y_item)
+
+                return y.reshape(x['shape'])
+
+            case 'scalar':
+                return np.lib.format.descr_to_dtype(x['dtype']).type(x['value'])
+
+            case 'dict':
+                return {self.decode(k): self.decode(v) for k, v in x['items']}
+
+            case 'tuple':
+                return tuple([self.decode(y) for y in x['items']])
+
+            case 'set':
+                return set([self.decode(y) for y in x['items']])
+
+            case 'path':
+                return Path(x['value'])
+
+            case 'dataframe':
+                c_name = self.decode(x['columns'])
+                df_data = dict(zip(c_name, [np.array(self.decode(y)) for y in x['data']]))
+                return pd.DataFrame(df_data, index=np.array(self.decode(x['index'])), columns=c_name)
+
+            case 'object':
+                # case is a stored class object (the class fields are set without calling the constructor)
+                if x['class'] not in ssf_class:
+                    raise SessionFileError('Unknown session file class type "{0}".'.format(x['class']))
+
+                obj = ssf_class[x['class']].__new__(ssf_class[x['class']])
+                obj.__dict__.update(self.decode(x['fields']))
+                return obj
+
+            case _:
+                # case is a field type from a newer file version (these fields are skipped)
+                return None
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+"""
+    SessionData: session data dictionary view of a versioned session file (each field is only decoded when it is
+                 first accessed)
+"""
+
+
+class SessionData(Mapping):
+    def __init__(self, ssf):
+
+        # class field initialisations
+        self.ssf = ssf
+        self.data = {}
+
+    def __getitem__(self, key):
+
+        # decodes the field (if not already decoded)
+        if key not in self.data:
+            if key not in self.ssf.hdr['data']:
+                raise KeyError(key)
+
+            self.data[key] = self.ssf.get_field(key)
+
+        return self.data[key]
+
+    def __iter__(self):
+
+        return iter(self.ssf.keys())
+
+    def __len__(self):
+
+        return len(self.ssf.keys())
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+"""
+    LegacyUnpickler: restricted unpickler for the pickled session files written by previous versions (only the
+                     numpy/pandas/path reconstructors and spykit configuration objects can be loaded)
+"""
+
+
+class LegacyUnpickler(pickle.Unpickler):
+    def find_class(self, module, name):
+
+        if (module, name) in legacy_class:
+            # case is a feasible class/reconstructor
+            return super(LegacyUnpickler, self).find_class(module, name)
+
+        # otherwise, flag an error
+        raise SessionFileError('Legacy session file contains an unsupported object ({0}.{1}).'.format(module, name))
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def get_aligned_size(n_bytes):
+    """Returns the byte count, n_bytes, rounded up to the array section alignment"""
+
+    return ssf_align * int(np.ceil(n_bytes / ssf_align))
+
+
+def is_legacy_session_file(file_path):
+    """Determines if the session file, file_path, is a legacy (pickled) session file"""
+
+    with open(file_path, 'rb') as f:
+        return f.read(len(ssf_magic)) != ssf_magic
+
+
+def write_session_file(file_path, ses_data):
+    """Writes the session data dictionary, ses_data, to the versioned session file, file_path"""
+
+    # encodes the session data
+    ssf_enc = SessionFileEncoder()
+    hdr = {
+        'format': 'spykit-session',
+        'version': ssf_version,
+        'min_version': ssf_min_version,
+        'data': ssf_enc.encode(ses_data),
+        'arrays': ssf_enc.arr_info,
+    }
+
+    # sets up the header byte string
+    hdr_bytes = json.dumps(hdr).encode('utf-8')
+    n_pre = ssf_prefix.size + len(hdr_bytes)
+
+    # writes to a temporary file (so an existing file is only replaced once the write has completed)
+    tmp_path = '{0}.tmp'.format(file_path)
+    with open(tmp_path, 'wb') as f:
+        # writes the file prefix/header
+        f.write(ssf_prefix.pack(ssf_magic, len(hdr_bytes)))
+        f.write(hdr_bytes)
+        f.write(bytes(get_aligned_size(n_pre) - n_pre))
+
+        # writes the array sections
+        for x in ssf_enc.arr:
+            x.tofile(f)
+            f.write(bytes(get_aligned_size(x.nbytes) - x.nbytes))
+
+    # replaces the session file
+    os.replace(tmp_path, file_path)
+
+
+def read_session_file(file_path):
+    """Reads the session data dictionary from the session file, file_path (legacy files are also supported). the
+       fields of a versioned session file are decoded when they are first accessed"""
+
+    if is_legacy_session_file(file_path):
+        # case is a legacy pickled session file
+        with open(file_path, 'rb') as f:
+            return LegacyUnpickler(io.BytesIO(f.read())).load()
+
+    else:
+        # case is a versioned session file
+        return SessionData(SessionFile(file_path))
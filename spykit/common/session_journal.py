@@ -0,0 +1,363 @@
+# module import
+import os
+import json
+import time
+import queue
+import hashlib
+import threading
+import numpy as np
+from pathlib import PurePath
+
+# spykit module import
+import spykit.common.common_widget as cw
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+# autosave journal directory path
+journal_dir = os.path.join(cw.resource_dir, 'autosave').replace('\\', '/')
+
+# journal format version
+journal_version = 1
+
+# autosave recovery file extension (the recovery file is stored next to the session file)
+recovery_ext = '.recovery'
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+"""
+    SessionJournal: append-only autosave journal of the session edits. edit records are queued (so the edit cost
+                    is negligible) and appended to the journal file by a background writer thread. the journal is
+                    compacted (keeping the latest record for each edit key) once it grows too large
+"""
+
+
+class SessionJournal:
+    # journal size/sync parameters
+    n_compact = 2000
+    n_sync = 50
+
+    def __init__(self):
+
+        # class field initialisations
+        self.j_file = None
+        self.j_hdr = None
+        self.j_files = set()
+        self.n_record = 0
+        self.n_record_max = self.n_compact
+        self.n_pending = 0
+        self.is_open = False
+        self.is_enabled = True
+
+        # writer thread objects
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self.run_writer, name='SessionJournal', daemon=True)
+        self._thread.start()
+
+    # ---------------------------------------------------------------------------
+    # Journal Session Functions
+    # ---------------------------------------------------------------------------
+
+    def open_session(self, s_props, ssf_file=None):
+
+        # sets up the journal header record
+        j_hdr = {
+            'op': 'header',
+            'version': journal_version,
+            't_start': time.time(),
+            'session_props': s_props,
+            'ssf_file': None if (ssf_file is None) else str(ssf_file),
+            'rcv_file': None,
+        }
+
+        # starts the new journal file
+        j_file = os.path.join(journal_dir, '{0}.jnl'.format(self.get_session_hash(s_props))).replace('\\', '/')
+        self._queue.put(('open', j_file, j_hdr))
+        self.is_open = True
+
+    def reset_session_file(self, ssf_file, rcv_file=None):
+
+        # resets the journal to the header record (the edits have been written to the session file, or to the
+        # autosave recovery file, rcv_file)
+        self._queue.put(('reset', str(ssf_file), None if (rcv_file is None) else str(rcv_file)))
+
+    def close_session(self, discard=False):
+
+        self._queue.put(('close', discard, None))
+        self.is_open = False
+
+    def discard_all(self):
+
+        # removes all journals written by this session (and waits for the writer to finish)
+        self._queue.put(('discard_all', None, None))
+        self.is_open = False
+        self.flush()
+
+    def flush(self):
+
+        # waits for the queued records to be written
+        self._queue.join()
+
+    # ---------------------------------------------------------------------------
+    # Edit Recording Functions
+    # ---------------------------------------------------------------------------
+
+    def record(self, op, key, value):
+
+        # queues the edit record (the record is written by the writer thread)
+        if self.is_enabled and self.is_open:
+            self._queue.put(('record', (op, key, value), time.time()))
+
+    def has_pending(self):
+
+        with self._lock:
+            return self.n_pending > 0
+
+    def has_unsaved(self):
+
+        # determines if there are edits not written to the session file (journalled or autosaved)
+        with self._lock:
+            return (self.n_pending > 0) or ((self.j_hdr is not None) and (self.j_hdr.get('rcv_file') is not None))
+
+    # ---------------------------------------------------------------------------
+    # Writer Thread Functions
+    # ---------------------------------------------------------------------------
+
+    def run_writer(self):
+
+        # initialisations
+        f_obj = None
+
+        while True:
+            # retrieves the next queued item
+            j_type, j_val, j_other = self._queue.get()
+
+            try:
+                match j_type:
+                    case 'open':
+                        # case is opening a new session journal
+                        f_obj = self.close_file(f_obj)
+                        with self._lock:
+                            self.j_file, self.j_hdr = j_val, j_other
+                            self.j_files.add(j_val)
+
+                        f_obj = self.write_journal(j_val, [j_other])
+
+                    case 'reset':
+                        # case is resetting the journal (after the session/recovery file is written)
+                        if self.j_hdr is not None:
+                            # removes the previous recovery file (if superseded by the session file)
+                            f_obj = self.close_file(f_obj)
+                            rcv_prev = self.j_hdr.get('rcv_file')
+                            if (rcv_prev is not None) and (rcv_prev != j_other) and os.path.exists(rcv_prev):
+                                os.remove(rcv_prev)
+
+                            with self._lock:
+                                self.j_hdr['ssf_file'], self.j_hdr['rcv_file'] = j_val, j_other
+
+                            f_obj = self.write_journal(self.j_file, [self.j_hdr])
+
+                    case 'close':
+                        # case is closing the session journal
+                        f_obj = self.close_file(f_obj)
+                        if j_val and (self.j_file is not None):
+                            remove_journal(self.j_file)
+
+                        with self._lock:
+                            self.j_file, self.j_hdr = None, None
+
+                    case 'discard_all':
+                        # case is removing all journals written by this session
+                        f_obj = self.close_file(f_obj)
+                        for j_file in self.j_files:
+                            remove_journal(j_file)
+
+                        with self._lock:
+                            self.j_file, self.j_hdr = None, None
+                            self.j_files = set()
+
+                    case 'record':
+                        # case is an edit record (exit if there is no open journal)
+                        if f_obj is None:
+                            continue
+
+                        # appends the record to the journal
+                        op, key, value = j_val
+                        rec = {'op': op, 'key': key, 'value': value, 't': j_other}
+                        f_obj.write(json.dumps(rec, default=encode_value) + '\n')
+                        f_obj.flush()
+
+                        # updates the record counters
+                        with self._lock:
+                            self.n_record += 1
+                            self.n_pending += 1
+
+                        # syncs the journal to disk (at regular intervals)
+                        if (self.n_record % self.n_sync) == 0:
+                            os.fsync(f_obj.fileno())
+
+                        # compacts the journal (if too large)
+                        if self.n_record >= self.n_record_max:
+                            f_obj = self.compact_journal(f_obj)
+
+            except OSError:
+                # if there was a file error, then stop journalling the session
+                f_obj = None
+
+            finally:
+                self._queue.task_done()
+
+    def write_journal(self, j_file, rec):
+
+        # writes the records to a temporary file (the journal is replaced once the write has completed)
+        os.makedirs(os.path.dirname(j_file), exist_ok=True)
+        with open(j_file + '.tmp', 'w', encoding='utf-8') as f:
+            for r in rec:
+                f.write(json.dumps(r, default=encode_value) + '\n')
+
+        # replaces the journal file
+        os.replace(j_file + '.tmp', j_file)
+
+        # resets the record counters
+        with self._lock:
+            self.n_record = len(rec) - 1
+            self.n_record_max = max(self.n_compact, 2 * self.n_record)
+            self.n_pending = self.n_record
+
+        # re-opens the journal for appending
+        return open(j_file, 'a', encoding='utf-8')
+
+    def compact_journal(self, f_obj):
+
+        # reads the journal and keeps the latest record for each edit key
+        f_obj = self.close_file(f_obj)
+        j_hdr, rec = read_journal(self.j_file)
+        rec_c = {}
+        for r in rec:
+            rec_c.pop(self.get_record_key(r), None)
+            rec_c[self.get_record_key(r)] = r
+
+        # rewrites the journal
+        return self.write_journal(self.j_file, [j_hdr] + list(rec_c.values()))
+
+    @staticmethod
+    def close_file(f_obj):
+
+        if f_obj is not None:
+            f_obj.flush()
+            os.fsync(f_obj.fileno())
+            f_obj.close()
+
+        return None
+
+    # ---------------------------------------------------------------------------
+    # Class Getter Functions
+    # ---------------------------------------------------------------------------
+
+    @staticmethod
+    def get_record_key(rec):
+
+        return json.dumps([rec['op'], rec['key']], default=encode_value)
+
+    @staticmethod
+    def get_session_hash(s_props):
+
+        s_str = json.dumps(s_props, default=encode_value, sort_keys=True)
+        return hashlib.md5(s_str.encode('utf-8')).hexdigest()
+
+
+# global session journal object
+session_journal = SessionJournal()
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def encode_value(x):
+    """Converts the non-JSON value, x, into a JSON serialisable value"""
+
+    if isinstance(x, np.ndarray):
+        return x.tolist()
+
+    elif isinstance(x, np.generic):
+        return x.item()
+
+    elif isinstance(x, PurePath):
+        return str(x)
+
+    elif isinstance(x, (set, frozenset)):
+        return list(x)
+
+    else:
+        return str(x)
+
+
+def read_journal(j_file):
+    """Reads the header and (compacted) edit records from the journal file, j_file"""
+
+    # initialisations
+    j_hdr, rec = None, []
+
+    with open(j_file, 'r', encoding='utf-8') as f:
+        for j_line in f:
+            try:
+                r = json.loads(j_line)
+
+            except json.JSONDecodeError:
+                # case is a partially written record (from a crash)
+                break
+
+            if r.get('op') == 'header':
+                j_hdr = r
+            else:
+                rec.append(r)
+
+    return j_hdr, rec
+
+
+def remove_journal(j_file):
+    """Removes the journal file, j_file, and the autosave recovery file that it refers to"""
+
+    # exits if the journal doesn't exist
+    if not os.path.exists(j_file):
+        return
+
+    # removes the recovery file (if it exists)
+    j_hdr, _ = read_journal(j_file)
+    rcv_file = None if (j_hdr is None) else j_hdr.get('rcv_file')
+    if (rcv_file is not None) and os.path.exists(rcv_file):
+        os.remove(rcv_file)
+
+    # removes the journal file
+    os.remove(j_file)
+
+
+def get_recovery_file(ssf_file):
+    """Returns the autosave recovery file path for the session file, ssf_file"""
+
+    return '{0}{1}'.format(ssf_file, recovery_ext)
+
+
+def has_recovery_file(j_hdr):
+    """Determines if the journal header, j_hdr, refers to an existing autosave recovery file"""
+
+    return (j_hdr.get('rcv_file') is not None) and os.path.exists(j_hdr['rcv_file'])
+
+
+def get_recovery_journals():
+    """Returns the journal files that contain unsaved session edits (most recent first)"""
+
+    # exits if there is no journal directory
+    if not os.path.isdir(journal_dir):
+        return []
+
+    # retrieves the journals with edit records
+    j_file = []
+    for f in os.listdir(journal_dir):
+        if f.endswith('.jnl'):
+            j_path = os.path.join(journal_dir, f).replace('\\', '/')
+            j_hdr, rec = read_journal(j_path)
+            if (j_hdr is not None) and (len(rec) or has_recovery_file(j_hdr)):
+                j_file.append(j_path)
+
+    return sorted(j_file, key=os.path.getmtime, reverse=True)
@@ -0,0 +1,270 @@
+# module import
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+# psutil module import (optional - used for the memory/io counters)
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+# memory sampling interval (in seconds)
+t_mem_sample = 0.01
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+"""
+    TraceSpan: timing/resource information for a single session load stage
+"""
+
+
+class TraceSpan:
+    def __init__(self, name, cat, t_start, thread_name, thread_id, io_start, mem_start):
+
+        # span descriptors
+        self.name = name
+        self.cat = cat
+        self.args = {}
+
+        # thread information
+        self.thread_name = thread_name
+        self.thread_id = thread_id
+
+        # timing/resource fields
+        self.t_start = t_start
+        self.t_finish = None
+        self.io_start = io_start
+        self.mem_start = mem_start
+        self.n_bytes = 0
+        self.mem_peak = mem_start
+
+    def update_mem(self, mem_now):
+
+        # updates the span peak memory (from the memory sampler)
+        self.mem_peak = max(self.mem_peak, mem_now)
+
+    def close(self, t_finish, io_finish, mem_finish):
+
+        # sets the final timing/resource values
+        self.t_finish = t_finish
+        self.n_bytes = max(0, io_finish - self.io_start)
+        self.update_mem(mem_finish)
+
+    def duration(self):
+
+        if self.t_finish is None:
+            return 0.
+
+        else:
+            return self.t_finish - self.t_start
+
+    def get_mem_delta(self):
+
+        # the memory growth over the span (the peak memory relative to the span start)
+        return self.mem_peak - self.mem_start
+
+    def get_info_string(self):
+
+        # sets up the span information string
+        t_str = '{:>8.3f}s'.format(self.duration())
+        b_str = '{:>9.1f} MB read'.format(self.n_bytes / 2 ** 20)
+        m_str = '{:>9.1f} MB peak (+{:.1f} MB)'.format(self.mem_peak / 2 ** 20, self.get_mem_delta() / 2 ** 20)
+
+        return '{0} | {1} | {2} | {3} ({4})'.format(t_str, b_str, m_str, self.name, self.thread_name)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+"""
+    SessionTracer: thread-safe span tracer for the session loading stages. the process memory is sampled by a
+                   background thread while any spans are open, so each span holds its own peak memory
+"""
+
+
+class SessionTracer:
+    def __init__(self):
+
+        # class field initialisations
+        self.spans = []
+        self.open_spans = []
+        self.t_origin = time.perf_counter()
+        self.t_wall = time.time()
+        self.is_enabled = True
+
+        # thread-safety/process objects
+        self._lock = threading.Lock()
+        self._proc = None if (psutil is None) else psutil.Process(os.getpid())
+        self._sampler = None
+
+    # ---------------------------------------------------------------------------
+    # Span Recording Functions
+    # ---------------------------------------------------------------------------
+
+    def reset(self):
+
+        # resets the span list and time origin
+        with self._lock:
+            self.spans = []
+            self.t_origin = time.perf_counter()
+            self.t_wall = time.time()
+
+    @contextmanager
+    def span(self, name, cat='session', **kwargs):
+
+        # if tracing is disabled, then exit
+        if not self.is_enabled:
+            yield None
+            return
+
+        # creates the new span object
+        c_thread = threading.current_thread()
+        t_span = TraceSpan(name, cat, self.get_time(), c_thread.name,
+                           c_thread.ident, self.get_io_bytes(), self.get_mem_usage())
+        t_span.args.update(kwargs)
+
+        # appends the span to the lists (the memory sampler is started if not running)
+        with self._lock:
+            self.spans.append(t_span)
+            self.open_spans.append(t_span)
+            if (self._sampler is None) and (self._proc is not None):
+                self._sampler = threading.Thread(target=self.run_mem_sampler, name='SessionTraceSampler', daemon=True)
+                self._sampler.start()
+
+        try:
+            yield t_span
+
+        finally:
+            # closes the span
+            with self._lock:
+                self.open_spans.remove(t_span)
+
+            t_span.close(self.get_time(), self.get_io_bytes(), self.get_mem_usage())
+
+    def run_mem_sampler(self):
+
+        while True:
+            # samples the current process memory
+            mem_now = self.get_mem_usage()
+
+            with self._lock:
+                # exits if there are no open spans
+                if len(self.open_spans) == 0:
+                    self._sampler = None
+                    return
+
+                # updates the peak memory of the open spans
+                for t_span in self.open_spans:
+                    t_span.update_mem(mem_now)
+
+            time.sleep(t_mem_sample)
+
+    # ---------------------------------------------------------------------------
+    # Process Counter Functions
+    # ---------------------------------------------------------------------------
+
+    def get_time(self):
+
+        return time.perf_counter() - self.t_origin
+
+    def get_io_bytes(self):
+
+        # note - the io counters are process-wide, so concurrent spans share the read counts
+        if self._proc is None:
+            return 0
+
+        try:
+            return self._proc.io_counters().read_bytes
+
+        except (AttributeError, psutil.Error):
+            return 0
+
+    def get_mem_usage(self):
+
+        if self._proc is None:
+            return 0
+
+        return self._proc.memory_info().rss
+
+    # ---------------------------------------------------------------------------
+    # Class Getter Functions
+    # ---------------------------------------------------------------------------
+
+    def get_spans(self, is_closed=True):
+
+        with self._lock:
+            if is_closed:
+                return [x for x in self.spans if x.t_finish is not None]
+
+            else:
+                return list(self.spans)
+
+    def get_total_duration(self):
+
+        # retrieves the closed spans (exit if none)
+        t_span = self.get_spans()
+        if len(t_span) == 0:
+            return 0.
+
+        return max([x.t_finish for x in t_span]) - min([x.t_start for x in t_span])
+
+    def get_summary_string(self):
+
+        # retrieves the closed spans (exit if none)
+        t_span = sorted(self.get_spans(), key=lambda x: x.t_start)
+        if len(t_span) == 0:
+            return 'No session loading stages have been recorded.'
+
+        # sets up the summary string
+        s_str = ['Total Load Duration = {:.3f}s\n'.format(self.get_total_duration())]
+        s_str += ['{:>8.3f}s | {}'.format(x.t_start, x.get_info_string()) for x in t_span]
+
+        return '\n'.join(s_str)
+
+    # ---------------------------------------------------------------------------
+    # Chrome Trace Export Functions
+    # ---------------------------------------------------------------------------
+
+    def get_chrome_trace(self):
+
+        # memory allocation
+        pid = os.getpid()
+        t_events, t_names = [], {}
+
+        for t_span in self.get_spans():
+            # appends the complete ("X") span event (timings are in microseconds)
+            t_args = dict(t_span.args)
+            t_args.update({'bytes_read': t_span.n_bytes, 'mem_start': t_span.mem_start, 'mem_peak': t_span.mem_peak,
+                           'mem_delta': t_span.get_mem_delta()})
+            t_events.append({
+                'name': t_span.name,
+                'cat': t_span.cat,
+                'ph': 'X',
+                'ts': 1e6 * t_span.t_start,
+                'dur': 1e6 * t_span.duration(),
+                'pid': pid,
+                'tid': t_span.thread_id,
+                'args': t_args,
+            })
+
+            # stores the thread name
+            t_names[t_span.thread_id] = t_span.thread_name
+
+        # appends the thread name metadata events
+        for tid, t_name in t_names.items():
+            t_events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': t_name}})
+
+        return {'traceEvents': t_events, 'displayTimeUnit': 'ms', 'otherData': {'t_wall': self.t_wall}}
+
+    def export_chrome_trace(self, file_path):
+
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(self.get_chrome_trace(), f, indent=1)
+
+
+# global session tracer object
+session_tracer = SessionTracer()
@@ -4,21 +4,25 @@ import re
 import numpy as np
 import pandas as pd
 from pathlib import Path, PosixPath
-from copy import deepcopy
 from bigtree import list_to_tree, dataframe_to_tree
 
+import spikeinterface.extractors as se
+from spikewrap.configs._backend import canon
+from spikewrap.structure._raw_run import SeparateRawRun
+
 import spykit.common.common_func as cf
 
 
 class DirectoryCheck(object):
     col_name = ["path", "err"]
 
-    def __init__(self, f_path, f_format):
+    def __init__(self, f_path, f_format, d_index=None):
         super(DirectoryCheck, self).__init__()
 
         # input fields
         self.f_path = Path(f_path)
         self.f_format = f_format
+        self.d_index = d_index
 
         # field initialisation
         self.f_pd = None
@@ -26,6 +30,7 @@ class DirectoryCheck(object):
         self.sub_dict = None
         self.f_type = None
         self.reg_str = None
+        self.reg_obj = None
 
         # boolean class fields
         self.dir_match = False
@@ -45,15 +50,16 @@ class DirectoryCheck(object):
             case 'spikeglx':
                 # case is spikeglx recording
                 _f_type = _f_type + ['rundir']
-                _reg_str = _reg_str + [r'run-[0-9]{3}_g0_imec0']
+                _reg_str = _reg_str + [r'run-[0-9]{3}_g0_imec[0-9]+']
 
             case 'openephys':
                 # case is openephys recording
                 _f_type = _f_type + ['recordnode', 'experiment', 'recording']
                 _reg_str = _reg_str + [r'Recording Node [0-9]{3}|RecordNode[0-9]{3}', r'experiment[0-9]', r'recording[0-9]']
 
-        # sets the field type/regular expression strings
+        # sets the field type/regular expression strings (the level patterns are precompiled)
         self.f_type, self.reg_str = _f_type, _reg_str
+        self.reg_obj = [re.compile(x) for x in _reg_str]
 
     # FOLDER STRUCTURE CHECK FUNCTIONS ---------------------------------
 
@@ -63,10 +69,21 @@ class DirectoryCheck(object):
         self.init_class_fields()
 
         # determines the feasible directories
-        feas_dir = cf.get_path_matches(self.f_path, self.f_type[0])
+        if self.d_index is None:
+            # case is a full directory scan
+            feas_dir = cf.get_path_matches(self.f_path, self.f_type[0], descend_match=False)
+
+        else:
+            # case is an indexed directory scan (only changed directory listings are re-read)
+            f_root = self.f_path
+            self.d_index.start_scan()
+            feas_dir = self.d_index.get_path_matches(self.f_path, self.f_type[0])
         match len(feas_dir):
             case 0:
                 # case is there are no feasible directories
+                if self.d_index is not None:
+                    self.d_index.end_scan(f_root)
+
                 return
 
             case 1:
@@ -88,6 +105,10 @@ class DirectoryCheck(object):
             f_list_new = ['*'] + path_parts
             self.check_folder_level(Path(f), f_list_new, 1)
 
+        # updates the directory index
+        if self.d_index is not None:
+            self.d_index.end_scan(f_root)
+
         # converts the tree list to the final dataframe
         self.dir_match = len(self.t_list) > 0
         if self.dir_match:
@@ -137,36 +158,56 @@ class DirectoryCheck(object):
 
     def check_folder_level(self, f_path_prev, t_list_prev, i_lvl):
 
-        # sets up the regexp object
-        r = re.compile(self.reg_str[i_lvl])
-        f_path_dir = cf.get_folder_dir(f_path_prev)
-
-        if len(f_path_dir) == 0:
-            # if there are no files in the directory, then add this to the list
-            err_str_new = self.get_structure_error_string(i_lvl - 1, True)
-            self.t_list.append(['/'.join(t_list_prev), err_str_new])
+        # initialisations
+        n_lvl = len(self.reg_obj)
+        d_stack = [self.open_folder_level(str(f_path_prev), '/'.join(t_list_prev), i_lvl)]
+        if d_stack[0] is None:
+            # case is the initial folder is empty
             return
 
-        # searches the sub-directories for matches
-        for i, fs in enumerate(f_path_dir):
-            # sets the new tree list
-            t_list_new = deepcopy(t_list_prev) + [fs]
-
-            if r.match(fs) is not None:
+        # searches the directory tree (iterative depth-first search, with each folder level held on the stack
+        # as a sub-directory iterator and its tree path prefix string)
+        while len(d_stack):
+            # retrieves the next sub-directory from the current folder level
+            f_path, t_pref, i_lvl_d, f_iter = d_stack[-1]
+            fs = next(f_iter, None)
+            if fs is None:
+                # case is the folder level has been searched
+                d_stack.pop()
+                continue
+
+            # sets the new tree path
+            t_path = '{0}/{1}'.format(t_pref, fs) if len(t_pref) else fs
+
+            if self.reg_obj[i_lvl_d].match(fs) is not None:
                 # case is a match has been found
-                if (i_lvl + 1) == len(self.reg_str):
+                if (i_lvl_d + 1) == n_lvl:
                     # case is the final level has been reached
-                    self.t_list.append(['/'.join(t_list_new), ""])
+                    self.t_list.append([t_path, ""])
 
                 else:
                     # case is there are lower levels to search
-                    f_path_new = f_path_prev / fs
-                    self.check_folder_level(f_path_new, t_list_new, i_lvl + 1)
+                    d_level = self.open_folder_level(os.path.join(f_path, fs), t_path, i_lvl_d + 1)
+                    if d_level is not None:
+                        d_stack.append(d_level)
 
             else:
                 # otherwise, append the directory to the list
-                err_str_new = self.get_structure_error_string(i_lvl, False)
-                self.t_list.append(['/'.join(t_list_new), err_str_new])
+                err_str_new = self.get_structure_error_string(i_lvl_d, False)
+                self.t_list.append([t_path, err_str_new])
+
+    def open_folder_level(self, f_path, t_pref, i_lvl):
+
+        # retrieves the sub-directories
+        f_path_dir = cf.get_folder_dir(f_path) if (self.d_index is None) else self.d_index.get_folder_dir(f_path)
+
+        if len(f_path_dir) == 0:
+            # if there are no files in the directory, then add this to the list
+            err_str_new = self.get_structure_error_string(i_lvl - 1, True)
+            self.t_list.append([t_pref, err_str_new])
+            return None
+
+        return f_path, t_pref, i_lvl, iter(f_path_dir)
 
     # MISCELLANEOUS FUNCTIONS ------------------------------------------
 
@@ -257,6 +298,89 @@ class DirectoryCheck(object):
         return err_str
 
 
+def get_run_probe_name(run_name):
+
+    # returns the probe name from the run directory name (e.g., "run-001_g0_imec1" -> "imec1")
+    m_probe = re.search(r'_g[0-9]+_(imec[0-9]+)', run_name)
+    return None if (m_probe is None) else m_probe.group(1)
+
+
+def get_probe_run_names(run_names):
+
+    # groups the run directory names by probe (runs without a probe suffix are grouped under None)
+    probe_runs = {}
+    for r_name in run_names:
+        probe_runs.setdefault(get_run_probe_name(r_name), []).append(r_name)
+
+    return probe_runs
+
+
+class ProbeRawRun(SeparateRawRun):
+    def __init__(self, run_path, ses_name, probe_name, probe, output_path):
+        super(ProbeRawRun, self).__init__(run_path.parent, ses_name, run_path.name, 'spikeglx', probe,
+                                          output_path / run_path.name)
+
+        # class field initialisations
+        self._probe_name = probe_name
+
+    def load_raw_data(self, internal_overwrite=False):
+
+        if self.raw_is_loaded() and not internal_overwrite:
+            raise RuntimeError('Cannot overwrite the "{0}" run.'.format(self._run_name))
+
+        # loads the probe stream recordings (without/with the sync channel)
+        run_path = self._parent_input_path / self._run_name
+        without_sync, with_sync = [
+            se.read_spikeglx(folder_path=run_path, stream_id='{0}.ap'.format(self._probe_name),
+                             all_annotations=True, load_sync_channel=sync) for sync in [False, True]
+        ]
+
+        # sets the probe (if provided)
+        if self._probe is not None:
+            without_sync = without_sync.set_probe(self._probe)
+
+        elif not without_sync.has_probe():
+            raise RuntimeError('No probe is attached to the "{0}" run recording.'.format(self._run_name))
+
+        # sets the run recordings
+        self._raw = {canon.grouped_shankname(): without_sync}
+        self._sync = with_sync
+
+
+def load_probe_raw_data(s, probe_name):
+
+    # sets the session path (NeuroBlueprint sessions include the ephys folder). the runs are loaded directly from the
+    # probe stream, as spikewrap rejects sessions with non-imec0 runs (and always reads the imec0 stream)
+    ses_path = s._parent_input_path / s._ses_name
+    if (ses_path / 'ephys').is_dir():
+        ses_path = ses_path / 'ephys'
+
+    # retrieves the probe run names
+    if s._passed_run_names == 'all':
+        run_names = [x.name for x in sorted(ses_path.iterdir()) if get_run_probe_name(x.name) == probe_name]
+
+    else:
+        run_names = s._passed_run_names
+
+    # loads the probe runs
+    raw_runs = []
+    for r_name in run_names:
+        run_path = ses_path / r_name
+        if get_run_probe_name(r_name) != probe_name:
+            # case is the run is not from the probe
+            raise ValueError('"{0}" is not a {1} probe run.'.format(r_name, probe_name))
+
+        elif not run_path.is_dir():
+            # case is the run folder is missing
+            raise FileNotFoundError('"{0}" not found in folder: {1}'.format(r_name, ses_path))
+
+        raw_run = ProbeRawRun(run_path, s._ses_name, probe_name, s._probe, s._output_path)
+        raw_run.load_raw_data()
+        raw_runs.append(raw_run)
+
+    s._raw_runs = raw_runs
+
+
 def get_data_folder_structure(f_type):
 
     # initialisations
@@ -272,9 +396,12 @@ def get_data_folder_structure(f_type):
                 "                ├── run-001_g0_imec0/",
                 "                │   ├── run-001_g0_t0.imec0.ap.bin",
                 "                │   └── run-001_g0_t0.imec0.ap.meta",
-                "                └── run-002_g0_imec0/",
-                "                    ├── run-002_g0_t0.imec0.ap.bin",
-                "                    └── run-002_g0_t0.imec0.ap.meta",
+                "                ├── run-002_g0_imec0/",
+                "                │   ├── run-002_g0_t0.imec0.ap.bin",
+                "                │   └── run-002_g0_t0.imec0.ap.meta",
+                "                └── run-002_g0_imec1/  (additional probes)",
+                "                    ├── run-002_g0_t0.imec1.ap.bin",
+                "                    └── run-002_g0_t0.imec1.ap.meta",
             )
 
         case 'openephys':
@@ -0,0 +1,167 @@
+# module import
+import os
+import time
+import threading
+
+# spikeinterface module import
+from spikeinterface.preprocessing.basepreprocessor import BasePreprocessor, BasePreprocessorSegment
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+"""
+    StepProfiler: opt-in profiler for the lazy preprocessing chain. each step output is wrapped in a pass-through
+                  recording layer, and the time spent within the step (excluding the time spent in the upstream
+                  steps) and the bytes returned are accumulated for each get_traces call. the statistics are
+                  held by the profiler within the gui process, so only the reads run in-process (or by job threads)
+                  are profiled - the reads run by process pool workers (n_jobs > 1 with the process pool engine)
+                  are not counted
+"""
+
+
+class StepProfiler(object):
+    def __init__(self):
+        super(StepProfiler, self).__init__()
+
+        # class field initialisations
+        self.is_enabled = False
+        self.p_stats = {}
+        self.pid = os.getpid()
+
+        # thread-safety objects
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    # ---------------------------------------------------------------------------
+    # Profiling Functions
+    # ---------------------------------------------------------------------------
+
+    def wrap_recording(self, rec, pp_name):
+
+        # the step output is only wrapped if profiling is enabled (when the chain is built)
+        return ProfiledRecording(rec, pp_name) if self.is_enabled else rec
+
+    def start_call(self):
+
+        # pushes the upstream step time accumulator for the call
+        self.get_call_stack().append(0.)
+
+    def end_call(self, pp_name, t_call, n_bytes):
+
+        # pops the call upstream step time (the call time is added to the time of the downstream calling step)
+        c_stack = self.get_call_stack()
+        t_upstream = c_stack.pop()
+        if len(c_stack):
+            c_stack[-1] += t_call
+
+        with self._lock:
+            # updates the step statistics
+            p_stat = self.p_stats.setdefault(pp_name, {'n_call': 0, 't_step': 0., 't_total': 0., 'n_bytes': 0})
+            p_stat['n_call'] += 1
+            p_stat['t_step'] += max(0., t_call - t_upstream)
+            p_stat['t_total'] += t_call
+            p_stat['n_bytes'] += n_bytes
+
+    def reset(self):
+
+        with self._lock:
+            self.p_stats = {}
+
+    # ---------------------------------------------------------------------------
+    # Class Getter Functions
+    # ---------------------------------------------------------------------------
+
+    def is_active(self):
+
+        # the calls are only profiled within the profiler process (forked workers would hold a separate copy)
+        return self.is_enabled and (os.getpid() == self.pid)
+
+    def get_call_stack(self):
+
+        # each thread holds a separate call stack (the chains are read concurrently by the job threads)
+        if not hasattr(self._local, 'c_stack'):
+            self._local.c_stack = []
+
+        return self._local.c_stack
+
+    def get_step_stats(self):
+
+        with self._lock:
+            return {k: dict(v) for k, v in self.p_stats.items()}
+
+    def get_step_string(self, pp_name):
+
+        # retrieves the step statistics
+        p_stats = self.get_step_stats()
+        if pp_name not in p_stats:
+            return 'N/A'
+
+        # calculates the mean step time per call, the share of the chain time and the step throughput
+        p_stat = p_stats[pp_name]
+        t_step_tot = max(sum([x['t_step'] for x in p_stats.values()]), 1e-9)
+        t_call = 1000. * p_stat['t_step'] / p_stat['n_call']
+        p_step = 100. * p_stat['t_step'] / t_step_tot
+        r_step = p_stat['n_bytes'] / (2 ** 20 * max(p_stat['t_step'], 1e-9))
+
+        return '{0:.1f} ms ({1:.0f}%), {2:.0f} MB/s'.format(t_call, p_step, r_step)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+"""
+    ProfiledRecording: pass-through recording layer that profiles the get_traces calls of a preprocessing step
+"""
+
+
+class ProfiledRecording(BasePreprocessor):
+    # extractor name
+    name = 'profiled'
+
+    def __init__(self, recording, pp_name):
+        BasePreprocessor.__init__(self, recording)
+
+        # sets up the recording segments
+        for rec_seg in recording._recording_segments:
+            self.add_recording_segment(ProfiledRecordingSegment(rec_seg, pp_name))
+
+        # sets the recording keyword arguments
+        self._kwargs = dict(recording=recording, pp_name=pp_name)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+"""
+    ProfiledRecordingSegment: profiled recording segment
+"""
+
+
+class ProfiledRecordingSegment(BasePreprocessorSegment):
+    def __init__(self, parent_segment, pp_name):
+        BasePreprocessorSegment.__init__(self, parent_segment)
+
+        # class field initialisations
+        self.pp_name = pp_name
+
+    def get_traces(self, start_frame, end_frame, channel_indices):
+
+        # case is profiling is disabled or a process pool worker (the parent traces are returned directly)
+        if not step_profiler.is_active():
+            return self.parent_recording_segment.get_traces(start_frame, end_frame, channel_indices)
+
+        # retrieves the parent traces (timing the call)
+        traces = None
+        step_profiler.start_call()
+        t_start = time.perf_counter()
+
+        try:
+            traces = self.parent_recording_segment.get_traces(start_frame, end_frame, channel_indices)
+
+        finally:
+            # updates the step statistics (the call stack is reset if the call failed)
+            t_call = time.perf_counter() - t_start
+            step_profiler.end_call(self.pp_name, t_call, 0 if (traces is None) else traces.nbytes)
+
+        return traces
+
+
+# global preprocessing step profiler object
+step_profiler = StepProfiler()
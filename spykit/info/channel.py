@@ -18,6 +18,7 @@ from PyQt6.QtCore import Qt, QSize, pyqtSignal, QPersistentModelIndex
 
 class ChannelInfoTab(InfoWidget):
     # pyqtSignal signal functions
+    probe_change = pyqtSignal(QWidget)
     run_change = pyqtSignal(QWidget)
     shank_change = pyqtSignal(QWidget)
     status_change = pyqtSignal(QWidget, object)
@@ -61,6 +62,7 @@ class ChannelInfoTab(InfoWidget):
         # plot option widgets
         self.opt_widget = QWidget()
         self.opt_layout = QGridLayout()
+        self.probe_type = QLabelCombo(None, 'Recording Probe:', None, font_lbl=font_lbl)
         self.run_type = QLabelCombo(None, 'Session Run:', None, font_lbl=font_lbl)
         self.shank_type = QLabelCombo(None, "Recording Shank:", None, font_lbl=font_lbl)
         self.status_filter = QLabelCheckCombo(None, lbl="Status Filter:", font=font_lbl)
@@ -81,6 +83,8 @@ class ChannelInfoTab(InfoWidget):
         self.opt_widget.setContentsMargins(0, 0, 0, 0)
 
         # adds the widgets to the layout widget
+        self.opt_layout.addWidget(self.probe_type.obj_lbl, 0, 0, 1, 1)
+        self.opt_layout.addWidget(self.probe_type.obj_cbox, 0, 1, 1, 1)
         self.opt_layout.addWidget(self.run_type.obj_lbl, 1, 0, 1, 1)
         self.opt_layout.addWidget(self.run_type.obj_cbox, 1, 1, 1, 1)
         self.opt_layout.addWidget(self.shank_type.obj_lbl, 2, 0, 1, 1)
@@ -97,6 +101,10 @@ class ChannelInfoTab(InfoWidget):
         self.status_filter.item_clicked.connect(self.check_filter_item)
         self.status_filter.setEnabled(False)
 
+        # sets the recording probe combobox properties (only shown for multi-probe sessions)
+        self.probe_type.connect(self.combo_probe_change)
+        self.set_probe_visible(False)
+
     def init_other_class_fields(self):
 
         # creates the table widget
@@ -131,6 +139,12 @@ class ChannelInfoTab(InfoWidget):
     # Widget Event Functions
     # ---------------------------------------------------------------------------
 
+    def combo_probe_change(self, h_combo):
+
+        # if manually updating, then exit
+        if not self.is_updating:
+            self.probe_change.emit(self)
+
     def combo_run_change(self, h_combo):
 
         # if manually updating, then exit
@@ -162,6 +176,11 @@ class ChannelInfoTab(InfoWidget):
     # Setter Functions
     # ---------------------------------------------------------------------------
 
+    def set_probe_visible(self, state):
+
+        self.probe_type.obj_lbl.setVisible(state)
+        self.probe_type.obj_cbox.setVisible(state)
+
     def set_table_row_colour(self, i_row, c_stat):
 
         for i_col in range(self.table.columnCount()):
@@ -283,6 +302,24 @@ class ChannelInfoTab(InfoWidget):
         self.set_update_flag.emit(False)
         self.status_filter.blockSignals(False)
 
+    def reset_probe_fields(self, probe_list, probe_name):
+
+        # flag that the combobox is being updated manually
+        self.is_updating = True
+
+        # resets the probe combobox fields
+        self.probe_type.obj_cbox.clear()
+        self.probe_type.addItems(probe_list)
+        self.probe_type.set_enabled(len(probe_list) > 1)
+        if probe_name in probe_list:
+            self.probe_type.set_current_text(probe_name)
+
+        # sets the probe combobox visibility (multi-probe sessions only)
+        self.set_probe_visible(len(probe_list) > 1)
+
+        # resets the update flag
+        self.is_updating = False
+
     def reset_combobox_fields(self, cb_type, cb_list):
 
         # flag that the combobox is being updated manually
@@ -1,7 +1,10 @@
 # custom module imports
-import time
+import json
 import numpy as np
 from copy import deepcopy
+from functools import partial as pfcn
+from threading import Lock
+from concurrent.futures import ThreadPoolExecutor
 
 # spikeinterface/spikewrap module import
 from spikeinterface.preprocessing import depth_order
@@ -16,11 +19,19 @@ import spykit.common.common_widget as cw
 import spykit.common.common_func as cf
 from spykit.info.utils import InfoWidgetPara
 from spykit.threads.utils import ThreadWorker
+from spykit.common.progress_bus import progress_bus
+from spykit.common.preprocess_cache import prep_cache, encode_key_value
+from spykit.common.memory_manager import mem_manager
+from spykit.common.dtype_policy import DtypePolicy, filt_dtypes
+from spykit.common.cost_estimator import cost_estimator
+from spykit.common.step_profiler import step_profiler
+from spykit.common.fused_filter import fused_chain, find_fused_chain, fuse_filter_chain
 
 # pyqt imports
-from PyQt6.QtWidgets import (QWidget, QFrame, QTabWidget, QVBoxLayout, QFormLayout, QHBoxLayout,
-                             QListWidget, QGridLayout, QSpacerItem, QDialog, QMainWindow, QProgressBar, QMessageBox)
-from PyQt6.QtCore import QSize, pyqtSignal, QObject, QTimeLine, Qt
+from PyQt6.QtWidgets import (QWidget, QFrame, QTabWidget, QVBoxLayout, QFormLayout, QHBoxLayout, QCheckBox,
+                             QListWidget, QGridLayout, QSpacerItem, QDialog, QMainWindow, QProgressBar, QMessageBox,
+                             QTreeWidgetItem)
+from PyQt6.QtCore import QSize, pyqtSignal, QObject, QTimeLine, QTimer, Qt
 from PyQt6.QtGui import QIcon, QFont, QColor
 
 # ----------------------------------------------------------------------------------------------------------------------
@@ -74,6 +85,14 @@ class PreprocessConfig(object):
             "concat_runs": False,
         }
 
+        # preprocessing cache options
+        self.use_cache = False
+        self.cache_format = 'binary'
+
+        # data type policy options
+        self.filt_dtype = 'float32'
+        self.export_dtype = 'int16'
+
     def add_prep_task(self, p_task, t_para=None, t_name=None):
 
         self.prep_task.append(p_task)
@@ -102,17 +121,50 @@ class PreprocessConfig(object):
         # returns the configuration dictionary list
         return pp_cfig
 
-    def clear(self):
+    def set_cache_opt(self, use_cache, cache_format=None):
+
+        self.use_cache = use_cache
+        if cache_format is not None:
+            self.cache_format = cache_format
+
+    def get_cache_opt(self):
+
+        # the cache fields are not set for configurations saved by previous versions
+        return getattr(self, 'use_cache', False), getattr(self, 'cache_format', 'binary')
+
+    def set_dtype_opt(self, filt_dtype=None, export_dtype=None):
+
+        if filt_dtype is not None:
+            self.filt_dtype = filt_dtype
+
+        if export_dtype is not None:
+            self.export_dtype = export_dtype
+
+    def get_dtype_opt(self):
+
+        # the data type fields are not set for configurations saved by previous versions
+        return getattr(self, 'filt_dtype', 'float32'), getattr(self, 'export_dtype', 'int16')
+
+    def clear_tasks(self):
 
         self.prep_task = []
         self.task_name = []
         self.task_para = {}
 
+    def clear(self):
+
+        self.clear_tasks()
+
         self.prep_opt = {
             "per_shank": False,
             "concat_runs": False,
         }
 
+        self.use_cache = False
+        self.cache_format = 'binary'
+        self.filt_dtype = 'float32'
+        self.export_dtype = 'int16'
+
 # ----------------------------------------------------------------------------------------------------------------------
 
 """
@@ -121,6 +173,13 @@ class PreprocessConfig(object):
 
 
 class PreprocessInfoTab(InfoWidgetPara):
+    # profiled preprocessing steps
+    profile_steps = ['phase_shift', 'bandpass_filter', 'interpolate_channels', 'remove_channels',
+                     'common_reference', 'whitening', 'drift_correct']
+
+    # profile field update interval (in ms)
+    t_profile = 1000
+
     def __init__(self, sp_main, t_str):
         super(PreprocessInfoTab, self).__init__(sp_main, t_str, layout=QFormLayout)
 
@@ -131,10 +190,16 @@ class PreprocessInfoTab(InfoWidgetPara):
         self.is_channel_removed = None
         self.configs = PreprocessConfig()
 
+        # step profiling widgets
+        self.h_profile = {}
+        self.check_profile = QCheckBox()
+        self.profile_timer = QTimer(self)
+
         # initialises the major widget groups
         self.setup_prop_fields()
         self.init_filter_edit()
         self.init_property_frame()
+        self.init_profile_group()
 
     # ---------------------------------------------------------------------------
     # Class Property Widget Setup Functions
@@ -203,14 +268,92 @@ class PreprocessInfoTab(InfoWidgetPara):
             for k, p in pp_str[pp_k].items():
                 self.p_props[pp_k][k] = p['value']
 
+    def init_profile_group(self):
+
+        # creates the profiling group item
+        item = QTreeWidgetItem(self.tree_prop)
+        h_lbl = cw.create_text_label(None, 'Step Profiling', font=self.item_font)
+        h_lbl.setAlignment(Qt.AlignmentFlag.AlignVCenter)
+        h_lbl.setStyleSheet("background-color: #A0A0A0;")
+        self.tree_prop.setItemWidget(item, 0, h_lbl)
+
+        # sets the item properties
+        item.setExpanded(True)
+        item.setFirstColumnSpanned(True)
+        self.append_grp_obj(item, 'profiling')
+        self.tree_prop.addTopLevelItem(item)
+
+        # creates the profiling checkbox
+        self.check_profile.setCheckState(cf.chk_state[step_profiler.is_enabled])
+        self.check_profile.setStyleSheet("padding-left: 5px;")
+        self.check_profile.setToolTip('Profiles the trace reads of each preprocessing step (only steps run after '
+                                      'profiling is enabled are profiled, and reads by process pool workers are '
+                                      'not counted)')
+        self.check_profile.clicked.connect(self.check_profile_steps)
+        self.add_profile_item(item, 'Profile Steps', self.check_profile)
+
+        # creates the step profile fields (the first step time includes the raw data read)
+        for pp_k in self.profile_steps:
+            self.h_profile[pp_k] = cw.QLabel('N/A')
+            self.add_profile_item(item, pp_flds[pp_k], self.h_profile[pp_k])
+
+        # resets the property column width
+        self.tree_prop.setColumnWidth(0, self.w_lbl + self.x_pad)
+
+        # sets the profile update timer
+        self.profile_timer.setInterval(self.t_profile)
+        self.profile_timer.timeout.connect(self.update_profile_fields)
+
+    def add_profile_item(self, item, lbl_str, h_obj):
+
+        # creates the tree widget item
+        item_ch = QTreeWidgetItem(item)
+
+        # creates the label widget
+        h_lbl = cw.create_text_label(None, '{0}: '.format(lbl_str))
+        h_lbl.setAlignment(Qt.AlignmentFlag.AlignVCenter)
+        self.w_lbl = np.max([self.w_lbl, h_lbl.sizeHint().width()])
+
+        # adds the child tree widget item
+        h_obj.setFixedHeight(self.item_row_size)
+        self.tree_prop.setItemWidget(item_ch, 0, h_lbl)
+        self.tree_prop.setItemWidget(item_ch, 1, h_obj)
+        item.addChild(item_ch)
+        self.append_para_obj(item_ch, 'profiling')
+
+    # ---------------------------------------------------------------------------
+    # Step Profiling Functions
+    # ---------------------------------------------------------------------------
+
+    def check_profile_steps(self):
+
+        # resets the profiler state (the step statistics are reset when profiling is enabled)
+        step_profiler.is_enabled = self.check_profile.isChecked()
+        if step_profiler.is_enabled:
+            step_profiler.reset()
+            self.profile_timer.start()
+
+        else:
+            self.profile_timer.stop()
+
+        # updates the profile fields
+        self.update_profile_fields()
+
+    def update_profile_fields(self):
+
+        for pp_k, h_lbl in self.h_profile.items():
+            h_lbl.setText(step_profiler.get_step_string(pp_k))
+
     # ---------------------------------------------------------------------------
     # Preprocessing Config Functions
     # ---------------------------------------------------------------------------
 
-    def setup_config_dict(self, prep_task, is_sorting=False):
+    def setup_config_dict(self, prep_task, is_sorting=False, configs=None):
 
-        # clears the configuration array
-        self.configs.clear()
+        # clears the configuration tasks (a separate configuration object can be set, e.g. for previews). the
+        # preprocessing, cache and data type options are kept
+        configs = self.configs if (configs is None) else configs
+        configs.clear_tasks()
 
         # determines if there are any channels to remove
         rmv_channels = self.get_remove_channels()
@@ -230,7 +373,7 @@ class PreprocessInfoTab(InfoWidgetPara):
                     }
 
                     # adds the preprocessing task to the list
-                    self.configs.add_prep_task(pp, c_dict, pp_t)
+                    configs.add_prep_task(pp, c_dict, pp_t)
 
                 case 'remove_channels':
                     # case is remove channel step
@@ -241,18 +384,18 @@ class PreprocessInfoTab(InfoWidgetPara):
                     }
 
                     # adds the preprocessing task to the list
-                    self.configs.add_prep_task(pp, c_dict, pp_t)
+                    configs.add_prep_task(pp, c_dict, pp_t)
 
                 case _:
                     # case is another step type
-                    self.configs.add_prep_task(pp, self.p_props[pp], pp_t)
+                    configs.add_prep_task(pp, self.p_props[pp], pp_t)
 
         # sorting?
         if is_sorting:
             pass
 
         # returns the configuration dictionaries
-        return self.configs.setup_config_dicts()
+        return configs.setup_config_dicts()
 
     def get_remove_channels(self):
 
@@ -278,6 +421,7 @@ class PreprocessInfoTab(InfoWidgetPara):
 class PreprocessSetup(QMainWindow):
     # pyqtSignal functions
     close_preprocessing = pyqtSignal(bool)
+    preview_status = pyqtSignal(object)
 
     # parameters
     n_but = 4
@@ -287,6 +431,7 @@ class PreprocessSetup(QMainWindow):
     dlg_height_orig = 300
     dlg_height_auto = 130
     dlg_width = 450
+    t_preview = 50
     p_row = np.array([7, 2, 1])
 
     # array class fields
@@ -336,10 +481,15 @@ class PreprocessSetup(QMainWindow):
         self.task_list = QListWidget(None)
         self.spacer_top = QSpacerItem(20, 60, cf.q_min, cf.q_max)
         self.spacer_bottom = QSpacerItem(20, 60, cf.q_min, cf.q_max)
+        self.preview_button = cw.create_push_button(self, 'Preview Window', font=cw.font_lbl)
+        self.preview_timer = QTimer(self)
+        self.preview_label = cw.create_text_label(None, '', font=cw.font_lbl, align='left')
+        self.pp_preview = PreprocessPreview(self.session_obj, self.preview_status.emit)
 
         # other class field initialisations
         self.task_order = []
         self.checkbox_opt = []
+        self.obj_lbl_dtype = None
         self.button_control = []
         self.prog_bar = []
 
@@ -350,7 +500,11 @@ class PreprocessSetup(QMainWindow):
         self.has_pp = False
         self.per_shank = False
         self.concat_runs = False
+        self.use_cache = False
         self.is_running = False
+        self.is_preview = False
+        self.cache_format = 'binary'
+        self.filt_dtype = 'float32'
         self.is_updating = False
 
         # index/scalar class fields
@@ -361,8 +515,6 @@ class PreprocessSetup(QMainWindow):
         self.n_shank = None
         self.n_step = None
         self.n_task = None
-        self.p_run = None
-        self.p_shank = None
         self.pr_task = None
         self.t_worker = None
         self.dlg_height = self.dlg_height_auto if self.is_auto else self.dlg_height_orig
@@ -408,8 +560,8 @@ class PreprocessSetup(QMainWindow):
         self.init_task_listboxes()
         self.init_order_buttons()
 
-        # connects the preprocessing signal function
-        self.session.prep_obj.update_prog.connect(self.worker_progress)
+        # subscribes to the preprocessing progress
+        progress_bus.subscribe(RunPreProcessing.pr_name, self.worker_progress)
 
         # adds the items to the task layout
         self.task_layout.addWidget(self.task_list, 0, 0, 1, 1)
@@ -427,8 +579,8 @@ class PreprocessSetup(QMainWindow):
     def init_checkbox_opt(self):
 
         # initialisations
-        c_str = [' Split Recording By Shank', ' Concatenate Experimental Runs']
-        cb_fcn = [self.checkbox_split_shank, self.checkbox_concat_expt]
+        c_str = [' Split Recording By Shank', ' Concatenate Experimental Runs', ' Cache Preprocessed Steps']
+        cb_fcn = [self.checkbox_split_shank, self.checkbox_concat_expt, self.checkbox_use_cache]
 
         # sets the frame/layout properties
         self.checkbox_frame.setContentsMargins(0, 0, 0, 0)
@@ -456,22 +608,42 @@ class PreprocessSetup(QMainWindow):
         n_run = self.session.get_run_count()
         self.checkbox_opt[1].setEnabled(n_run > 1)
 
+        # sets the cache checkbox value (from the current preprocessing configuration)
+        prep_tab = self.info_manager.get_info_tab('preprocess')
+        self.use_cache, self.cache_format = prep_tab.configs.get_cache_opt()
+        self.checkbox_opt[2].setCheckState(cf.chk_state[self.use_cache])
+
         # determines if partial preprocessing has taken place
         pp_runs = self.session_obj.get_pp_runs()
         if len(pp_runs):
-            # flag that partial preprocessing has taken place
+            # flag that partial preprocessing has taken place (the existing chain data type is kept)
             self.has_pp = True
             self.per_shank = self.session.prep_obj.per_shank
             self.concat_runs = self.session.prep_obj.concat_runs
+            self.filt_dtype = self.session.prep_obj.dtype_policy.filt_dtype
 
             # sets the checkbox values
             self.checkbox_opt[0].setCheckState(cf.chk_state[self.per_shank])
             self.checkbox_opt[1].setCheckState(cf.chk_state[self.concat_runs])
 
-            # disables the checkboxes
+        else:
+            # otherwise, the data type is set from the current preprocessing configuration
+            self.filt_dtype = prep_tab.configs.get_dtype_opt()[0]
+
+        # creates the filtered data type combobox
+        tl_dtype = 'Filtered Data Type:'
+        self.obj_lbl_dtype = cw.QLabelCombo(None, tl_dtype, filt_dtypes, self.filt_dtype, font_lbl=cw.font_lbl)
+        self.obj_lbl_dtype.setToolTip('Data type of the filtered preprocessing step outputs')
+        self.obj_lbl_dtype.connect(self.combo_filt_dtype)
+        self.checkbox_layout.addWidget(self.obj_lbl_dtype)
+
+        if self.has_pp:
+            # disables the checkboxes/data type combobox
             for cb_opt in self.checkbox_opt:
                 cb_opt.setEnabled(False)
 
+            self.obj_lbl_dtype.set_enabled(False)
+
             # removes the tasks from the list that have been completed
             for pp_names in [pp_flds[v[0]] for v in pp_runs[0]._pp_steps.values()]:
                 if pp_names in self.l_task:
@@ -568,6 +740,26 @@ class PreprocessSetup(QMainWindow):
             button_new.setFixedHeight(cf.but_height)
             button_new.setStyleSheet(self.border_style)
 
+        # sets the preview button properties (the button is placed before the control buttons)
+        self.preview_button.clicked.connect(self.button_preview)
+        self.preview_button.setCheckable(True)
+        self.preview_button.setFixedHeight(cf.but_height)
+        self.preview_button.setStyleSheet(self.border_style)
+        self.preview_button.setToolTip('Previews the selected tasks over the visible trace window')
+        self.preview_button.setVisible(not self.is_auto)
+        self.control_layout.insertWidget(0, self.preview_button)
+
+        # sets the preview update timer (parameter changes are coalesced)
+        self.preview_timer.setSingleShot(True)
+        self.preview_timer.setInterval(self.t_preview)
+        self.preview_timer.timeout.connect(self.update_preview)
+
+        # sets the preview status label properties (this is only shown if the preview couldn't be calculated)
+        self.preview_label.setStyleSheet("color: red;")
+        self.preview_label.setWordWrap(True)
+        self.preview_label.setVisible(False)
+        self.preview_status.connect(self.set_preview_status)
+
         # sets the control button properties
         self.button_control[4].setCheckable(True)
         self.set_button_props()
@@ -594,6 +786,7 @@ class PreprocessSetup(QMainWindow):
             self.list_layout.addWidget(self.task_frame, 0, 0, 1, 1)
             self.list_layout.addWidget(self.progress_frame, 1, 0, 1, 1)
             self.list_layout.addWidget(self.button_frame, 2, 0, 1, 1)
+            self.list_layout.addWidget(self.preview_label, 3, 0, 1, 1)
 
             # set the grid layout column sizes
             self.list_layout.setRowStretch(0, self.p_row[0])
@@ -612,6 +805,17 @@ class PreprocessSetup(QMainWindow):
 
         self.concat_runs = self.checkbox_opt[1].checkState() == cf.chk_state[False]
 
+    def checkbox_use_cache(self):
+
+        self.use_cache = self.checkbox_opt[2].checkState() == cf.chk_state[False]
+
+    def combo_filt_dtype(self, h_cbox, *_):
+
+        self.filt_dtype = h_cbox.currentText()
+
+        # updates the preprocessing preview (if previewing)
+        self.reset_preview()
+
     def button_add(self):
 
         # swaps the selected item between lists
@@ -683,6 +887,15 @@ class PreprocessSetup(QMainWindow):
             self.add_list.setCurrentRow(i_row_sel + 1)
             self.set_button_props()
 
+    def button_preview(self):
+
+        # if manually updating, then exit
+        if self.is_updating:
+            return
+
+        # the button check state has already been toggled by the click
+        self.set_preview_state(self.preview_button.isChecked())
+
     def start_preprocess(self):
 
         # if manually updating, then exit
@@ -696,6 +909,10 @@ class PreprocessSetup(QMainWindow):
         if self.is_running:
             # case is starting the calculations
 
+            # turns off the preprocessing preview
+            if self.is_preview:
+                self.set_preview_state(False)
+
             # other field initialisations
             if self.is_auto:
                 # case is loading from file
@@ -709,12 +926,24 @@ class PreprocessSetup(QMainWindow):
                 # sets the preprocessing options
                 prep_tab = self.info_manager.get_info_tab('preprocess')
                 prep_tab.configs.set_prep_opt(self.per_shank, self.concat_runs)
+                prep_tab.configs.set_cache_opt(self.use_cache, self.cache_format)
+                prep_tab.configs.set_dtype_opt(self.filt_dtype)
 
                 # retrieves the selected tasks
                 prep_task = []
                 for i in range(self.n_task):
                     prep_task.append(self.add_list.item(i).text())
 
+                # checks the estimated plan cost against the available resources
+                if not self.check_plan_cost(prep_task):
+                    # if the user cancelled, then reset the button state and exit the function
+                    self.is_running = False
+                    self.is_updating = True
+                    self.button_control[4].setChecked(False)
+                    self.button_control[4].setText(self.prep_str[0])
+                    self.is_updating = False
+                    return
+
                 # starts running the pre-processing
                 prep_opt = (self.per_shank, self.concat_runs)
                 self.setup_preprocessing_worker((prep_task, prep_opt))
@@ -723,7 +952,6 @@ class PreprocessSetup(QMainWindow):
             # stops the worker
             self.t_worker.force_quit()
             self.t_worker.deleteLater()
-            time.sleep(0.01)
 
             # disables the progressbar fields
             for pb in self.prog_bar:
@@ -743,6 +971,10 @@ class PreprocessSetup(QMainWindow):
                 # case is the user chose not to close
                 return
 
+        # turns off the preprocessing preview
+        if self.is_preview:
+            self.set_preview_state(False, False)
+
         if self.has_pp:
             # updates the pre-processing information
             pr_val = self.session.prep_obj.pp_steps_tot.values()
@@ -753,12 +985,15 @@ class PreprocessSetup(QMainWindow):
             prep_tab.configs.task_name = [pp_flds[x] for x in prep_tab.configs.prep_task]
             prep_tab.configs.task_para = dict(pr_val)
             prep_tab.configs.set_prep_opt(self.per_shank, self.concat_runs)
+            prep_tab.configs.set_cache_opt(self.use_cache, self.cache_format)
+            prep_tab.configs.set_dtype_opt(self.filt_dtype)
 
         elif self.session_obj.is_session_sorted():
             # otherwise if the session is sorted, then enable the post-processing
             self.sp_main.menu_bar.set_menu_enabled_blocks('sorted-without-preprocess')
 
         # runs the post window close functions
+        progress_bus.unsubscribe(RunPreProcessing.pr_name, self.worker_progress)
         self.close_preprocessing.emit(self.has_pp)
 
         # closes the window
@@ -769,12 +1004,89 @@ class PreprocessSetup(QMainWindow):
         self.sp_main.raise_()
         self.sp_main.setFocus()
 
+    # ---------------------------------------------------------------------------
+    # Preprocessing Preview Functions
+    # ---------------------------------------------------------------------------
+
+    def set_preview_state(self, state, reset_modal=True):
+
+        # exits if the preview state is unchanged
+        if state == self.is_preview:
+            return
+
+        # updates the preview flag/button (the button is only reset if the state is changed programmatically)
+        self.is_preview = state
+        if self.preview_button.isChecked() != state:
+            self.preview_button.setChecked(state)
+
+        # resets the window modality (the main window is accessible while previewing, so the trace window can be
+        # moved and the task parameters altered)
+        if reset_modal:
+            self.hide()
+            self.setWindowModality(Qt.WindowModality(int(not state)))
+            self.show()
+
+        # resets the parameter update/preview functions
+        prep_tab = self.info_manager.get_info_tab('preprocess')
+        if state:
+            prep_tab.prop_updated.connect(self.reset_preview)
+            self.update_preview()
+
+        else:
+            prep_tab.prop_updated.disconnect(self.reset_preview)
+            self.preview_timer.stop()
+            self.pp_preview.set_config(None)
+            self.set_preview_status(None)
+
+            # removes the preview traces
+            trace_view = self.sp_main.plot_manager.get_plot_view('trace', is_add=False)
+            if trace_view is not None:
+                trace_view.set_preview_fcn(None)
+
+    def set_preview_status(self, err_str):
+
+        # shows the preview error message (the label is hidden if the preview was calculated)
+        self.preview_label.setText('' if (err_str is None) else 'Preview Error - {0}'.format(err_str))
+        self.preview_label.setVisible(err_str is not None)
+
+    def reset_preview(self, *_):
+
+        # restarts the preview update timer
+        if self.is_preview:
+            self.preview_timer.start()
+
+    def update_preview(self):
+
+        # sets up the candidate configuration (the stored preprocessing configuration is not altered)
+        prep_tab = self.info_manager.get_info_tab('preprocess')
+        prep_task = [self.add_list.item(i).text() for i in range(self.add_list.count())]
+        pp_config = prep_tab.setup_config_dict(prep_task, configs=PreprocessConfig())
+        self.pp_preview.set_config(pp_config, DtypePolicy(self.filt_dtype))
+
+        # resets the trace view (the preview is calculated for the visible window only)
+        trace_view = self.sp_main.plot_manager.get_plot_view('trace', is_add=False)
+        if trace_view is not None:
+            trace_view.set_preview_fcn(self.pp_preview.get_traces)
+
     # ---------------------------------------------------------------------------
     # Preprocessing Worker Functions
     # ---------------------------------------------------------------------------
 
     def setup_preprocessing_worker(self, prep_obj):
 
+        # resets the index values/sizes
+        self.i_run, self.i_shank, self.i_task = 0, 0, 0
+        self.n_run, self.n_shank = 1, 1
+
+        # enables the progressbar
+        m_str = ['Initialising Preprocessing', 'Initialising Task Data']
+        for pb, ms in zip(self.prog_bar, m_str):
+            pb.set_progbar_state(True)
+            pb.update_prog_fields(ms, 0.)
+
+        # disables the required dialog widgets
+        self.set_preprocess_props(False)
+
         # creates the threadworker object
         self.t_worker = ThreadWorker(self.sp_main, self.run_preprocessing_worker, prep_obj)
         self.t_worker.work_finished.connect(self.preprocessing_complete)
@@ -797,13 +1109,30 @@ class PreprocessSetup(QMainWindow):
             # case is running from loading session
             pp_config = prep_obj.setup_config_dicts()
 
-        # runs the preprocessing
-        self.session.prep_obj.preprocess(pp_config, per_shank, concat_runs)
+        # runs the preprocessing (for each probe of a multi-probe session)
+        prep_fcn = pfcn(self.run_probe_preprocessing, pp_config, per_shank, concat_runs)
+        self.session_obj.run_probe_tasks(prep_fcn)
 
-    def preprocessing_complete(self):
+    def run_probe_preprocessing(self, pp_config, per_shank, concat_runs, ses_probe, n_cpu):
+
+        # sets the materialisation cache options
+        ses_probe.prep_obj.use_cache = self.use_cache
+        ses_probe.prep_obj.cache_format = self.cache_format
+
+        # sets the preprocessing data type policy (the export data type is set from the current configuration)
+        prep_tab = self.info_manager.get_info_tab('preprocess')
+        ses_probe.prep_obj.dtype_policy = DtypePolicy(self.filt_dtype, prep_tab.configs.get_dtype_opt()[1])
+
+        # sets the progress task name (the dialog shows the current probe progress only)
+        if ses_probe is self.session:
+            ses_probe.prep_obj.pr_name = RunPreProcessing.pr_name
+        else:
+            ses_probe.prep_obj.pr_name = '{0}-{1}'.format(RunPreProcessing.pr_name, ses_probe.probe_name)
 
-        # pauses for a little bit...
-        time.sleep(0.25)
+        # runs the preprocessing for the probe session (within the probe task core share)
+        ses_probe.prep_obj.preprocess(deepcopy(pp_config), per_shank, concat_runs, n_cpu)
+
+    def preprocessing_complete(self):
 
         # updates the boolean flags
         self.has_pp = True
@@ -846,99 +1175,40 @@ class PreprocessSetup(QMainWindow):
     # Worker Progress Functions
     # ---------------------------------------------------------------------------
 
-    def worker_progress(self, pr_type, pr_dict):
-
-        # initialisations
-        pr_val = None
-        m_str = [None, None]
-
-        # updates the values from the dictionary
-        for pd, pv in pr_dict.items():
-            setattr(self, pd, pv)
-
-        match pr_type:
-            case 0:
-                # case is intialising preprocessing
-
-                # resets the index values
-                self.i_run = 0
-                self.i_shank = 0
-                self.i_task = 0
-
-                # resets the index sizes
-                self.n_run = 1
-                self.n_shank = 1
-
-                # sets the run/shank proportional multipliers
-                self.p_run = 1.
-                self.p_shank = 1.
-
-                # sets the progress values
-                pr_val = np.zeros(2, dtype=float)
-                m_str = ['Initialising Preprocessing', 'Initialising Task Data']
-
-                # enables the progressbar
-                for pb in self.prog_bar:
-                    pb.set_progbar_state(True)
+    def worker_progress(self, p_info):
 
-                # disables the required dialog widgets
-                self.set_preprocess_props(False)
+        if p_info.is_finished:
+            # case is preprocessing completion
+            pr_val = np.ones(2, dtype=float)
+            m_str = ['Preprocessing Complete', 'All Tasks Complete']
 
-            case 1:
-                # case is new preprocessing run
-
-                # sets up the message labels
-                m_str[0] = self.setup_overall_progress_msg()
+        else:
+            # retrieves the run/shank/task indices (for the task levels that have been set up)
+            n_level = p_info.get_level_count()
+            self.i_run, self.n_run = p_info.i_step[0], p_info.n_step[0]
+            self.i_shank, self.n_shank = (p_info.i_step[1], p_info.n_step[1]) if (n_level > 1) else (0, 1)
+
+            # sets up the overall progress message label
+            m_str = [self.setup_overall_progress_msg(), None]
+            if p_info.pr_val[0] > 0:
+                m_str[0] = '{0} - {1}'.format(m_str[0], p_info.get_eta_string())
+
+            if n_level < 2:
+                # case is a new preprocessing run
                 m_str[1] = 'Initialising Run Data...'
 
-                # resets the index values
-                self.i_shank = 0
-                self.i_task = 0
-
-            case 2:
-                # case is new preprocessing shank
-
-                # resets the index values
-                self.i_task = 0
-
-                # sets up the message labels
-                m_str[0] = self.setup_overall_progress_msg()
+            elif (n_level < 3) or (p_info.desc[2] is None):
+                # case is a new preprocessing shank
                 m_str[1] = 'Initialising Shank Data...'
 
-            case 3:
+            else:
                 # case is performing a preprocessing task
-
-                # updates the list selection
+                self.i_task, self.pr_task = p_info.i_step[2], p_info.desc[2]
                 self.reset_list_selection(self.i_task)
-
-                # sets up the message labels
                 m_str[1] = 'Task: {0}'.format(pp_flds[self.pr_task])
 
-            case 4:
-                # case is the run count
-                self.p_run = 1 / self.n_run
-
-            case 5:
-                # case is the shank count
-                self.p_shank = 1 / self.n_shank
-
-            case 6:
-                # case is preprocessing completion
-
-                # sets the progress values
-                pr_val = np.ones(2, dtype=float)
-                m_str = ['Preprocessing Complete', 'All Tasks Complete']
-
-        # calculates the
-        if pr_val is None:
-            # calculates the run/shank proportional components
-            pr_val_run = self.i_run * self.p_run
-            pr_val_shank = self.i_shank * self.p_shank
-
-            # calculates and sets the task/overall proportions
-            pr_task = 0. if (self.n_task is None) else self.i_task / self.n_task
-            pr_overall = pr_val_run + pr_val_shank + self.p_run * self.p_shank * pr_task
-            pr_val = np.array([pr_overall, pr_task])
+            # sets the overall/task proportions
+            pr_val = [p_info.pr_val[0], p_info.pr_val[2] if (n_level > 2) else 0.]
 
         # updates the progressbar fields
         for pb, ms, pv in zip(self.prog_bar, m_str, pr_val):
@@ -991,11 +1261,9 @@ class PreprocessSetup(QMainWindow):
         if state:
             self.set_button_props()
 
-        # sets the close button properties
+        # sets the close/preview button properties
         self.button_control[5].setEnabled(state)
-
-        # pause for update...
-        time.sleep(0.01)
+        self.preview_button.setEnabled(state and (self.add_list.count() > 0))
 
     def set_button_props(self):
 
@@ -1015,6 +1283,40 @@ class PreprocessSetup(QMainWindow):
         self.button_control[2].setEnabled(is_added_sel and (i_row_add > 0))
         self.button_control[3].setEnabled(is_added_sel and (i_row_add < n_added))
         self.button_control[4].setEnabled((n_added >= 0) or self.is_auto)
+        self.preview_button.setEnabled((n_added >= 0) or self.is_preview)
+
+        # updates the plan cost estimate (shown in the start button tooltip)
+        if (not self.is_auto) and (n_added >= 0):
+            prep_task = [self.add_list.item(i).text() for i in range(n_added + 1)]
+            self.button_control[4].setToolTip(self.get_plan_cost(prep_task).get_summary_string())
+
+        # updates the preprocessing preview (if previewing)
+        self.reset_preview()
+
+    def check_plan_cost(self, prep_task):
+
+        # determines if the estimated plan cost exceeds the available resources
+        pp_cost = self.get_plan_cost(prep_task)
+        if len(pp_cost.warnings) == 0:
+            return True
+
+        # prompts the user if they still want to continue
+        q_str = ('The preprocessing plan is estimated to exceed the available resources:\n\n{0}\n\n'
+                 'Do you still want to continue?'.format(pp_cost.get_summary_string()))
+        u_choice = QMessageBox.question(self.sp_main, 'Resource Warning', q_str, cf.q_yes_no, cf.q_yes)
+        return u_choice == cf.q_yes
+
+    def get_plan_cost(self, prep_task):
+
+        # retrieves the raw recordings (for each run of each probe session)
+        ses_probe = self.session_obj.get_probe_sessions()
+        probe_recs = [[x.get_session_runs(i, 'grouped') for i in range(x.get_run_count())] for x in ses_probe]
+
+        # estimates the preprocessing plan cost
+        pp_steps = [prep_task_map[x] for x in prep_task]
+        n_shank = self.session_obj.get_shank_count()
+        return cost_estimator.estimate_preprocess(
+            probe_recs, n_shank, pp_steps, self.per_shank, self.concat_runs, self.use_cache)
 
     def check_task_order(self, task_new):
 
@@ -1060,8 +1362,12 @@ class PreprocessSetup(QMainWindow):
 
 
 class RunPreProcessing(QObject):
-    # pyqtSignal functions
-    update_prog = pyqtSignal(int, dict)
+    # progress bus task name
+    pr_name = 'preprocess'
+
+    # unit memory estimate parameters (chunk duration and the chunk buffers held by each job)
+    t_chunk = 1.
+    n_chunk_buf = 4
 
     # preprocessing function dictionary
     pp_funcs = {
@@ -1082,21 +1388,34 @@ class RunPreProcessing(QObject):
         # boolean class fields
         self.per_shank = False
         self.concat_runs = False
+        self.use_cache = False
 
         # other class field initialisations
+        self.cache_format = 'binary'
         self.prepro_dict = None
         self.pp_steps_new = None
         self.pp_steps_tot = None
         self.run_name = None
         self.file_format = None
         self.raw_data_path = None
+        self.job_kw = {}
+        self.n_cpu = None
+        self.dtype_policy = DtypePolicy()
 
-    def preprocess(self, pp_steps, per_shank, concat_runs):
+        # progress task fields
+        self.n_shank_pr = 1
+        self.pr_task = [None, None, None]
+        self.pr_index = []
+        self.pr_count = None
+        self.pr_lock = Lock()
+
+    def preprocess(self, pp_steps, per_shank, concat_runs, n_cpu=None):
 
         # sets the input arguments
         self.per_shank = per_shank
         self.concat_runs = concat_runs
         self.pp_steps_new = pp_steps
+        self.n_cpu = n_cpu
 
         # initialises the progressbar
         self.update_prep_prog(0)
@@ -1139,25 +1458,23 @@ class RunPreProcessing(QObject):
             # sets the run count
             self.update_prep_prog(4, len(runs_to_pp))
 
-        # runs the preprocessing for each run (for all tasks)
-        for i_run, run in enumerate(runs_to_pp):
-            # sets the shank count (first run only)
-            if i_run == 0:
-                self.update_prep_prog(5, self.get_shank_count(run, is_raw))
+        # sets up the independent (run, shank) preprocessing units and runs them concurrently
+        pp_unit = self.get_preprocess_units(runs_to_pp, is_raw)
+        pp_result = self.run_preprocess_units(pp_unit)
 
-            # update the progressbar for the current run
-            self.update_prep_prog(1, i_run)
-
-            # runs the preprocessing for the current run
-            preprocessed_run = self.preprocess_run(run, is_raw)
+        # stores the preprocessing data (the unit results are reassembled in run/shank order)
+        if n_run_pp == 0:
+            for i_run, run in enumerate(runs_to_pp):
+                # retrieves the run names
+                orig_run_names = (
+                    run._orig_run_names if isinstance(run, ConcatRawRun) else None
+                )
 
-            # retrieves the run names
-            orig_run_names = (
-                run._orig_run_names if isinstance(run, ConcatRawRun) else None
-            )
+                # retrieves the preprocessed shank data for the run
+                preprocessed_run = {
+                    shank_id: pp_data for (j_run, shank_id, _), pp_data in zip(pp_unit, pp_result) if j_run == i_run
+                }
 
-            # stores the preprocessing data
-            if n_run_pp == 0:
                 self.s._pp_runs.append(
                     PreprocessedRun(
                         run_name=self.run_name[i_run],
@@ -1174,82 +1491,120 @@ class RunPreProcessing(QObject):
         # flag that preprocessing is complete
         self.update_prep_prog(6)
 
-    def preprocess_run(self, run, is_raw):
+    def get_preprocess_units(self, runs_to_pp, is_raw):
 
-        preprocessed = {}
+        # memory allocation
+        pp_unit = []
 
-        if is_raw:
-            # case is starting preprocessing from raw
+        for i_run, run in enumerate(runs_to_pp):
+            if is_raw:
+                # case is starting preprocessing from raw (the units are the shank/group recordings)
+                run_grp = run._get_split_by_shank() if self.per_shank else run._raw
+                pp_unit += [(i_run, shank_id, {"0-raw": raw_rec}) for shank_id, raw_rec in run_grp.items()]
 
-            # determines the runs to process
-            if self.per_shank:
-                runs_to_preprocess = run._get_split_by_shank()
             else:
-                runs_to_preprocess = run._raw
+                # case is running from previous preprocessing (the existing step data is extended)
+                pp_unit += [(i_run, shank_id, pp_rec) for shank_id, pp_rec in run.items()]
 
-            # runs the preprocessing over each grouping
-            for i_shank, (shank_id, raw_rec) in enumerate(runs_to_preprocess.items()):
-                self.update_prep_prog(2, i_shank)
-                preprocessed[shank_id] = self.preprocess_recording({"0-raw": raw_rec})
+        return pp_unit
 
-        else:
-            # case is running from previous preprocessing
+    def run_preprocess_units(self, pp_unit):
+
+        # sets the unit run/shank indices (used for the progress updates)
+        self.pr_index, self.pr_count = [], np.zeros(len(pp_unit))
+        for i_run, shank_id, _ in pp_unit:
+            sh_run = [x[1] for x in pp_unit if x[0] == i_run]
+            self.pr_index.append((i_run, sh_run.index(shank_id), len(sh_run)))
+
+        # determines the concurrent unit count (from the CPU/memory budgets)
+        n_worker, n_jobs = self.get_unit_budget(pp_unit)
+        self.job_kw = {'n_jobs': n_jobs, 'progress_bar': False}
 
-            # runs the preprocessing over each grouping
-            self.update_prep_prog(5, len(run.items()))
-            for i_shank, (shank_id, pp_rec) in enumerate(run.items()):
-                self.update_prep_prog(2, i_shank)
-                preprocessed[shank_id] = pp_rec
-                self.preprocess_recording(pp_rec)
+        with ThreadPoolExecutor(max_workers=n_worker) as executor:
+            # runs the preprocessing for each unit
+            t_unit = [executor.submit(self.preprocess_recording, x[2], i) for i, x in enumerate(pp_unit)]
 
-        return preprocessed
+            try:
+                # waits for the units to complete (re-raising any unit errors)
+                return [t.result() for t in t_unit]
 
-    def preprocess_recording(self, pp_data):
+            except Exception:
+                # cancels the pending units
+                for t in t_unit:
+                    t.cancel()
+
+                raise
+
+    def preprocess_recording(self, pp_data, i_unit=0):
 
         # field retrieval
         step_ofs = len(pp_data) - 1
         prev_name = list(pp_data.keys())[-1]
         pp_step_names = [item[0] for item in self.pp_steps_tot.values()]
 
+        # retrieves the preprocessing chain key of the upstream recording
+        key_prev = prep_cache.get_recording_key(pp_data[prev_name])
+
+        # determines if the steps contain the fused filter chain (not possible if the steps are materialised)
+        i_fuse = None if self.use_cache else find_fused_chain([x[0] for x in self.pp_steps_new.values()])
+        rec_fuse, opt_fuse = None, []
+
+        # determines the deepest step with an existing materialisation (the upstream steps are kept lazy)
+        i_cache = self.find_cached_step(pp_data[prev_name], key_prev) if self.use_cache else None
+
         for i_step, (step_num, pp_info) in enumerate(self.pp_steps_new.items()):
             # updates the progressbar
-            run_pp_step = True
-            pp_name, pp_opt = pp_info
-            self.update_prep_prog(3, i_step, pp_name)
+            pp_name = pp_info[0]
+            self.update_unit_prog(i_unit, i_step, pp_name)
 
             # retrieves the preprocessing step parameters
-            if self.per_shank and (pp_name == 'interpolate_channels'):
-                # if analysing by shank, and interpolating bad channels, then ensure the channels for removal exist
-                # on the current shank
-                shank_id = np.intersect1d(pp_opt['channel_ids'], pp_data[prev_name].channel_ids)
-                if len(shank_id):
-                    # if there are bad channels, then reset the field
-                    pp_opt['channel_ids'] = shank_id
-
-                else:
-                    # if there are no bad channels, then continue
-                    run_pp_step = False
+            pp_opt = self.get_step_para(pp_name, pp_info, pp_data[prev_name].channel_ids)
+            if pp_opt is None:
+                # case is the step is skipped (the upstream recording is kept)
+                preprocessed_rec = pp_data[prev_name]
 
-            if run_pp_step:
-                if (pp_name == 'drift_correct') and (pp_data[prev_name]._dtype.kind == 'i'):
-                    # special case - the motion correction code only works on float32 data types
-                    #                if the data is uint16, then covert before running
-                    preprocessed_rec = self.pp_funcs[pp_name](pp_data[prev_name].astype('float32'), **pp_opt)
-
-                elif (pp_name == 'remove_channels') and ('channel_ids' in pp_opt):
-                    ch_ids = pp_data[prev_name].channel_ids
-                    if np.all([x in ch_ids for x in pp_opt['channel_ids']]):
-                        # runs the spikewrap function as per normal
-                        preprocessed_rec = self.pp_funcs[pp_name](pp_data[prev_name], **pp_opt)
+            else:
+                if pp_name == 'drift_correct':
+                    # case is motion correction (integer data is cast lazily, as the correction requires float data)
+                    rec_drift = self.dtype_policy.get_step_input(pp_data[prev_name], pp_name)
 
-                    else:
-                        # otherwise, skip the step
-                        preprocessed_rec = pp_data[prev_name]
+                    # runs the motion correction (the cached motion estimate is used if available)
+                    preprocessed_rec = self.run_drift_correct(rec_drift, pp_opt, key_prev)
 
                 else:
                     # otherwise, run the spikewrap function as per normal
                     preprocessed_rec = self.pp_funcs[pp_name](pp_data[prev_name], **pp_opt)
 
+                # sets the step output data type (channel selection keeps the input type, otherwise float32)
+                if preprocessed_rec is not pp_data[prev_name]:
+                    preprocessed_rec = self.dtype_policy.get_step_output(preprocessed_rec, pp_data[prev_name], pp_name)
+
+            if (i_fuse is not None) and (i_fuse <= i_step < i_fuse + len(fused_chain)):
+                # case is a fused filter chain step (the chain input recording/step parameters are stored)
+                if i_step == i_fuse:
+                    rec_fuse = pp_data[prev_name]
+
+                opt_fuse.append(pp_opt)
+                if i_step == (i_fuse + len(fused_chain) - 1):
+                    # replaces the chain output with the fused recording (the intermediate steps are kept layered)
+                    preprocessed_rec = fuse_filter_chain(rec_fuse, preprocessed_rec, opt_fuse)
+
+            # sets the chain key for the step output (skipped steps keep the upstream key, and the output data type
+            # is included so that materialisations with different data types are kept separate)
+            if (preprocessed_rec is not pp_data[prev_name]) and (key_prev is not None):
+                pp_opt_key = dict(pp_opt, dtype=preprocessed_rec.get_dtype().str)
+                key_prev = prep_cache.get_step_key(key_prev, pp_name, pp_opt_key)
+                prep_cache.set_recording_key(preprocessed_rec, key_prev)
+
+                # materialises the step output (an existing materialisation of an identical chain is reused)
+                if self.use_cache and ((i_cache is None) or (i_step >= i_cache)):
+                    preprocessed_rec = prep_cache.materialise(
+                        preprocessed_rec, key_prev, pp_name, self.cache_format, self.job_kw)
+
+            # wraps the step output in a profiling layer (if step profiling is enabled)
+            if preprocessed_rec is not pp_data[prev_name]:
+                preprocessed_rec = step_profiler.wrap_recording(preprocessed_rec, pp_name)
+
             # stores the preprocessing run object
             step_num_tot = int(step_num) + step_ofs
             new_name = f"{str(step_num_tot)}-" + "-".join(["raw"] + pp_step_names[: step_num_tot])
@@ -1258,50 +1613,287 @@ class RunPreProcessing(QObject):
             # resets the previous run name
             prev_name = new_name
 
+        # flags the unit as being complete
+        self.update_unit_prog(i_unit, len(self.pp_steps_new))
         return pp_data
 
-    def update_prep_prog(self, pr_type, i_val=None, pp_str=None):
+    def get_step_para(self, pp_name, pp_info, ch_ids):
+
+        # retrieves the step parameters (the output data type is set for the steps that support it)
+        pp_opt = self.dtype_policy.get_step_opt(pp_name, dict(pp_info[1]))
+
+        if self.per_shank and (pp_name == 'interpolate_channels'):
+            # if analysing by shank, the interpolated channels are reduced to those on the current shank (the step
+            # is skipped if there are no bad channels on the shank)
+            shank_id = np.intersect1d(pp_opt['channel_ids'], ch_ids)
+            if len(shank_id) == 0:
+                return None
+
+            pp_opt['channel_ids'] = shank_id
+
+        elif (pp_name == 'remove_channels') and ('channel_ids' in pp_opt):
+            # the step is skipped if any of the channels for removal are missing
+            if not np.all([x in ch_ids for x in pp_opt['channel_ids']]):
+                return None
+
+        return pp_opt
+
+    def find_cached_step(self, rec, key_prev):
+
+        # exits if the upstream recording has no chain key
+        if key_prev is None:
+            return None
 
         # initialisations
-        pr_dict = {}
+        i_cache = None
+        dtype, ch_ids = rec.get_dtype(), list(rec.channel_ids)
+
+        for i_step, pp_info in enumerate(self.pp_steps_new.values()):
+            # retrieves the step parameters (skipped steps keep the upstream key)
+            pp_name = pp_info[0]
+            pp_opt = self.get_step_para(pp_name, pp_info, ch_ids)
+            if pp_opt is None:
+                continue
+
+            # sets the step chain key (from the step output data type) and flags if the step is materialised
+            dtype = self.dtype_policy.get_step_dtype(dtype, pp_name)
+            key_prev = prep_cache.get_step_key(key_prev, pp_name, dict(pp_opt, dtype=dtype.str))
+            if prep_cache.has_entry(key_prev):
+                i_cache = i_step
+
+            # updates the step output channels
+            if pp_name == 'remove_channels':
+                ch_ids = [x for x in ch_ids if x not in pp_opt['channel_ids']]
+
+            elif pp_name == 'drift_correct':
+                # the motion interpolation can remove the border channels (these depend on the motion estimate, so
+                # the downstream step keys can't be determined)
+                if prep_cache.get_interp_kwargs(pp_opt).get('border_mode') != 'force_extrapolate':
+                    break
+
+        return i_cache
+
+    def run_drift_correct(self, rec, pp_opt, key_prev):
+
+        # retrieves the cached motion estimate for the upstream chain/motion parameters
+        m_key = None if (key_prev is None) else prep_cache.get_motion_key(key_prev, pp_opt)
+        m_info = prep_cache.load_motion(m_key)
+        if m_info is None:
+            # case is there is no cached estimate (the motion is estimated and stored in the cache)
+            return prep_cache.estimate_motion(rec, m_key, pp_opt, self.get_step_job_kwargs(pp_opt))
+
+        else:
+            # case is a cached estimate (only the motion interpolation is run)
+            return prep_cache.interpolate_motion(rec, m_info, pp_opt)
+
+    def update_unit_prog(self, i_unit, i_step, pp_str=None):
+
+        with self.pr_lock:
+            # updates the unit step count
+            self.pr_count[i_unit] = i_step
+            i_run, i_shank, n_shank = self.pr_index[i_unit]
+
+            # publishes the most recently updated unit (run -> shank -> step task levels)
+            self.update_prep_prog(5, n_shank)
+            self.update_prep_prog(1, i_run)
+            self.update_prep_prog(2, i_shank)
+            self.update_prep_prog(3, i_step, pp_str)
+
+            # resets the overall progress (from the step counts over all units)
+            n_step_tot = len(self.pr_count) * max(1, len(self.pp_steps_new))
+            self.pr_task[0].set_overall(np.sum(self.pr_count) / n_step_tot)
 
+    def update_prep_prog(self, pr_type, i_val=None, pp_str=None):
+
+        # publishes the progress to the progress bus (run -> shank -> step task levels)
         match pr_type:
+            case 0:
+                # case is intialising preprocessing
+                self.n_shank_pr = 1
+                self.pr_task = [progress_bus.start_task(self.pr_name, 'run'), None, None]
+
             case 1:
                 # case is new preprocessing run
-                pr_dict = {'i_run': i_val}
+                self.pr_task[0].set_step(i_val)
+                self.pr_task[1] = self.pr_task[0].add_sub_task('shank', 'shank', self.n_shank_pr)
+                self.pr_task[2] = None
 
             case 2:
                 # case is new preprocessing shank
-                pr_dict = {'i_shank': i_val}
+                self.pr_task[1].set_step(i_val)
+                self.pr_task[2] = self.pr_task[1].add_sub_task('step', None, len(self.pp_steps_new))
 
             case 3:
                 # case is new preprocessing task
-                pr_dict = {'i_task': i_val, 'pr_task': pp_str}
+                self.pr_task[2].set_step(i_val, pp_str)
 
             case 4:
                 # case is the run count
-                pr_dict = {'n_run': i_val}
+                self.pr_task[0].set_count(i_val)
 
             case 5:
                 # case is the shank count
-                pr_dict = {'n_shank': i_val}
+                self.n_shank_pr = i_val
+                if self.pr_task[1] is not None:
+                    self.pr_task[1].set_count(i_val)
 
-        # updates the progressbar
-        self.update_prog.emit(pr_type, pr_dict)
-        time.sleep(0.05)
+            case 6:
+                # case is preprocessing completion
+                self.pr_task[0].finish()
 
-    def get_shank_count(self, run, is_raw):
+    def get_unit_budget(self, pp_unit):
 
-        if is_raw:
-            if self.per_shank:
-                return len(run._get_split_by_shank())
-            else:
-                return len(run._raw)
+        # splits the CPU share (the probe task core share is used for concurrent probe tasks)
+        n_worker, n_jobs = cf.get_cpu_budget(len(pp_unit), self.n_cpu)
 
-        else:
-            return len(run.items())
+        # reduces the worker count until the estimated unit memory usage is within the memory budget
+        n_bytes_job = max([self.get_job_bytes(x[2]) for x in pp_unit], default=0)
+        while (n_worker > 1) and (n_worker * n_jobs * n_bytes_job > mem_manager.n_bytes_max):
+            n_worker -= 1
+
+        return n_worker, n_jobs
+
+    def get_step_job_kwargs(self, pp_opt):
+
+        return {k: v for k, v in self.job_kw.items() if k not in pp_opt}
+
+    def get_job_bytes(self, pp_data):
+
+        # estimates the memory used by each job (float32 chunk buffers of the unit recording)
+        rec = list(pp_data.values())[-1]
+        n_frm_chunk = int(rec.get_sampling_frequency() * self.t_chunk)
+
+        return rec.get_num_channels() * n_frm_chunk * np.dtype('float32').itemsize * self.n_chunk_buf
 
     def set_prep_opt(self, prep_opt):
 
         self.per_shank = prep_opt['per_shank']
-        self.concat_runs = prep_opt['concat_runs']
\ No newline at end of file
+        self.concat_runs = prep_opt['concat_runs']
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+"""
+    PreprocessPreview: applies a candidate preprocessing configuration to the visible trace window only. the preview
+                       chain is built lazily over the current recording (so only the window and step margins are
+                       read), and is reused until the recording or configuration changes. parameter errors are
+                       reported through the status function
+"""
+
+
+class PreprocessPreview(object):
+    # steps that require the full session recording (these are not previewed)
+    pp_skip = ['drift_correct']
+
+    # step parameter errors (these are reported as the preview status, all other errors are raised)
+    pp_errors = (ValueError, TypeError, KeyError, AssertionError)
+
+    def __init__(self, session_obj, status_fcn=None):
+        super(PreprocessPreview, self).__init__()
+
+        # class field initialisations
+        self.session_obj = session_obj
+        self.status_fcn = status_fcn
+        self.pp_config = None
+        self.dtype_policy = DtypePolicy()
+
+        # preview chain fields
+        self.rec_src = None
+        self.rec_pp = None
+        self.pp_key = None
+        self.err_str = None
+
+    def set_config(self, pp_config, dtype_policy=None):
+
+        self.pp_config = pp_config
+        if dtype_policy is not None:
+            self.dtype_policy = dtype_policy
+
+        # clears the preview chain/status (if the preview is turned off)
+        if pp_config is None:
+            self.rec_src, self.rec_pp, self.pp_key, self.err_str = None, None, None, None
+
+    def get_traces(self, i_frm0, i_frm1, channel_ids):
+
+        # retrieves the preview chain (exits if there are no preview steps or the chain couldn't be built)
+        rec_pp = self.get_preview_chain()
+        if rec_pp is None:
+            return None
+
+        try:
+            # retrieves the window signals (removed channels are set to zero)
+            is_ch = np.isin(channel_ids, rec_pp.channel_ids)
+            y_pp = np.zeros((i_frm1 - i_frm0, len(channel_ids)), dtype=float)
+            if np.any(is_ch):
+                y_pp[:, is_ch] = rec_pp.get_traces(start_frame=i_frm0, end_frame=i_frm1,
+                                                   channel_ids=np.asarray(channel_ids)[is_ch])
+
+        except self.pp_errors as e:
+            # case is the preview couldn't be calculated (e.g., invalid parameters)
+            self.set_status(str(e))
+            return None
+
+        self.set_status(None)
+        return y_pp
+
+    def get_preview_chain(self):
+
+        # retrieves the preview steps (exits if there are none)
+        pp_steps = [] if (self.pp_config is None) else \
+            [x for x in self.pp_config.values() if x[0] not in self.pp_skip]
+        if len(pp_steps) == 0:
+            self.set_status(None)
+            return None
+
+        # returns the stored chain (if the recording and configuration are unchanged)
+        rec = self.session_obj.get_current_recording_probe()
+        pp_key = json.dumps([pp_steps, self.dtype_policy.filt_dtype], default=encode_key_value, sort_keys=True)
+        if (rec is self.rec_src) and (pp_key == self.pp_key):
+            return self.rec_pp
+
+        # initialisations
+        self.rec_src, self.pp_key, self.rec_pp = rec, pp_key, None
+        i_fuse = find_fused_chain([x[0] for x in pp_steps])
+        rec_pp, opt_fuse, pp_name = rec, [], None
+
+        try:
+            # applies the preprocessing steps to the recording
+            for i_step, (pp_name, pp_opt) in enumerate(pp_steps):
+                # sets the step parameters/output data type (as for the full preprocessing)
+                pp_opt = self.dtype_policy.get_step_opt(pp_name, pp_opt)
+                if 'channel_ids' in pp_opt:
+                    # case is a channel step (only the channels within the recording are included)
+                    pp_opt = dict(pp_opt)
+                    pp_opt['channel_ids'] = np.intersect1d(pp_opt['channel_ids'], rec_pp.channel_ids)
+                    if len(pp_opt['channel_ids']) == 0:
+                        continue
+
+                if i_step == i_fuse:
+                    # case is the fused filter chain start (the chain input recording is stored)
+                    rec_fuse = rec_pp
+
+                rec_in = rec_pp
+                rec_pp = RunPreProcessing.pp_funcs[pp_name](rec_pp, **pp_opt)
+                rec_pp = self.dtype_policy.get_step_output(rec_pp, rec_in, pp_name)
+
+                if (i_fuse is not None) and (i_fuse <= i_step < i_fuse + len(fused_chain)):
+                    # case is a fused filter chain step (the chain output is replaced at the chain end)
+                    opt_fuse.append(pp_opt)
+                    if i_step == (i_fuse + len(fused_chain) - 1):
+                        rec_pp = fuse_filter_chain(rec_fuse, rec_pp, opt_fuse)
+
+        except self.pp_errors as e:
+            # case is the step parameters are invalid
+            self.set_status('{0}: {1}'.format(pp_flds.get(pp_name, pp_name), e))
+            return None
+
+        self.rec_pp = rec_pp
+        return self.rec_pp
+
+    def set_status(self, err_str):
+
+        # reports the preview status (only if changed)
+        if err_str != self.err_str:
+            self.err_str = err_str
+            if self.status_fcn is not None:
+                self.status_fcn(err_str)
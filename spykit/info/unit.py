@@ -8,6 +8,7 @@ from copy import deepcopy
 import spykit.common.common_func as cf
 import spykit.common.common_widget as cw
 from spykit.info.utils import InfoWidget
+from spykit.common.session_journal import session_journal
 from spykit.common.common_widget import QLabelCombo, QLabelCheckCombo, QLabelText, font_lbl
 
 # pyqt imports
@@ -373,6 +374,12 @@ class UnitInfoTab(InfoWidget):
         # updates the unit type field
         self.set_field('unit_type', i_type_new, i_row)
 
+        # records the unit type edit in the autosave journal
+        post_data = self.session_obj.post_data
+        u_key = [post_data.mmap_name[post_data.i_mmap], self.session_obj.get_current_run_index(),
+                 self.session_obj.get_shank_index(), i_row]
+        session_journal.record('unit_type', u_key, i_type_new)
+
         # updates the trace spikes/unit type tabs
         self.update_unit_type(unit_type, i_row, False)
         self.unit_spike_tab.update_unit_type(unit_type, i_row)
@@ -1,6 +1,5 @@
 # module imports
 import re
-import time
 import platform
 import numpy as np
 from copy import deepcopy
@@ -162,6 +161,7 @@ class InfoManager(QObject):
                     tab_widget.table.horizontalHeader().check_update.connect(cb_fcn)
 
                     # connects the other tab widget slot functions
+                    tab_widget.probe_change.connect(self.channel_probe_update)
                     tab_widget.run_change.connect(pfcn(self.channel_combobox_update, 'run'))
                     tab_widget.shank_change.connect(pfcn(self.channel_combobox_update, 'shank'))
                     tab_widget.status_change.connect(self.channel_status_update)
@@ -225,6 +225,7 @@ class InfoManager(QObject):
 
         # resets the combobox fields
         channel_tab = self.get_info_tab('channel')
+        channel_tab.reset_probe_fields(self.session_obj.get_probe_names(), self.session_obj.get_current_probe())
         channel_tab.reset_combobox_fields('run', run_list)
         channel_tab.reset_combobox_fields('shank', shank_list)
 
@@ -244,6 +245,15 @@ class InfoManager(QObject):
     # Channel Tab Functions
     # ---------------------------------------------------------------------------
 
+    def channel_probe_update(self, tab_obj):
+
+        # if manually updating the combobox, then exit
+        if self.is_updating:
+            return
+
+        # switches to the selected probe session (the main window is reset for the new probe)
+        self.session_obj.set_current_probe(tab_obj.probe_type.current_text())
+
     def channel_combobox_update(self, d_type, tab_obj):
 
         # if manually updating the combobox, then exit
@@ -416,9 +426,6 @@ class InfoManager(QObject):
         self.init_channel_comboboxes(data_list=data_list, shank_list=shank_list)
         self.session_obj.current_shank = 0
 
-        # pauses for update...
-        time.sleep(0.05)
-
     # ---------------------------------------------------------------------------
     # Unit Tab Event Functions
     # ---------------------------------------------------------------------------
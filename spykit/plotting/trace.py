@@ -15,6 +15,7 @@ from pyqtgraph.Qt import QtGui
 import spykit.common.common_func as cf
 import spykit.common.common_widget as cw
 from spykit.plotting.utils import PlotWidget, PlotPara
+from spykit.threads.utils import ThreadWorker
 from spikeinterface.preprocessing import depth_order
 
 # pyqt6 module import
@@ -161,6 +162,7 @@ class TracePlot(TraceLabelMixin, PlotWidget):
     l_pen_trace = mkPen(color=cf.get_colour_value('g'), width=1)
     l_pen_inset = mkPen(color=cf.get_colour_value('r'), width=1)
     l_pen_high = mkPen(color=cf.get_colour_value('y'), width=1)
+    l_pen_preview = mkPen(color=cf.get_colour_value('c'), width=1)
 
     def __init__(self, sp_main):
         TraceLabelMixin.__init__(self)
@@ -188,6 +190,9 @@ class TracePlot(TraceLabelMixin, PlotWidget):
         self.c_tr = None
         self.inset_id = None
         self.inset_tr = []
+        self.preview_fcn = None
+        self.preview_req = None
+        self.preview_worker = None
 
         # property class fields
         self.gen_props = None
@@ -258,6 +263,7 @@ class TracePlot(TraceLabelMixin, PlotWidget):
         self.main_trace = PlotCurveItem(pen=self.l_pen_trace, skipFiniteCheck=False)
         self.inset_trace = PlotCurveItem(pen=self.l_pen_inset, skipFiniteCheck=False)
         self.highlight_trace = PlotCurveItem(pen=self.l_pen_high, skipFiniteCheck=False)
+        self.preview_trace = PlotCurveItem(pen=self.l_pen_preview, skipFiniteCheck=False)
 
         # sets up the plot regions
         self.setup_subplots(n_r=2, n_c=2)
@@ -314,6 +320,7 @@ class TracePlot(TraceLabelMixin, PlotWidget):
         self.h_plot[0, 0].addItem(self.main_trace)
         self.h_plot[0, 0].addItem(self.inset_trace)
         self.h_plot[0, 0].addItem(self.highlight_trace)
+        self.h_plot[0, 0].addItem(self.preview_trace)
         self.h_plot[0, 0].addItem(self.hm_label)
         self.h_plot[0, 0].addItem(self.hm_roi)
 
@@ -733,6 +740,9 @@ class TracePlot(TraceLabelMixin, PlotWidget):
                     self.update_trace(self.main_trace, ~self.inset_tr)
                     self.update_trace(self.inset_trace, self.inset_tr)
 
+                # resets the preprocessing preview traces (if previewing)
+                self.update_preview_trace(channel_id, use_diff)
+
                 # spike marker update
                 # if (self.spike_props is not None):
                 if (self.spike_props is not None) and self.show_spikes:
@@ -778,6 +788,11 @@ class TracePlot(TraceLabelMixin, PlotWidget):
         self.main_trace.hide() if is_map else self.main_trace.show()
         self.inset_trace.hide() if is_map else self.inset_trace.show()
 
+        # the preview traces are only shown in trace mode (any outstanding preview request is discarded)
+        if is_map or (self.preview_fcn is None):
+            self.preview_req = None
+            self.preview_trace.clear()
+
     def update_trace(self, h_trace, is_tr=None):
 
         # clears the trace
@@ -797,6 +812,88 @@ class TracePlot(TraceLabelMixin, PlotWidget):
                 connect=self.c_tr[is_tr, :].flatten(),
             )
 
+    def update_preview_trace(self, channel_id, use_diff):
+
+        # clears the preview trace
+        self.preview_trace.clear()
+        if self.preview_fcn is None:
+            self.preview_req = None
+            return
+
+        # sets the preview request (the trace layout is stored, as the view can change before the preview is set)
+        self.preview_req = (self.preview_fcn, self.i_frm0, self.i_frm1, channel_id, use_diff, self.x_tr, self.c_tr)
+
+        # starts the preview worker (if running, the latest request is calculated once the current one finishes)
+        if self.preview_worker is None:
+            self.start_preview_worker()
+
+    def start_preview_worker(self):
+
+        # calculates the preview signals off the GUI thread
+        self.preview_worker = ThreadWorker(self, self.calc_preview_trace, self.preview_req)
+        self.preview_worker.finished.connect(self.preview_worker_finished)
+        self.preview_worker.start()
+
+    def preview_worker_finished(self):
+
+        # retrieves the preview signals (the worker is released)
+        p_worker, self.preview_worker = self.preview_worker, None
+        p_future = p_worker.future
+        y0 = p_future.result() if (p_future.done() and (p_future.exception() is None)) else None
+        p_worker.deleteLater()
+
+        if p_worker.work_para is not self.preview_req:
+            # case is the view has changed since the request (the latest request is calculated instead)
+            if self.preview_req is not None:
+                self.start_preview_worker()
+
+        elif y0 is not None:
+            # otherwise, updates the preview trace
+            self.set_preview_trace(y0, *self.preview_req[4:])
+
+    def set_preview_trace(self, y0, use_diff, x_tr, c_tr):
+
+        # calculates the signal difference (if using difference calc)
+        if use_diff:
+            y0 = np.diff(y0, axis=0)
+
+        # exits if the preview doesn't match the trace frames
+        if y0.shape[0] != x_tr.shape[1]:
+            return
+
+        if self.trace_props.get('scale_signal'):
+            # case is scaling to the preview signal range
+            y_lo, y_hi = np.floor(np.min(y0)), np.ceil(np.max(y0))
+            y_hi = max(y_hi, y_lo + 1)
+
+        else:
+            # case is using fixed lower/upper limits
+            y_lo, y_hi = self.c_lim_lo, self.c_lim_hi
+            y0 = np.minimum(np.maximum(y0, self.c_lim_lo), self.c_lim_hi)
+
+        # calculates the scaled traces (these are placed in the gap above each original trace)
+        y_scl = ((y0 - y_lo) / (y_hi - y_lo)).T
+        y_tr = (np.arange(y0.shape[1]).reshape(-1, 1) * self.y_gap + 1 + self.y_ofs / 2) + (1 - self.y_ofs) * y_scl
+
+        self.preview_trace.setData(
+            x_tr.flatten(),
+            y_tr.flatten(),
+            connect=c_tr.flatten()
+        )
+
+    @staticmethod
+    def calc_preview_trace(p_req):
+
+        # calculates the preview signals for the requested frames/channels
+        preview_fcn, i_frm0, i_frm1, channel_id = p_req[:4]
+        return preview_fcn(i_frm0, i_frm1, channel_id)
+
+    def set_preview_fcn(self, preview_fcn):
+
+        # sets the preview function and resets the trace view
+        self.preview_fcn = preview_fcn
+        self.reset_trace_view()
+
     # ---------------------------------------------------------------------------
     # Mouse Movement Functions
     # ---------------------------------------------------------------------------
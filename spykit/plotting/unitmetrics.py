@@ -1,6 +1,5 @@
 # module import
 import os
-import time
 import math
 import colorsys
 import numpy as np
@@ -11,6 +10,7 @@ from functools import partial as pfcn
 import spykit.common.common_func as cf
 import spykit.common.common_widget as cw
 from spykit.threads.utils import ThreadWorker
+from spykit.common.memory_manager import mem_manager, get_array_bytes
 from spykit.plotting.utils import (PlotWidget, PlotLayout, UnitPlotLayout, x_gap, setup_default_layout)
 
 # pyqt6 module import
@@ -1075,11 +1075,13 @@ class AutoCorrelPlot(UnitPlotLayout):
 
     def cc_gram_finished(self, _):
 
+        # updates the cc-gram cache footprint
+        mem_manager.update(self, get_array_bytes(self.cc_gram))
+
         # re-shows the plot widget
         self.show()
         if self.i_unit > 1:
             self.set_prog_state(False)
-            time.sleep(0.1)
 
         # re-runs the update function
         self.update_cc_gram()
@@ -1110,8 +1112,17 @@ class AutoCorrelPlot(UnitPlotLayout):
         self.y_tauR = q_met[:, self.unit_props.get_metric_col_index('fractionRPVs_estimatedTauR')]
 
         # memory allocation
-        self.cc_gram = np.empty(q_met.shape[0], dtype=object)
-        self.cc_gram_mu = np.zeros(q_met.shape[0], dtype=float)
+        self.clear_cc_gram_cache()
+
+        # registers the cc-gram cache with the memory manager
+        mem_manager.register(self, 'Auto-Correlogram Cache', self.clear_cc_gram_cache)
+
+    def clear_cc_gram_cache(self):
+
+        # memory allocation
+        n_unit = self.unit_props.get_field('q_met').shape[0]
+        self.cc_gram = np.empty(n_unit, dtype=object)
+        self.cc_gram_mu = np.zeros(n_unit, dtype=float)
 
     def get_err_flags(self):
 
@@ -1170,6 +1181,14 @@ class SpikeActivityPlot(UnitPlotLayout):
         self.xi_freq = np.linspace(0, self.t_dur, self.n_bin + 1)
 
         # other class fields
+        self.clear_spike_cache()
+
+        # registers the spike time cache with the memory manager
+        mem_manager.register(self, 'Spike Activity Cache', self.clear_spike_cache)
+
+    def clear_spike_cache(self):
+
+        # memory allocation
         n_unit = self.unit_props.get_field('q_met').shape[0]
         self.s_freq = np.empty((n_unit, 2), dtype=object)
         self.t_spike = np.empty((n_unit, 3), dtype=object)
@@ -1292,6 +1311,13 @@ class SpikeActivityPlot(UnitPlotLayout):
             self.s_freq[i_unit_f, 0] = (x[1:] + x[:-1]) / 2
             self.s_freq[i_unit_f, 1] = self.n_bin * n_count / self.t_dur
 
+            # updates the spike time cache footprint
+            mem_manager.update(self, get_array_bytes(self.t_spike) + get_array_bytes(self.s_freq))
+
+        else:
+            # flags the cache as being recently used
+            mem_manager.touch(self)
+
         # updates the feasible plot spikes
         x, y, is_ok = self.t_spike[i_unit_f, :]
         self.plot_spike.setData(x[is_ok], y[is_ok])
@@ -1,5 +1,4 @@
 # module import
-import time
 import numpy as np
 import pandas as pd
 from functools import partial as pfcn
@@ -7,6 +6,7 @@ from functools import partial as pfcn
 # spike pipeline imports
 import spykit.common.common_func as cf
 import spykit.common.common_widget as cw
+from spykit.common.memory_manager import mem_manager, get_array_bytes
 from spykit.props.utils import PropWidget, PropPara
 from spykit.widgets.unit_filter import UnitFilterDialog
 
@@ -173,7 +173,7 @@ class TraceSpikeMixin:
         i_channel = int(self.ch_spk[i_spk_hover])
 
         # determines the spike index
-        spk_info = self.i_spike_info[self.i_run, self.i_shank]
+        spk_info = self.get_unit_spike_info()
         i_ofs = spk_info['i_ofs'][i_unit]
         i_spk_unit = spk_info['i_spike'][i_ofs:(i_ofs+spk_info['n_spike'][i_unit]+1)]
         ind_spike = np.argmin(np.abs(i_spk_unit - self.x_spk[i_spk_hover] * self.s_freq))
@@ -264,7 +264,7 @@ class TraceSpikeMixin:
         # field retrieval
         i_unit = self.get_unit_index(self.i_row_sel) - 1
         i_spike = int(self.get_para_value('i_spike')) - 1
-        sp_info = self.i_spike_info[self.i_run, self.i_shank]
+        sp_info = self.get_unit_spike_info()
 
         # determines the time frame of the corresponding spike
         d_frm = self.trace_view.i_frm1 - self.trace_view.i_frm0
@@ -558,6 +558,7 @@ class TraceSpikeProps(TraceSpikeMixin, PropWidget):
 
         # exit if already setup
         if self.i_spike_info[self.i_run, self.i_shank] is not None:
+            mem_manager.touch(self)
             return
 
         # field retrieval
@@ -572,7 +573,18 @@ class TraceSpikeProps(TraceSpikeMixin, PropWidget):
             'i_spike': i_spike[np.lexsort((i_spike, spk_clust))],
         }
 
-        pass
+        # updates the spike information cache footprint
+        mem_manager.update(self, get_array_bytes(self.i_spike_info))
+
+    def get_unit_spike_info(self):
+
+        # ensures the spike information is set up (may have been evicted)
+        self.setup_unit_spike_info()
+        return self.i_spike_info[self.i_run, self.i_shank]
+
+    def clear_unit_spike_info(self):
+
+        self.i_spike_info = np.empty(self.n_unit_pp.shape, dtype=object)
 
     def setup_spike_table(self):
 
@@ -580,7 +592,10 @@ class TraceSpikeProps(TraceSpikeMixin, PropWidget):
         self.n_unit = self.get_field('n_unit')
         self.n_unit_pp = self.session_obj.post_data.n_unit_pp
         self.data = np.empty(self.n_unit_pp.shape, dtype=object)
-        self.i_spike_info = np.empty(self.n_unit_pp.shape, dtype=object)
+        self.clear_unit_spike_info()
+
+        # registers the spike information cache with the memory manager
+        mem_manager.register(self, 'Unit Spike Index Cache', self.clear_unit_spike_info)
 
         # unit selection memory allocation
         self.is_filt = np.empty(self.n_unit_pp.shape, dtype=object)
@@ -599,7 +614,6 @@ class TraceSpikeProps(TraceSpikeMixin, PropWidget):
         # flag that manual update is taking place
         self.is_updating = True
         self.is_table_init = True
-        time.sleep(0.05)
 
         # clears the table model
         self.table.clear()
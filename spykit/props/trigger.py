@@ -9,6 +9,7 @@ from functools import partial as pfcn
 import spykit.common.common_func as cf
 import spykit.common.common_widget as cw
 from spykit.props.utils import PropWidget, PropPara
+from spykit.common.session_journal import session_journal
 
 # pyqt imports
 from PyQt6.QtWidgets import QTableWidget, QHeaderView
@@ -109,17 +110,17 @@ class TriggerPara(PropPara):
     def add_row(self, i_run, nw_row):
 
         self.t_arr[i_run].add_row(nw_row)
-        self.region_index[i_run] = self.t_arr[i_run].data
+        self.update_region_index(i_run)
 
     def remove_row(self, i_run, i_row):
 
         self.t_arr[i_run].remove_row(i_row)
-        self.region_index[i_run] = self.t_arr[i_run].data
+        self.update_region_index(i_run)
 
     def set(self, i_run, i_row, i_col, value):
 
         self.t_arr[i_run].set(i_row, i_col, value)
-        self.region_index[i_run] = self.t_arr[i_run].data
+        self.update_region_index(i_run)
 
     def set_arr(self, i_run, i_row, i_col, values):
 
@@ -129,12 +130,18 @@ class TriggerPara(PropPara):
         else:
             self.t_arr[i_run].data[i_row, i_col] = values
 
-        self.region_index[i_run] = self.t_arr[i_run].data
+        self.update_region_index(i_run)
 
     def get(self, i_run, i_row, i_col):
 
         return self.t_arr[i_run].get(i_row, i_col)
 
+    def update_region_index(self, i_run):
+
+        # resets the region indices and records the edit in the autosave journal
+        self.region_index[i_run] = self.t_arr[i_run].data
+        session_journal.record('prop', ['trigger', 'region_index', i_run], self.t_arr[i_run].data)
+
     # ---------------------------------------------------------------------------
     # Table Array Functions
     # ---------------------------------------------------------------------------
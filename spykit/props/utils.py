@@ -9,6 +9,7 @@ import spykit.props.prop_type as ppt
 import spykit.common.common_func as cf
 import spykit.common.common_widget as cw
 from spykit.threads.utils import ThreadWorker
+from spykit.common.session_journal import session_journal
 
 # pyqt imports
 from PyQt6.QtWidgets import (QWidget, QLineEdit, QComboBox, QCheckBox, QPushButton, QSizePolicy, QVBoxLayout,
@@ -24,6 +25,9 @@ x_gap = 5
 x_gap2 = 2 * x_gap
 x_gap_h = 2
 
+# journalled property tab types (mapped to the session property parameter keys)
+j_prop_type = {'general': 'general', 'traceview': 'trace', 'trigger': 'trigger'}
+
 # ----------------------------------------------------------------------------------------------------------------------
 
 """
@@ -453,7 +457,6 @@ class PropManager(QObject):
 
         # updates the class fields
         unit_tab.df_unit, unit_tab.c_hdr, unit_tab.unit_lbl = thread_data
-        time.sleep(0.01)
 
         # applies the unit status filter
         unit_tab.update_unit_status()
@@ -613,9 +616,6 @@ class PropManager(QObject):
         self.create_spike_table()
         self.set_spike_table_data()
 
-        # pause for a little bit...
-        time.sleep(0.05)
-
     def create_spike_table(self):
 
         # field retrieval
@@ -1375,6 +1375,10 @@ class PropWidget(QWidget):
         else:
             setattr(self.p_props, p_fld, p_value)
 
+        # records the parameter edit in the autosave journal (session fields only)
+        if (self.p_type in j_prop_type) and (p_fld in self.p_info['ch_fld']):
+            session_journal.record('prop', [j_prop_type[self.p_type], p_fld, i_run], p_value)
+
     def set_n(self, p_fld, p_value, i_run=None):
 
         # flag that manual updating is taking place
@@ -0,0 +1,101 @@
+# module import
+import os
+import time
+import shutil
+import argparse
+import tempfile
+
+# spykit module import
+import spykit.common.spikeinterface_func as sf
+from spykit.common.directory_index import DirectoryIndex
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+# benchmark tree dimensions (subjects x sessions x runs, with the extra levels this gives ~100k directories)
+n_sub_def = 250
+n_ses_def = 40
+n_run_def = 8
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def create_benchmark_tree(f_path, n_sub, n_ses, n_run):
+    """Creates a spikeglx format directory tree (rawdata/sub/ses/ephys/run) under the path, f_path"""
+
+    # initialisations
+    n_dir = 0
+    raw_path = os.path.join(f_path, 'project', 'rawdata')
+
+    for i_sub in range(n_sub):
+        for i_ses in range(n_ses):
+            # creates the session ephys directory
+            ephys_path = os.path.join(raw_path, 'sub-{:03d}'.format(i_sub), 'ses-{:03d}'.format(i_ses), 'ephys')
+            os.makedirs(ephys_path, exist_ok=True)
+            n_dir += 2
+
+            # creates the run directories
+            for i_run in range(n_run):
+                os.makedirs(os.path.join(ephys_path, 'run-{:03d}_g0_imec0'.format(i_run)), exist_ok=True)
+                n_dir += 1
+
+        n_dir += 1
+
+    return n_dir + 2
+
+
+def run_benchmark(f_path, n_rep, d_index=None):
+    """Runs the feasible folder search on the directory tree, f_path, and returns the search times"""
+
+    # memory allocation
+    t_run = []
+
+    for i_rep in range(n_rep):
+        # runs the directory check
+        t_start = time.perf_counter()
+        obj_dir = sf.DirectoryCheck(f_path, 'spikeglx', d_index)
+        obj_dir.det_all_feas_folders()
+        t_run.append(time.perf_counter() - t_start)
+
+    return t_run, len(obj_dir.t_list)
+
+
+def main():
+
+    # sets up the argument parser
+    parser = argparse.ArgumentParser(description='Spykit DirectoryCheck folder search benchmark')
+    parser.add_argument('--path', default=None, help='tree directory (a temporary tree is created if not set)')
+    parser.add_argument('--n_sub', type=int, default=n_sub_def, help='subject folder count')
+    parser.add_argument('--n_ses', type=int, default=n_ses_def, help='session folder count (per subject)')
+    parser.add_argument('--n_run', type=int, default=n_run_def, help='run folder count (per session)')
+    parser.add_argument('--n_rep', type=int, default=3, help='benchmark repetition count')
+    parser.add_argument('--keep', action='store_true', help='keeps the generated directory tree')
+    parser.add_argument('--index', action='store_true', help='runs the search with a persistent directory index')
+    args = parser.parse_args()
+
+    # creates the benchmark directory tree
+    f_path = tempfile.mkdtemp(prefix='spykit_dir_') if (args.path is None) else args.path
+    t_start = time.perf_counter()
+    n_dir = create_benchmark_tree(f_path, args.n_sub, args.n_ses, args.n_run)
+    print('Created {0} directories in {1:.1f}s ({2})'.format(n_dir, time.perf_counter() - t_start, f_path))
+
+    try:
+        # runs the benchmark (the first run is a cold run, unless the tree is already cached)
+        t_run, n_path = run_benchmark(f_path, args.n_rep)
+        for i_rep, t in enumerate(t_run):
+            print('Run #{0}: {1:.3f}s ({2:.0f} dir/s, {3} paths)'.format(i_rep + 1, t, n_dir / t, n_path))
+
+        if args.index:
+            # runs the benchmark with the directory index (the first run builds the index)
+            d_index = DirectoryIndex()
+            t_run, n_path = run_benchmark(f_path, args.n_rep, d_index)
+            for i_rep, t in enumerate(t_run):
+                print('Indexed Run #{0}: {1:.3f}s ({2} paths)'.format(i_rep + 1, t, n_path))
+
+    finally:
+        # removes the benchmark directory tree
+        if (args.path is None) and (not args.keep):
+            shutil.rmtree(f_path, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+# module import
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import threading
+
+# spykit module import
+from spykit.testing.preprocess_benchmark import create_recording, get_system_info
+from spykit.common.recording_export import (create_export, benchmark_read, export_formats, blosc_cnames,
+                                            zarr_filters)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+# benchmark dimensions
+n_channel_def = 384
+t_dur_def = 30.
+dtype_def = ['int16', 'float32']
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def setup_cases(args):
+    """Sets up the benchmark cases (the binary format, and the zarr format over each compressor/filter)"""
+
+    b_case = []
+    for dtype in args.dtype:
+        # binary format case
+        b_case.append({'format': 'binary', 'cname': None, 'filter': None, 'dtype': dtype})
+
+        # zarr format cases
+        if 'zarr' in export_formats:
+            for cname in args.cname:
+                for f_type in zarr_filters:
+                    b_case.append({'format': 'zarr', 'cname': cname, 'filter': f_type, 'dtype': dtype})
+
+    return b_case
+
+
+def run_case(b_case, args, out_dir):
+    """Runs a single export case, and returns the compression ratio and the write/read-back throughput"""
+
+    # initialisations
+    b_result = dict(b_case)
+    rec = create_recording(args.n_channels, b_case['dtype'], args.t_dur)
+    c_folder = tempfile.mkdtemp(dir=out_dir)
+
+    try:
+        # runs the export
+        exp = create_export(rec, c_folder, 'benchmark', args.chunk_duration, b_case['format'],
+                            b_case['cname'], b_case['filter'])
+        exp.run(args.n_jobs, threading.BoundedSemaphore(args.n_jobs))
+
+        # sets the export statistics
+        w_stats = exp.get_write_stats()
+        b_result.update({
+            'ratio': w_stats['ratio'],
+            'write_mb_per_s': w_stats['rate_mb'],
+            'read_mb_per_s': benchmark_read(exp.folder),
+        })
+
+    except Exception as e:
+        # case is the export failed
+        b_result['error'] = '{0}: {1}'.format(type(e).__name__, e)
+
+    finally:
+        # removes the export output
+        shutil.rmtree(c_folder, ignore_errors=True)
+
+    return b_result
+
+
+def main():
+
+    # sets up the argument parser
+    parser = argparse.ArgumentParser(description='Spykit preprocessed data export format benchmark')
+    parser.add_argument('--n_channels', type=int, default=n_channel_def, help='channel count')
+    parser.add_argument('--t_dur', type=float, default=t_dur_def, help='synthetic recording duration (s)')
+    parser.add_argument('--dtype', nargs='+', default=dtype_def, help='recording data types')
+    parser.add_argument('--cname', nargs='+', default=blosc_cnames, help='blosc compressor names')
+    parser.add_argument('--chunk_duration', type=float, default=1., help='chunk duration (s)')
+    parser.add_argument('--n_jobs', type=int, default=1, help='job count')
+    parser.add_argument('--out_dir', default=None, help='export folder (e.g., on the shared storage)')
+    parser.add_argument('--out', default=None, help='output JSON file (the results are printed if not set)')
+    args = parser.parse_args()
+
+    # initialisations
+    b_case = setup_cases(args)
+    b_data = {'system': get_system_info(), 'results': []}
+
+    # runs the benchmark cases
+    for i_case, bc in enumerate(b_case):
+        b_result = run_case(bc, args, args.out_dir)
+        b_data['results'].append(b_result)
+
+        # outputs the case summary
+        c_name = bc['format'] if (bc['cname'] is None) else '{0} ({1}, {2})'.format(bc['format'], bc['cname'],
+                                                                                   bc['filter'])
+        c_str = 'Case #{0}/{1}: {2} [{3}]'.format(i_case + 1, len(b_case), c_name, bc['dtype'])
+        if 'error' in b_result:
+            print('{0} - {1}'.format(c_str, b_result['error']), file=sys.stderr)
+        else:
+            print('{0} - x{1:.2f}, write {2:.0f} MB/s, read {3:.0f} MB/s'.format(
+                c_str, b_result['ratio'], b_result['write_mb_per_s'], b_result['read_mb_per_s']), file=sys.stderr)
+
+    # outputs the benchmark results
+    if args.out is None:
+        print(json.dumps(b_data, indent=2))
+
+    else:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(b_data, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+# module import
+import sys
+import shutil
+import argparse
+import tempfile
+import threading
+import numpy as np
+from pathlib import Path
+
+# spikeinterface module import
+import spikeinterface as si
+
+# spykit module import
+from spykit.common.dtype_policy import DtypePolicy
+from spykit.testing.preprocess_benchmark import create_recording
+from spykit.common.recording_export import create_export, benchmark_read, export_formats
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+# synthetic recording dimensions
+n_channel_def = 32
+t_dur_def = 5.
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def check_round_trip(out_dir, f_format, n_channel, t_dur):
+    """Checks an export (of a requantised float recording) is loaded by si.load with matching traces/gains, including
+       after the export folder has been moved"""
+
+    # initialisations
+    e_str = []
+    rec, _ = DtypePolicy().requantise(create_recording(n_channel, 'float32', t_dur))
+
+    # runs the export
+    exp = create_export(rec, Path(out_dir, f_format), f_format, 1., f_format)
+    exp.run(2, threading.BoundedSemaphore(2))
+    if not exp.is_complete():
+        return ['{0} export did not complete'.format(f_format)]
+
+    # moves the export folder (the export must only hold relative paths)
+    m_folder = exp.folder.with_name('moved-' + exp.folder.name)
+    shutil.move(exp.folder, m_folder)
+
+    try:
+        # loads the exported recording
+        rec_exp = si.load(m_folder)
+
+    except Exception as e:
+        return ['{0} export could not be loaded ({1}: {2})'.format(f_format, type(e).__name__, e)]
+
+    # checks the loaded recording
+    if not np.array_equal(rec_exp.get_traces(), rec.get_traces()):
+        e_str.append('{0} export traces do not match'.format(f_format))
+
+    if not np.allclose(rec_exp.get_channel_gains(), rec.get_channel_gains()):
+        e_str.append('{0} export channel gains do not match'.format(f_format))
+
+    if not np.array_equal(rec_exp.get_channel_ids(), rec.get_channel_ids()) or (not rec_exp.has_probe()):
+        e_str.append('{0} export channels/probe do not match'.format(f_format))
+
+    try:
+        # runs the read-back benchmark
+        benchmark_read(m_folder, n_chunk=2)
+
+    except Exception as e:
+        e_str.append('{0} export read-back failed ({1}: {2})'.format(f_format, type(e).__name__, e))
+
+    return e_str
+
+
+def check_cancel_resume(out_dir, f_format, n_channel, t_dur):
+    """Checks a cancelled export is incomplete (stopping before all chunks are written), and that the resumed export
+       only writes the remaining chunks"""
+
+    # initialisations
+    e_str, n_prog = [], [0]
+    rec, _ = DtypePolicy().requantise(create_recording(n_channel, 'float32', t_dur))
+
+    def prog_fcn():
+
+        n_prog[0] += 1
+
+    # runs the export (cancelled after the first chunk)
+    exp = create_export(rec, Path(out_dir, 'cancel-' + f_format), f_format, 0.5, f_format)
+    exp.run(1, threading.BoundedSemaphore(1), prog_fcn, lambda: n_prog[0] > 0)
+    if exp.is_complete() or (exp.n_done != 1):
+        return ['{0} export was not cancelled (chunks written = {1})'.format(f_format, exp.n_done)]
+
+    # resumes the export
+    n_prog[0] = 0
+    exp = create_export(rec, exp.folder, f_format, 0.5, f_format)
+    exp.run(2, threading.BoundedSemaphore(2), prog_fcn)
+    if not exp.is_complete():
+        return ['{0} resumed export did not complete'.format(f_format)]
+
+    if n_prog[0] != (len(exp.chunk) - 1):
+        e_str.append('{0} resumed export rewrote the previously written chunks'.format(f_format))
+
+    if not np.array_equal(si.load(exp.folder).get_traces(), rec.get_traces()):
+        e_str.append('{0} resumed export traces do not match'.format(f_format))
+
+    return e_str
+
+
+def main():
+
+    # sets up the argument parser
+    parser = argparse.ArgumentParser(description='Spykit preprocessed data export check')
+    parser.add_argument('--n_channel', type=int, default=n_channel_def, help='synthetic recording channel count')
+    parser.add_argument('--t_dur', type=float, default=t_dur_def, help='synthetic recording duration (s)')
+    args = parser.parse_args()
+
+    # runs the checks (for each export format)
+    out_dir, e_str = tempfile.mkdtemp(), []
+    try:
+        for f_format in export_formats:
+            e_str += check_round_trip(out_dir, f_format, args.n_channel, args.t_dur)
+            e_str += check_cancel_resume(out_dir, f_format, args.n_channel, args.t_dur)
+
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+    # outputs the check results
+    for es in e_str:
+        print(es, file=sys.stderr)
+
+    print('Export check: {0}'.format('failed' if len(e_str) else 'passed'))
+    sys.exit(1 if len(e_str) else 0)
+
+
+if __name__ == '__main__':
+    main()
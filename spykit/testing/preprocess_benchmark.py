@@ -0,0 +1,257 @@
+# module import
+import os
+import sys
+import json
+import time
+import queue
+import argparse
+import platform
+import numpy as np
+import multiprocessing as mp
+
+# spikeinterface module import
+import spikeinterface as si
+from spikeinterface.core import NumpyRecording
+from spikeinterface.core.generate import generate_recording
+
+# spykit module import
+from spykit.info.preprocess import RunPreProcessing
+from spykit.common.dtype_policy import DtypePolicy
+
+try:
+    # peak memory usage is read from the resource usage (not available on windows)
+    import resource
+
+except ImportError:
+    resource = None
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+# synthetic recording parameters
+s_freq_def = 30000.
+t_dur_def = 10.
+y_noise_def = 50.
+
+# benchmark dimensions
+n_channel_def = [64, 384]
+t_chunk_def = [0.5, 1.]
+dtype_def = ['int16', 'float32']
+n_jobs_def = [1, os.cpu_count() or 1]
+
+# benchmark step parameters (these match the preprocessing info tab defaults)
+step_para = {
+    'phase_shift': {'margin_ms': 40},
+    'bandpass_filter': {'freq_min': 300, 'freq_max': 6000, 'margin_ms': 5},
+    'common_reference': {'operator': 'median', 'reference': 'global'},
+    'remove_channels': {},
+    'interpolate_channels': {},
+    'drift_correct': {'preset': 'dredge_fast'},
+}
+
+# benchmark step chains (these are run in addition to the individual steps)
+step_chain = {
+    'standard': ['phase_shift', 'bandpass_filter', 'common_reference'],
+    'bad_channel': ['phase_shift', 'bandpass_filter', 'interpolate_channels', 'common_reference'],
+    'full': ['phase_shift', 'bandpass_filter', 'interpolate_channels', 'common_reference', 'drift_correct'],
+}
+
+# bad channel count (used for the channel removal/interpolation steps)
+n_bad_ch = 4
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def create_recording(n_channel, dtype, t_dur=t_dur_def, s_freq=s_freq_def):
+    """Creates a synthetic in-memory recording (with probe/phase shift information) of the given size/data type"""
+
+    # creates the noise recording (this sets up the probe/channel locations)
+    rec_gen = generate_recording(num_channels=n_channel, sampling_frequency=s_freq, durations=[t_dur], seed=0)
+    y_rec = rec_gen.get_traces() * (y_noise_def / np.std(rec_gen.get_traces(end_frame=int(s_freq))))
+
+    # sets up the recording with the required data type
+    rec = NumpyRecording([y_rec.astype(dtype)], s_freq, channel_ids=rec_gen.channel_ids)
+    rec = rec.set_probe(rec_gen.get_probe())
+    rec.set_property('inter_sample_shift', np.tile(np.linspace(0, 1, 13)[:-1], n_channel // 12 + 1)[:n_channel])
+
+    return rec
+
+
+def setup_step_para(pp_name, rec):
+    """Returns the benchmark parameters for the preprocessing step, pp_name"""
+
+    pp_opt = dict(step_para[pp_name])
+    if pp_name in ['remove_channels', 'interpolate_channels']:
+        # case is a bad channel step (the first channels are set as the bad channels)
+        pp_opt['channel_ids'] = rec.channel_ids[:n_bad_ch]
+
+    return pp_opt
+
+
+def run_steps(rec, pp_steps, t_chunk, n_jobs):
+    """Runs the preprocessing steps, pp_steps, on the recording and materialises the output into memory"""
+
+    # the steps use the session data type policy
+    dtype_policy = DtypePolicy()
+
+    for pp_name in pp_steps:
+        pp_opt = dtype_policy.get_step_opt(pp_name, setup_step_para(pp_name, rec))
+        if pp_name == 'drift_correct':
+            # special case - the motion correction uses the job parameters
+            pp_opt.update({'n_jobs': n_jobs, 'chunk_duration': '{0}s'.format(t_chunk), 'progress_bar': False})
+
+        rec_in = dtype_policy.get_step_input(rec, pp_name)
+        rec = dtype_policy.get_step_output(RunPreProcessing.pp_funcs[pp_name](rec_in, **pp_opt), rec, pp_name)
+
+    # materialises the preprocessed recording (the lazy steps are evaluated over all chunks)
+    return rec.save(format='memory', n_jobs=n_jobs, chunk_duration='{0}s'.format(t_chunk), progress_bar=False)
+
+
+def run_case(b_case, r_queue):
+    """Runs a single benchmark case (in a separate process, so the peak memory usage is specific to the case)"""
+
+    # initialisations
+    b_result = dict(b_case)
+
+    try:
+        # creates the synthetic recording
+        rec = create_recording(b_case['n_channels'], b_case['dtype'], b_case['t_dur'])
+        n_frm = rec.get_num_frames()
+
+        # runs the preprocessing steps (for each repetition)
+        t_run = []
+        for i_rep in range(b_case['n_rep']):
+            t_start = time.perf_counter()
+            run_steps(rec, b_case['steps'], b_case['chunk_duration'], b_case['n_jobs'])
+            t_run.append(time.perf_counter() - t_start)
+
+        # sets the throughput values
+        b_result.update({
+            't_run': t_run,
+            't_min': min(t_run),
+            'samples_per_s': n_frm / min(t_run),
+            'channel_samples_per_s': n_frm * b_case['n_channels'] / min(t_run),
+        })
+
+    except Exception as e:
+        # case is the step couldn't be run (e.g., motion estimation failure)
+        b_result['error'] = '{0}: {1}'.format(type(e).__name__, e)
+
+    # sets the peak memory usage
+    b_result.update(get_peak_rss())
+    r_queue.put(b_result)
+
+
+def get_peak_rss():
+    """Returns the peak resident set size (in MB) of the process and its (job) child processes"""
+
+    if resource is None:
+        return {'rss_peak_mb': None, 'rss_child_peak_mb': None}
+
+    # the maximum resident set size is in bytes on macos (kilobytes otherwise)
+    mb_scl = 2 ** 20 if (sys.platform == 'darwin') else 2 ** 10
+    return {
+        'rss_peak_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / mb_scl,
+        'rss_child_peak_mb': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / mb_scl,
+    }
+
+
+def setup_cases(args):
+    """Sets up the benchmark cases (individual steps and step chains over each benchmark dimension)"""
+
+    # sets the step/chain groups
+    s_group = [(pp_name, None, [pp_name]) for pp_name in args.steps]
+    if not args.no_chains:
+        s_group += [('chain', c_name, c_steps) for c_name, c_steps in step_chain.items()
+                    if all([x in args.steps for x in c_steps])]
+
+    # sets up the benchmark cases
+    b_case = []
+    for step, chain, steps in s_group:
+        for n_ch in args.n_channels:
+            for t_chunk in args.chunk_duration:
+                for dtype in args.dtype:
+                    for n_jobs in args.n_jobs:
+                        b_case.append({
+                            'step': step,
+                            'chain': chain,
+                            'steps': steps,
+                            'n_channels': n_ch,
+                            'chunk_duration': t_chunk,
+                            'dtype': dtype,
+                            'n_jobs': n_jobs,
+                            't_dur': args.t_dur,
+                            'n_rep': args.n_rep,
+                        })
+
+    return b_case
+
+
+def get_system_info():
+    """Returns the benchmark system information"""
+
+    return {
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'spikeinterface': si.__version__,
+        'numpy': np.__version__,
+    }
+
+
+def main():
+
+    # sets up the argument parser
+    parser = argparse.ArgumentParser(description='Spykit preprocessing step throughput benchmark')
+    parser.add_argument('--steps', nargs='+', default=list(RunPreProcessing.pp_funcs), help='preprocessing steps')
+    parser.add_argument('--n_channels', nargs='+', type=int, default=n_channel_def, help='channel counts')
+    parser.add_argument('--chunk_duration', nargs='+', type=float, default=t_chunk_def, help='chunk durations (s)')
+    parser.add_argument('--dtype', nargs='+', default=dtype_def, help='recording data types')
+    parser.add_argument('--n_jobs', nargs='+', type=int, default=n_jobs_def, help='job counts')
+    parser.add_argument('--t_dur', type=float, default=t_dur_def, help='synthetic recording duration (s)')
+    parser.add_argument('--n_rep', type=int, default=1, help='benchmark repetition count')
+    parser.add_argument('--no_chains', action='store_true', help='only runs the individual steps')
+    parser.add_argument('--out', default=None, help='output JSON file (the results are printed if not set)')
+    args = parser.parse_args()
+
+    # initialisations
+    b_case = setup_cases(args)
+    b_data = {'system': get_system_info(), 'results': []}
+    mp_ctx = mp.get_context('spawn')
+
+    # runs the benchmark cases (each case is run in a new process)
+    for i_case, bc in enumerate(b_case):
+        r_queue = mp_ctx.Queue()
+        p_case = mp_ctx.Process(target=run_case, args=(bc, r_queue))
+        p_case.start()
+        p_case.join()
+
+        try:
+            # retrieves the case results
+            b_result = r_queue.get(timeout=1)
+
+        except queue.Empty:
+            # case is the process exited without results (e.g., it ran out of memory)
+            b_result = dict(bc, error='process exited with code {0}'.format(p_case.exitcode))
+
+        # outputs the case summary
+        b_data['results'].append(b_result)
+        c_name = bc['step'] if (bc['chain'] is None) else 'chain:{0}'.format(bc['chain'])
+        c_str = 'Case #{0}/{1}: {2} ({3}ch, {4}s, {5}, {6} jobs)'.format(
+            i_case + 1, len(b_case), c_name, bc['n_channels'], bc['chunk_duration'], bc['dtype'], bc['n_jobs'])
+        if 'error' in b_result:
+            print('{0} - {1}'.format(c_str, b_result['error']), file=sys.stderr)
+        else:
+            print('{0} - {1:.0f} samples/s'.format(c_str, b_result['samples_per_s']), file=sys.stderr)
+
+    # outputs the benchmark results
+    if args.out is None:
+        print(json.dumps(b_data, indent=2))
+
+    else:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(b_data, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+# module import
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import numpy as np
+
+# spikeinterface module import
+import spikeinterface as si
+import spikeinterface.extractors as se
+from spikeinterface.core.generate import generate_recording
+
+# spykit module import
+from spykit.info.preprocess import RunPreProcessing
+from spykit.common.preprocess_cache import PreprocessCache, prep_cache
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+# synthetic recording dimensions
+n_channel_def = 16
+t_dur_def = 2.
+
+# openephys recording node/stream names
+oe_node = 'Record Node 101'
+oe_stream = 'Acquisition_Board-100.Rhythm Data'
+
+# check step chain (step name, step parameters)
+step_chain = {
+    '1': ['bandpass_filter', {'freq_min': 300, 'freq_max': 6000, 'margin_ms': 5}],
+    '2': ['common_reference', {'operator': 'median', 'reference': 'global'}],
+}
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def write_recording(f_path, n_channel, t_dur):
+    """Writes a synthetic int16 binary folder recording, and returns the loaded recording"""
+
+    rec = generate_recording(num_channels=n_channel, durations=[t_dur], seed=0)
+    rec.astype('int16').save(format='binary', folder=f_path, progress_bar=False)
+
+    return si.read_binary_folder(f_path)
+
+
+def write_openephys_recording(f_path, n_channel, t_dur, seed):
+    """Writes a synthetic openephys binary format recording (the data files are held within the recording
+       sub-folders, below the record node settings), and returns the loaded recording"""
+
+    # writes the record node settings (these are the same for all recordings)
+    f_samp, n_sample = 30000., int(30000. * t_dur)
+    rec_path = os.path.join(f_path, oe_node, 'experiment1', 'recording1')
+    os.makedirs(os.path.join(rec_path, 'continuous', oe_stream))
+    with open(os.path.join(f_path, oe_node, 'settings.xml'), 'w') as f:
+        f.write('<SETTINGS><INFO><VERSION>0.6.0</VERSION></INFO></SETTINGS>')
+
+    # writes the stream structure information
+    ch_info = [{'channel_name': 'CH{0}'.format(i + 1), 'description': '', 'identifier': '', 'history': '',
+                'bit_volts': 0.195, 'units': 'uV'} for i in range(n_channel)]
+    s_info = {'folder_name': oe_stream + '/', 'sample_rate': f_samp, 'source_processor_name': 'Acquisition Board',
+              'source_processor_id': 100, 'stream_name': 'Rhythm Data', 'recorded_processor': 'Acquisition Board',
+              'recorded_processor_id': 100, 'num_channels': n_channel, 'channels': ch_info}
+    with open(os.path.join(rec_path, 'structure.oebin'), 'w') as f:
+        json.dump({'GUI version': '0.6.0', 'continuous': [s_info], 'events': [], 'spikes': []}, f)
+
+    # writes the stream data files
+    s_path = os.path.join(rec_path, 'continuous', oe_stream)
+    y = np.random.default_rng(seed).integers(-100, 100, (n_sample, n_channel)).astype(np.int16)
+    y.tofile(os.path.join(s_path, 'continuous.dat'))
+    np.save(os.path.join(s_path, 'sample_numbers.npy'), np.arange(n_sample, dtype=np.int64))
+    np.save(os.path.join(s_path, 'timestamps.npy'), np.arange(n_sample) / f_samp)
+
+    return se.read_openephys(f_path)
+
+
+def run_chain(rec):
+    """Runs the check step chain (with the step materialisation) on the recording"""
+
+    # sets up the preprocessing object
+    r_pp = RunPreProcessing(None)
+    r_pp.use_cache = True
+    r_pp.pp_steps_new = r_pp.pp_steps_tot = step_chain
+    r_pp.job_kw = {'n_jobs': 1, 'progress_bar': False}
+
+    # sets up the progress fields (for a single unit)
+    r_pp.pr_index, r_pp.pr_count = [(0, 0, 1)], np.zeros(1)
+    r_pp.update_prep_prog(0)
+
+    return r_pp.preprocess_recording({'0-raw': rec})
+
+
+def check_source_key(out_dir, n_channel, t_dur):
+    """Checks the raw recording key is unchanged if the recording is copied, but changes if the data changes"""
+
+    # initialisations
+    e_str = []
+    p_cache = PreprocessCache()
+    f_path = [os.path.join(out_dir, 'raw-{0}'.format(i)) for i in range(2)]
+
+    # writes the recording, and copies it (without the file modification times)
+    key_orig = p_cache.get_raw_key(write_recording(f_path[0], n_channel, t_dur))
+    shutil.copytree(f_path[0], f_path[1], copy_function=shutil.copyfile)
+
+    if p_cache.get_raw_key(si.read_binary_folder(f_path[1])) != key_orig:
+        e_str.append('raw recording key changed when the recording was copied')
+
+    # alters the recording data (keeping the file size)
+    with open(os.path.join(f_path[1], 'traces_cached_seg0.raw'), 'r+b') as f:
+        f.write(b'\xff\x7f')
+
+    if p_cache.get_raw_key(si.read_binary_folder(f_path[1])) == key_orig:
+        e_str.append('raw recording key was unchanged when the recording data changed')
+
+    return e_str
+
+
+def check_openephys_key(out_dir, n_channel, t_dur):
+    """Checks the openephys recording keys differ for different data (with the same record node settings), and are
+       unchanged if the recording is copied"""
+
+    # initialisations
+    e_str = []
+    p_cache = PreprocessCache()
+    f_path = [os.path.join(out_dir, 'oe-{0}'.format(i)) for i in range(3)]
+
+    # writes the recordings (the first two recordings only differ by the stream data)
+    key_rec = [p_cache.get_raw_key(write_openephys_recording(fp, n_channel, t_dur, i)) for i, fp in
+               enumerate(f_path[:2])]
+    if key_rec[0] == key_rec[1]:
+        e_str.append('openephys recordings with different data have the same raw recording key')
+
+    # copies the first recording
+    shutil.copytree(f_path[0], f_path[2], copy_function=shutil.copyfile)
+    if p_cache.get_raw_key(se.read_openephys(f_path[2])) != key_rec[0]:
+        e_str.append('openephys raw recording key changed when the recording was copied')
+
+    return e_str
+
+
+def check_materialise_error(out_dir, n_channel, t_dur):
+    """Checks a failed materialisation returns the lazy recording, and removes the temporary folder"""
+
+    # initialisations
+    e_str = []
+    p_cache = PreprocessCache(os.path.join(out_dir, 'cache-error'))
+    rec = write_recording(os.path.join(out_dir, 'raw-error'), n_channel, t_dur)
+
+    try:
+        # runs the materialisation (with invalid job parameters)
+        rec_c = p_cache.materialise(rec, p_cache.get_raw_key(rec), job_kw={'chunk_duration': 'invalid'})
+        if rec_c is not rec:
+            e_str.append('failed materialisation did not return the lazy recording')
+
+    except Exception as e:
+        e_str.append('failed materialisation raised {0}'.format(type(e).__name__))
+
+    if len(os.listdir(p_cache.cache_dir)):
+        e_str.append('failed materialisation left files in the cache directory')
+
+    return e_str
+
+
+def check_cached_step(out_dir, n_channel, t_dur):
+    """Checks only the steps after the deepest materialised step are materialised"""
+
+    # initialisations
+    e_str = []
+    cache_dir0 = prep_cache.cache_dir
+    prep_cache.cache_dir = os.path.join(out_dir, 'cache-step')
+    rec = write_recording(os.path.join(out_dir, 'raw-step'), n_channel, t_dur)
+
+    try:
+        # runs the step chain (all steps are materialised)
+        pp_data = run_chain(rec)
+        key_step = [prep_cache.get_recording_key(x) for x in list(pp_data.values())[1:]]
+        y_final = list(pp_data.values())[-1].get_traces()
+
+        if not all([prep_cache.has_entry(x) for x in key_step]):
+            e_str.append('preprocessing steps were not all materialised')
+
+        # removes the first step materialisation, and reruns the step chain
+        prep_cache.remove(key_step[0])
+        n_hit, n_miss = prep_cache.n_hit, prep_cache.n_miss
+        pp_data = run_chain(rec)
+
+        if (prep_cache.n_miss != n_miss) or prep_cache.has_entry(key_step[0]):
+            e_str.append('steps upstream of the deepest materialised step were materialised')
+
+        if prep_cache.n_hit != (n_hit + 1):
+            e_str.append('deepest materialised step was not reused')
+
+        if not np.array_equal(list(pp_data.values())[-1].get_traces(), y_final):
+            e_str.append('reused materialised step traces do not match')
+
+    finally:
+        prep_cache.cache_dir = cache_dir0
+
+    return e_str
+
+
+def main():
+
+    # sets up the argument parser
+    parser = argparse.ArgumentParser(description='Spykit preprocessing cache check')
+    parser.add_argument('--n_channel', type=int, default=n_channel_def, help='synthetic recording channel count')
+    parser.add_argument('--t_dur', type=float, default=t_dur_def, help='synthetic recording duration (s)')
+    args = parser.parse_args()
+
+    # runs the checks
+    out_dir = tempfile.mkdtemp()
+    try:
+        e_str = check_source_key(out_dir, args.n_channel, args.t_dur) + \
+                check_openephys_key(out_dir, args.n_channel, args.t_dur) + \
+                check_materialise_error(out_dir, args.n_channel, args.t_dur) + \
+                check_cached_step(out_dir, args.n_channel, args.t_dur)
+
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+    # outputs the check results
+    for es in e_str:
+        print(es, file=sys.stderr)
+
+    print('Preprocessing cache check: {0}'.format('failed' if len(e_str) else 'passed'))
+    sys.exit(1 if len(e_str) else 0)
+
+
+if __name__ == '__main__':
+    main()
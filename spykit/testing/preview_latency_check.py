@@ -0,0 +1,93 @@
+# module import
+import sys
+import time
+import argparse
+import numpy as np
+
+# spykit module import
+from spykit.info.preprocess import PreprocessPreview
+from spykit.testing.preprocess_benchmark import create_recording, step_para
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+# synthetic recording/trace window dimensions (these match the trace view defaults)
+n_channel_def = 384
+n_plt_def = 64
+t_window_def = 0.1
+t_dur_def = 30.
+n_rep_def = 20
+
+# preview step chain
+preview_steps = ['phase_shift', 'bandpass_filter', 'common_reference']
+
+# maximum median preview latency (in seconds)
+t_latency_max = 0.1
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+"""
+    PreviewSession: minimal session object providing the current recording to the preview
+"""
+
+
+class PreviewSession:
+    def __init__(self, rec):
+
+        # class field initialisations
+        self.rec = rec
+
+    def get_current_recording_probe(self):
+
+        return self.rec
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def main():
+
+    # sets up the argument parser
+    parser = argparse.ArgumentParser(description='Spykit preprocessing preview latency check')
+    parser.add_argument('--n_channel', type=int, default=n_channel_def, help='recording channel count')
+    parser.add_argument('--n_plt', type=int, default=n_plt_def, help='visible trace channel count')
+    parser.add_argument('--t_window', type=float, default=t_window_def, help='visible trace window duration (s)')
+    parser.add_argument('--t_dur', type=float, default=t_dur_def, help='recording duration (s)')
+    parser.add_argument('--n_rep', type=int, default=n_rep_def, help='repetition count')
+    args = parser.parse_args()
+
+    # sets up the preview (the window is moved over the recording for each repetition)
+    rec = create_recording(args.n_channel, 'int16', args.t_dur)
+    pp_preview = PreprocessPreview(PreviewSession(rec))
+    pp_preview.set_config({str(i + 1): [x, dict(step_para[x])] for i, x in enumerate(preview_steps)})
+
+    # initialisations
+    n_frm_w = int(args.t_window * rec.get_sampling_frequency())
+    i_frm0 = np.linspace(0, rec.get_num_frames() - n_frm_w, args.n_rep).astype(int)
+    channel_ids = rec.channel_ids[:args.n_plt]
+    t_latency, is_ok = [], True
+
+    # runs the preview once before timing (the fused filter chain is validated on the first preview)
+    pp_preview.get_traces(0, n_frm_w, channel_ids)
+
+    for i_rep in range(args.n_rep):
+        # calculates the preview for the window
+        t_start = time.perf_counter()
+        y_pp = pp_preview.get_traces(i_frm0[i_rep], i_frm0[i_rep] + n_frm_w, channel_ids)
+        t_latency.append(time.perf_counter() - t_start)
+
+        # the preview must be calculated for the window
+        if (y_pp is None) or (y_pp.shape != (n_frm_w, len(channel_ids))):
+            print('Repetition #{0}: preview was not calculated'.format(i_rep + 1), file=sys.stderr)
+            is_ok = False
+
+    # outputs the latency summary
+    print('Preview latency: median {0:.2f} ms, max {1:.2f} ms (limit {2:.0f} ms)'.format(
+        1000. * np.median(t_latency), 1000. * np.max(t_latency), 1000. * t_latency_max))
+    is_ok = is_ok and (np.median(t_latency) <= t_latency_max)
+
+    print('Preview latency check: {0}'.format('passed' if is_ok else 'failed'))
+    sys.exit(0 if is_ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+# module import
+import os
+import sys
+import shutil
+import argparse
+import tempfile
+import numpy as np
+from pathlib import Path
+
+# spykit module import
+import spykit.common.spikeinterface_func as sf
+from spykit.common.session_cache import ResidentSession, ResidentSessionCache
+
+# spikewrap module import
+import spikewrap as sw
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+# synthetic recording dimensions
+n_channel = 384
+f_samp = 30000.
+n_sample_def = 3000
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+"""
+    CheckSession: minimal session object held by the resident session cache check
+"""
+
+
+class CheckSession:
+    def __init__(self, probe_name):
+
+        # class field initialisations
+        self.probe_name = probe_name
+        self.is_released = False
+
+    def get_session_props(self):
+
+        return {'format_type': 'folder', 'subject_path': 'sub-001', 'session_name': 'ses-001',
+                'file_format': 'spikeglx', 'run_names': ['run-001_g0_{0}'.format(self.probe_name)]}
+
+    def force_close_workers(self):
+
+        self.is_released = True
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def write_spikeglx_run(ses_path, run_name, probe_name, n_sample):
+    """Writes a synthetic Neuropixels 1.0 SpikeGLX run (AP stream with the sync channel), and returns the data"""
+
+    # writes the binary file (the channel values are offset by the probe index, so the probe streams differ)
+    run_path = Path(ses_path, '{0}_g0_{1}'.format(run_name, probe_name))
+    os.makedirs(run_path, exist_ok=True)
+    bin_file = run_path / '{0}_g0_t0.{1}.ap.bin'.format(run_name, probe_name)
+    y = np.random.randint(-100, 100, (n_sample, n_channel + 1)).astype(np.int16)
+    y[:, :n_channel] += np.int16(1000 * int(probe_name[len('imec'):]))
+    y.tofile(bin_file)
+
+    # sets up the probe channel tables
+    imro_tbl = '(0,{0})'.format(n_channel) + ''.join(['({0} 0 0 500 250 1)'.format(i) for i in range(n_channel)])
+    ch_map = '({0},{0},1)'.format(n_channel) + ''.join(['(AP{0};{0}:{0})'.format(i) for i in range(n_channel)]) + \
+             '(SY0;{0}:{0})'.format(n_channel)
+    shank_map = '(1,2,480)' + ''.join(['(0:{0}:{1}:1)'.format(i % 2, i // 2) for i in range(n_channel)])
+
+    # writes the meta file
+    meta = {
+        'acqApLfSy': '{0},{0},1'.format(n_channel), 'appVersion': '20201103', 'fileName': str(bin_file),
+        'fileSizeBytes': y.nbytes, 'fileTimeSecs': n_sample / f_samp, 'fileCreateTime': '2024-01-01T00:00:00',
+        'firstSample': 0, 'imAiRangeMax': 0.6, 'imAiRangeMin': -0.6, 'imMaxInt': 512, 'imSampRate': f_samp,
+        'imDatPrb_type': 0, 'imDatPrb_pn': 'NP1010', 'imDatPrb_sn': 1, 'imDatPrb_port': 1,
+        'imDatPrb_slot': 2, 'imDatPrb_dock': 1, 'nSavedChans': n_channel + 1, 'snsApLfSy': '{0},0,1'.format(n_channel),
+        'snsSaveChanSubset': 'all', 'typeThis': 'imec', '~imroTbl': imro_tbl, '~snsChanMap': ch_map,
+        '~snsShankMap': shank_map,
+    }
+    with open(bin_file.with_suffix('.meta'), 'w') as f:
+        f.write(''.join(['{0}={1}\n'.format(k, v) for k, v in meta.items()]))
+
+    return y
+
+
+def check_probe_load(out_dir, n_sample):
+    """Checks each probe of a multi-probe SpikeGLX session loads its own probe stream"""
+
+    # initialisations
+    e_str = []
+    probe_names = ['imec0', 'imec1']
+    ses_path = Path(out_dir, 'rawdata', 'sub-001', 'ses-001', 'ephys')
+
+    # writes the multi-probe session
+    y_run = {p_name: write_spikeglx_run(ses_path, 'run-001', p_name, n_sample) for p_name in probe_names}
+
+    for p_name in probe_names:
+        # loads the probe session runs
+        r_name = 'run-001_g0_{0}'.format(p_name)
+        s = sw.Session(subject_path=ses_path.parent.parent, session_name='ses-001', file_format='spikeglx',
+                       run_names=[r_name], output_path=Path(out_dir, 'derivatives', p_name))
+
+        try:
+            sf.load_probe_raw_data(s, p_name)
+
+        except Exception as e:
+            e_str.append('{0} probe failed to load ({1}: {2})'.format(p_name, type(e).__name__, e))
+            continue
+
+        # checks the loaded run recordings
+        raw_run = s._raw_runs[0]
+        rec, rec_sync = raw_run._raw['grouped'], raw_run._sync
+        if (raw_run._run_name != r_name) or (not rec.has_probe()):
+            e_str.append('{0} probe run was not set up correctly'.format(p_name))
+
+        elif not np.array_equal(rec.get_traces(), y_run[p_name][:, :n_channel]):
+            e_str.append('{0} probe traces do not match the probe stream'.format(p_name))
+
+        elif not np.array_equal(rec_sync.get_traces()[:, -1], y_run[p_name][:, -1]):
+            e_str.append('{0} probe sync channel does not match the probe stream'.format(p_name))
+
+    # runs from another probe must be rejected
+    s = sw.Session(subject_path=ses_path.parent.parent, session_name='ses-001', file_format='spikeglx',
+                   run_names=['run-001_g0_imec1'], output_path=Path(out_dir, 'derivatives', 'imec0'))
+    try:
+        sf.load_probe_raw_data(s, 'imec0')
+        e_str.append('imec1 probe run was loaded as an imec0 probe run')
+
+    except ValueError:
+        pass
+
+    return e_str
+
+
+def check_cache_pinning():
+    """Checks the pinned probe sessions are never released by the resident session cache"""
+
+    # initialisations
+    e_str = []
+    ses_cache = ResidentSessionCache(n_max=1, n_bytes_max=0)
+    ses_probe = [CheckSession('imec{0}'.format(i)) for i in range(3)]
+
+    # adds the pinned probe sessions (beyond the cache limits)
+    ses_cache.set_pinned(ses_probe)
+    for ses in ses_probe:
+        ses_cache.add_entry(ResidentSession(ses, None, None, None))
+
+    for ses in ses_probe:
+        ses_cache.remove_entry(ses_cache.get_session_key(ses.get_session_props()))
+
+    if any([x.is_released for x in ses_probe]) or (ses_cache.get_session_count() != len(ses_probe)):
+        e_str.append('pinned probe sessions were released by the session cache')
+
+    # unpinning the sessions returns them to the cache limits
+    ses_cache.set_pinned([])
+    if ses_cache.get_session_count() > ses_cache.n_max:
+        e_str.append('unpinned probe sessions were not reduced to the cache limits')
+
+    # clearing the cache releases all sessions
+    ses_cache.clear()
+    if not all([x.is_released for x in ses_probe]):
+        e_str.append('probe sessions were not released when the session cache was cleared')
+
+    return e_str
+
+
+def main():
+
+    # sets up the argument parser
+    parser = argparse.ArgumentParser(description='Spykit multi-probe session load check')
+    parser.add_argument('--n_sample', type=int, default=n_sample_def, help='synthetic run sample count')
+    args = parser.parse_args()
+
+    # runs the checks
+    out_dir = tempfile.mkdtemp()
+    try:
+        e_str = check_probe_load(out_dir, args.n_sample) + check_cache_pinning()
+
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+    # outputs the check results
+    for es in e_str:
+        print(es, file=sys.stderr)
+
+    print('Probe load check: {0}'.format('failed' if len(e_str) else 'passed'))
+    sys.exit(1 if len(e_str) else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+# module import
+import os
+import sys
+import pickle
+import shutil
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+# spykit module import
+from spykit.info.preprocess import PreprocessConfig
+from spykit.common.session_file import read_session_file, write_session_file, SessionData, SessionFileError
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+# malicious legacy payload callables (module, name, code/command argument, extra arguments)
+legacy_payload = [
+    ('numpy.testing._private.utils', 'runstring', "open({0!r}, 'w').close()", ({},)),
+    ('posix', 'system', 'touch {0}', ()),
+    ('builtins', 'eval', "open({0!r}, 'w').close()", ()),
+    ('pandas.io.pickle', 'read_pickle', '{0}', ()),
+]
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def setup_session_data(n_sample):
+    """Sets up a session data dictionary (containing a large channel array) with all the stored field types"""
+
+    return {
+        'state': 2,
+        'configs': PreprocessConfig(),
+        'prop_para': {'trace': {'t_start': 1., 't_span': 10., 'path': Path('raw', 'run-001')}},
+        'channel_data': {
+            'bad': [pd.DataFrame({'channel_ids': ['AP0', 'AP1'], 'labels': ['good', 'dead']})],
+            'sync': [np.arange(n_sample, dtype=np.int16)],
+            'keep': np.array([True, False]),
+        },
+        'channel_snapshot': {(0, 'ap'): (np.int64(10), 1.5)},
+    }
+
+
+def check_versioned_file(out_dir, n_sample):
+    """Checks the versioned session file fields are decoded on demand, and that a loaded file can be overwritten"""
+
+    # initialisations
+    e_str = []
+    ses_data = setup_session_data(n_sample)
+    ssf_file = os.path.join(out_dir, 'session.ssf')
+
+    # writes/reads the session file
+    write_session_file(ssf_file, ses_data)
+    ses_load = read_session_file(ssf_file)
+
+    # no fields should be decoded until they are accessed
+    if not isinstance(ses_load, SessionData) or len(ses_load.data):
+        e_str.append('versioned session file fields were decoded before being accessed')
+
+    if set(ses_load.keys()) != set(ses_data.keys()):
+        e_str.append('versioned session file field names do not match')
+
+    # checks the loaded field values
+    ch_data = ses_load['channel_data']
+    if not np.array_equal(ch_data['sync'][0], ses_data['channel_data']['sync'][0]):
+        e_str.append('versioned session file array values do not match')
+
+    if isinstance(ch_data['sync'][0], np.memmap):
+        e_str.append('versioned session file array is mapped from the session file')
+
+    if not ch_data['bad'][0].equals(ses_data['channel_data']['bad'][0]):
+        e_str.append('versioned session file data frame values do not match')
+
+    if ses_load['prop_para']['trace']['path'] != ses_data['prop_para']['trace']['path']:
+        e_str.append('versioned session file path values do not match')
+
+    if set(ses_load.data.keys()) != {'channel_data', 'prop_para'}:
+        e_str.append('versioned session file decoded fields other than those accessed')
+
+    # the loaded session must be able to be saved over the session file
+    try:
+        write_session_file(ssf_file, {k: ses_load[k] for k in ses_load})
+
+    except OSError as e:
+        e_str.append('loaded session file could not be overwritten ({0})'.format(e))
+
+    return e_str
+
+
+def check_legacy_file(out_dir):
+    """Checks the legacy (pickled) session files are loaded for each pickle protocol"""
+
+    # initialisations
+    e_str = []
+    ses_data = setup_session_data(1000)
+    ssf_file = os.path.join(out_dir, 'legacy.ssf')
+
+    for protocol in range(2, pickle.HIGHEST_PROTOCOL + 1):
+        # writes the legacy session file
+        with open(ssf_file, 'wb') as f:
+            pickle.dump(ses_data, f, protocol=protocol)
+
+        # reads the legacy session file
+        try:
+            ses_load = read_session_file(ssf_file)
+
+        except SessionFileError as e:
+            e_str.append('legacy session file (protocol {0}) was rejected: {1}'.format(protocol, e))
+            continue
+
+        # checks the loaded field values
+        ch_data = ses_load['channel_data']
+        is_ok = np.array_equal(ch_data['sync'][0], ses_data['channel_data']['sync'][0]) and \
+            ch_data['bad'][0].equals(ses_data['channel_data']['bad'][0]) and \
+            isinstance(ses_load['configs'], PreprocessConfig)
+        if not is_ok:
+            e_str.append('legacy session file (protocol {0}) values do not match'.format(protocol))
+
+    return e_str
+
+
+def check_legacy_payload(out_dir):
+    """Checks the legacy session files containing malicious payloads are rejected (without running the payload)"""
+
+    # initialisations
+    e_str = []
+    ssf_file = os.path.join(out_dir, 'payload.ssf')
+    marker_file = os.path.join(out_dir, 'payload.marker')
+
+    for module, name, p_arg, p_arg_ex in legacy_payload:
+        # writes the payload (calls module.name with the arguments when unpickled)
+        p_args = pickle.dumps((p_arg.format(marker_file),) + p_arg_ex, protocol=2)[2:-1]
+        with open(ssf_file, 'wb') as f:
+            f.write(b'\x80\x02c' + '{0}\n{1}\n'.format(module, name).encode('ascii') + p_args + b'R.')
+
+        try:
+            # attempts to read the payload session file
+            read_session_file(ssf_file)
+            e_str.append('legacy payload ({0}.{1}) was not rejected'.format(module, name))
+
+        except SessionFileError:
+            pass
+
+        except Exception as e:
+            e_str.append('legacy payload ({0}.{1}) raised {2}'.format(module, name, type(e).__name__))
+
+        # the payload must not have run
+        if os.path.exists(marker_file):
+            e_str.append('legacy payload ({0}.{1}) was run'.format(module, name))
+            os.remove(marker_file)
+
+    return e_str
+
+
+def main():
+
+    # sets up the argument parser
+    parser = argparse.ArgumentParser(description='Spykit session file load check')
+    parser.add_argument('--n_sample', type=int, default=2 ** 24, help='channel array sample count')
+    args = parser.parse_args()
+
+    # runs the checks
+    out_dir = tempfile.mkdtemp()
+    try:
+        e_str = check_versioned_file(out_dir, args.n_sample) + check_legacy_file(out_dir) + \
+                check_legacy_payload(out_dir)
+
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+    # outputs the check results
+    for es in e_str:
+        print(es, file=sys.stderr)
+
+    print('Session file check: {0}'.format('failed' if len(e_str) else 'passed'))
+    sys.exit(1 if len(e_str) else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+# module import
+import sys
+import time
+import argparse
+import numpy as np
+
+# spykit module import
+from spykit.threads.utils import ThreadWorker, WorkerBarrier
+
+# pyqt6 module import
+from PyQt6.QtCore import QCoreApplication, QEventLoop, QObject, QTimer
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+# check dimensions (worker count, worker job duration in seconds and the repetition count)
+n_worker_def = 4
+t_job_def = 0.05
+n_rep_def = 20
+
+# maximum latency (in seconds) between the last worker job finishing and the barrier slot running
+t_latency_max = 0.05
+
+# event loop timeout (in ms)
+t_timeout = 10000
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+"""
+    BarrierReceiver: main thread receiver for the worker/barrier completion signals
+"""
+
+
+class BarrierReceiver(QObject):
+    def __init__(self, n_worker):
+        super(BarrierReceiver, self).__init__()
+
+        # class field initialisations
+        self.n_worker = n_worker
+        self.orig_error_hook = sys.excepthook
+        self.event_loop = QEventLoop()
+
+        # completion fields
+        self.t_job = []
+        self.n_finished = 0
+        self.n_finished_barrier = None
+        self.t_barrier = None
+
+    def worker_finished(self, t_job):
+
+        # stores the job finish time
+        self.t_job.append(t_job)
+        self.n_finished += 1
+
+    def barrier_finished(self):
+
+        # stores the barrier slot time (and the number of worker slots run before it)
+        self.t_barrier = time.perf_counter()
+        self.n_finished_barrier = self.n_finished
+        self.event_loop.quit()
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def run_job(t_job):
+    """Runs a single worker job (returns the job finish time)"""
+
+    time.sleep(t_job)
+    return time.perf_counter()
+
+
+def run_rep(n_worker, t_job):
+    """Runs a single repetition, and returns the barrier latency and the worker slot count run before the barrier"""
+
+    # creates the barrier and the workers (the workers are added before they are started)
+    receiver = BarrierReceiver(n_worker)
+    barrier = WorkerBarrier(receiver)
+    barrier.all_finished.connect(receiver.barrier_finished)
+
+    t_worker = []
+    for i_worker in range(n_worker):
+        tw = ThreadWorker(receiver, run_job, t_job)
+        tw.work_finished.connect(receiver.worker_finished)
+        barrier.add_worker(tw)
+        t_worker.append(tw)
+
+    # starts the workers and waits for the barrier to complete
+    QTimer.singleShot(t_timeout, receiver.event_loop.quit)
+    for tw in t_worker:
+        tw.start()
+
+    receiver.event_loop.exec()
+    for tw in t_worker:
+        tw.wait()
+
+    # case is the barrier timed out
+    if receiver.t_barrier is None:
+        return None, receiver.n_finished
+
+    return receiver.t_barrier - max(receiver.t_job), receiver.n_finished_barrier
+
+
+def main():
+
+    # sets up the argument parser
+    parser = argparse.ArgumentParser(description='Spykit worker completion barrier latency check')
+    parser.add_argument('--n_worker', type=int, default=n_worker_def, help='worker count')
+    parser.add_argument('--t_job', type=float, default=t_job_def, help='worker job duration (s)')
+    parser.add_argument('--n_rep', type=int, default=n_rep_def, help='repetition count')
+    args = parser.parse_args()
+
+    # initialisations
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    t_latency, is_ok = [], True
+
+    for i_rep in range(args.n_rep):
+        # runs the repetition
+        t_lat, n_finished = run_rep(args.n_worker, args.t_job)
+        if t_lat is None:
+            print('Repetition #{0}: barrier timed out'.format(i_rep + 1), file=sys.stderr)
+            is_ok = False
+            continue
+
+        # the worker completion slots must all be run before the barrier slot
+        if n_finished != args.n_worker:
+            print('Repetition #{0}: barrier ran after {1}/{2} worker slots'.format(
+                i_rep + 1, n_finished, args.n_worker), file=sys.stderr)
+            is_ok = False
+
+        t_latency.append(t_lat)
+
+    # outputs the latency summary
+    if len(t_latency):
+        print('Barrier latency: median {0:.2f} ms, max {1:.2f} ms (limit {2:.0f} ms)'.format(
+            1000. * np.median(t_latency), 1000. * np.max(t_latency), 1000. * t_latency_max))
+        is_ok = is_ok and (np.max(t_latency) <= t_latency_max)
+
+    app.quit()
+    sys.exit(0 if is_ok else 1)
+
+
+if __name__ == '__main__':
+    main()
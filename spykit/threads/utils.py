@@ -1,5 +1,7 @@
 # module import
 import sys
+import threading
+from concurrent.futures import Future
 
 # pyqt5 module import
 from PyQt6.QtCore import QObject, QThread, pyqtSignal
@@ -34,6 +36,9 @@ class ThreadWorker(QThread):
         self.is_running = False
         self.desc = None
 
+        # future object (resolved when the thread job completes)
+        self.future = Future()
+
     def run(self):
 
         # emits the work start signal
@@ -41,17 +46,30 @@ class ThreadWorker(QThread):
         self.work_started.emit()
 
         # runs the thread job
-        thread_data = self.work_fcn(self.work_para)
+        try:
+            thread_data = self.work_fcn(self.work_para)
 
-        # emits the work start signal
+        except BaseException as e:
+            # sets the future exception (then re-raises the error)
+            self.is_running = False
+            self.future.set_exception(e)
+            raise
+
+        # emits the work finished signal (before resolving the future, so any barrier signals are queued after)
         self.is_running = False
         self.work_finished.emit(thread_data)
+        self.future.set_result(thread_data)
 
     def force_quit(self):
 
-        # force quits the thread worker
+        # force quits the thread worker (and waits for the thread to terminate)
         self.is_running = False
         self.terminate()
+        self.wait()
+
+        # cancels the future (if the job didn't complete)
+        if not self.future.done():
+            self.future.cancel()
 
     def reset_error_hook(self):
 
@@ -63,7 +81,66 @@ class ThreadWorker(QThread):
 # ----------------------------------------------------------------------------------------------------------------------
 
 """
-    ThreadWorker: 
+    WorkerBarrier: completion barrier for a group of thread workers. the all_finished signal is emitted once
+                   every worker in the group has finished (so dependent steps can start immediately)
 """
 
 
+class WorkerBarrier(QObject):
+    # pyqtsignal objects
+    worker_finished = pyqtSignal(object)
+    all_finished = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super(WorkerBarrier, self).__init__(parent)
+
+        # class field initialisations
+        self.t_worker = []
+        self.n_done = 0
+
+        # thread-safety objects (set when all workers have finished)
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._done.set()
+
+    def add_worker(self, t_worker):
+
+        # appends the worker to the group
+        self._done.clear()
+        self.t_worker.append(t_worker)
+
+        # connects the worker future completion callback
+        t_worker.future.add_done_callback(self.worker_done)
+
+    def worker_done(self, future):
+
+        # increments the completed worker count (ignoring workers from before a reset)
+        with self._lock:
+            if not any([x.future is future for x in self.t_worker]):
+                return
+
+            self.n_done += 1
+            is_done = self.n_done == len(self.t_worker)
+
+        # flags the barrier as complete (if all workers have finished)
+        self.worker_finished.emit(self)
+        if is_done:
+            self._done.set()
+            self.all_finished.emit()
+
+    def wait(self, timeout=None):
+
+        return self._done.wait(timeout)
+
+    def is_done(self):
+
+        return self._done.is_set()
+
+    def reset(self):
+
+        # resets the class fields
+        self.t_worker = []
+        self.n_done = 0
+        self._done.set()
+
+
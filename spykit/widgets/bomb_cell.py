@@ -1,7 +1,6 @@
 # module import
 import os
 import sys
-import time
 import mmap
 import pathlib
 import numpy as np
@@ -17,6 +16,7 @@ import spykit.common.common_func as cf
 import spykit.common.common_widget as cw
 from spykit.info.utils import InfoWidgetPara
 from spykit.threads.utils import ThreadWorker
+from spykit.common.progress_bus import progress_bus
 
 # pyqt6 module import
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QWidget, QMessageBox, QGroupBox,
@@ -841,6 +841,7 @@ class BombCellSolver(BombCellPara, QDialog):
 
     # string class fields
     mmap_name = 'mMapProg.bin'
+    pr_name = 'bombcell'
 
     # array class fields
     p_str_u = ['ephysMetaFile', 'rawFile']
@@ -900,6 +901,7 @@ class BombCellSolver(BombCellPara, QDialog):
         self.i_tab = 0
         self.i_run = 1
         self.i_unit = 0
+        self.p_task = None
         self.bc_pkg = None
         self.bc_para_c = None
         self.t_worker_solver = None
@@ -933,8 +935,9 @@ class BombCellSolver(BombCellPara, QDialog):
         self.main_layout.addWidget(self.progress_frame)
         self.main_layout.addWidget(self.button_frame)
 
-        # solver timer callback function
+        # solver timer callback/progress functions
         self.solver_timer.timeout.connect(self.solver_timer_fcn)
+        progress_bus.subscribe(self.pr_name, self.solver_progress)
 
     def init_fspec_group(self):
 
@@ -1018,7 +1021,6 @@ class BombCellSolver(BombCellPara, QDialog):
             # stops the package initialisation worker
             self.t_worker_pkg.force_quit()
             self.solver_timer.stop()
-            time.sleep(0.01)
 
             # if not, then close the window
             self.close_window(True)
@@ -1050,7 +1052,6 @@ class BombCellSolver(BombCellPara, QDialog):
         # updates the progressbar
         self.prog_bar.set_label("Initialising BombCell")
         self.prog_bar.set_progbar_state(True)
-        time.sleep(0.1)
 
         # creates the threadworker object
         self.t_worker_pkg = ThreadWorker(self.sp_main, self.init_bombcell_package)
@@ -1148,6 +1149,7 @@ class BombCellSolver(BombCellPara, QDialog):
 
         # stops the solver timer
         self.solver_timer.stop()
+        self.p_task.finish()
 
         # stops and updates the progressbar
         self.prog_bar.stop_timer()
@@ -1177,15 +1179,13 @@ class BombCellSolver(BombCellPara, QDialog):
         self.is_running = False
         self.set_button_props(True)
 
-        # resets the progressbar
-        time.sleep(0.5)
-        self.prog_bar.set_progbar_state(False)
+        # resets the progressbar (after a short delay, without blocking the event loop)
+        QTimer.singleShot(500, lambda: self.prog_bar.set_progbar_state(False))
 
     def run_solver(self):
 
         # resets the button state
         self.is_running = self.cont_button[0].isChecked()
-        time.sleep(0.05)
 
         if self.is_running:
             if not self.check_solver_overwrite():
@@ -1207,11 +1207,12 @@ class BombCellSolver(BombCellPara, QDialog):
             self.prog_bar.timer_lbl = False
             self.prog_bar.set_label("Initialising Solver")
             self.prog_bar.set_enabled(True)
-            time.sleep(0.1)
 
             # flag that the solver is running
+            self.i_unit = 0
             self.mmap['i_unit'] = np.int16(0)
             self.mmap['s_flag'] = np.int16(1)
+            self.p_task = progress_bus.start_task(self.pr_name, 'Initialising Solver')
 
             # creates the threadworker object
             self.t_worker_solver = ThreadWorker(self.sp_main, self.run_bombcell_solver)
@@ -1225,7 +1226,7 @@ class BombCellSolver(BombCellPara, QDialog):
             # stops the worker
             self.t_worker_solver.force_quit()
             self.solver_timer.stop()
-            time.sleep(0.01)
+            self.p_task.finish()
 
             # deletes the memory map file
             self.mmap['s_flag'] = np.int16(0)
@@ -1274,7 +1275,6 @@ class BombCellSolver(BombCellPara, QDialog):
         for p in Path('.').rglob(self.mmap_name):
             try:
                 os.remove(p)
-                time.sleep(0.1)
             except:
                 pass
 
@@ -1283,9 +1283,7 @@ class BombCellSolver(BombCellPara, QDialog):
         self.mmap['s_flag'] = np.int16(0)
         self.mmap['i_unit'] = np.int16(0)
         self.mmap['n_unit'] = np.int16(0)
-
-        # pauses for a little bit...
-        time.sleep(0.1)
+        self.mmap.flush()
 
     def delete_solver_mmap(self):
 
@@ -1333,9 +1331,8 @@ class BombCellSolver(BombCellPara, QDialog):
             # updates the unit index
             self.i_unit = self.mmap['i_unit'][0]
 
-            # unit/progress value fields
+            # unit progress fields
             i_unit_pr = self.i_unit
-            pr_val = float(self.i_unit) / (2 * float(self.mmap['n_unit'][0]))
 
             # solver procedure specific updates
             if (self.i_unit == 2 * self.mmap['n_unit'][0]):
@@ -1355,8 +1352,20 @@ class BombCellSolver(BombCellPara, QDialog):
                 # updates the progressbar
                 pr_str = '{0} ({1}/{2})'.format(pr_pref, i_unit_pr, self.mmap['n_unit'][0])
 
-            # updates the progressbar string/value
-            self.prog_bar.update_prog_fields(pr_str, pr_val)
+            # publishes the solver progress (the progressbar is updated by the progress bus)
+            self.p_task.set_count(2 * int(self.mmap['n_unit'][0]))
+            self.p_task.set_step(self.i_unit, pr_str)
+
+    def solver_progress(self, p_info):
+
+        # exits if the solver has finished (the progressbar is reset by the completion function)
+        if p_info.is_finished:
+            return
+
+        # updates the progressbar string/value
+        pr_str = p_info.desc[0] if (p_info.pr_val[0] == 0) else '{0} - {1}'.format(
+            p_info.desc[0], p_info.get_eta_string())
+        self.prog_bar.update_prog_fields(pr_str, p_info.pr_val[0])
 
     def post_processing_soln_change(self):
 
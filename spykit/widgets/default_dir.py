@@ -8,6 +8,7 @@ from functools import partial as pfcn
 # spike pipeline imports
 import spykit.common.common_func as cf
 import spykit.common.common_widget as cw
+from spykit.common.preprocess_cache import prep_cache, get_cache_dir
 
 # pyqt6 module import
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QWidget, QMessageBox)
@@ -26,7 +27,7 @@ class DefaultDir(QDialog):
     width_dlg = 600
 
     # array class fields
-    grp_str = ['data', 'session', 'trigger', 'configs', 'filter', 'logging', 'figure']
+    grp_str = ['data', 'session', 'trigger', 'configs', 'filter', 'logging', 'figure', 'cache']
     but_str = ['Update Defaults', 'Reset Defaults', 'Close Window']
 
     # group mapping fields
@@ -38,6 +39,7 @@ class DefaultDir(QDialog):
         "filter": "Unit Filter Options",
         "logging": "Session Info && Error Logging Files",
         "figure": "Output Figure Directory",
+        "cache": "Preprocessing Cache Directory",
     }
 
     def __init__(self, sp_main):
@@ -74,6 +76,11 @@ class DefaultDir(QDialog):
             with open(cw.def_file, 'rb') as f:
                 self.def_path = pickle.load(f)
 
+            # sets any directory paths missing from the file (added in later versions)
+            for gs in self.grp_str:
+                if gs not in self.def_path:
+                    self.def_path[gs] = Path(os.path.join(cw.resource_dir, gs))
+
             # exits the function
             return
 
@@ -209,6 +216,9 @@ class DefaultDir(QDialog):
         with open(cw.def_file, 'wb') as f:
             pickle.dump(self.def_path, f)
 
+        # resets the preprocessing cache directory
+        prep_cache.cache_dir = get_cache_dir()
+
     def update_cont_button_props(self, state):
 
         self.cont_button[0].setEnabled(state)
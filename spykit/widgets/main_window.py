@@ -2,7 +2,6 @@
 import os
 import re
 import sys
-import time
 import glob
 import pickle
 import shutil
@@ -28,10 +27,18 @@ from spykit.plotting.utils import PlotManager
 from spykit.props.utils import PropManager
 from spykit.common.property_classes import SessionWorkBook
 from spykit.common.postprocess import PostMemMap
+from spykit.common.session_trace import session_tracer
 from spykit.info.preprocess import PreprocessSetup, pp_flds
 from spykit.threads.utils import ThreadWorker
 from spykit.widgets.open_session import OpenSession
 from spykit.widgets.default_dir import DefaultDir
+from spykit.widgets.memory_usage import MemoryUsage, mem_file
+from spykit.common.memory_manager import mem_manager
+from spykit.common.progress_bus import progress_bus
+from spykit.common.session_file import read_session_file, write_session_file, SessionFileError
+from spykit.common.session_journal import (session_journal, read_journal, remove_journal, get_recovery_journals,
+                                           get_recovery_file, has_recovery_file)
+from spykit.common.property_classes import SessionObject
 from spykit.widgets.save_prep import SavePrep
 from spykit.widgets.spike_sorting import SpikeSortingDialog
 from spykit.widgets.bomb_cell import BombCellSolver
@@ -106,6 +113,9 @@ class MainWindow(QMainWindow):
         # sets the widget style sheets
         self.set_styles()
 
+        # checks for unsaved session edits (from a previous crashed session)
+        QTimer.singleShot(0, self.menu_bar.recover_session)
+
         # REMOVE ME LATER
         if cf.is_dev():
             self.testing()
@@ -154,7 +164,7 @@ class MainWindow(QMainWindow):
         self.session_obj.keep_channel_reset.connect(self.keep_channel_reset)
         self.session_obj.worker_job_started.connect(self.worker_job_started)
         self.session_obj.worker_job_finished.connect(self.worker_job_finished)
-        self.session_obj.prep_progress_update.connect(self.prep_progress_update)
+        progress_bus.subscribe('session', self.prep_progress_update)
         self.session_obj.added_post_process.connect(self.added_post_process)
 
     # ---------------------------------------------------------------------------
@@ -169,7 +179,8 @@ class MainWindow(QMainWindow):
             self.clear_session()
 
         if self.session_obj.session is None:
-            # if the session has been cleared, then exit
+            # if the session has been cleared, then close the autosave journal and exit
+            session_journal.close_session()
             return
 
         # adds the widgets to the information panel
@@ -190,25 +201,26 @@ class MainWindow(QMainWindow):
 
         # sets up the trace/probe views
         for p_view in ['Trace', 'Probe']:
-            # if missing, then add the plot type (if required)
-            if p_view.lower() in self.plot_manager.types:
-                # retrieves the plot view widget
-                plot_view = self.plot_manager.get_plot_view(p_view.lower())
-
-                # performs specific view updates
-                match p_view.lower():
-                    case 'probe':
-                        plot_view.probe_rec = self.session_obj.get_current_recording_probe()
-                        self.plot_manager.reset_probe_views()
-
-                    case 'trace':
-                        pass
+            with session_tracer.span(f'{p_view} Plot Setup', cat='gui'):
+                # if missing, then add the plot type (if required)
+                if p_view.lower() in self.plot_manager.types:
+                    # retrieves the plot view widget
+                    plot_view = self.plot_manager.get_plot_view(p_view.lower())
 
-            else:
-                self.plot_manager.add_plot_view(p_view.lower())
+                    # performs specific view updates
+                    match p_view.lower():
+                        case 'probe':
+                            plot_view.probe_rec = self.session_obj.get_current_recording_probe()
+                            self.plot_manager.reset_probe_views()
+
+                        case 'trace':
+                            pass
+
+                else:
+                    self.plot_manager.add_plot_view(p_view.lower())
 
-            # adds the configuration view
-            self.prop_manager.add_config_view(p_view)
+                # adds the configuration view
+                self.prop_manager.add_config_view(p_view)
 
         # initial region configuration
         c_id = np.zeros((4, 5), dtype=int)
@@ -238,18 +250,19 @@ class MainWindow(QMainWindow):
         # Channel Info Table Setup
         # -----------------------------------------------------------------------
 
-        # sets up the channel information dataframe
-        p_dframe = self.session_obj.get_info_data_frame()
+        with session_tracer.span('Channel Table Setup', cat='gui'):
+            # sets up the channel information dataframe
+            p_dframe = self.session_obj.get_info_data_frame()
 
-        # sets the table column header (removes last column if single shank)
-        c_hdr_ch = deepcopy(self.session_obj.c_hdr_ch)
-        if self.session_obj.get_shank_count() == 1:
-            c_hdr_ch = c_hdr_ch[:-1]
-            p_dframe = p_dframe.drop(columns=['shank_ids'])
+            # sets the table column header (removes last column if single shank)
+            c_hdr_ch = deepcopy(self.session_obj.c_hdr_ch)
+            if self.session_obj.get_shank_count() == 1:
+                c_hdr_ch = c_hdr_ch[:-1]
+                p_dframe = p_dframe.drop(columns=['shank_ids'])
 
-        # creates the table model
-        self.info_manager.setup_info_table(p_dframe, 'Channel', c_hdr_ch)
-        self.info_manager.init_channel_comboboxes()
+            # creates the table model
+            self.info_manager.setup_info_table(p_dframe, 'Channel', c_hdr_ch)
+            self.info_manager.init_channel_comboboxes()
 
         # appends the channel status flags (if available)
         if self.session_obj.session.bad_ch is not None:
@@ -263,9 +276,24 @@ class MainWindow(QMainWindow):
         # enables the menubar items
         self.menu_bar.set_menu_enabled_blocks('session-open')
 
+        # resets the post-processing views (if restoring a resident session)
+        if self.session_obj.post_data.n_mmap:
+            self.menu_bar.set_menu_enabled_blocks('sorted-without-preprocess')
+            for mm_name in self.session_obj.post_data.mmap_name:
+                self.added_post_process(mm_name)
+
+            self.menu_bar.setup_post_process_views()
+
+        # restores the preprocessing views (if switching to a preprocessed probe session)
+        if self.session_obj.session.has_prep():
+            self.on_preprocessing_close(True)
+
         # resets the session flags
         self.session_obj.state = 1
 
+        # starts the session autosave journal
+        self.open_session_journal()
+
     def sync_channel_change(self):
 
         # sets up the trigger channel view (if session is loaded)
@@ -355,10 +383,10 @@ class MainWindow(QMainWindow):
 
         self.info_manager.delete_job(job_name)
 
-    def prep_progress_update(self, m_str, pr_val):
+    def prep_progress_update(self, p_info):
 
-        # stops the timeline widget
-        self.info_manager.prog_widget.update_prog_message(m_str, pr_val)
+        # updates the progressbar message/value
+        self.info_manager.prog_widget.update_prog_message(p_info.desc[0], p_info.pr_val[0])
 
     def added_post_process(self, mm_name_new):
 
@@ -585,7 +613,7 @@ class MainWindow(QMainWindow):
 
         # creates the memory map object
         pmm_obj = PostMemMap(self.session_obj)
-        pmm_obj.progress_fcn.connect(self.postprocessing_progress)
+        progress_bus.subscribe('postprocess', self.postprocessing_progress)
 
         # array dimensioning
         self.n_run_pp, self.n_shank_pp = mm_file.shape
@@ -610,6 +638,9 @@ class MainWindow(QMainWindow):
         self.n_pp = self.n_run_pp * self.n_shank_pp
         self.mmap_pp_tmp = np.empty((self.n_run_pp, self.n_shank_pp), dtype=object)
 
+        # starts the progress task
+        p_task = progress_bus.start_task('postprocess', 'Memory Mapping', self.n_pp)
+
         # sets up the memory mapped file names
         for i_run in range(self.n_run_pp):
             for i_shank in range(self.n_shank_pp):
@@ -618,13 +649,22 @@ class MainWindow(QMainWindow):
                 pmm_obj.set_mmap_file(self.mm_file_tmp[i_run, i_shank])
 
                 # creates the memory map
-                self.mmap_pp_tmp[i_run, i_shank] = pmm_obj.write_mem_map(bc_data[i_run, i_shank])
+                p_task.set_step(self.pr_ofs)
+                self.mmap_pp_tmp[i_run, i_shank] = pmm_obj.write_mem_map(bc_data[i_run, i_shank], p_task)
+
+        # flags the progress task is complete
+        p_task.finish()
 
-    def postprocessing_progress(self, i_fld, n_fld):
+    def postprocessing_progress(self, p_info):
+
+        # exits if the task has completed (the progressbar is reset by the completion function)
+        if p_info.is_finished:
+            return
 
         # sets the progressbar message/value
+        i_fld, n_fld = (p_info.i_step[-1], p_info.n_step[-1]) if (p_info.get_level_count() > 1) else (0, 1)
         pr_msg = 'Memory Mapping Field {0}/{1}'.format(i_fld + 1, n_fld)
-        pr_val = (self.pr_ofs + (i_fld / n_fld)) / self.n_pp
+        pr_val = p_info.pr_val[0]
 
         # updates the progressbar objects
         h_prog = self.info_manager.prog_widget
@@ -759,9 +799,6 @@ class MainWindow(QMainWindow):
         # resets the menu item properties
         self.menu_bar.set_menu_enabled_blocks('init')
 
-        # clears the post-processing memory map/temporary files
-        self.session_obj.clear_all_postprocessing()
-
         # resets the session flag
         self.has_session = False
 
@@ -780,6 +817,11 @@ class MainWindow(QMainWindow):
     # Miscellaneous Functions
     # ---------------------------------------------------------------------------
 
+    def open_session_journal(self):
+
+        session = self.session_obj.session
+        session_journal.open_session(session.get_session_props(), session.ssf_file)
+
     def set_styles(self):
 
         # # widget stylesheets
@@ -836,6 +878,9 @@ class MenuBar(QObject):
     sync_file_name = canon.saved_sync_filename()
     sync_folder_name = canon.sync_folder()
 
+    # session autosave period (in ms)
+    t_autosave = 60 * 1000
+
     def __init__(self, sp_main):
         super(MenuBar, self).__init__(sp_main)
 
@@ -856,9 +901,17 @@ class MenuBar(QObject):
         # REMOVE ME LATER
         self.filt_dlg = None
 
+        # loads the user memory budget
+        mem_manager.load_budget(mem_file)
+
         # initialises the class fields
         self.init_class_fields()
 
+        # starts the session autosave timer
+        self.autosave_timer = QTimer(self)
+        self.autosave_timer.timeout.connect(self.autosave_session)
+        self.autosave_timer.start(self.t_autosave)
+
     # ---------------------------------------------------------------------------
     # Class Widget Setup Functions
     # ---------------------------------------------------------------------------
@@ -895,12 +948,12 @@ class MenuBar(QObject):
         # ---------------------------------------------------------------------------
 
         # initialisations
-        p_str = ['new', 'open', 'save', None, 'clear', 'info', 'default', None, 'close']
+        p_str = ['new', 'open', 'save', None, 'clear', 'info', 'default', 'memory', None, 'close']
         p_lbl = ['New Session', 'Load...', 'Save...', None, 'Clear Session', 'Session Information',
-                 'Default Directories', None, 'Close Spykit']
-        has_ch = [False, True, True, False, False, False, False, False, False]
+                 'Default Directories', 'Memory Usage', None, 'Close Spykit']
+        has_ch = [False, True, True, False, False, False, False, False, False, False]
         cb_fcn = [self.new_session, self.load_session, self.save_session, None, self.clear_session,
-                  self.session_info, self.default_dir, None, self.close_window]
+                  self.session_info, self.default_dir, self.memory_usage, None, self.close_window]
 
         # REMOVE ME LATER
         if cf.is_dev():
@@ -1089,7 +1142,8 @@ class MenuBar(QObject):
             # exit if they cancelled
             return
 
-        # clears the session data
+        # moves the current session into the resident session cache, then clears the session data
+        self.session_obj.stash_session()
         self.session_obj.session = None
 
         # resets the status label
@@ -1103,12 +1157,31 @@ class MenuBar(QObject):
 
         DefaultDir(self.sp_main).show()
 
+    def memory_usage(self):
+
+        MemoryUsage(self.sp_main).show()
+
     def close_window(self):
 
+        # prompts the user to save any autosaved/journalled edits to the session file
+        session = self.session_obj.session
+        session_journal.flush()
+        if (session is not None) and (session.ssf_file is not None) and session_journal.has_unsaved():
+            q_str = 'The session has unsaved edits. Would you like to save these edits to the session file?'
+            u_choice = QMessageBox.question(self.sp_main, 'Save Session?', q_str, cf.q_yes_no_cancel, cf.q_yes)
+            if u_choice == cf.q_cancel:
+                # exit if the user cancelled
+                return
+
+            elif (u_choice == cf.q_yes) and (not self.write_session(session.ssf_file)):
+                # exit if there was an error saving the session
+                return
+
         # determines if there are any outstanding post-processing data files
         if self.sp_main.post_processing_data_check():
             # if the user chose to continue, then clear the data files
             self.sp_main.session_obj.clear_all_postprocessing()
+            self.sp_main.session_obj.session_cache.clear()
 
         else:
             # if the user cancelled, then exit
@@ -1118,6 +1191,10 @@ class MenuBar(QObject):
         if self.bombcell_dlg is not None:
             self.bombcell_dlg.close_window(True)
 
+        # removes the session autosave journals (and recovery files)
+        self.autosave_timer.stop()
+        session_journal.discard_all()
+
         # closes the window
         self.sp_main.can_close = True
         self.sp_main.close()
@@ -1140,8 +1217,8 @@ class MenuBar(QObject):
 
         # determines if there are any outstanding post-processing data files
         if self.sp_main.post_processing_data_check():
-            # if the user chose to continue, then clear the data files
-            self.session_obj.clear_all_postprocessing()
+            # if the user chose to continue, then clear the temporary data files and cache the current session
+            self.session_obj.stash_session()
 
         else:
             # if the user cancelled, then exit
@@ -1149,8 +1226,14 @@ class MenuBar(QObject):
 
         # loads data from the file
         self.update_progress_bar('Loading Session File', 0.1)
-        with open(ssf_file, 'rb') as f:
-            ses_data = pickle.load(f)
+        try:
+            ses_data = read_session_file(ssf_file)
+
+        except SessionFileError as e:
+            # if there was an error, then output a message to screen
+            cf.show_error(str(e), 'Session File Error')
+            self.update_progress_bar(None, None)
+            return
 
         # field retrieval
         channel_data = ses_data['channel_data']
@@ -1166,10 +1249,19 @@ class MenuBar(QObject):
         self.update_progress_bar('Resetting Channel Data', 0.2)
         self.session_obj.reset_channel_data(channel_data)
 
+        # recalculates the channel data for any runs where the raw data files have changed
+        i_run_stale = self.session_obj.session.get_stale_runs(ses_data.get('channel_snapshot'))
+        if len(i_run_stale):
+            self.session_obj.session.load_channel_data(i_run_stale)
+
         # resets the sorting information object
-        if 'sorting_props' in ses_data:
+        if len(ses_data.get('sorting_props') or {}):
             self.session_obj.set_sorting_props(ses_data['sorting_props'])
 
+        else:
+            # case is the sorter information is missing from the file (recalculates the information)
+            self.session_obj.session.load_sorting_para(self.session_obj, True)
+
         # updates the bad/sync channel status table fields
         self.update_progress_bar('Updating Channel Information', 0.3)
         self.sp_main.bad_channel_change()
@@ -1222,6 +1314,8 @@ class MenuBar(QObject):
                     # if there is preprocessed data, prompt the user if they would like to re-run the calculations
                     t_str = 'Re-run Preprocessing?'
                     q_str = 'The loaded session has preprocessed tasks. Would you like to re-run these tasks?'
+                    if prep_info.configs.get_cache_opt()[0]:
+                        q_str += '\n\n(Preprocessing steps materialised in the preprocessing cache are reused)'
                     u_choice = QMessageBox.question(self.sp_main, 'Use Default Files?', q_str, cf.q_yes_no, cf.q_yes)
                     if u_choice == cf.q_yes:
                         # if so, run the preprocessing dialog window
@@ -1237,6 +1331,9 @@ class MenuBar(QObject):
                             # disables the preprocessing menu items
                             self.set_menu_enabled_blocks('clear-preprocess')
 
+        # restarts the session autosave journal (removes any records from the session load)
+        self.sp_main.open_session_journal()
+
         # resets the status label
         self.update_progress_bar(None, None)
         self.info_manager.prog_widget.update_message_label()
@@ -1283,6 +1380,11 @@ class MenuBar(QObject):
             mm_name = os.path.split(mm_file[0, 0, i_mm])[1]
             self.sp_main.added_post_process(mm_name)
 
+        # sets up the post-processing views
+        self.setup_post_process_views()
+
+    def setup_post_process_views(self):
+
         # updates the unit information tab
         self.info_manager.reset_shank_run_info()
         self.prop_manager.add_spike_table()
@@ -1401,6 +1503,160 @@ class MenuBar(QObject):
 
     def save_session(self):
 
+        # prompts the user for the session file path (exit if the user cancels)
+        session_dir = cw.get_def_dir("session")
+        ssf_file = self.save_file('session', def_dir=session_dir)
+        if ssf_file is None:
+            return
+
+        # saves the session file
+        self.write_session(ssf_file)
+
+    def write_session(self, ssf_file):
+
+        try:
+            # saves the session file
+            write_session_file(ssf_file, self.get_session_data())
+
+        except (TypeError, OSError) as e:
+            # if there was an error, then output a message to screen
+            cf.show_error('Error saving the session file:\n\n{0}'.format(e), 'Session File Error')
+            return False
+
+        # resets the autosave journal (the edits are now stored in the session file, so the autosave recovery file
+        # is also removed)
+        self.session_obj.session.ssf_file = ssf_file
+        session_journal.reset_session_file(ssf_file)
+        return True
+
+    def autosave_session(self):
+
+        # exits if there is no saved session file or no unsaved edits
+        session = self.session_obj.session
+        if (session is None) or (session.ssf_file is None) or (not session_journal.has_pending()):
+            return
+
+        try:
+            # compacts the journal edits into the recovery file next to the session file (the session file is
+            # only overwritten by an explicit save/recovery)
+            rcv_file = get_recovery_file(session.ssf_file)
+            write_session_file(rcv_file, self.get_session_data())
+            session_journal.reset_session_file(session.ssf_file, rcv_file)
+
+        except (TypeError, OSError):
+            # if there was an error, then the edits are kept in the journal
+            pass
+
+    def recover_session(self):
+
+        # determines if there are any journals with unsaved session edits (exit if none)
+        j_file = get_recovery_journals()
+        if not len(j_file):
+            return
+
+        # prompts the user if they want to recover the unsaved edits
+        j_hdr, j_rec = read_journal(j_file[0])
+        is_rcv = has_recovery_file(j_hdr)
+        e_str = 'Autosaved edits (and {0} later edits)' if is_rcv else 'Unsaved edits ({0} in total)'
+        q_str = ('{0} were found from a previous Spykit session.\n\n'
+                 'Would you like to recover these edits?').format(e_str.format(len(j_rec)))
+        u_choice = QMessageBox.question(self.sp_main, 'Recover Session?', q_str, cf.q_yes_no, cf.q_yes)
+
+        # removes the other session journals (and their recovery files)
+        for jf in (j_file[1:] if (u_choice == cf.q_yes) else j_file):
+            remove_journal(jf)
+
+        if u_choice == cf.q_no:
+            # exit if the user chose not to recover the session
+            return
+
+        # promotes the autosave recovery file to the session file (if it exists)
+        ssf_file = j_hdr['ssf_file']
+        if is_rcv:
+            try:
+                os.replace(j_hdr['rcv_file'], ssf_file)
+
+            except OSError as e:
+                # if there was an error, then output a message to screen
+                cf.show_error('Error recovering the session file:\n\n{0}'.format(e), 'Session Recovery Error')
+                return
+
+        # reloads the journal session
+        if (ssf_file is not None) and os.path.exists(ssf_file):
+            # case is a saved session (reloads the session file)
+            self.load_session(ssf_file, True)
+
+        else:
+            # case is an unsaved session (recreates the session object)
+            try:
+                session = SessionObject(self.sp_main, j_hdr['session_props'], sig_fcn=self.sp_main.worker_job_started)
+
+            except Exception as e:
+                # if there was an error, then output a message to screen
+                cf.show_error('Error recovering the session:\n\n{0}'.format(e), 'Session Recovery Error')
+                return
+
+            session.channel_calc.connect(self.session_obj.channel_calc)
+            self.session_obj.session = session
+
+        # exits if the session failed to load
+        if self.session_obj.session is None:
+            return
+
+        # replays the journal edits (the edits are also re-journalled)
+        self.apply_journal_records(j_rec)
+        for r in j_rec:
+            session_journal.record(r['op'], r['key'], r['value'])
+
+    def apply_journal_records(self, j_rec):
+
+        # initialisations
+        prop_list = ["general", "trace", "trigger"]
+        p_para = self.prop_manager.get_prop_para(prop_list)
+        ch_data = self.session_obj.channel_data
+        post_data = self.session_obj.post_data
+        is_keep, is_prop = False, False
+
+        for r in j_rec:
+            match r['op']:
+                case 'keep':
+                    # case is a channel keep flag
+                    ch_data.is_keep[r['key']] = r['value']
+                    is_keep = True
+
+                case 'prop':
+                    # case is a property parameter field
+                    p_type, p_fld, i_run = r['key']
+                    p_val = np.array(r['value']) if (p_fld == 'region_index') else r['value']
+                    if p_type not in p_para:
+                        continue
+
+                    elif i_run is None:
+                        p_para[p_type][p_fld] = p_val
+
+                    else:
+                        p_para[p_type][p_fld][i_run] = p_val
+
+                    is_prop = True
+
+                case 'unit_type':
+                    # case is a unit type (only if the post-processing data is loaded, as the edits are also
+                    # written directly to the post-processing memory map file)
+                    mm_name, i_run, i_shank, i_row = r['key']
+                    if (post_data is not None) and (mm_name in post_data.mmap_name):
+                        i_mmap = post_data.mmap_name.index(mm_name)
+                        post_data.mmap[i_mmap][i_run, i_shank]['unit_type'][0][i_row] = r['value']
+
+        # resets the channel keep flags
+        if is_keep:
+            self.session_obj.keep_channel_reset.emit()
+
+        # resets the property parameter fields
+        if is_prop:
+            self.prop_manager.set_prop_para(p_para)
+
+    def get_session_data(self):
+
         # field retrieval
         ses_obj = self.session_obj
         prep_tab = self.info_manager.get_info_tab('preprocess')
@@ -1409,8 +1665,8 @@ class MenuBar(QObject):
         info_list = ["preprocess", "status"]
         prop_list = ["general", "trace", "trigger"]
 
-        # sets up the session save data dictionary
-        session_data = {
+        # returns the session save data dictionary
+        return {
             'state': ses_obj.state,
             'configs': prep_tab.configs,
             'session_props': ses_obj.session.get_session_props(),
@@ -1422,13 +1678,10 @@ class MenuBar(QObject):
                 'sync': ses_obj.session.sync_ch,
                 'keep': ses_obj.get_keep_channels(),
                 'removed': ses_obj.get_removed_channels(),
-            }
+            },
+            'channel_snapshot': ses_obj.session.get_channel_snapshot(),
         }
 
-        # saves the session file
-        session_dir = cw.get_def_dir("session")
-        self.save_file('session', session_data, def_dir=session_dir)
-
     def save_preprocessed(self):
 
         SavePrep(self.sp_main).show()
@@ -1670,7 +1923,6 @@ class MenuBar(QObject):
         # removes the post-processing
         for i_rmv in np.flip(i_mmap_rmv):
             self.session_obj.remove_post_process(i_rmv)
-            time.sleep(0.05)
 
         if reset_view:
             # clears the post-processing views from the configuration panel
@@ -1695,12 +1947,9 @@ class MenuBar(QObject):
 
                 # resets the view ID (if a change was made)
                 if is_view_change:
-                    # force updates the gui
-                    time.sleep(0.05)
                     self.prop_manager.set_region_config(g_id)
 
                     # resets the configuration ID flags and views
-                    time.sleep(0.05)
                     self.plot_manager.update_plot_config(g_id)
                     self.sp_main.reset_prop_tab_visible(g_id)
 
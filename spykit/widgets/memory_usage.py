@@ -0,0 +1,132 @@
+# module import
+import os
+
+# spike pipeline imports
+import spykit.common.common_func as cf
+import spykit.common.common_widget as cw
+from spykit.common.memory_manager import mem_manager
+
+# pyqt6 module import
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QWidget, QPlainTextEdit)
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+# memory budget file path
+mem_file = os.path.join(cw.resource_dir, 'mem_budget.json').replace('\\', '/')
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+"""
+    MemoryUsage: dialog window that shows the memory usage of the registered caches (largest consumers first),
+                 and provides the means for users to set the memory budget
+"""
+
+
+class MemoryUsage(QDialog):
+    # widget dimensions
+    x_gap = 5
+    dlg_width = 600
+    dlg_height = 400
+
+    # array class fields
+    but_str = ['Apply Budget', 'Free Cached Data', 'Close Window']
+
+    # widget styles
+    list_style = "border: 1px solid black;"
+
+    def __init__(self, sp_main):
+        super(MemoryUsage, self).__init__(sp_main)
+
+        # class widgets
+        self.cont_button = []
+        self.button_widget = QWidget()
+        self.info_list = QPlainTextEdit()
+        self.edit_budget = cw.QLabelEdit(
+            None, 'Memory Budget (MB): ', '{:.0f}'.format(mem_manager.n_bytes_max / 2 ** 20), font_lbl=cw.font_lbl)
+
+        # class layouts
+        self.main_layout = QVBoxLayout()
+        self.button_layout = QHBoxLayout()
+
+        # initialises the class fields
+        self.init_class_fields()
+        self.init_cont_buttons()
+        self.update_usage_info()
+
+    # ---------------------------------------------------------------------------
+    # Class Property Widget Setup Functions
+    # ---------------------------------------------------------------------------
+
+    def init_class_fields(self):
+
+        # sets the dialog window properties
+        self.setFixedSize(self.dlg_width, self.dlg_height)
+        self.setWindowTitle('Spykit Memory Usage')
+        self.setLayout(self.main_layout)
+        self.main_layout.setSpacing(self.x_gap)
+
+        # sets the listbox properties
+        self.info_list.setStyleSheet(self.list_style)
+        self.info_list.setReadOnly(True)
+
+        # adds the widgets to the main layout
+        self.main_layout.addWidget(self.edit_budget)
+        self.main_layout.addWidget(self.info_list)
+
+        # connects the memory manager signal functions
+        mem_manager.usage_changed.connect(self.update_usage_info)
+
+    def init_cont_buttons(self):
+
+        # initialisations
+        cb_fcn = [self.apply_budget, self.free_cached_data, self.close_window]
+
+        # sets the button widget/layout properties
+        self.main_layout.addWidget(self.button_widget)
+        self.button_widget.setLayout(self.button_layout)
+        self.button_layout.setSpacing(0)
+        self.button_layout.setContentsMargins(0, 0, 0, 0)
+
+        for bs, cb in zip(self.but_str, cb_fcn):
+            # creates the control button widgets
+            obj_but = cw.create_push_button(None, bs, cw.font_lbl)
+            self.button_layout.addWidget(obj_but)
+            self.cont_button.append(obj_but)
+
+            # sets the slot function
+            obj_but.clicked.connect(cb)
+
+    # ---------------------------------------------------------------------------
+    # Class Widget Event Functions
+    # ---------------------------------------------------------------------------
+
+    def apply_budget(self):
+
+        # determines if the new budget is valid
+        nw_val, e_str = cf.check_edit_num(self.edit_budget.get_text(), min_val=1)
+        if e_str is not None:
+            # if not, then reset the budget string
+            self.edit_budget.set_text('{:.0f}'.format(mem_manager.n_bytes_max / 2 ** 20))
+            return
+
+        # resets and saves the memory budget
+        mem_manager.set_budget(nw_val * 2 ** 20)
+        mem_manager.save_budget(mem_file)
+
+    def free_cached_data(self):
+
+        mem_manager.evict_all()
+
+    def update_usage_info(self):
+
+        self.info_list.setPlainText(mem_manager.get_summary_string())
+
+    def close_window(self):
+
+        self.close()
+
+    def closeEvent(self, evnt):
+
+        # disconnects the memory manager signal functions
+        mem_manager.usage_changed.disconnect(self.update_usage_info)
+        super(MemoryUsage, self).closeEvent(evnt)
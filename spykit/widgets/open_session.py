@@ -1,10 +1,9 @@
 # module import
 import os
-import time
+import sqlite3
 import numpy as np
 from pathlib import Path
 from copy import deepcopy
-from datetime import timedelta
 from functools import partial as pfcn
 from bigtree import dataframe_to_tree, tree_to_dict
 
@@ -12,14 +11,18 @@ from bigtree import dataframe_to_tree, tree_to_dict
 import spykit.common.common_func as cf
 import spykit.common.common_widget as cw
 import spykit.common.spikeinterface_func as sf
+from spykit.common.directory_index import dir_index
+from spykit.common.recording_catalog import rec_catalog
 from spykit.common.property_classes import SessionObject
 from spykit.common.common_widget import (QLabelEdit, QFileSpec, QLabelCombo, QFolderTree, QLabelCheckCombo)
 from spykit.plotting.probe import ProbeView
+from spykit.threads.utils import ThreadWorker
 
 # pyqt6 module import
 from PyQt6.QtWidgets import (QDialog, QHBoxLayout, QVBoxLayout, QWidget, QFormLayout, QSizePolicy, QGridLayout,
                              QGroupBox, QComboBox, QCheckBox, QLineEdit, QTableWidget, QTableWidgetItem, QFrame,
-                             QSpacerItem, QTableView, QMainWindow, QApplication, QToolBar, QMessageBox)
+                             QSpacerItem, QTableView, QMainWindow, QApplication, QToolBar, QMessageBox,
+                             QHeaderView)
 from PyQt6.QtGui import QFont, QIcon, QStandardItem, QKeySequence, QAction
 from PyQt6.QtCore import Qt, QSize, QSizeF, pyqtSignal
 
@@ -92,6 +95,7 @@ class OpenSession(QMainWindow):
         # other class fields
         self.n_shank = None
         self.session = None
+        self.probe_sessions = {}
         self.session_obj.open_session = True
         self.scr_sz = QApplication.primaryScreen().size()
         self.probe_width = dlg_width - (file_width + 2 * x_gap)
@@ -198,6 +202,7 @@ class OpenSession(QMainWindow):
 
                 # reloads the session
                 self.session = self.session_obj.session
+                self.probe_sessions = self.session_obj.probe_sessions
                 self.session_load(load_expt=False)
 
     # ---------------------------------------------------------------------------
@@ -234,6 +239,7 @@ class OpenSession(QMainWindow):
 
         # clears the session field
         self.session = None
+        self.probe_sessions = {}
         self.is_changed = True
         self.set_toolbar_props('restart', False)
         self.file.expt_folder.button_reset_click()
@@ -276,21 +282,22 @@ class OpenSession(QMainWindow):
 
         # closes the dialog window
         self.setVisible(False)
-        time.sleep(0.25)
 
         # updates the session class field
         self.session_obj.open_session = False
         if update_session:
-            # clears the post-processing memory map/temporary files
-            self.session_obj.clear_all_postprocessing()
+            # moves the current session into the resident session cache
+            if self.session is not self.session_obj.session:
+                self.session_obj.stash_session()
 
-            # resets the session object
+            # resets the session object (and the probe sessions for multi-probe sessions)
+            self.session_obj.probe_sessions = self.probe_sessions
             self.session_obj.session = self.session
-            time.sleep(0.1)
 
         elif self.session is not None:
             # force closes the multi-processing workers (if running)
-            self.session.force_close_workers()
+            for ses in (self.probe_sessions.values() if len(self.probe_sessions) else [self.session]):
+                ses.force_close_workers()
 
         # sets the parent widget to be visible (if available)
         if self.sp_main is not None:
@@ -399,7 +406,7 @@ class SessionFile(QWidget):
     grp_name = "Recording Data"
     p_list_axis = ['Axis 0', 'Axis 1']
     p_list_type = ['int8', 'int16', 'int32']
-    col_hdr = ['Run #', 'Analyse Run?', 'Session Run Name']
+    col_hdr = ['Run #', 'Analyse Run?', 'Session Run Name', 'Duration']
 
     table_font = cw.create_font_obj(size=8)
     table_hdr_font = cw.create_font_obj(size=8, is_bold=True, font_weight=QFont.Weight.Bold)
@@ -435,7 +442,7 @@ class SessionFile(QWidget):
         # class widget fields
         self.expt_folder = None
         self.main_widget = self.open_ses.main_widget
-        self.run_table = QTableWidget(0, 3, None)
+        self.run_table = QTableWidget(0, len(self.col_hdr), None)
         self.tab_group = cw.create_tab_group(self)
         self.group_panel = QGroupBox(self.grp_name.upper())
 
@@ -557,7 +564,7 @@ class SessionFile(QWidget):
         self.run_table.resizeRowsToContents()
         self.run_table.resizeColumnToContents(0)
         self.run_table.resizeColumnToContents(1)
-        self.run_table.horizontalHeader().setStretchLastSection(True)
+        self.run_table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
         self.run_table.setSizePolicy(QSizePolicy(cf.q_exp, cf.q_exp))
         self.run_table.setStyleSheet(cw.table_style)
         self.run_table.itemChanged.connect(self.check_run_table)
@@ -852,12 +859,14 @@ class SessionFile(QWidget):
 
     def get_session_run_names(self):
 
-        # retrieves the subject/session dictionary field
-        ex_f = self.expt_folder
-        ses_dict = ex_f.obj_dir.sub_dict[ex_f.sub_path][ex_f.ses_type]
-
         # returns the run-name list
-        return [x.split('/')[-1] for x in np.array(ex_f.obj_dir.f_pd[0]['path'])[ses_dict]]
+        return [x.split('/')[-1] for x in self.expt_folder.get_session_tree_paths()]
+
+    def get_session_run_paths(self):
+
+        # returns the run directory paths
+        ex_f = self.expt_folder
+        return ex_f.get_run_paths(ex_f.get_session_tree_paths())
 
     def get_session_type(self):
 
@@ -869,12 +878,54 @@ class SessionFile(QWidget):
 
     def get_run_names(self):
 
-        return "all" if np.all(self.use_run) else self.get_session_run_names()
+        # returns all runs (single probe unfiltered sessions only, as "all" would include every probe/filtered run)
+        ex_f = self.expt_folder
+        if np.all(self.use_run) and (not ex_f.is_multi_probe()) and (ex_f.run_filt is None):
+            return "all"
+
+        return [x for x, is_use in zip(self.get_session_run_names(), self.use_run) if is_use]
+
+    def get_probe_run_names(self):
+
+        # exits if a single probe is selected
+        if not self.expt_folder.is_all_probe():
+            return {}
+
+        # groups the selected runs by probe
+        return sf.get_probe_run_names(self.get_run_names())
 
     def get_output_path(self):
 
         return None
 
+    @staticmethod
+    def get_run_duration_string(run_path):
+
+        # retrieves the run information from the recording catalog (exit if not available)
+        r_info = rec_catalog.get_run_info(run_path)
+        if (r_info is None) or (r_info['duration'] is None):
+            return 'N/A'
+
+        return cf.get_duration_string(r_info['duration'])
+
+    @staticmethod
+    def get_run_info_string(run_path):
+
+        # retrieves the run information from the recording catalog (exit if not available)
+        r_info = rec_catalog.get_run_info(run_path)
+        if r_info is None:
+            return ''
+
+        # sets up the information string
+        f_size = 'N/A' if (r_info['file_size'] is None) else '{:.1f} MB'.format(r_info['file_size'] / 2 ** 20)
+        return '\n'.join([
+            'Stream: {0}'.format(r_info['stream']),
+            'Sampling Freq: {0}'.format(r_info['sample_rate']),
+            'Channel Count: {0}'.format(r_info['n_channel']),
+            'Probe Type: {0}'.format(r_info['probe_type']),
+            'File Size: {0}'.format(f_size),
+        ])
+
     def reset_session_run_table(self, get_run_names):
 
         # resets the update flag
@@ -883,6 +934,7 @@ class SessionFile(QWidget):
         # clears the table
         self.run_table.clear()
         run_name = self.get_session_run_names() if get_run_names else []
+        run_path = self.get_session_run_paths() if get_run_names else []
 
         # resets the table dimensions
         n_run = len(run_name)
@@ -891,9 +943,9 @@ class SessionFile(QWidget):
         # memory allocation
         self.use_run = np.ones(n_run, dtype=bool)
 
-        # enables the open session toolbar item
+        # enables the open session toolbar item (if there are any runs)
         h_root = cf.get_parent_widget(self, OpenSession)
-        h_root.set_toolbar_props('open', True)
+        h_root.set_toolbar_props('open', n_run > 0)
 
         # resets the header font
         self.run_table.setHorizontalHeaderLabels(self.col_hdr)
@@ -923,9 +975,34 @@ class SessionFile(QWidget):
             self.run_table.setItem(i, 2, h_cell_run)
             self.run_table.setRowHeight(i, self.row_height)
 
+            # creates the run duration field (from the recording catalog)
+            h_cell_dur = QTableWidgetItem(self.get_run_duration_string(run_path[i]))
+            h_cell_dur.setFlags(~Qt.ItemFlag.ItemIsEditable)
+            h_cell_dur.setTextAlignment(cf.align_type['center'])
+            h_cell_dur.setFont(self.table_font)
+            h_cell_dur.setToolTip(self.get_run_info_string(run_path[i]))
+            self.run_table.setItem(i, 3, h_cell_dur)
+
+        # resizes the duration column
+        self.run_table.resizeColumnToContents(3)
+
         # resets the update flag
         self.is_updating = False
 
+    def update_run_durations(self):
+
+        # updates the run duration fields (the run selections are retained)
+        self.is_updating = True
+        for i, rp in enumerate(self.get_session_run_paths()):
+            h_cell_dur = self.run_table.item(i, 3)
+            if h_cell_dur is not None:
+                h_cell_dur.setText(self.get_run_duration_string(rp))
+                h_cell_dur.setToolTip(self.get_run_info_string(rp))
+
+        # resizes the duration column
+        self.run_table.resizeColumnToContents(3)
+        self.is_updating = False
+
     # ---------------------------------------------------------------------------
     # Miscellaneous Functions
     # ---------------------------------------------------------------------------
@@ -946,15 +1023,55 @@ class SessionFile(QWidget):
                 s_props['run_names'] = self.get_run_names()
                 s_props['output_path'] = self.get_output_path()
 
+                # loads each probe as a separate session (multi-probe sessions only)
+                probe_runs = self.get_probe_run_names()
+                if len(probe_runs) > 1:
+                    self.load_probe_sessions(s_props, probe_runs)
+                    return
+
             case 'file':
                 # case is a raw file format
                 pass
 
+        # resets the probe sessions
+        self.open_ses.probe_sessions = {}
+
+        # retrieves the session from the resident session cache (if available)
+        ses_entry = self.sp_main.session_obj.session_cache.get_entry(s_props)
+        if ses_entry is not None:
+            # case is a resident session (the channel data has already been calculated)
+            self.open_ses.session = ses_entry.session
+            return
+
         # creates the session object
         sig_fcn = self.sp_main.worker_job_started
         self.open_ses.session = SessionObject(self.open_ses, s_props, sig_fcn=sig_fcn)
         self.open_ses.session.channel_calc.connect(self.channel_calc_slot)
 
+    def load_probe_sessions(self, s_props, probe_runs):
+
+        # retrieves the resident probe sessions (the other probe sessions are loaded)
+        probe_ses, probe_props = {}, {}
+        for p_name, r_names in probe_runs.items():
+            p_props = dict(s_props, run_names=r_names, probe_name=p_name)
+            ses_entry = self.sp_main.session_obj.session_cache.get_entry(p_props)
+            if ses_entry is None:
+                probe_props[p_name] = p_props
+
+            else:
+                probe_ses[p_name] = ses_entry.session
+
+        # loads the non-resident probe sessions (the raw data for each probe is loaded concurrently)
+        sig_fcn = self.sp_main.worker_job_started
+        probe_load = SessionObject.load_probe_sessions(self.open_ses, probe_props, sig_fcn=sig_fcn)
+        for ps in probe_load.values():
+            ps.channel_calc.connect(self.channel_calc_slot)
+
+        # sets the probe sessions (the first probe is the current session)
+        probe_ses.update(probe_load)
+        self.open_ses.probe_sessions = {p_name: probe_ses[p_name] for p_name in probe_runs}
+        self.open_ses.session = self.open_ses.probe_sessions[list(probe_runs)[0]]
+
     def channel_calc_slot(self, ch_type, session):
 
         self.channel_calc.emit(ch_type, session)
@@ -1528,14 +1645,8 @@ class SessionProbe(QWidget):
 
         n_frame = self.p_rec.get_num_frames()
         s_freq = self.p_rec.get_sampling_frequency()
-        t_dur = n_frame / s_freq
-
-        td = timedelta(seconds=t_dur)
-        t_sp = str(td).split(':')
-        t_sp_s = t_sp[2].split('.')
-        t_sp_ms = str(np.round(float(t_sp[2]) % 1, 3))[2:]
 
-        return '{0}:{1}:{2}.{3}'.format(t_sp[0], t_sp[1], t_sp_s[0], t_sp_ms)
+        return cf.get_duration_string(n_frame / s_freq)
 
 
 # ----------------------------------------------------------------------------------------------------------------------
@@ -1550,6 +1661,10 @@ class ExptFolder(QWidget):
     f_format = ['spikeglx', 'openephys']
     tab_name = ['Feasible', 'Infeasible']
 
+    # multi-probe/probe type selection strings
+    all_probe = 'All Probes'
+    all_type = 'All Types'
+
     def __init__(self, parent=None):
         super(ExptFolder, self).__init__(parent)
 
@@ -1560,10 +1675,20 @@ class ExptFolder(QWidget):
         self.s_dir = None
         self.ses_type = None
         self.sub_path = None
+        self.probe_type = None
+        self.probe_names = []
         self.format_type = self.f_format[0]
 
+        # run filter class fields
+        self.run_filt = None
+        self.t_dur_min = None
+
+        # recording catalog worker fields
+        self.catalog_req = None
+        self.catalog_worker = None
+
         # directory check class object
-        self.obj_dir = sf.DirectoryCheck(s_dir0, self.format_type)
+        self.obj_dir = sf.DirectoryCheck(s_dir0, self.format_type, dir_index)
 
         # class layout setup
         self.h_tab = []
@@ -1571,14 +1696,19 @@ class ExptFolder(QWidget):
         self.main_layout = QVBoxLayout()
         self.tab_layout = QVBoxLayout()
         self.para_layout = QHBoxLayout()
+        self.filt_layout = QHBoxLayout()
 
         # class widget setup
         self.main_widget = QWidget(self)
         self.para_group = QWidget(self)
+        self.filt_group = QWidget(self)
         self.tab_group = cw.create_tab_group(None)
         self.file_spec = QFileSpec(None, 'Parent Search Folder', file_path=s_dir0, name='data_folder')
         self.f_type = QLabelCombo(None, 'Recording Format:', self.f_format, self.format_type, font_lbl)
         self.s_type = QLabelCombo(None, 'Session Name:', [], [], font_lbl)
+        self.p_type = QLabelCombo(None, 'Probe:', [], [], font_lbl)
+        self.r_type = QLabelCombo(None, 'Probe Type:', [self.all_type], self.all_type, font_lbl)
+        self.t_min = QLabelEdit(None, 'Min Duration (s):', '', font_lbl)
 
         # boolean class fields
         self.is_updating = False
@@ -1616,8 +1746,9 @@ class ExptFolder(QWidget):
 
     def init_class_widgets(self):
 
-        # sets up the other property objects
+        # sets up the other property/run filter objects
         self.setup_other_para()
+        self.setup_filter_para()
 
         # sets up the tab widgets
         for tn in self.tab_name:
@@ -1629,6 +1760,7 @@ class ExptFolder(QWidget):
         # adds the other widgets
         self.tab_layout.addWidget(self.tab_group)
         self.tab_layout.addWidget(self.para_group)
+        self.tab_layout.addWidget(self.filt_group)
         self.tab_layout.addWidget(self.file_spec)
 
         # resets the collapse panel size policy
@@ -1680,12 +1812,40 @@ class ExptFolder(QWidget):
         self.s_type.setContentsMargins(0, 0, 0, 0)
         self.s_type.connect(self.session_changed, False)
 
+        # adds the recording probe combo box
+        self.para_layout.addWidget(self.p_type)
+        self.p_type.set_enabled(False)
+        self.p_type.setContentsMargins(0, 0, 0, 0)
+        self.p_type.connect(self.probe_changed, False)
+
+    def setup_filter_para(self):
+
+        # initialisations
+        self.filt_group.setLayout(self.filt_layout)
+        self.filt_group.setContentsMargins(0, 0, 0, 0)
+        self.filt_layout.setSpacing(0)
+
+        # adds the probe type filter combo box (the types are read from the recording catalog)
+        self.filt_layout.addWidget(self.r_type)
+        self.r_type.set_enabled(False)
+        self.r_type.setContentsMargins(0, 0, 0, 0)
+        self.r_type.connect(self.filter_changed, False)
+
+        # adds the minimum run duration filter editbox
+        self.filt_layout.addWidget(self.t_min)
+        self.t_min.setContentsMargins(0, 0, 0, 0)
+        self.t_min.set_tooltip('Only show runs at least this long (leave empty to show all runs)')
+        self.t_min.connect(self.edit_min_duration)
+
     def setup_folder_tree_views(self):
 
         # determines all the feasible folders (for the current search path/file format)
         self.obj_dir.det_all_feas_folders()
         self.s_dir = str(self.obj_dir.f_path)
 
+        # updates the recording catalog (for all feasible runs)
+        self.update_run_catalog()
+
         for i, (ht, fd) in enumerate(zip(self.h_tab, self.obj_dir.f_pd)):
             # retrieves the tree widget
             obj_tree = ht.findChild(QFolderTree)
@@ -1721,12 +1881,155 @@ class ExptFolder(QWidget):
                     # clears the session/run table widgets
                     self.is_updating = True
                     self.s_type.obj_cbox.clear()
+                    self.reset_probe_combo(False)
                     self.h_root.reset_session_run_table(False)
                     self.is_updating = False
 
             # updates the enabled properties
             self.tab_group.setTabEnabled(i, len(fd) > 0)
 
+    def update_run_catalog(self):
+
+        # resets the run filter (from the current catalog entries, until the catalog update has finished)
+        self.reset_run_filter()
+
+        # exits if there are no feasible runs
+        if not len(self.obj_dir.f_pd[0]):
+            self.catalog_req = None
+            return
+
+        # starts the catalog worker (if running, the latest request is catalogued once the current one finishes)
+        self.catalog_req = self.get_run_paths(self.obj_dir.f_pd[0]['path'])
+        if self.catalog_worker is None:
+            self.start_catalog_worker()
+
+    def start_catalog_worker(self):
+
+        # creates/starts the catalog worker
+        self.catalog_worker = ThreadWorker(self.h_root, self.calc_run_catalog, self.catalog_req)
+        self.catalog_worker.finished.connect(self.catalog_worker_finished)
+        self.catalog_worker.start()
+
+    def catalog_worker_finished(self):
+
+        # retrieves the catalog worker (the worker is released)
+        c_worker, self.catalog_worker = self.catalog_worker, None
+        c_worker.deleteLater()
+
+        if c_worker.work_para is not self.catalog_req:
+            # case is the search folder/format has changed since the request (the latest request is catalogued)
+            if self.catalog_req is not None:
+                self.start_catalog_worker()
+
+            return
+
+        # resets the run filter
+        run_filt_pr = self.run_filt
+        self.reset_run_filter()
+
+        # updates the session run table (the table is only reset if the filtered runs have changed)
+        if self.has_session():
+            if self.run_filt != run_filt_pr:
+                self.h_root.reset_session_run_table(True)
+
+            else:
+                self.h_root.update_run_durations()
+
+    def reset_run_filter(self):
+
+        # retrieves the catalogued probe types (for the current search folder/format)
+        r_info = self.query_run_catalog()
+        p_type = sorted(set(x['probe_type'] for x in r_info if x['probe_type'] is not None))
+
+        # resets the probe type combobox (the current selection is retained if still available)
+        r_type_pr, is_updating_pr = self.r_type.current_text(), self.is_updating
+        self.is_updating = True
+        self.r_type.obj_cbox.clear()
+        self.r_type.addItems([self.all_type] + p_type)
+        self.r_type.set_current_text(r_type_pr if (r_type_pr in p_type) else self.all_type)
+        self.r_type.set_enabled(len(p_type) > 0)
+        self.is_updating = is_updating_pr
+
+        # determines the runs that meet the filter criteria (None if no filter is set)
+        probe_type = None if (self.r_type.current_text() == self.all_type) else self.r_type.current_text()
+        if (probe_type is None) and (self.t_dur_min is None):
+            self.run_filt = None
+
+        else:
+            r_info = self.query_run_catalog(probe_type=probe_type, min_duration=self.t_dur_min)
+            self.run_filt = set(x['run_path'] for x in r_info)
+
+    def query_run_catalog(self, **q_para):
+
+        # exits if the search folder is not set
+        if self.s_dir is None:
+            return []
+
+        try:
+            # queries the catalog for the runs within the search folder (for the current format)
+            return rec_catalog.query(path_prefix=cf.convert_path(self.s_dir), file_format=self.format_type, **q_para)
+
+        except sqlite3.Error:
+            # case is the catalog can't be read
+            return []
+
+    def has_session(self):
+
+        # determines if the subject/session are set (and are feasible)
+        sub_dict = self.obj_dir.sub_dict.get(self.sub_path, {})
+        return self.ses_type in sub_dict
+
+    def get_run_paths(self, t_path):
+
+        # converts the feasible tree paths (relative to the search folder) to the run directory paths
+        s_dir = cf.convert_path(self.s_dir)
+        return ['{0}{1}'.format(s_dir, x[1:]) for x in t_path]
+
+    def get_session_tree_paths(self, all_probe=False):
+
+        # retrieves the feasible tree paths for the selected subject/session
+        ses_dict = self.obj_dir.sub_dict[self.sub_path][self.ses_type]
+        t_path = np.array(self.obj_dir.f_pd[0]['path'])[ses_dict]
+
+        # removes the runs that don't meet the filter criteria (if a filter is set)
+        if self.run_filt is not None:
+            t_path = [x for x, rp in zip(t_path, self.get_run_paths(t_path)) if rp in self.run_filt]
+
+        # returns the tree paths (for the selected probe)
+        if all_probe or self.is_all_probe():
+            return list(t_path)
+
+        else:
+            return [x for x in t_path if sf.get_run_probe_name(x.split('/')[-1]) == self.probe_type]
+
+    def is_multi_probe(self):
+
+        return len(self.probe_names) > 1
+
+    def is_all_probe(self):
+
+        return (self.probe_type is None) or (self.probe_type == self.all_probe)
+
+    def reset_probe_combo(self, has_session=True):
+
+        # retrieves the probe names for the selected session runs
+        if has_session:
+            r_name = [x.split('/')[-1] for x in self.get_session_tree_paths(True)]
+            p_name = [x for x in sf.get_probe_run_names(r_name) if x is not None]
+            self.probe_names = sorted(p_name, key=lambda x: int(x[len('imec'):]))
+
+        else:
+            self.probe_names = []
+
+        # resets the probe combobox (all probes are selected by default for multi-probe sessions)
+        p_list = ([self.all_probe] if self.is_multi_probe() else []) + self.probe_names
+        self.p_type.obj_cbox.clear()
+        self.p_type.addItems(p_list)
+        self.p_type.set_enabled(self.is_multi_probe())
+
+        # sets the selected probe
+        self.probe_type = p_list[0] if len(p_list) else None
+
     # ---------------------------------------------------------------------------
     # Widget Event Functions
     # ---------------------------------------------------------------------------
@@ -1799,6 +2102,11 @@ class ExptFolder(QWidget):
         # updates the session type
         self.ses_type = self.s_type.current_text()
 
+        # resets the recording probe combobox
+        self.is_updating = True
+        self.reset_probe_combo()
+        self.is_updating = False
+
         # resets the session run table
         self.h_root.reset_session_run_table(True)
 
@@ -1807,6 +2115,56 @@ class ExptFolder(QWidget):
             obj_tree = self.h_tab[0].findChild(QFolderTree)
             obj_tree.update_tree_highlights()
 
+    def probe_changed(self, *_):
+
+        # if manually updating, then exit
+        if self.is_updating:
+            return
+
+        # updates the selected probe and resets the session run table
+        self.probe_type = self.p_type.current_text()
+        self.h_root.reset_session_run_table(True)
+
+    def filter_changed(self, *_):
+
+        # if manually updating, then exit
+        if self.is_updating:
+            return
+
+        # resets the run filter
+        self.reset_run_filter()
+
+        # resets the recording probe combobox and session run table (if a session is selected)
+        if self.has_session():
+            self.is_updating = True
+            self.reset_probe_combo()
+            self.is_updating = False
+
+            self.h_root.reset_session_run_table(True)
+
+    def edit_min_duration(self, h_obj):
+
+        # determines if the new value is valid (an empty string clears the filter)
+        nw_str = h_obj.text().strip()
+        if len(nw_str):
+            nw_val, e_str = cf.check_edit_num(nw_str, min_val=0)
+            if e_str is not None:
+                # if not, then reset the previous value
+                h_obj.setText('' if (self.t_dur_min is None) else '%g' % self.t_dur_min)
+                return
+
+        else:
+            # case is the filter is cleared
+            nw_val = None
+
+        # exits if the value hasn't changed
+        if nw_val == self.t_dur_min:
+            return
+
+        # updates the duration filter
+        self.t_dur_min = nw_val
+        self.filter_changed()
+
     def reset_selected_node(self, session):
 
         # sets up the subject path node string
@@ -1822,6 +2180,17 @@ class ExptFolder(QWidget):
     # Static Methods
     # ---------------------------------------------------------------------------
 
+    @staticmethod
+    def calc_run_catalog(run_path):
+
+        try:
+            # updates the catalog (only new/modified recording header files are parsed)
+            rec_catalog.update_runs(run_path)
+
+        except (OSError, sqlite3.Error):
+            # case is the catalog can't be updated (the run metadata is not shown)
+            pass
+
     @staticmethod
     def reset_selected_subject(obj_tree, sub_path):
 
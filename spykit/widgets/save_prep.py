@@ -8,6 +8,12 @@ from functools import partial as pfcn
 import spykit.info.preprocess as pp
 import spykit.common.common_func as cf
 import spykit.common.common_widget as cw
+from spykit.common.dtype_policy import export_dtypes
+from spykit.threads.utils import ThreadWorker
+from spykit.common.job_tuner import job_tuner
+from spykit.common.progress_bus import progress_bus
+from spykit.common.recording_export import (ExportScheduler, create_export, benchmark_read, export_formats,
+                                             blosc_cnames, zarr_filters)
 
 # pyqt6 module import
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QGridLayout,
@@ -39,13 +45,17 @@ class SavePrep(QDialog):
         self.cont_button = []
         self.prep_group = None
         self.para_group = None
+        self.export_group = None
         self.prep_list = QListWidget()
+        self.export_list = QListWidget()
+        self.prog_bar = cw.QDialogProgress(font=cw.font_lbl, is_task=False)
         self.button_widget = QWidget()
 
         # class layouts
         self.main_layout = QVBoxLayout()
         self.prep_layout = QVBoxLayout()
         self.para_layout = QGridLayout()
+        self.export_layout = QVBoxLayout()
         self.button_layout = QHBoxLayout()
 
         # field retrieval
@@ -61,15 +71,31 @@ class SavePrep(QDialog):
 
         # other class fields
         self.n_worker = 10
+        self.is_auto_job = True
+        self.is_read_bench = False
+        self.obj_lbl_work = None
+        self.obj_lbl_zarr = []
+        self.out_format = export_formats[0]
+        self.cname = blosc_cnames[0]
+        self.f_type = zarr_filters[1]
+        self.dtype_policy = self.session_obj.session.prep_obj.dtype_policy
+        self.export_dtype = self.sp_main.info_manager.get_info_tab('preprocess').configs.get_dtype_opt()[1]
         self.user_dir = self.pp_steps[-1]
         self.i_sel_pp = len(self.pp_steps)
+        self.t_worker = None
+        self.scheduler = None
+        self.is_cancel = False
 
         # initialises the class fields
         self.init_class_fields()
         self.init_prep_group()
         self.init_para_group()
+        self.init_export_group()
         self.init_cont_buttons()
 
+        # subscribes to the export progress
+        progress_bus.subscribe(ExportScheduler.pr_name, self.export_progress)
+
     # ---------------------------------------------------------------------------
     # Class Property Widget Setup Functions
     # ---------------------------------------------------------------------------
@@ -113,11 +139,12 @@ class SavePrep(QDialog):
 
         # creates the label/editbox object
         tl_work = "Worker Count:"
-        obj_lbl_work = cw.QLabelEdit(None, tl_work, self.n_worker, font_lbl=cw.font_lbl, name="n_worker")
-        self.para_layout.addWidget(obj_lbl_work.obj_lbl, 0, 0)
-        self.para_layout.addWidget(obj_lbl_work.obj_edit, 0, 1)
+        self.obj_lbl_work = cw.QLabelEdit(None, tl_work, self.n_worker, font_lbl=cw.font_lbl, name="n_worker")
+        self.para_layout.addWidget(self.obj_lbl_work.obj_lbl, 0, 0)
+        self.para_layout.addWidget(self.obj_lbl_work.obj_edit, 0, 1)
         cb_fcn_nw = pfcn(self.edit_worker_count, "n_worker")
-        obj_lbl_work.connect(cb_fcn_nw)
+        self.obj_lbl_work.connect(cb_fcn_nw)
+        self.obj_lbl_work.set_enabled(not self.is_auto_job)
 
         # creates the label/editbox object
         tl_dir = "Folder Name:"
@@ -127,6 +154,56 @@ class SavePrep(QDialog):
         cb_fcn_fn = pfcn(self.edit_folder_name, "user_dir")
         obj_lbl_dir.connect(cb_fcn_fn)
 
+        # creates the label/combobox object
+        tl_dtype = "Output Data Type:"
+        obj_lbl_dtype = cw.QLabelCombo(None, tl_dtype, export_dtypes, self.export_dtype, font_lbl=cw.font_lbl)
+        self.para_layout.addWidget(obj_lbl_dtype.obj_lbl, 2, 0)
+        self.para_layout.addWidget(obj_lbl_dtype.obj_cbox, 2, 1)
+        obj_lbl_dtype.connect(self.combo_export_dtype)
+
+        # creates the output format label/combobox object
+        tl_format = "Output Format:"
+        obj_lbl_format = cw.QLabelCombo(None, tl_format, export_formats, self.out_format, font_lbl=cw.font_lbl)
+        self.para_layout.addWidget(obj_lbl_format.obj_lbl, 3, 0)
+        self.para_layout.addWidget(obj_lbl_format.obj_cbox, 3, 1)
+        obj_lbl_format.connect(self.combo_out_format)
+
+        # creates the zarr compression label/combobox objects (enabled for the zarr format only)
+        z_para = [('Compressor:', blosc_cnames, self.cname), ('Compression Filter:', zarr_filters, self.f_type)]
+        for i_z, (tl_z, z_list, z_value) in enumerate(z_para):
+            obj_lbl_z = cw.QLabelCombo(None, tl_z, z_list, z_value, font_lbl=cw.font_lbl)
+            self.para_layout.addWidget(obj_lbl_z.obj_lbl, 4 + i_z, 0)
+            self.para_layout.addWidget(obj_lbl_z.obj_cbox, 4 + i_z, 1)
+            obj_lbl_z.connect(pfcn(self.combo_zarr_para, i_z))
+            obj_lbl_z.set_enabled(self.out_format == 'zarr')
+            self.obj_lbl_zarr.append(obj_lbl_z)
+
+        # creates the auto-tune checkbox object
+        tl_auto = "Auto-Tune Worker Count/Chunk Size"
+        obj_chk_auto = cw.create_check_box(None, tl_auto, self.is_auto_job, font=cw.font_lbl)
+        self.para_layout.addWidget(obj_chk_auto, 6, 0, 1, 2)
+        obj_chk_auto.stateChanged.connect(self.checkbox_auto_job)
+
+        # creates the read-back benchmark checkbox object
+        tl_read = "Benchmark Read-Back Throughput"
+        obj_chk_read = cw.create_check_box(None, tl_read, self.is_read_bench, font=cw.font_lbl)
+        self.para_layout.addWidget(obj_chk_read, 7, 0, 1, 2)
+        obj_chk_read.stateChanged.connect(self.checkbox_read_bench)
+
+    def init_export_group(self):
+
+        # creates the groupbox object
+        self.export_group = QGroupBox("Export Progress")
+        self.export_group.setLayout(self.export_layout)
+        self.export_group.setFont(cw.font_panel)
+        self.main_layout.addWidget(self.export_group)
+
+        # creates the export output listbox/progressbar
+        self.export_layout.addWidget(self.export_list)
+        self.export_layout.addWidget(self.prog_bar)
+        self.export_list.setFont(cw.create_font_obj())
+        self.prog_bar.set_enabled(False)
+
     def init_cont_buttons(self):
 
         # initialisations
@@ -182,6 +259,41 @@ class SavePrep(QDialog):
             # otherwise, reset the previous value
             h_edit.setText(self.user_dir)
 
+    def checkbox_auto_job(self, *_):
+
+        # updates the auto-tune flag (the worker count is only set manually if auto-tuning is disabled)
+        self.is_auto_job = not self.is_auto_job
+        self.obj_lbl_work.set_enabled(not self.is_auto_job)
+
+    def checkbox_read_bench(self, *_):
+
+        self.is_read_bench = not self.is_read_bench
+
+    def combo_out_format(self, h_cbox, *_):
+
+        # updates the output format (the compression parameters are only used for the zarr format)
+        self.out_format = h_cbox.currentText()
+        for obj_lbl_z in self.obj_lbl_zarr:
+            obj_lbl_z.set_enabled(self.out_format == 'zarr')
+
+    def combo_zarr_para(self, i_z, h_cbox, *_):
+
+        if i_z == 0:
+            # case is the blosc compressor
+            self.cname = h_cbox.currentText()
+
+        else:
+            # case is the compression filter
+            self.f_type = h_cbox.currentText()
+
+    def combo_export_dtype(self, h_cbox, *_):
+
+        self.export_dtype = h_cbox.currentText()
+
+        # stores the export data type in the preprocessing configuration (so it is kept with the session)
+        prep_tab = self.sp_main.info_manager.get_info_tab('preprocess')
+        prep_tab.configs.set_dtype_opt(export_dtype=self.export_dtype)
+
     def prep_list_click(self):
 
         self.i_sel_pp = self.prep_list.currentRow() + 1
@@ -196,31 +308,118 @@ class SavePrep(QDialog):
             # case is outputting all runs
             i_run = list(range(len(self.run_names)))
 
-        # outputs the preprocessed data for all specified experimental runs
+        # sets up the output information for all specified experimental runs (and shanks)
+        out_info = []
         for _i_run in i_run:
+            run_name = 'concat_run' if self.is_concat_run else self.run_names[_i_run]
             if self.is_per_shank:
                 for _i_shank in range(self.n_shank):
-                    # sets up the output folder
+                    out_name = '{0}/shank_{1}'.format(run_name, _i_shank)
                     out_folder = self.setup_output_folder_path(_i_run, _i_shank)
-
-                    # retrieves the recording object
-                    run_type = "shank_{0}".format(_i_shank)
-                    pp_rec = self.session_obj.session.get_session_runs(
-                        _i_run, run_type, pp_type=self.pp_data_flds[self.i_sel_pp])
-
-                    # outputs the binary file
-                    pp_rec.save(format="binary", folder=out_folder, n_jobs=self.n_worker, progres_bar=True)
+                    out_info.append((_i_run, "shank_{0}".format(_i_shank), out_folder, out_name))
 
             else:
-                # sets up the output folder
                 out_folder = self.setup_output_folder_path(_i_run)
+                out_info.append((_i_run, "grouped", out_folder, run_name))
+
+        # resets the export output list
+        self.export_list.clear()
+        for x in out_info:
+            self.export_list.addItem('{0}: Waiting...'.format(x[3]))
+
+        # updates the dialog properties
+        self.set_export_props(True)
+        self.prog_bar.update_prog_fields('Setting Up Export...', 0.)
+
+        # runs the export worker
+        self.is_cancel = False
+        self.t_worker = ThreadWorker(self, self.run_export_worker, out_info)
+        self.t_worker.work_finished.connect(self.export_complete)
+        self.t_worker.start()
+
+    def run_export_worker(self, out_info):
+
+        # sets up the recording exports
+        exports, job_kw = [], None
+        for i_run, run_type, out_folder, out_name in out_info:
+            # retrieves the recording object (requantised to the output data type, with the requantisation gain
+            # stored in the channel gains)
+            pp_rec = self.session_obj.session.get_session_runs(
+                i_run, run_type, pp_type=self.pp_data_flds[self.i_sel_pp])
+            pp_rec, _ = self.dtype_policy.requantise(pp_rec, self.export_dtype)
+
+            # sets the job parameters (auto-tuned parameters are calibrated against the output disk)
+            if job_kw is None:
+                if self.is_auto_job:
+                    job_kw = job_tuner.get_job_kwargs(pp_rec, 'export', str(out_folder.parent))
+                else:
+                    job_kw = {'n_jobs': self.n_worker, 'chunk_duration': '1s'}
+
+            t_chunk = float(job_kw['chunk_duration'].replace('s', ''))
+            exports.append(create_export(pp_rec, out_folder, out_name, t_chunk, self.out_format, self.cname, self.f_type))
+
+        # exits if the export was cancelled during the setup
+        if self.is_cancel:
+            return []
+
+        # runs the exports concurrently (under the global worker budget)
+        self.scheduler = ExportScheduler(exports, job_kw['n_jobs'])
+        exp_err = self.scheduler.run()
+
+        # runs the read-back benchmark on the completed exports (if required)
+        if self.is_read_bench and (not self.is_cancel):
+            for exp in exports:
+                if exp.is_complete() and (exp.error is None):
+                    try:
+                        exp.read_rate = benchmark_read(exp.folder)
+
+                    except Exception:
+                        # case is the export couldn't be read back (the read throughput isn't reported)
+                        exp.read_rate = None
+
+        return exp_err
+
+    def export_progress(self, p_info):
+
+        # updates the export output status strings
+        if self.scheduler is not None:
+            for i_exp, s_str in enumerate(self.scheduler.get_status_strings()):
+                self.export_list.item(i_exp).setText(s_str)
+
+        # updates the overall progress
+        if p_info.is_finished:
+            self.prog_bar.update_prog_fields('Export Complete', 1.)
+
+        else:
+            m_str = 'Exporting ({0}/{1} Complete)'.format(p_info.i_step[0], p_info.n_step[0])
+            if p_info.pr_val[0] > 0:
+                m_str = '{0} - {1}'.format(m_str, p_info.get_eta_string())
 
-                # retrieves the recording object
-                pp_rec = self.session_obj.session.get_session_runs(
-                            _i_run, "grouped", pp_type=self.pp_data_flds[self.i_sel_pp])
+            self.prog_bar.update_prog_fields(m_str, p_info.pr_val[0])
 
-                # outputs the binary file
-                pp_rec.save(format="binary", folder=out_folder, n_jobs=self.n_worker, progres_bar=True)
+    def export_complete(self, exp_err):
+
+        # resets the dialog properties
+        self.set_export_props(False)
+        if self.scheduler is not None:
+            for i_exp, s_str in enumerate(self.scheduler.get_status_strings()):
+                self.export_list.item(i_exp).setText(s_str)
+
+        # outputs any export errors
+        if len(exp_err):
+            e_str = '\n'.join(['{0}: {1}'.format(x.out_name, x.error) for x in exp_err])
+            m_str = 'The following outputs failed to export:\n\n{0}'.format(e_str)
+            QMessageBox.warning(self, 'Export Error', m_str)
+
+        self.t_worker = None
+
+    def set_export_props(self, is_running):
+
+        # updates the widget enabled properties
+        self.prep_group.setEnabled(not is_running)
+        self.para_group.setEnabled(not is_running)
+        self.cont_button[0].setEnabled(not is_running)
+        self.prog_bar.set_enabled(True)
 
     # ---------------------------------------------------------------------------
     # Miscellaneous Functions
@@ -228,7 +427,19 @@ class SavePrep(QDialog):
 
     def close_window(self):
 
+        if self.t_worker is not None:
+            # case is an export is running (the export is cancelled)
+            q_str = 'The preprocessed data is still being exported. Do you want to cancel the export?'
+            u_choice = QMessageBox.question(self, 'Cancel Export?', q_str, cf.q_yes_no, cf.q_yes)
+            if u_choice == cf.q_yes:
+                self.is_cancel = True
+                if self.scheduler is not None:
+                    self.scheduler.cancel()
+
+            return
+
         # closes the dialog window
+        progress_bus.unsubscribe(ExportScheduler.pr_name, self.export_progress)
         self.close()
 
     def setup_output_folder_path(self, i_run=None, i_shank=None):
@@ -1,7 +1,6 @@
 # module import
 import re
 import os
-import time
 import docker
 import shutil
 import logging
@@ -17,6 +16,8 @@ from functools import partial as pfcn
 import spykit.common.common_func as cf
 import spykit.common.common_widget as cw
 from spykit.threads.utils import ThreadWorker
+from spykit.common.job_tuner import job_tuner
+from spykit.common.cost_estimator import cost_estimator
 
 # spike interface module imports
 from spikeinterface.sorters import (available_sorters, installed_sorters, get_sorter_params_description,
@@ -537,13 +538,18 @@ class SpikeSortingDialog(QMainWindow):
             # initialise the sorter tab (if not initalised)
             s_prop_t.setup_tab_objects()
 
+        # updates the plan cost estimate
+        self.update_plan_cost()
+
     def checkbox_split_shank(self):
 
         self.per_shank = self.checkbox_opt[0].checkState() == cf.chk_state[False]
+        self.update_plan_cost()
 
     def checkbox_concat_expt(self):
 
         self.concat_runs = self.checkbox_opt[1].checkState() == cf.chk_state[False]
+        self.update_plan_cost()
 
     def start_spike_sort(self):
 
@@ -553,10 +559,9 @@ class SpikeSortingDialog(QMainWindow):
 
         # resets the button state
         self.is_running = not self.button_cont[0].isChecked()
-        time.sleep(0.05)
 
         if self.is_running:
-            if not self.check_sort_overwrite():
+            if not (self.check_plan_cost() and self.check_sort_overwrite()):
                 # if the user cancelled, then exit the function
                 self.is_updating = True
                 self.button_cont[0].setChecked(False)
@@ -572,7 +577,6 @@ class SpikeSortingDialog(QMainWindow):
             # updates the progressbar
             self.prog_bar.set_label("Running Spike Sorting")
             self.prog_bar.set_progbar_state(True)
-            time.sleep(0.1)
 
             # sets up the configuration dictionary
             sort_config = self.setup_config_dict()
@@ -588,7 +592,6 @@ class SpikeSortingDialog(QMainWindow):
         else:
             # stops the worker
             self.t_worker.force_quit()
-            time.sleep(0.01)
 
             # disables the progressbar fields
             self.prog_bar.set_progbar_state(False)
@@ -602,7 +605,6 @@ class SpikeSortingDialog(QMainWindow):
         if (self.t_worker is not None) and self.t_worker.is_running:
             # stops the progressbar
             self.prog_bar.set_progbar_state(False)
-            time.sleep(0.1)
 
             # force closes the thread worker
             self.t_worker.force_quit()
@@ -657,13 +659,20 @@ class SpikeSortingDialog(QMainWindow):
         per_shank, concat_runs = sort_opt
         run_sorter_method = self.get_sorter_method()
 
-        # runs the preprocessing
+        # runs the spike sorting (for each probe of a multi-probe session, except for concatenated runs as the
+        # concatenated run output folder is shared between the probes)
+        sort_fcn = pfcn(self.run_probe_sorting, sort_config, per_shank, concat_runs, run_sorter_method)
         try:
-            self.session.sort_obj.sort(sort_config, per_shank, concat_runs, run_sorter_method)
+            self.session_obj.run_probe_tasks(sort_fcn, all_probe=not concat_runs)
             return []
         except Exception as e:
             return str(e)
 
+    @staticmethod
+    def run_probe_sorting(sort_config, per_shank, concat_runs, run_sorter_method, ses_probe, n_cpu):
+
+        ses_probe.sort_obj.sort(deepcopy(sort_config), per_shank, concat_runs, run_sorter_method, n_cpu)
+
     def spike_sorting_complete(self, sorting_msg):
 
         # stops and updates the progressbar
@@ -730,9 +739,6 @@ class SpikeSortingDialog(QMainWindow):
         if state:
             self.set_checkbox_enabled_props()
 
-        # pause for update...
-        time.sleep(0.01)
-
     def set_sorter_tab_enabled(self, sl_name, state):
 
         g_tab, i_tab = self.get_sorter_tab_props(sl_name)
@@ -801,6 +807,50 @@ class SpikeSortingDialog(QMainWindow):
                 # case is using occker
                 return 'docker'
 
+    def update_plan_cost(self):
+
+        # exits if there is no session (or the control buttons haven't been created)
+        if (self.sp_main is None) or (len(self.button_cont) == 0) or (self.s_type is None):
+            return
+
+        # updates the plan cost estimate (shown in the start button tooltip)
+        self.button_cont[0].setToolTip(self.get_plan_cost().get_summary_string())
+
+    def check_plan_cost(self):
+
+        # determines if the estimated plan cost exceeds the available resources
+        sort_cost = self.get_plan_cost()
+        if len(sort_cost.warnings) == 0:
+            return True
+
+        # prompts the user if they still want to continue
+        q_str = ('The spike sorting plan is estimated to exceed the available resources:\n\n{0}\n\n'
+                 'Do you still want to continue?'.format(sort_cost.get_summary_string()))
+        u_choice = QMessageBox.question(self.sp_main, 'Resource Warning', q_str, cf.q_yes_no, cf.q_yes)
+        return u_choice == cf.q_yes
+
+    def get_plan_cost(self):
+
+        # sets the sorting options (the sorting units are split/combined if either the preprocessing or sorting
+        # options are set)
+        prep_obj = self.session.prep_obj
+        per_shank = self.per_shank or prep_obj.per_shank
+        concat_runs = self.concat_runs or prep_obj.concat_runs
+
+        # retrieves the raw recordings (for each run of each sorted probe session - concatenated runs are only sorted
+        # for the current probe)
+        ses_probe = [self.session] if concat_runs else self.session_obj.get_probe_sessions()
+        probe_recs = [[x.get_session_runs(i, 'grouped') for i in range(x.get_run_count())] for x in ses_probe]
+
+        # the sorter reads through the lazy preprocessing steps (materialised steps are read directly)
+        pp_steps_tot = {} if (prep_obj.pp_steps_tot is None) else prep_obj.pp_steps_tot
+        pp_steps = [] if prep_obj.use_cache else [x[0] for x in pp_steps_tot.values()]
+
+        # estimates the sorting plan cost
+        out_path = self.session._s.get_output_path()
+        return cost_estimator.estimate_sorting(probe_recs, self.session_obj.get_shank_count(), self.s_type,
+                                               per_shank, concat_runs, out_path, pp_steps)
+
     def check_sort_overwrite(self):
 
         # determines if the output path exists
@@ -961,7 +1011,7 @@ class RunSpikeSorting(QObject):
         self.concat_runs = False
         self.run_sorter_method = False
 
-    def sort(self, ss_config, per_shank, concat_runs, run_sorter_method):
+    def sort(self, ss_config, per_shank, concat_runs, run_sorter_method, n_cpu=None):
 
         # sets the input arguments
         self.per_shank = per_shank
@@ -969,6 +1019,11 @@ class RunSpikeSorting(QObject):
         self.ss_config = ss_config
         self.run_sorter_method = run_sorter_method
 
+        # sets the tuned job parameters within the sorter parameters (the global job parameters aren't altered, as
+        # these are shared by the concurrent probe sorting tasks)
+        rec = next(iter(self.s._raw_runs[0]._raw.values()))
+        self.set_sorter_job_kwargs(ss_config, job_tuner.get_job_kwargs(rec, 'sort', n_cpu=n_cpu))
+
         # runs the spike sorting solver
         self.s.sort(
             ss_config,
@@ -977,6 +1032,21 @@ class RunSpikeSorting(QObject):
             concat_runs=self.concat_runs,
         )
 
+    @staticmethod
+    def set_sorter_job_kwargs(ss_config, job_kw):
+
+        for s_name, s_para in ss_config['sorting'].items():
+            s_para_def = get_default_sorter_params(s_name)
+            if isinstance(s_para_def.get('job_kwargs'), dict):
+                # case is a sorter with a job parameter dictionary (the user set parameters are kept)
+                s_para['job_kwargs'] = {**s_para_def['job_kwargs'], **job_kw, **s_para.get('job_kwargs', {})}
+
+            else:
+                # case is a sorter with top-level job parameters (the user set parameters are kept)
+                for k, v in job_kw.items():
+                    if k in s_para_def:
+                        s_para.setdefault(k, v)
+
     def get_info(self, ss_obj, p_name):
 
         # initialises the progressbar